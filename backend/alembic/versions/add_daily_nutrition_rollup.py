@@ -0,0 +1,114 @@
+"""add daily_nutrition_rollup table
+
+Revision ID: add_daily_nutrition_rollup
+Revises: add_user_streaks
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_nutrition_rollup'
+down_revision = 'add_user_streaks'
+branch_labels = None
+depends_on = None
+
+# Same sums as app.services.nutrition_rollup.meal_macros/aggregate_days:
+# a non-empty external_meal wins (its own calories/macros, else its 'macros'
+# object, no portion multiplier), otherwise the recipe's macros_per_serving
+# times portion_multiplier. Only consumed meals add macros.
+BACKFILL_ROLLUP = """
+INSERT INTO daily_nutrition_rollup (
+    user_id, date, calories, protein_g, carbs_g, fat_g, fiber_g,
+    meals_planned, meals_consumed, meals_skipped, updated_at
+)
+SELECT
+    ml.user_id,
+    CAST(ml.planned_datetime AS date),
+    COALESCE(SUM(m.calories) FILTER (WHERE ml.consumed_datetime IS NOT NULL), 0),
+    COALESCE(SUM(m.protein_g) FILTER (WHERE ml.consumed_datetime IS NOT NULL), 0),
+    COALESCE(SUM(m.carbs_g) FILTER (WHERE ml.consumed_datetime IS NOT NULL), 0),
+    COALESCE(SUM(m.fat_g) FILTER (WHERE ml.consumed_datetime IS NOT NULL), 0),
+    COALESCE(SUM(m.fiber_g) FILTER (WHERE ml.consumed_datetime IS NOT NULL), 0),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE ml.consumed_datetime IS NOT NULL),
+    COUNT(*) FILTER (WHERE ml.consumed_datetime IS NULL AND ml.was_skipped IS TRUE),
+    timezone('utc', now())
+FROM meal_logs ml
+LEFT JOIN recipes r ON r.id = ml.recipe_id
+CROSS JOIN LATERAL (
+    SELECT CAST(ml.external_meal AS jsonb) AS ext
+) e
+CROSS JOIN LATERAL (
+    SELECT
+        CASE
+            WHEN e.ext IS NOT NULL AND e.ext NOT IN (CAST('null' AS jsonb), CAST('{}' AS jsonb)) THEN
+                CASE WHEN jsonb_exists(e.ext, 'calories') THEN e.ext ELSE e.ext -> 'macros' END
+            ELSE CAST(r.macros_per_serving AS jsonb)
+        END AS src,
+        CASE
+            WHEN e.ext IS NOT NULL AND e.ext NOT IN (CAST('null' AS jsonb), CAST('{}' AS jsonb)) THEN 1
+            ELSE COALESCE(ml.portion_multiplier, 1)
+        END AS multiplier
+) s
+CROSS JOIN LATERAL (
+    SELECT
+        COALESCE(CAST(s.src ->> 'calories' AS double precision), 0) * s.multiplier AS calories,
+        COALESCE(CAST(s.src ->> 'protein_g' AS double precision), 0) * s.multiplier AS protein_g,
+        COALESCE(CAST(s.src ->> 'carbs_g' AS double precision), 0) * s.multiplier AS carbs_g,
+        COALESCE(CAST(s.src ->> 'fat_g' AS double precision), 0) * s.multiplier AS fat_g,
+        COALESCE(CAST(s.src ->> 'fiber_g' AS double precision), 0) * s.multiplier AS fiber_g
+) m
+WHERE ml.user_id IS NOT NULL AND ml.planned_datetime IS NOT NULL
+GROUP BY ml.user_id, CAST(ml.planned_datetime AS date)
+"""
+
+# Every existing user is built by the backfill, including users without meals
+MARK_USERS_BUILT = """
+INSERT INTO nutrition_rollup_users (user_id, rebuilt_at)
+SELECT id, timezone('utc', now()) FROM users
+"""
+
+
+def upgrade():
+    """
+    Add the per-user daily nutrition rollup and backfill it from meal_logs.
+    Rows are kept current by NutritionRollupService as meals are logged,
+    skipped, edited and planned. nutrition_rollup_users records which users'
+    rollups have been built.
+    """
+    op.create_table(
+        'daily_nutrition_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('calories', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('protein_g', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('carbs_g', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('fat_g', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('fiber_g', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('meals_planned', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('meals_consumed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('meals_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+    op.create_table(
+        'nutrition_rollup_users',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('rebuilt_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.execute(sa.text(BACKFILL_ROLLUP))
+    op.execute(sa.text(MARK_USERS_BUILT))
+
+
+def downgrade():
+    """
+    Rollback migration: drop nutrition_rollup_users and daily_nutrition_rollup.
+    """
+    op.drop_table('nutrition_rollup_users')
+    op.drop_table('daily_nutrition_rollup')
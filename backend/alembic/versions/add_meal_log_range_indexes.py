@@ -0,0 +1,39 @@
+"""add composite and partial range indexes to meal_logs
+
+Revision ID: add_meal_log_range_indexes
+Revises: add_daily_nutrition_rollup
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_meal_log_range_indexes'
+down_revision = 'add_daily_nutrition_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Index the per-user timestamp range scans on meal_logs.
+    Day filters use half-open ranges (app.core.dates) so these are usable.
+    """
+    op.create_index('ix_meal_logs_user_planned', 'meal_logs', ['user_id', 'planned_datetime'], unique=False)
+    op.create_index('ix_meal_logs_user_consumed', 'meal_logs', ['user_id', 'consumed_datetime'], unique=False)
+
+    # Pending meals (reminders, next meal, expiry horizon)
+    op.create_index(
+        'ix_meal_logs_user_pending', 'meal_logs', ['user_id', 'planned_datetime'], unique=False,
+        postgresql_where=sa.text('consumed_datetime IS NULL AND was_skipped = false')
+    )
+
+
+def downgrade():
+    """
+    Rollback migration: drop the meal_logs range indexes.
+    """
+    op.drop_index('ix_meal_logs_user_pending', table_name='meal_logs')
+    op.drop_index('ix_meal_logs_user_consumed', table_name='meal_logs')
+    op.drop_index('ix_meal_logs_user_planned', table_name='meal_logs')
@@ -0,0 +1,40 @@
+"""add user_streaks table
+
+Revision ID: add_user_streaks
+Revises: add_meal_plan_link
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_streaks'
+down_revision = 'add_meal_plan_link'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Add the per-user meal logging streak counter.
+    Rows are created lazily (recomputed from meal_logs on first read).
+    """
+    op.create_table(
+        'user_streaks',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_logged_date', sa.Date(), nullable=True),
+        sa.Column('milestone_awarded', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    """
+    Rollback migration: drop user_streaks.
+    """
+    op.drop_table('user_streaks')
@@ -0,0 +1,81 @@
+"""
+Streaming runs of the compiled nutrition graph.
+
+/nutrition/chat/v2 waits for the whole run (classification, tool loops,
+final generation) before it answers, so the app shows a spinner for
+multi-second turns. ChatStream drives the same graph with astream_events
+and turns LangGraph's event stream into a few client events as they happen:
+
+- node_start / node_end: a graph node began / finished (node_end of
+  classify_intent carries the intent and confidence)
+- tool_start / tool_end: a tool call inside the tools node
+- token: a text delta from generate_response_node's LLM call
+
+The final graph state is kept on the stream (final_state) for the caller to
+build its reply. Used by POST /nutrition/chat/v2/stream (SSE) and the "chat"
+message of the WebSocket channel.
+
+Usage:
+    stream = ChatStream(graph, initial_state, config)
+    async for event in stream.events():
+        ...
+    result = stream.final_state
+"""
+
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STREAMED_NODES = ("load_context", "classify_intent", "trim_messages", "generate_response", "tools")
+TOKEN_NODE = "generate_response"
+
+
+class ChatStream:
+    """Client events of one graph run, plus its final state and time to first token"""
+
+    def __init__(self, graph, state: Dict[str, Any], config: Dict[str, Any]):
+        self.graph = graph
+        self.state = state
+        self.config = config
+        self.final_state: Optional[Dict[str, Any]] = None
+        self.first_token_ms: Optional[int] = None
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        started = time.perf_counter()
+
+        async for event in self.graph.astream_events(self.state, config=self.config, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream":
+                # classify_intent's fallback LLM call streams too; only the answer is shown
+                delta = event["data"]["chunk"].content
+                if node == TOKEN_NODE and isinstance(delta, str) and delta:
+                    if self.first_token_ms is None:
+                        self.first_token_ms = int((time.perf_counter() - started) * 1000)
+                    yield {"event": "token", "delta": delta}
+
+            elif kind in ("on_chain_start", "on_chain_end") and node in STREAMED_NODES and event["name"] == node:
+                if kind == "on_chain_start":
+                    yield {"event": "node_start", "node": node}
+                    continue
+
+                node_event = {"event": "node_end", "node": node}
+                output = event["data"].get("output")
+                if node == "classify_intent" and isinstance(output, dict):
+                    node_event.update(intent=output.get("intent"), confidence=output.get("confidence"))
+                yield node_event
+
+            elif kind in ("on_tool_start", "on_tool_end"):
+                yield {"event": "tool_start" if kind == "on_tool_start" else "tool_end", "tool": event["name"]}
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # Root graph run finished: its output is the final state
+                self.final_state = event["data"].get("output")
+
+        logger.info(
+            f"[ChatStream] Run finished in {int((time.perf_counter() - started) * 1000)}ms "
+            f"(first token {self.first_token_ms}ms)"
+        )
@@ -0,0 +1,233 @@
+"""
+Async MongoDB checkpointer for the compiled nutrition graph.
+
+The graph is driven with ainvoke from /nutrition/chat/v2. The sync
+MongoDBSaver answers every async checkpoint call by running blocking pymongo
+I/O on the default thread pool. This saver talks to MongoDB through the
+shared motor client (core/mongodb.get_mongo_async_client) instead, so
+checkpoint I/O never blocks the event loop or ties up executor threads.
+
+On top of the vendored AsyncMongoDBSaver it:
+- batches pending writes per graph step: the writes of a step's tasks are
+  buffered and sent as one bulk_write together with the checkpoint that
+  closes the step (error/interrupt writes are still flushed right away, and
+  reads of a thread flush its buffer first)
+- caps stored checkpoints per thread: every `prune_every` steps, checkpoints
+  (and their writes) older than the newest `max_checkpoints` are deleted
+
+Documents use the same collections and layout as MongoDBSaver, so existing
+conversation state keeps working.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+ThreadKey = Tuple[str, str]  # (thread_id, checkpoint_ns)
+
+
+class AsyncMongoCheckpointer(AsyncMongoDBSaver):
+    """Motor-backed checkpointer with per-step write batching and per-thread retention"""
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        db_name: str,
+        checkpoint_collection_name: str = "checkpoints",
+        writes_collection_name: str = "checkpoint_writes",
+        max_checkpoints: int = 20,
+        prune_every: int = 10,
+        ttl: Optional[int] = None
+    ):
+        # AsyncMongoDBSaver.__init__ warns about its deprecation and appends
+        # pymongo driver metadata, which a motor client does not support
+        BaseCheckpointSaver.__init__(self)
+        self.client = client
+        self.db = client[db_name]
+        self.checkpoint_collection = self.db[checkpoint_collection_name]
+        self.writes_collection = self.db[writes_collection_name]
+        self.loop = asyncio.get_running_loop()
+        self.ttl = ttl
+        self._setup_future: Optional[asyncio.Future] = None
+
+        self.max_checkpoints = max_checkpoints
+        self.prune_every = prune_every
+        self._pending_writes: Dict[ThreadKey, List[UpdateOne]] = defaultdict(list)
+
+    async def _setup(self) -> None:
+        """Create the checkpoint/writes indexes once (no-op if they already exist)"""
+        if self._setup_future is not None:
+            return await self._setup_future
+        self._setup_future = self.loop.create_future()
+
+        try:
+            await self.checkpoint_collection.create_index(
+                [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)], unique=True
+            )
+            await self.writes_collection.create_index(
+                [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1), ("task_id", 1), ("idx", 1)],
+                unique=True
+            )
+            if self.ttl:
+                await self.checkpoint_collection.create_index([("created_at", 1)], expireAfterSeconds=self.ttl)
+                await self.writes_collection.create_index([("created_at", 1)], expireAfterSeconds=self.ttl)
+            self._setup_future.set_result(None)
+        except Exception as e:
+            self._setup_future.set_exception(e)
+            self._setup_future = None
+            raise
+
+    # ===== WRITE BATCHING =====
+
+    def _write_ops(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str
+    ) -> List[UpdateOne]:
+        """Upserts for a task's writes (same documents as AsyncMongoDBSaver.aput_writes)"""
+        configurable = config["configurable"]
+        # Allow replacement on existing writes only if there were errors
+        set_method = "$set" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "$setOnInsert"
+        now = datetime.now()
+
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized_value = self.serde.dumps_typed(value)
+            update_doc = {"channel": channel, "type": type_, "value": serialized_value}
+            if self.ttl:
+                update_doc["created_at"] = now
+
+            operations.append(UpdateOne(
+                {
+                    "thread_id": configurable["thread_id"],
+                    "checkpoint_ns": configurable["checkpoint_ns"],
+                    "checkpoint_id": configurable["checkpoint_id"],
+                    "task_id": task_id,
+                    "task_path": task_path,
+                    "idx": WRITES_IDX_MAP.get(channel, idx)
+                },
+                {set_method: update_doc},
+                upsert=True
+            ))
+        return operations
+
+    async def _flush(self, thread_id: Optional[str] = None) -> None:
+        """Send buffered writes (of one thread, or all) in one bulk_write"""
+        keys = [key for key in self._pending_writes if thread_id is None or key[0] == thread_id]
+        operations = [op for key in keys for op in self._pending_writes.pop(key)]
+        if operations:
+            await self.writes_collection.bulk_write(operations, ordered=False)
+
+    async def aflush(self) -> None:
+        """Flush every buffered write (call on shutdown)"""
+        await self._flush()
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Buffer a task's writes until the step's checkpoint is saved"""
+        await self._setup()
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable["checkpoint_ns"])
+        self._pending_writes[key].extend(self._write_ops(config, writes, task_id, task_path))
+
+        # Errors/interrupts may not be followed by another checkpoint
+        if any(channel in WRITES_IDX_MAP for channel, _ in writes):
+            await self._flush(configurable["thread_id"])
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Save the checkpoint together with the step's buffered writes, pruning old ones"""
+        await self._setup()
+        configurable = config["configurable"]
+        thread_id, checkpoint_ns = configurable["thread_id"], configurable["checkpoint_ns"]
+
+        operations = self._pending_writes.pop((thread_id, checkpoint_ns), [])
+        saves = [super().aput(config, checkpoint, metadata, new_versions)]
+        if operations:
+            saves.append(self.writes_collection.bulk_write(operations, ordered=False))
+        next_config, *_ = await asyncio.gather(*saves)
+
+        step = metadata.get("step") or 0
+        if self.max_checkpoints and step > 0 and step % self.prune_every == 0:
+            await self._prune(thread_id, checkpoint_ns)
+
+        return next_config
+
+    # ===== RETENTION =====
+
+    async def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Delete checkpoints (and their writes) older than the newest max_checkpoints"""
+        try:
+            cursor = self.checkpoint_collection.find(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns},
+                projection={"checkpoint_id": 1},
+                sort=[("checkpoint_id", -1)],
+                skip=self.max_checkpoints,
+                limit=1
+            )
+            async for doc in cursor:
+                stale = {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": {"$lte": doc["checkpoint_id"]}
+                }
+                await asyncio.gather(
+                    self.checkpoint_collection.delete_many(stale),
+                    self.writes_collection.delete_many(stale)
+                )
+        except Exception as e:
+            # Retention is best effort; never fail the graph step over it
+            logger.warning(f"[Checkpointer] Failed to prune thread {thread_id}: {e}")
+
+    # ===== READS =====
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self._flush(config["configurable"]["thread_id"])
+        return await super().aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        await self._flush(thread_id)
+        async for item in super().alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        for key in [key for key in self._pending_writes if key[0] == thread_id]:
+            del self._pending_writes[key]
+        await super().adelete_thread(thread_id)
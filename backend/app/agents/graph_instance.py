@@ -7,14 +7,15 @@ The graph is compiled ONCE at application startup and reused for all requests.
 Benefits:
 - Eliminates 90ms graph compilation overhead per request
 - Thread-safe: LangGraph compiled graphs are designed for concurrent use
-- Stateless: Each request passes user_id in state, tools create own DB sessions
+- Stateless: Each request passes user_id in state, nodes/tools share the turn's DB session
+- Non-blocking persistence: checkpoints go through the shared motor client
 """
 
 import logging
 from contextlib import asynccontextmanager
-from langgraph.checkpoint.mongodb import MongoDBSaver
+from app.agents.checkpointer import AsyncMongoCheckpointer
 from app.core.config import settings
-from app.core.mongodb import get_mongo_sync_client
+from app.core.mongodb import get_mongo_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ async def initialize_nutrition_graph():
     Initialize and compile the nutrition graph at application startup.
 
     This async context manager handles:
-    1. Creating MongoDB checkpointer
+    1. Creating the async MongoDB checkpointer
     2. Building graph structure
     3. Compiling graph with checkpointer
     4. Cleanup on shutdown
@@ -46,9 +47,15 @@ async def initialize_nutrition_graph():
     try:
         # Create MongoDB checkpointer for conversation state persistence
         try:
-            client = get_mongo_sync_client()
-            _checkpointer = MongoDBSaver(client=client, db_name=settings.mongodb_db)
-            logger.info("[GraphInit] ✅ MongoDB checkpointer created")
+            client = get_mongo_async_client()
+            await client.admin.command("ping")
+            _checkpointer = AsyncMongoCheckpointer(
+                client,
+                db_name=settings.mongodb_db,
+                max_checkpoints=settings.checkpoint_max_per_thread
+            )
+            await _checkpointer._setup()
+            logger.info("[GraphInit] ✅ Async MongoDB checkpointer created")
         except Exception as mongo_error:
             logger.error(f"[GraphInit] ❌ MongoDB connection failed: {mongo_error}")
             logger.warning("[GraphInit] ⚠️ Proceeding WITHOUT checkpointer (stateless mode)")
@@ -83,6 +90,11 @@ async def initialize_nutrition_graph():
     finally:
         # Cleanup on shutdown
         logger.info("[GraphInit] 👋 Shutting down nutrition graph...")
+        if _checkpointer:
+            try:
+                await _checkpointer.aflush()
+            except Exception as flush_error:
+                logger.error(f"[GraphInit] ❌ Failed to flush checkpoint writes: {flush_error}")
         _compiled_graph = None
         _checkpointer = None
 
@@ -0,0 +1,431 @@
+"""
+Local fast-path intent router for nutrition chat.
+
+classify_intent_node and IntentClassifier.classify used to make a GPT-4o
+JSON-mode call before every response, even for "how is my protein?". That
+is one extra network round trip (~300-800ms) and ~300 tokens per turn.
+
+The router classifies locally in two stages and only lets the caller fall
+back to the LLM when neither is confident enough:
+
+1. Rules: keyword/regex patterns with high precision. A query that matches
+   the rules of exactly one intent is routed with RULE_CONFIDENCE.
+2. Centroid: a small bag-of-ngrams embedding (word unigrams/bigrams and
+   character trigrams, IDF-weighted over the exemplars) and the nearest
+   intent centroid. Exemplar vectors and centroids are built once per
+   process. Confidence comes from the top similarity and its margin over
+   the runner-up.
+
+Entities the handlers read (nutrients, meal_type, time_period) are extracted
+with regexes for fast-path results.
+
+Every classification is recorded in RouterMetrics (hit rate and latency per
+source; deferred queries count as misses even when the LLM fallback fails),
+exposed through GET /nutrition/health.
+
+Usage:
+    router = get_intent_router()
+    routed = router.route(query)
+    if routed is None:
+        started = time.perf_counter()
+        ...  # LLM classification
+        router.metrics.record("llm", (time.perf_counter() - started) * 1000)
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RULE_CONFIDENCE = 0.95
+MIN_SIMILARITY = 0.3  # centroid matches below this are scaled down
+LATENCY_WINDOW = 1000  # latencies kept per source for percentiles
+
+Vector = Dict[str, float]
+
+
+# ============================================================================
+# INTENT DATA
+# ============================================================================
+
+INTENT_EXEMPLARS: Dict[str, List[str]] = {
+    "stats": [
+        "how is my protein?",
+        "how is my protein intake today",
+        "show my macros",
+        "what did I eat today?",
+        "am I on track?",
+        "how many calories have I had",
+        "how much protein do I still need",
+        "how many calories left today",
+        "what are my macros so far",
+        "my nutrition progress today",
+        "did I hit my protein goal",
+        "how am I doing on carbs",
+        "calories remaining",
+        "show today's nutrition stats",
+        "how much fat have I eaten",
+        "what's my calorie count",
+        "protein status",
+        "give me my daily summary",
+    ],
+    "what_if": [
+        "what if I eat a pizza?",
+        "how would 2 samosas affect my macros?",
+        "can I fit ice cream?",
+        "what happens if I have a burger",
+        "can I afford a slice of cake",
+        "if I eat 3 eggs will I go over",
+        "would a chocolate bar fit my calories",
+        "what if I add a protein shake",
+        "is there room for a beer tonight",
+        "can I still have biryani for dinner",
+        "will a mango lassi break my diet today",
+        "what if I skip lunch and eat a big dinner",
+        "if I drink a coke will I exceed my calories",
+    ],
+    "meal_suggestion": [
+        "what should I eat?",
+        "suggest lunch",
+        "I'm hungry",
+        "meal ideas?",
+        "recommend a high protein dinner",
+        "give me a snack idea",
+        "what should I have for breakfast",
+        "suggest something light",
+        "what's a good post workout meal",
+        "any healthy dinner recommendations",
+        "what can I eat to hit my protein",
+        "quick low calorie snack ideas",
+        "give me something high protein to eat",
+        "any ideas for a snack",
+    ],
+    "meal_plan": [
+        "show my meal plan",
+        "what's for dinner?",
+        "change tomorrow's lunch",
+        "upcoming meals?",
+        "what is planned for today",
+        "what's on my plan for tomorrow",
+        "swap my breakfast",
+        "replace tonight's dinner with something else",
+        "what am I having for lunch",
+        "show this week's plan",
+        "what meals are left today",
+        "reschedule my snack",
+        "what's next on my plan",
+        "what meals do I have planned",
+    ],
+    "inventory": [
+        "do I have eggs?",
+        "what's expiring?",
+        "what can I make?",
+        "ingredient status?",
+        "what's in my fridge",
+        "am I out of milk",
+        "how much rice do I have left",
+        "what groceries do I need",
+        "what can I cook with what I have",
+        "which items expire soon",
+        "check my pantry",
+        "do I have enough chicken for dinner",
+        "how many eggs are left",
+        "is there paneer in the fridge",
+    ],
+    "conversational": [
+        "is protein important?",
+        "tell me about meal prep",
+        "nutrition tips",
+        "explain macros",
+        "why is fiber good for you",
+        "what are complex carbs",
+        "is intermittent fasting healthy",
+        "how does creatine work",
+        "thanks!",
+        "hello",
+        "what is a calorie deficit",
+        "are eggs bad for cholesterol",
+        "is whey protein safe",
+        "what are good fats",
+    ],
+}
+
+_MEALS = r"(breakfast|lunch|dinner|snacks?)"
+_NUTRIENTS = r"(protein|calories|calorie|carbs?|fats?|fib(er|re)|macros?|sugar|sodium)"
+
+INTENT_RULES: Dict[str, List[str]] = {
+    # Only clear hypotheticals: "can I have/eat ..." and "does X affect ..." are
+    # as often general questions, so they go to the centroid / LLM
+    "what_if": [
+        r"\bwhat if\b",
+        r"\bif i (eat|ate|have|had|add|drink|skip)\b",
+        r"\bcan i (still )?fit\b",
+        r"\b\w+ (fit|go over) (in(to)? )?my\b",
+        r"\bis there room for\b",
+    ],
+    "stats": [
+        rf"\bhow('s| is| are| am i doing (on|with)?)\s*(my )?(\w+ )?{_NUTRIENTS}\b",
+        rf"\bhow (many|much) {_NUTRIENTS}\b.*\b(i|my|left|today)\b",  # not "how many calories are in X"
+        rf"\b(show|check|see)( me)? (my )?(today'?s )?({_NUTRIENTS}|stats|progress|nutrition)\b",
+        r"\bam i (on track|over|under)\b",
+        r"\bhow am i doing\b",
+        r"\b(daily|today'?s) (summary|totals?)\b",
+        r"\bwhat did i eat\b",
+        rf"\b{_NUTRIENTS} (left|remaining|so far)\b",
+        r"\bdid i (hit|reach|meet) my\b",
+    ],
+    "meal_plan": [
+        r"\bmeal ?plan\b",
+        rf"\bwhat'?s for {_MEALS}\b",
+        rf"\bwhat am i (having|eating) for {_MEALS}\b",
+        r"\bupcoming meals?\b",
+        rf"\b(change|swap|replace|reschedule)( my| the)? (\w+'?s? )?{_MEALS}\b",
+        r"\bwhat('?s| is) (planned|on my plan)\b",
+        r"\bplanned\b",
+    ],
+    "inventory": [
+        r"\bdo i have\b",
+        r"\bexpir(e|es|ing|y)\b",
+        r"\bwhat can i (make|cook)\b",
+        r"\b(in|check) my (fridge|pantry|inventory|kitchen)\b",
+        r"\b(am i|are we) out of\b",
+        r"\bgrocer(y|ies)\b",
+    ],
+    "meal_suggestion": [
+        r"\bwhat should i (eat|have|cook)\b",
+        r"\b(suggest|recommend)\b",
+        r"\bi'?m (so )?(hungry|starving)\b",
+        r"\b(meal|snack|dinner|lunch|breakfast) ideas?\b",
+    ],
+    "conversational": [
+        r"^(hi|hello|hey|thanks|thank you)\b",
+        r"\b(explain|tell me about)\b",
+        r"\bnutrition tips?\b",
+        r"\bwhy (is|are|do|does|should)\b",
+        r"^(is|are) .+ (good|bad|safe|healthy|important)\b",
+    ],
+}
+
+_ENTITY_PATTERNS = {
+    "nutrients": re.compile(r"\b(protein|calories?|carbs?|fats?|fib(?:er|re))\b"),
+    "meal_type": re.compile(rf"\b{_MEALS}\b"),
+    "time_period": re.compile(r"\b(today|tonight|tomorrow|yesterday|this week|last week)\b"),
+}
+
+_NUTRIENT_NAMES = {"calorie": "calories", "carb": "carbs", "fat": "fat", "fats": "fat", "fibre": "fiber"}
+
+
+def extract_entities(query: str) -> Dict[str, Any]:
+    """Nutrients, meal type and time period mentioned in the query"""
+    text = _normalize(query)
+    entities: Dict[str, Any] = {}
+
+    nutrients = [_NUTRIENT_NAMES.get(match, match) for match in _ENTITY_PATTERNS["nutrients"].findall(text)]
+    if nutrients:
+        entities["nutrients"] = list(dict.fromkeys(nutrients))
+
+    meal_type = _ENTITY_PATTERNS["meal_type"].search(text)
+    if meal_type:
+        entities["meal_type"] = meal_type.group(1).rstrip("s")
+
+    time_period = _ENTITY_PATTERNS["time_period"].search(text)
+    if time_period:
+        entities["time_period"] = "today" if time_period.group(1) == "tonight" else time_period.group(1)
+
+    return entities
+
+
+# ============================================================================
+# EMBEDDING
+# ============================================================================
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower().replace("’", "'")).strip()
+
+
+def _features(text: str) -> Counter:
+    """Word unigrams/bigrams and character trigrams of a query"""
+    words = re.findall(r"[a-z0-9']+", _normalize(text))
+    features = Counter(f"w:{word}" for word in words)
+    features.update(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        padded = f" {word} "
+        features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def _unit(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {key: value / norm for key, value in vector.items()} if norm else {}
+
+
+def _dot(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(key, 0.0) for key, value in a.items())
+
+
+class CentroidModel:
+    """Nearest-centroid classifier over IDF-weighted n-gram vectors of intent exemplars"""
+
+    def __init__(self, exemplars: Dict[str, Sequence[str]]):
+        documents = [(intent, _features(text)) for intent, texts in exemplars.items() for text in texts]
+        document_frequency = Counter(key for _, features in documents for key in features)
+        total = len(documents)
+        self.idf = {key: math.log((1 + total) / (1 + count)) + 1 for key, count in document_frequency.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for intent, features in documents:
+            for key, value in self.embed_features(features).items():
+                sums[intent][key] += value
+        self.centroids = {intent: _unit(vector) for intent, vector in sums.items()}
+
+    def embed_features(self, features: Counter) -> Vector:
+        # Unseen n-grams carry no signal for any centroid
+        return _unit({
+            key: (1 + math.log(count)) * self.idf[key]
+            for key, count in features.items() if key in self.idf
+        })
+
+    def embed(self, text: str) -> Vector:
+        return self.embed_features(_features(text))
+
+    def similarities(self, text: str) -> List[Tuple[str, float]]:
+        """(intent, cosine similarity) pairs, most similar first"""
+        vector = self.embed(text)
+        scores = [(intent, _dot(vector, centroid)) for intent, centroid in self.centroids.items()]
+        return sorted(scores, key=lambda score: score[1], reverse=True)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Nearest intent and a confidence from its similarity and margin"""
+        (intent, top), (_, second) = self.similarities(text)[:2]
+        if top <= 0:
+            return intent, 0.0
+        confidence = top / (top + second) if second > 0 else 1.0
+        confidence *= min(1.0, top / MIN_SIMILARITY)
+        return intent, round(confidence, 3)
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+@dataclass
+class RouterMetrics:
+    """
+    Classification counts and latencies per source: rules / centroid (routed
+    locally), deferred (sent to the LLM, counted whether or not the LLM call
+    succeeds) and llm (successful LLM classifications, for latency only)
+    """
+    counts: Counter = field(default_factory=Counter)
+    latencies_ms: Dict[str, Deque[float]] = field(
+        default_factory=lambda: defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, source: str, elapsed_ms: float):
+        with self.lock:
+            self.counts[source] += 1
+            self.latencies_ms[source].append(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            fast = self.counts["rules"] + self.counts["centroid"]
+            total = fast + self.counts["deferred"]
+            latency = {}
+            for source, values in self.latencies_ms.items():
+                ordered = sorted(values)
+                latency[source] = {
+                    "avg_ms": round(sum(ordered) / len(ordered), 3),
+                    "p50_ms": round(ordered[len(ordered) // 2], 3),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3)
+                }
+            return {
+                "total": total,
+                "by_source": dict(self.counts),
+                "hit_rate": round(fast / total, 3) if total else 0.0,
+                "latency": latency
+            }
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+@dataclass
+class RoutedIntent:
+    """Fast-path classification result"""
+    intent: str
+    confidence: float
+    entities: Dict[str, Any]
+    source: str  # "rules" or "centroid"
+
+
+class IntentRouter:
+    """Rules first, then nearest centroid; None means 'ask the LLM'"""
+
+    def __init__(
+        self,
+        exemplars: Dict[str, Sequence[str]] = INTENT_EXEMPLARS,
+        rules: Dict[str, Sequence[str]] = INTENT_RULES,
+        threshold: Optional[float] = None
+    ):
+        self.rules: Dict[str, List[Pattern]] = {
+            intent: [re.compile(pattern) for pattern in patterns] for intent, patterns in rules.items()
+        }
+        self.model = CentroidModel(exemplars)
+        self.threshold = settings.intent_router_threshold if threshold is None else threshold
+        self.metrics = RouterMetrics()
+
+    def match_rules(self, query: str) -> Optional[str]:
+        """The intent whose rules match, if exactly one does"""
+        text = _normalize(query)
+        matched = {
+            intent for intent, patterns in self.rules.items()
+            if any(pattern.search(text) for pattern in patterns)
+        }
+        # A hypothetical ("what if I eat X, how are my calories?") is still a what-if
+        if "what_if" in matched:
+            matched.discard("stats")
+        return matched.pop() if len(matched) == 1 else None
+
+    def route(self, query: str) -> Optional[RoutedIntent]:
+        """Classify locally; None when below the confidence threshold"""
+        started = time.perf_counter()
+
+        intent = self.match_rules(query)
+        if intent:
+            routed = RoutedIntent(intent, RULE_CONFIDENCE, extract_entities(query), "rules")
+        else:
+            intent, confidence = self.model.predict(query)
+            routed = RoutedIntent(intent, confidence, extract_entities(query), "centroid")
+
+        if routed.confidence < self.threshold:
+            logger.debug(f"[IntentRouter] Low confidence {routed.intent} ({routed.confidence:.2f}), deferring to LLM")
+            self.metrics.record("deferred", (time.perf_counter() - started) * 1000)
+            return None
+
+        self.metrics.record(routed.source, (time.perf_counter() - started) * 1000)
+        return routed
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Process-wide router (exemplar vectors and centroids are built once)"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter()
+    return _router
@@ -23,6 +23,8 @@ from app.models.database import (
     MealPlan, GoalType, ActivityLevel, PathType
 )
 from app.services.inventory_service import IntelligentInventoryService
+from app.services.nutrition_rollup import NutritionRollupService
+from app.core.dates import in_range, utc_day_bounds
 
 logger = logging.getLogger(__name__)
 
@@ -1221,13 +1223,10 @@ class NutritionAgent:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=7 * weeks)
             
-            # Get meal logs
-            meal_logs = self.db.query(MealLog).filter(
-                and_(
-                    MealLog.user_id == self.user_id,
-                    MealLog.consumed_datetime >= start_date
-                )
-            ).all()
+            # Daily rollups (one row per day) instead of every meal log
+            daily_rollups = NutritionRollupService(self.db).get_days(
+                self.user_id, start_date.date(), end_date.date()
+            )
             
             # Weekly analysis
             weekly_data = defaultdict(lambda: {
@@ -1235,32 +1234,15 @@ class NutritionAgent:
                 "meals_logged": 0, "meals_planned": 0, "meals_skipped": 0
             })
             
-            for log in meal_logs:
-                week_key = log.consumed_datetime.isocalendar()[1]
-                
-                if log.recipe and log.recipe.macros_per_serving:
-                    macros = log.recipe.macros_per_serving
-                    multiplier = log.portion_multiplier or 1.0
-                    
-                    weekly_data[week_key]["calories"] += macros.get("calories", 0) * multiplier
-                    weekly_data[week_key]["protein_g"] += macros.get("protein_g", 0) * multiplier
-                    weekly_data[week_key]["carbs_g"] += macros.get("carbs_g", 0) * multiplier
-                    weekly_data[week_key]["fat_g"] += macros.get("fat_g", 0) * multiplier
-                    weekly_data[week_key]["meals_logged"] += 1
-            
-            # Calculate planned meals
-            planned_logs = self.db.query(MealLog).filter(
-                and_(
-                    MealLog.user_id == self.user_id,
-                    MealLog.planned_datetime >= start_date
-                )
-            ).all()
-            
-            for log in planned_logs:
-                week_key = log.planned_datetime.isocalendar()[1]
-                weekly_data[week_key]["meals_planned"] += 1
-                if log.was_skipped:
-                    weekly_data[week_key]["meals_skipped"] += 1
+            for day in daily_rollups:
+                week = weekly_data[day.date.isocalendar()[1]]
+                week["calories"] += day.calories
+                week["protein_g"] += day.protein_g
+                week["carbs_g"] += day.carbs_g
+                week["fat_g"] += day.fat_g
+                week["meals_logged"] += day.meals_consumed
+                week["meals_planned"] += day.meals_planned
+                week["meals_skipped"] += day.meals_skipped
             
             # Calculate compliance and trends
             compliance_trend = []
@@ -1483,7 +1465,7 @@ class NutritionAgent:
         meal_logs = self.db.query(MealLog).filter(
             and_(
                 MealLog.user_id == self.user_id,
-                func.date(MealLog.consumed_datetime) == today
+                in_range(MealLog.consumed_datetime, utc_day_bounds(today))
             )
         ).all()
         
@@ -11,8 +11,9 @@ Author: NutriLens AI Team
 Created: 2025-11-08
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Hashable
 from datetime import datetime, date, timedelta
+from functools import cached_property, wraps
 from sqlalchemy.orm import Session
 import json
 import logging
@@ -20,12 +21,24 @@ import logging
 from app.services.consumption_services import ConsumptionService
 from app.services.inventory_service import IntelligentInventoryService
 from app.services.onboarding import OnboardingService
+from app.services.day_meals import DEFAULT_TARGETS, daily_targets
 from app.agents.planning_agent import PlanningAgent
 from app.models.database import User, UserProfile, UserGoal, UserPreference
 
 logger = logging.getLogger(__name__)
 
 
+def _memoized(method):
+    """Cache a UserContext method's result per arguments (see UserContext.invalidate)"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self._memo:
+            self._memo[key] = method(self, *args, **kwargs)
+        return self._memo[key]
+    return wrapper
+
+
 class UserContext:
     """
     Thin wrapper that builds complete user context for AI intelligence
@@ -39,7 +52,10 @@ class UserContext:
     Purpose:
     - Gather all user data in one place
     - Format for LLM consumption
-    - Cache to avoid repeated service calls
+    - Cache to avoid repeated service calls: services are created on first
+      use and every sub-result is memoized for the lifetime of the instance
+      (one chat turn, see app/agents/turn_context.py). Call invalidate()
+      after writing data the context has already read.
 
     Usage:
         context = UserContext(db, user_id)
@@ -57,12 +73,28 @@ class UserContext:
         """
         self.db = db
         self.user_id = user_id
-
-        # Inject existing services (orchestration pattern)
-        self.consumption_service = ConsumptionService(db)
-        self.inventory_service = IntelligentInventoryService(db)
         self.onboarding_service = OnboardingService()  # Static service, no db in __init__
-        self.planning_agent = PlanningAgent(db, user_id)
+        self._memo: Dict[Hashable, Any] = {}
+
+    # Inject existing services (orchestration pattern), built on first use:
+    # IntelligentInventoryService loads the item table + normalizer and
+    # PlanningAgent builds a MealPlanOptimizer
+
+    @cached_property
+    def consumption_service(self) -> ConsumptionService:
+        return ConsumptionService(self.db)
+
+    @cached_property
+    def inventory_service(self) -> IntelligentInventoryService:
+        return IntelligentInventoryService(self.db)
+
+    @cached_property
+    def planning_agent(self) -> PlanningAgent:
+        return PlanningAgent(self.db, self.user_id)
+
+    def invalidate(self):
+        """Forget memoized results (after logging/swapping meals)"""
+        self._memo.clear()
 
     def build_context(self, minimal: bool = False) -> Dict[str, Any]:
         """
@@ -112,6 +144,7 @@ class UserContext:
                 "timestamp": datetime.utcnow().isoformat()
             }
 
+    @_memoized
     def _get_profile_basic(self) -> Dict[str, Any]:
         """
         Get basic user profile
@@ -134,6 +167,7 @@ class UserContext:
             "activity_level": profile.activity_level.value if profile.activity_level else "sedentary"
         }
 
+    @_memoized
     def _get_targets(self) -> Dict[str, float]:
         """
         Get daily nutritional targets
@@ -144,28 +178,14 @@ class UserContext:
         try:
             result = self.onboarding_service.get_calculated_targets(self.db, self.user_id)
 
-            # Extract goal_calories and calculate macros from percentages
-            goal_calories = result.get("goal_calories", 2000)
-            macro_targets = result.get("macro_targets", {"protein": 0.3, "carbs": 0.4, "fat": 0.3})
-
-            return {
-                "calories": goal_calories,
-                "protein_g": (goal_calories * macro_targets.get("protein", 0.3)) / 4,
-                "carbs_g": (goal_calories * macro_targets.get("carbs", 0.4)) / 4,
-                "fat_g": (goal_calories * macro_targets.get("fat", 0.3)) / 9,
-                "fiber_g": result.get("fiber_g", 25)
-            }
+            # Calorie target with the goal's macro split (shared with the async chat tools)
+            return daily_targets(result.get("goal_calories"), result.get("macro_targets"))
         except Exception as e:
             logger.error(f"Error getting targets: {str(e)}")
             # Return reasonable defaults
-            return {
-                "calories": 2000,
-                "protein_g": 100,
-                "carbs_g": 250,
-                "fat_g": 65,
-                "fiber_g": 25
-            }
+            return dict(DEFAULT_TARGETS)
 
+    @_memoized
     def _get_today_consumption(self) -> Dict[str, Any]:
         """
         Get today's consumption summary
@@ -211,6 +231,7 @@ class UserContext:
                 "compliance_rate": 0
             }
 
+    @_memoized
     def _get_inventory_summary(self) -> Dict[str, Any]:
         """
         Get inventory status summary
@@ -239,6 +260,7 @@ class UserContext:
                 "estimated_days": 0
             }
 
+    @_memoized
     def _get_weekly_stats(self) -> Dict[str, Any]:
         """
         Get weekly consumption statistics
@@ -272,6 +294,7 @@ class UserContext:
                 "meal_timing_patterns": {}
             }
 
+    @_memoized
     def _get_preferences(self) -> Dict[str, Any]:
         """
         Get user preferences
@@ -311,6 +334,7 @@ class UserContext:
                 "spice_level": "medium"
             }
 
+    @_memoized
     def _get_meal_history(self, days: int = 7) -> List[Dict[str, Any]]:
         """
         Get recent meal history
@@ -342,6 +366,7 @@ class UserContext:
             logger.error(f"Error getting meal history: {str(e)}")
             return []
 
+    @_memoized
     def _get_upcoming_meals(self) -> List[Dict[str, Any]]:
         """
         Get upcoming planned meals for today
@@ -354,14 +379,15 @@ class UserContext:
         """
         try:
             from app.models.database import MealLog
-            from sqlalchemy import and_, func
+            from app.core.dates import day_bounds, in_range
+            from sqlalchemy import and_
 
             today = datetime.utcnow().date()
 
             upcoming = self.db.query(MealLog).filter(
                 and_(
                     MealLog.user_id == self.user_id,
-                    func.date(MealLog.planned_datetime) == today,
+                    in_range(MealLog.planned_datetime, day_bounds(today)),
                     MealLog.consumed_datetime.is_(None),
                     MealLog.was_skipped == False
                 )
@@ -382,6 +408,7 @@ class UserContext:
             logger.error(f"Error getting upcoming meals: {str(e)}")
             return []
 
+    @_memoized
     def get_makeable_recipes(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get recipes user can make with current inventory
@@ -403,6 +430,7 @@ class UserContext:
             logger.error(f"Error getting makeable recipes: {str(e)}")
             return []
 
+    @_memoized
     def get_goal_aligned_recipes(self, count: int = 20) -> List[Dict[str, Any]]:
         """
         Get recipes aligned with user's fitness goal
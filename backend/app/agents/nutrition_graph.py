@@ -4,7 +4,7 @@ Production LangGraph Implementation for Nutrition Intelligence Agent
 
 Architecture:
 1. load_context → Fetch latest user data from DB
-2. classify_intent → LLM classifies user query intent
+2. classify_intent → Local router classifies user query intent (LLM fallback)
 3. generate_response → LLM with tools generates response
 4. [Conditional] → Tools execution if LLM calls them
 5. [Loop back] → LLM synthesizes final answer from tool results
@@ -26,6 +26,7 @@ from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.mongodb import MongoDBSaver
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from sqlalchemy.orm import Session
@@ -36,7 +37,10 @@ from datetime import datetime, date
 
 from app.core.config import settings
 from app.core.mongodb import save_chat_message, get_mongo_sync_client
-from app.agents.nutrition_context import UserContext
+from app.core.async_db import get_async_session
+from app.agents.turn_context import use_turn
+from app.agents.intent_router import get_intent_router
+from app.agents.nutrition_queries import fetch_pending_meals, fetch_today_stats
 from app.services.consumption_services import ConsumptionService
 from app.services.meal_plan_service import MealPlanService
 from app.services.inventory_service import IntelligentInventoryService
@@ -87,11 +91,14 @@ def create_nutrition_tools_v2() -> List:
     Create stateless tool functions (no closure, no db/user_id captured).
 
     These tools are exposed to the LLM via function calling.
-    Tools accept user_id as parameter and create their own database sessions.
+    Tools accept user_id as parameter. Service-backed tools share the turn's
+    database session and memoized UserContext (app/agents/turn_context.py);
+    read-only lookups are async and use the pooled async engine
+    (app/agents/nutrition_queries.py), so ToolNode runs them concurrently.
     """
 
     @tool
-    def get_nutrition_stats(user_id: int, nutrients: Optional[str] = None) -> str:
+    async def get_nutrition_stats(user_id: int, nutrients: Optional[str] = None) -> str:
         """Get current nutrition statistics for today.
 
         Args:
@@ -103,14 +110,12 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with nutrition stats
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:get_nutrition_stats] Called for user {user_id}")
 
-            context_builder = UserContext(db, user_id)
-            user_context = context_builder.build_context(minimal=True)
+            # Read-only: runs on its own pooled async connection, concurrently with other tools
+            async with get_async_session() as db:
+                user_context = await fetch_today_stats(db, user_id)
 
             # Extract data from context dictionary
             consumed = user_context['today']['consumed']
@@ -138,8 +143,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:get_nutrition_stats] Error: {e}", exc_info=True)
             return json.dumps({"error": str(e)})
-        finally:
-            db.close()
 
     @tool
     def check_inventory(user_id: int, search_term: Optional[str] = None) -> str:
@@ -153,14 +156,11 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with inventory information
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:check_inventory] Called for user {user_id}")
 
-            context_builder = UserContext(db, user_id)
-            user_context = context_builder.build_context(minimal=True)
+            with use_turn(user_id) as context_builder:
+                user_context = context_builder.build_context(minimal=True)
             inventory = user_context['inventory_summary']
 
             if search_term:
@@ -183,11 +183,9 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:check_inventory] Error: {e}", exc_info=True)
             return json.dumps({"error": str(e)})
-        finally:
-            db.close()
 
     @tool
-    def get_meal_plan(user_id: int, target_date: Optional[str] = None) -> str:
+    async def get_meal_plan(user_id: int, target_date: Optional[str] = None) -> str:
         """Get meal plan for a specific date.
 
         Args:
@@ -197,18 +195,16 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with meal plan
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:get_meal_plan] Called for user {user_id}")
 
-            context_builder = UserContext(db, user_id)
-            user_context = context_builder.build_context(minimal=False)  # Need full context for 'upcoming'
-            planned_meals = user_context.get('upcoming', [])
+            day = date.fromisoformat(target_date) if target_date else None
+            async with get_async_session() as db:
+                plan = await fetch_pending_meals(db, user_id, day)
+            planned_meals = plan['meals']
 
             result = {
-                "date": target_date or str(date.today()),
+                "date": str(plan['date']),
                 "meals": planned_meals,
                 "count": len(planned_meals)
             }
@@ -218,8 +214,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:get_meal_plan] Error: {e}", exc_info=True)
             return json.dumps({"error": str(e)})
-        finally:
-            db.close()
 
     @tool
     def get_makeable_recipes(user_id: int, min_protein: Optional[float] = None, max_calories: Optional[float] = None) -> str:
@@ -233,14 +227,11 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with makeable recipes
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:get_makeable_recipes] Called for user {user_id}")
 
-            context = UserContext(db, user_id)
-            recipes = context.get_makeable_recipes(limit=10)
+            with use_turn(user_id) as context:
+                recipes = context.get_makeable_recipes(limit=10)
 
             # Filter by nutrition criteria
             if min_protein is not None:
@@ -263,8 +254,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:get_makeable_recipes] Error: {e}", exc_info=True)
             return json.dumps({"error": str(e)})
-        finally:
-            db.close()
 
     @tool
     def get_goal_aligned_recipes(user_id: int, count: int = 5) -> str:
@@ -277,15 +266,12 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with goal-aligned recipes
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:get_goal_aligned_recipes] Called for user {user_id}")
 
-            context_builder = UserContext(db, user_id)
-            user_context = context_builder.build_context(minimal=True)
-            recipes = context_builder.get_goal_aligned_recipes(count=count)
+            with use_turn(user_id) as context_builder:
+                user_context = context_builder.build_context(minimal=True)
+                recipes = context_builder.get_goal_aligned_recipes(count=count)
 
             result = {
                 "recipes": recipes,
@@ -298,8 +284,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:get_goal_aligned_recipes] Error: {e}", exc_info=True)
             return json.dumps({"error": str(e)})
-        finally:
-            db.close()
 
     @tool
     def log_meal_consumption(user_id: int, meal_log_id: int, portions: float = 1.0) -> str:
@@ -313,18 +297,17 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with result
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:log_meal_consumption] Called for user {user_id}, meal_log_id {meal_log_id}")
 
-            consumption_service = ConsumptionService(db)
-            result = consumption_service.log_meal_consumption(
-                user_id=user_id,
-                meal_log_id=meal_log_id,
-                portions=portions
-            )
+            with use_turn(user_id) as context:
+                consumption_service = ConsumptionService(context.db)
+                result = consumption_service.log_meal_consumption(
+                    user_id=user_id,
+                    meal_log_id=meal_log_id,
+                    portions=portions
+                )
+                context.invalidate()  # Today's stats changed
 
             return json.dumps({
                 "success": True,
@@ -336,8 +319,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:log_meal_consumption] Error: {e}", exc_info=True)
             return json.dumps({"success": False, "error": str(e)})
-        finally:
-            db.close()
 
     @tool
     def swap_meal_recipe(user_id: int, meal_log_id: int, new_recipe_id: int) -> str:
@@ -351,17 +332,16 @@ def create_nutrition_tools_v2() -> List:
         Returns:
             JSON string with result
         """
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
         try:
             logger.info(f"[Tool:swap_meal_recipe] Called for user {user_id}, meal_log_id {meal_log_id}")
 
-            meal_plan_service = MealPlanService(db)
-            result = meal_plan_service.swap_meal(
-                meal_log_id=meal_log_id,
-                new_recipe_id=new_recipe_id
-            )
+            with use_turn(user_id) as context:
+                meal_plan_service = MealPlanService(context.db)
+                result = meal_plan_service.swap_meal(
+                    meal_log_id=meal_log_id,
+                    new_recipe_id=new_recipe_id
+                )
+                context.invalidate()  # Planned meals changed
 
             return json.dumps({
                 "success": True,
@@ -373,8 +353,6 @@ def create_nutrition_tools_v2() -> List:
         except Exception as e:
             logger.error(f"[Tool:swap_meal_recipe] Error: {e}", exc_info=True)
             return json.dumps({"success": False, "error": str(e)})
-        finally:
-            db.close()
 
     return [
         get_nutrition_stats,
@@ -402,19 +380,15 @@ def load_context_node(state: NutritionState) -> Dict[str, Any]:
     Tools will fetch detailed data (consumed, targets, inventory) on demand.
     This reduces initial system prompt from ~5000 tokens to ~500 tokens.
 
-    Creates its own database session (stateless pattern).
+    Uses the turn's shared session and UserContext (stateless pattern).
     """
-    from app.models.database import SessionLocal
-
     user_id = state["user_id"]
     logger.info(f"[Node:load_context] User {user_id}, turn {state.get('turn_count', 0) + 1}")
 
-    db = SessionLocal()
     try:
-        context_builder = UserContext(db, user_id)
-
-        # Fetch only profile data (minimal)
-        profile = context_builder._get_profile_basic()
+        with use_turn(user_id) as context_builder:
+            # Fetch only profile data (minimal)
+            profile = context_builder._get_profile_basic()
 
         # Build minimal context
         minimal_context = {
@@ -443,15 +417,15 @@ def load_context_node(state: NutritionState) -> Dict[str, Any]:
             "user_context": {"error": str(e)},
             "turn_count": state.get("turn_count", 0) + 1
         }
-    finally:
-        db.close()
 
 
-async def classify_intent_node(state: NutritionState) -> Dict[str, Any]:
+async def classify_intent_node(state: NutritionState, config: RunnableConfig) -> Dict[str, Any]:
     """
-    Node 2: Classify user intent using GPT-4o with JSON mode.
+    Node 2: Classify user intent, locally when confident, else GPT-4o with JSON mode.
 
     Classifies into: STATS, WHAT_IF, MEAL_SUGGESTION, MEAL_PLAN, INVENTORY, CONVERSATIONAL
+    The local router (app/agents/intent_router.py) answers most queries without
+    an LLM call; only queries below settings.intent_router_threshold reach GPT-4o.
     """
     logger.info("[Node:classify_intent] Starting classification")
 
@@ -467,6 +441,16 @@ async def classify_intent_node(state: NutritionState) -> Dict[str, Any]:
             logger.warning("[Node:classify_intent] No user message found")
             return {"intent": "error", "confidence": 0.0, "entities": {}}
 
+        # Fast path: local rules / nearest-centroid router, no LLM round trip
+        router = get_intent_router()
+        routed = router.route(user_message)
+        if routed:
+            logger.info(
+                f"[Node:classify_intent] Intent={routed.intent}, confidence={routed.confidence:.2f} "
+                f"(local {routed.source})"
+            )
+            return {"intent": routed.intent, "confidence": routed.confidence, "entities": routed.entities}
+
         # Build context summary from MINIMAL context fields only
         # Note: Intent classification doesn't need detailed stats/inventory - just the user's message
         context = state.get("user_context", {})
@@ -493,7 +477,8 @@ User Query: "{user_message}"
 Respond with ONLY valid JSON (no markdown, no extra text):
 {{"intent": "stats", "confidence": 0.95, "entities": {{"nutrients": ["protein", "calories"]}}}}"""
 
-        # Call LLM with JSON mode
+        # Call LLM with JSON mode (low-confidence queries only)
+        started = time.perf_counter()
         llm = ChatOpenAI(
             model="gpt-4o",
             temperature=0.1,
@@ -504,13 +489,14 @@ Respond with ONLY valid JSON (no markdown, no extra text):
         response = await llm.ainvoke([
             SystemMessage(content="You are a precise intent classifier. Respond with valid JSON only."),
             HumanMessage(content=prompt)
-        ])
+        ], config=config)
 
         # Parse result
         result = json.loads(response.content)
         intent = result.get("intent", "unknown").lower()
         confidence = float(result.get("confidence", 0.0))
         entities = result.get("entities", {})
+        router.metrics.record("llm", (time.perf_counter() - started) * 1000)
 
         logger.info(f"[Node:classify_intent] Intent={intent}, confidence={confidence:.2f}")
 
@@ -571,13 +557,19 @@ async def trim_messages_node(state: NutritionState) -> Dict[str, Any]:
         return {}  # Fall back to full history
 
 
-async def generate_response_node(state: NutritionState) -> Dict[str, Any]:
+async def generate_response_node(state: NutritionState, config: RunnableConfig) -> Dict[str, Any]:
     """
     Node 3: Generate response using LLM with tools.
 
     The LLM decides whether to:
     - Call tools to get data
     - Respond directly
+
+    When the graph runs under astream_events (app/agents/chat_stream.py), this
+    LLM call streams and its token deltas reach the client as they arrive. The
+    node's config is passed on explicitly: before Python 3.11 the callbacks
+    are not inherited through contextvars in async code, so without it no
+    token events are emitted.
     """
     logger.info(f"[Node:generate_response] Intent={state.get('intent')}")
 
@@ -655,7 +647,7 @@ Session: {state.get('session_id')}
         print(f"{'='*100}\n")
 
         print(f"[4] CALLING LLM (GPT-4o)...")
-        response = await llm.ainvoke(messages)
+        response = await llm.ainvoke(messages, config=config)
         print(f"[4] LLM RESPONDED!")
 
         # Get ACTUAL token usage from OpenAI API response
@@ -726,8 +718,8 @@ def create_nutrition_graph_structure() -> StateGraph:
     Create the stateless LangGraph workflow structure.
 
     This function is called ONCE at startup to create the graph structure.
-    Tools and nodes are stateless - they get user_id from state and create
-    their own database sessions.
+    Tools and nodes are stateless - they get user_id from state and share
+    the turn's database session (see turn_context.turn_scope).
 
     Flow:
     1. load_context → Fetch user data
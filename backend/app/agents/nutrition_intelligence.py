@@ -25,9 +25,11 @@ from dataclasses import dataclass
 from datetime import datetime
 import json
 import logging
+import time
 from sqlalchemy.orm import Session
 
 from app.agents.nutrition_context import UserContext
+from app.agents.intent_router import get_intent_router
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +90,7 @@ class IntentClassifier:
     LLM-powered intent classification using Claude Haiku
 
     Design:
+    - Try the local intent router first (rules + nearest centroid, <1ms)
     - Use lightweight model (Haiku) for fast, cheap classification
     - Extract entities (foods, time periods, meal types)
     - Provide confidence scores for routing
@@ -151,7 +154,7 @@ Respond ONLY with valid JSON (no markdown, no extra text):
 
     async def classify(self, query: str, context: Dict[str, Any]) -> IntentResult:
         """
-        Classify user query intent using LLM
+        Classify user query intent, locally when confident, else using LLM
 
         Args:
             query: User's natural language query
@@ -160,7 +163,20 @@ Respond ONLY with valid JSON (no markdown, no extra text):
         Returns:
             IntentResult with intent, confidence, and extracted entities
         """
+        router = get_intent_router()
+        routed = router.route(query)
+        if routed:
+            logger.info(f"Intent routed locally: {routed.intent} (confidence: {routed.confidence}, {routed.source})")
+            return IntentResult(
+                intent=IntentType(routed.intent),
+                confidence=routed.confidence,
+                entities=routed.entities,
+                reasoning=f"Matched locally ({routed.source})"
+            )
+
         try:
+            started = time.perf_counter()
+
             # Build context summary for prompt
             context_summary = self._build_context_summary(context)
 
@@ -187,6 +203,7 @@ Respond ONLY with valid JSON (no markdown, no extra text):
 
             # Parse response
             result = IntentResult.parse(response)
+            router.metrics.record("llm", (time.perf_counter() - started) * 1000)
 
             logger.info(f"Intent classified: {result.intent} (confidence: {result.confidence})")
             return result
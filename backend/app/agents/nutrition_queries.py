@@ -0,0 +1,156 @@
+"""
+Read-only queries behind the async chat tools.
+
+get_nutrition_stats and get_meal_plan only read a handful of rows. Running
+them on the turn's shared sync session serializes them behind the turn lock
+and an executor thread. Here they run on the pooled asyncpg engine
+(core/async_db.py), so when the LLM asks for several tools in one message,
+ToolNode awaits them concurrently, each on its own pooled connection.
+
+The select() builders work with either a sync Session or an AsyncSession.
+The helpers that shape the rows are pure and mirror what UserContext returns,
+so the tool output is the same as before.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dates import day_bounds, in_range, local_today, resolve_timezone
+from app.models.database import (
+    MealLog,
+    NotificationPreference,
+    Recipe,
+    UserGoal,
+    UserPath,
+    UserProfile,
+)
+from app.services.day_meals import DEFAULT_TARGETS, daily_targets, shown_meals_filter
+from app.services.nutrition_rollup import meal_macros
+
+STAT_KEYS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+
+# ===== QUERY BUILDERS =====
+
+def timezone_query(user_id: int) -> Select:
+    return select(NotificationPreference.timezone).where(NotificationPreference.user_id == user_id)
+
+
+def targets_query(user_id: int) -> Select:
+    """Profile calories with the goal's macro split (and whether a path exists)"""
+    return (
+        select(UserProfile.goal_calories, UserGoal.macro_targets, UserPath.id)
+        .outerjoin(UserGoal, UserGoal.user_id == UserProfile.user_id)
+        .outerjoin(UserPath, UserPath.user_id == UserProfile.user_id)
+        .where(UserProfile.user_id == user_id)
+        .limit(1)
+    )
+
+
+def day_meals_query(user_id: int, day: date) -> Select:
+    """
+    Meals of a day, filtered like ConsumptionService.get_today_summary:
+    active plan meals, consumed/skipped meals of any plan and manual entries.
+    """
+    return (
+        select(
+            MealLog.meal_type,
+            MealLog.planned_datetime,
+            MealLog.consumed_datetime,
+            MealLog.was_skipped,
+            MealLog.portion_multiplier,
+            MealLog.external_meal,
+            Recipe.title,
+            Recipe.macros_per_serving
+        )
+        .outerjoin(Recipe, Recipe.id == MealLog.recipe_id)
+        .where(
+            and_(
+                MealLog.user_id == user_id,
+                in_range(MealLog.planned_datetime, day_bounds(day)),
+                shown_meals_filter()
+            )
+        )
+        .order_by(MealLog.planned_datetime)
+    )
+
+
+# ===== ROW SHAPING =====
+
+def targets_from_row(row) -> Dict[str, float]:
+    """Daily targets (day_meals.daily_targets, as UserContext._get_targets)"""
+    if row is None:
+        return dict(DEFAULT_TARGETS)
+
+    goal_calories, macro_targets, path_id = row
+    if path_id is None:
+        # Onboarding incomplete
+        return dict(DEFAULT_TARGETS)
+    return daily_targets(goal_calories, macro_targets)
+
+
+def day_stats(rows: Iterable, targets: Dict[str, float]) -> Dict[str, Any]:
+    """Consumed/remaining macros and meal counts (shape of UserContext._get_today_consumption)"""
+    consumed = {key: 0.0 for key in STAT_KEYS}
+    planned = meals_consumed = meals_pending = 0
+
+    for row in rows:
+        planned += 1
+        if row.consumed_datetime:
+            meals_consumed += 1
+            macros = meal_macros(row.macros_per_serving, row.portion_multiplier, row.external_meal)
+            for key in STAT_KEYS:
+                consumed[key] += macros.get(key, 0)
+        elif not row.was_skipped:
+            meals_pending += 1
+
+    return {
+        "consumed": consumed,
+        "remaining": {key: max(0.0, round(targets.get(key, 0) - consumed[key], 2)) for key in STAT_KEYS},
+        "meals_consumed": meals_consumed,
+        "meals_pending": meals_pending,
+        "compliance_rate": round(meals_consumed / planned * 100, 1) if planned else 0
+    }
+
+
+def pending_meals(rows: Iterable) -> List[Dict[str, Any]]:
+    """Meals not yet consumed or skipped (shape of UserContext._get_upcoming_meals)"""
+    meals = []
+    for row in rows:
+        if row.consumed_datetime or row.was_skipped:
+            continue
+        macros = row.macros_per_serving or {}
+        meals.append({
+            "meal_type": row.meal_type,
+            "recipe": row.title or "No recipe",
+            "time": row.planned_datetime.strftime("%H:%M"),
+            "calories": macros.get("calories", 0),
+            "protein_g": macros.get("protein_g", 0)
+        })
+    return meals
+
+
+# ===== ASYNC FETCHERS =====
+
+async def fetch_local_today(db: AsyncSession, user_id: int) -> date:
+    """Today in the user's timezone"""
+    name = (await db.execute(timezone_query(user_id))).scalar()
+    return local_today(resolve_timezone(name))
+
+
+async def fetch_today_stats(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """Today's consumption against targets"""
+    today = await fetch_local_today(db, user_id)
+    targets = targets_from_row((await db.execute(targets_query(user_id))).first())
+    rows = (await db.execute(day_meals_query(user_id, today))).all()
+    return {"targets": targets, "today": day_stats(rows, targets)}
+
+
+async def fetch_pending_meals(db: AsyncSession, user_id: int, day: Optional[date] = None) -> Dict[str, Any]:
+    """Pending meals of a day (today in the user's timezone by default)"""
+    day = day or await fetch_local_today(db, user_id)
+    rows = (await db.execute(day_meals_query(user_id, day))).all()
+    return {"date": day, "meals": pending_meals(rows)}
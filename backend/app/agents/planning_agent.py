@@ -16,6 +16,7 @@ from langchain.schema import BaseMessage
 
 from app.services.final_meal_optimizer import MealPlanOptimizer, OptimizationConstraints
 from app.services.meal_plan_service import MealPlanService
+from app.services.meal_plan_writer import MealPlanWriter
 from app.models.database import MealPlan, Recipe, Item, UserInventory, UserProfile, UserGoal, UserPath, UserPreference, RecipeIngredient, MealLog
 from app.schemas.meal_plan import MealPlanCreate, MealPlanResponse
 from app.schemas.nutrition import RecipeResponse
@@ -24,6 +25,80 @@ from app.schemas.user import ProfileResponse
 logger = logging.getLogger(__name__)
 
 
+def categorize_grocery_list(grocery_list: Dict[int, Dict[str, Any]]) -> Dict[str, List[Dict]]:
+    categories = defaultdict(list)
+    for item_id, data in grocery_list.items():
+        if data["to_buy"] > 0:
+            cat = normalize_category(data.get("category", "other") or "other")
+
+            categories[cat].append({
+                "item_id": item_id,
+                "item_name": data["item_name"],
+                "category": cat,
+                "unit": data["unit"],
+                "quantity_needed": data["quantity_needed"],
+                "quantity_available": data["quantity_available"],
+                "to_buy": data["to_buy"]
+            })
+    return categories
+
+
+def normalize_category(category: str) -> str:
+    mapping = {"fats": "fat"}  # Extend as needed
+    return mapping.get(category.lower(), category.lower())
+
+
+def build_grocery_list(ingredient_rows, items_map: Dict, inventory_map: Dict[int, float]) -> Dict[str, Any]:
+    """
+    Aggregate (item_id, quantity_grams) ingredient rows into the grocery list
+    response. items_map values need canonical_name / category / unit
+    (Item rows or shared catalog items).
+    """
+    grocery_list: Dict[int, Dict[str, Any]] = {}
+
+    # --- Step 5: aggregate ---
+    for item_id, quantity_grams in ingredient_rows:
+        if not item_id:
+            continue
+        if item_id not in grocery_list:
+            item = items_map.get(item_id)
+            grocery_list[item_id] = {
+                "item_id": item_id,                                  # 🔹 ADDED
+                "item_name": item.canonical_name if item else f"Item {item_id}",
+                "category": normalize_category(                   # 🔹 CHANGED
+                    item.category if item else "other"
+                ),
+                "unit": item.unit if item else "g",
+                "quantity_needed": 0.0,                                 # 🔹 CHANGED: ensure float
+                "quantity_available": 0.0,                              # 🔹 CHANGED
+                "to_buy": 0.0,                                          # 🔹 CHANGED
+            }
+        grocery_list[item_id]["quantity_needed"] += quantity_grams
+
+    # --- Step 6: compute to_buy ---
+    for item_id, data in grocery_list.items():
+        available = inventory_map.get(item_id, 0)
+        data["quantity_available"] = available
+        data["to_buy"] = max(0, data["quantity_needed"] - available)
+
+    # --- Step 7: categorize ---
+    categorized = categorize_grocery_list(grocery_list)
+
+    # --- Step 8: convert keys to strings for Pydantic ---
+    items_str_keys = {str(k): v for k, v in grocery_list.items()}
+
+    # 🔹 Placeholder for future cost logic
+    estimated_cost = None                                               # 🔹 ADDED
+
+    return {
+        "items": items_str_keys,
+        "categorized": categorized,
+        "total_items": len(items_str_keys),
+        "items_to_buy": sum(1 for d in grocery_list.values() if d["to_buy"] > 0),
+        "estimated_cost": estimated_cost
+    }
+
+
 class PlanningState(Enum):
     """States for planning agent"""
     IDLE = "idle"
@@ -203,12 +278,9 @@ class PlanningAgent:
             # Calculate grocery list
             meal_plan['grocery_list'] = self.calculate_grocery_list(meal_plan['week_plan'], self.db, user_id)
             
-            # Save to database
+            # Save plan and meal logs to database
             saved_plan = self._save_meal_plan(meal_plan)
 
-            # Create meal logs with meal_plan_id linkage
-            self._create_meal_logs(meal_plan, saved_plan.id)
-
             print("saved_plan", saved_plan)
             
             self.context.state = PlanningState.COMPLETE
@@ -267,8 +339,6 @@ class PlanningAgent:
         Build a grocery list from a meal plan.
         """
         try:
-            grocery_list: Dict[int, Dict[str, Any]] = {}
-
             # --- Step 1: collect recipe IDs ---
             recipe_ids = [
                 recipe["id"]
@@ -308,47 +378,11 @@ class PlanningAgent:
                 .all()
             }
 
-            # --- Step 5: aggregate ---
-            for ri in recipe_ingredients:
-                if not ri.item_id:
-                    continue
-                if ri.item_id not in grocery_list:
-                    item = items_map.get(ri.item_id)
-                    grocery_list[ri.item_id] = {
-                        "item_id": ri.item_id,                                  # 🔹 ADDED
-                        "item_name": item.canonical_name if item else f"Item {ri.item_id}",
-                        "category": self._normalize_category(                   # 🔹 CHANGED
-                            item.category if item else "other"
-                        ),
-                        "unit": item.unit if item else "g",
-                        "quantity_needed": 0.0,                                 # 🔹 CHANGED: ensure float
-                        "quantity_available": 0.0,                              # 🔹 CHANGED
-                        "to_buy": 0.0,                                          # 🔹 CHANGED
-                    }
-                grocery_list[ri.item_id]["quantity_needed"] += ri.quantity_grams
-
-            # --- Step 6: compute to_buy ---
-            for item_id, data in grocery_list.items():
-                available = inventory_map.get(item_id, 0)
-                data["quantity_available"] = available
-                data["to_buy"] = max(0, data["quantity_needed"] - available)
-
-            # --- Step 7: categorize ---
-            categorized = self._categorize_grocery_list(grocery_list)
-
-            # --- Step 8: convert keys to strings for Pydantic ---
-            items_str_keys = {str(k): v for k, v in grocery_list.items()}
-
-            # 🔹 Placeholder for future cost logic
-            estimated_cost = None                                               # 🔹 ADDED
-
-            return {
-                "items": items_str_keys,
-                "categorized": categorized,
-                "total_items": len(items_str_keys),
-                "items_to_buy": sum(1 for d in grocery_list.values() if d["to_buy"] > 0),
-                "estimated_cost": estimated_cost
-            }
+            return build_grocery_list(
+                [(ri.item_id, ri.quantity_grams) for ri in recipe_ingredients],
+                items_map,
+                inventory_map
+            )
 
         except Exception as e:
             logger.exception("Error calculating grocery list")                  # 🔹 CHANGED: use exception
@@ -361,8 +395,6 @@ class PlanningAgent:
                 "estimated_cost": None
             }
 
-
-    
     # Tool 4: Suggest Meal Prep
     def suggest_meal_prep(self, meal_plan: Dict) -> Dict:
         """
@@ -541,19 +573,7 @@ class PlanningAgent:
             remaining_calories = max(0, daily_target - consumed_with_restaurant)
             calories_per_meal = remaining_calories / len(remaining_meals)
 
-            # 6️⃣ Suggest adjusted recipes for remaining meals
-            adjusted_meals = {}
-            for meal_name in remaining_meals:
-                candidates = self._find_recipes_by_calories(
-                    calories_per_meal, tolerance=0.2, meal_type=meal_name
-                )
-                if candidates:
-                    adjusted_meals[meal_name] = candidates[0]
-
-        
-
-            # Include the external meal for clarity in the suggestion payload
-            adjusted_meals[meal] = {
+            external_meal = {
                 "title": "Eating Out",
                 "macros_per_serving": {
                     "calories": restaurant_calories,
@@ -564,7 +584,33 @@ class PlanningAgent:
                 "is_external": True,
             }
 
-            print("adjusted_meals", adjusted_meals)
+            # 6️⃣ Re-solve only the remaining meals of the day, everything else in
+            # the plan fixed and the current meals as warm start (on a copy - suggestions only)
+            week_plan = dict(plan["plan_data"])
+            week_plan[day_key] = {**day_plan, "meals": {**day_plan["meals"], meal: external_meal}}
+            result = self.optimizer.reoptimize(
+                self.context.user_id,
+                week_plan,
+                [(day, meal_name) for meal_name in remaining_meals],
+                constraints=self._build_optimization_constraints(self.context.user_id),
+                inventory=self.context.current_inventory
+            )
+
+            adjusted_meals = {}
+            if result:
+                for meal_name in remaining_meals:
+                    adjusted_meals[meal_name] = result["week_plan"][day_key]["meals"][meal_name]
+            else:
+                # Fall back to per-meal calorie matching
+                for meal_name in remaining_meals:
+                    candidates = self._find_recipes_by_calories(
+                        calories_per_meal, tolerance=0.2, meal_type=meal_name
+                    )
+                    if candidates:
+                        adjusted_meals[meal_name] = candidates[0]
+
+            # Include the external meal for clarity in the suggestion payload
+            adjusted_meals[meal] = external_meal
 
             return {
                 "adjusted_day": day,
@@ -921,31 +967,6 @@ class PlanningAgent:
         avg_diff = sum(differences) / len(differences)
         return max(0, 1 - avg_diff)
     
-    def _categorize_grocery_list(self, grocery_list: Dict[int, Dict[str, Any]]) -> Dict[str, List[Dict]]:
-        categories = defaultdict(list)
-        for item_id, data in grocery_list.items():
-            if data["to_buy"] > 0:
-                
-                cat = self._normalize_category(data.get("category", "other") or "other")  
-
-                categories[cat].append({                                        
-                    "item_id": item_id,
-                    "item_name": data["item_name"],
-                    "category": cat,                                           
-                    "unit": data["unit"],
-                    "quantity_needed": data["quantity_needed"],                  
-                    "quantity_available": data["quantity_available"],            
-                    "to_buy": data["to_buy"]                                    
-                })
-        return categories
-    
-
-    def _normalize_category(self, category: str) -> str:
-        mapping = {"fats": "fat"}  # Extend as needed
-        return mapping.get(category.lower(), category.lower())
-
-
-    
     def _find_recipes_by_calories(self, target_calories: float, tolerance: float, meal_type: str) -> List[Dict]:
         """Find recipes within calorie range"""
         min_cal = target_calories * (1 - tolerance)
@@ -986,114 +1007,25 @@ class PlanningAgent:
             return "Store in airtight container for 3-4 days"
     
     def _save_meal_plan(self, meal_plan: Dict) -> Dict:
-        """Save meal plan to database"""
-        try:
-            # Deactivate existing plans
-            self.db.query(MealPlan).filter_by(
-                user_id=meal_plan['user_id'],
-                is_active=True
-            ).update({'is_active': False})
-
-            print("during saving grocery list", meal_plan.get('grocery_list', {}))
-            
-            # Create new plan
-            new_plan = MealPlan(
-                user_id=meal_plan['user_id'],
-                week_start_date=datetime.fromisoformat(meal_plan['start_date']),
-                plan_data=meal_plan['week_plan'],
-                grocery_list=meal_plan.get('grocery_list', {}),
-                total_calories=meal_plan['total_calories'],
-                avg_macros=meal_plan['avg_macros'],
-                is_active=True
-            )
-
-            new_plan.updated_at = datetime.now()
-
-            
-            self.db.add(new_plan)
-            self.db.commit()
-            
-            return MealPlanResponse.model_validate(new_plan)
-            
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error saving meal plan: {str(e)}")
-            raise
-
-    def _create_meal_logs(self, meal_plan: Dict, meal_plan_id: int):
         """
-        Create MealLog entries for each planned meal in the weekly plan.
-        Links logs to meal plan via meal_plan_id and day_index.
-        Sets proper meal times based on user's meal windows or defaults.
+        Save meal plan and its planned MealLog entries in one transaction.
+        Logs are linked via meal_plan_id/day_index and timed from the user's
+        meal windows (or defaults); their ids are mapped back into plan_data
+        as day['meal_log_ids'].
         """
-        try:
-            logs_to_add = []
-            start_date = datetime.fromisoformat(meal_plan['start_date'])
-
-            # Get user's meal windows for proper timing
-            user_path = self.db.query(UserPath).filter_by(user_id=self.context.user_id).first()
-            meal_windows = user_path.meal_windows if user_path and user_path.meal_windows else []
-
-            # Create meal time map from windows or use defaults
-            default_meal_times = {
-                'breakfast': '08:00',
-                'lunch': '13:00',
-                'dinner': '19:00',
-                'snack': '16:00'
-            }
-
-            meal_time_map = {}
-            for window in meal_windows:
-                meal_type = window.get('meal', '').lower()
-                start_time = window.get('start', default_meal_times.get(meal_type, '12:00'))
-                meal_time_map[meal_type] = start_time
-
-            # Fill in any missing meal types with defaults
-            for meal_type, default_time in default_meal_times.items():
-                if meal_type not in meal_time_map:
-                    meal_time_map[meal_type] = default_time
-
-            print("printing meal plan format inside MealLog save function",meal_plan.get('week_plan', {}))
-            for day_key, day_data in meal_plan.get('week_plan', {}).items():
-                # Extract the numeric day offset (e.g., 'day_0' → 0)
-                day_offset = int(day_key.split('_')[1])
-                planned_date = start_date + timedelta(days=day_offset)
-
-                for meal_name, recipe in day_data.get('meals', {}).items():
-                    if not recipe:
-                        continue  # Skip empty meal slots
-
-                    # Get meal time and create proper datetime
-                    meal_time_str = meal_time_map.get(meal_name.lower(), '12:00')
-                    hour, minute = map(int, meal_time_str.split(':'))
-                    planned_datetime = planned_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-                    logs_to_add.append(
-                        MealLog(
-                            user_id=self.context.user_id,
-                            recipe_id=recipe['id'],
-                            meal_type=meal_name,
-                            planned_datetime=planned_datetime,
-                            consumed_datetime=None,
-                            was_skipped=False,
-                            skip_reason=None,
-                            portion_multiplier=1.0,
-                            notes=None,
-                            external_meal=None,
-                            meal_plan_id=meal_plan_id,
-                            day_index=day_offset
-                        )
-                    )
-
-            if logs_to_add:
-                self.db.bulk_save_objects(logs_to_add)
-                self.db.commit()
-                logger.info(f"Created {len(logs_to_add)} MealLog entries for user {self.context.user_id}")
-            else:
-                logger.warning("No MealLog entries to create—meal plan may be empty.")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Failed to create MealLog entries: {str(e)}")
+        user_path = self.db.query(UserPath).filter_by(user_id=meal_plan['user_id']).first()
+
+        plan_id = MealPlanWriter(self.db).save_plans([{
+            'user_id': meal_plan['user_id'],
+            'start_date': datetime.fromisoformat(meal_plan['start_date']),
+            'week_plan': meal_plan['week_plan'],
+            'grocery_list': meal_plan.get('grocery_list', {}),
+            'total_calories': meal_plan['total_calories'],
+            'avg_macros': meal_plan['avg_macros'],
+            'meal_windows': user_path.meal_windows if user_path else None
+        }])[0]
+
+        return MealPlanResponse.model_validate(self.db.get(MealPlan, plan_id))
 
     def _get_consumed_calories(self, user_id: int, day: datetime, skip_meal: str, plan_day_data: Dict) -> int:
         """
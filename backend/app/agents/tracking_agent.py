@@ -15,18 +15,23 @@ from dataclasses import dataclass, asdict
 from langchain.agents import Tool
 from langchain.memory import ConversationBufferMemory
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_
 
 from app.models.database import (
-    User, UserInventory, MealLog, Recipe, RecipeIngredient,
+    User, MealLog, RecipeIngredient,
     Item, ReceiptUpload, AgentInteraction
 )
 from app.services.inventory_service import IntelligentInventoryService
+from app.services.inventory_snapshot import LOW_STOCK_GRAMS, inventory_snapshots
+from app.services.expiry_risk import ExpiryRiskEngine
+from app.services.restock_engine import RestockEngine
 from app.services.consumption_services import ConsumptionService
+from app.services.streak_service import StreakService
 from app.services.notification_service import NotificationService, NotificationPriority
 from app.services.websocket_manager import websocket_manager
 from app.services.item_normalizer import IntelligentItemNormalizer
 from app.core.config import settings
+from app.core.dates import in_range, utc_day_bounds
 
 logger = logging.getLogger(__name__)
 
@@ -71,11 +76,10 @@ class TrackingAgent:
         self.inventory_service = IntelligentInventoryService(db)
         self.consumption_service = ConsumptionService(db)  # FIX: Added missing service
         self.notification_service = NotificationService(db)  # FIX: Added notification service
-        # Updated to new normalizer pattern
-        from app.models.database import Item
-        from app.core.config import settings
-        items_list = self.db.query(Item).all()
-        self.normalizer = IntelligentItemNormalizer(items_list, settings.openai_api_key)
+        # Share the inventory service's catalog snapshot (no second items load)
+        self.normalizer = IntelligentItemNormalizer(
+            None, settings.openai_api_key, catalog=self.inventory_service.catalog
+        )
         self.memory = ConversationBufferMemory()
         self.state = self._initialize_state()
         self.tools = self._create_tools()
@@ -688,94 +692,58 @@ class TrackingAgent:
             days_threshold: Number of days ahead to check for expiry (default: 3)
         """
         try:
-            expiry_threshold = datetime.utcnow() + timedelta(days=days_threshold)
+            now = datetime.utcnow()
+            expiry_threshold = now + timedelta(days=days_threshold)
 
-            # Base query for all inventory items with expiry dates
-            base_query = self.db.query(UserInventory).options(
-                joinedload(UserInventory.item)
-            ).filter(
-                and_(
-                    UserInventory.user_id == self.user_id,
-                    UserInventory.quantity_grams > 0,
-                    UserInventory.expiry_date.isnot(None)
-                )
-            )
+            # Stocked, dated batches from the inventory snapshot
+            snapshot = inventory_snapshots.get(self.db, self.user_id)
+            inventory_items = [
+                batch for batch in snapshot.batches
+                if batch["item_name"] is not None and batch["quantity_grams"] > 0 and batch["expiry_date"]
+            ]
 
             # Apply date filter based on mode
             if filter_mode in ["date_only", "both"]:
-                inventory_items = base_query.filter(
-                    UserInventory.expiry_date <= expiry_threshold
-                ).all()
-            else:
-                # For consumption_only, get all items to check consumption patterns
-                inventory_items = base_query.all()
+                inventory_items = [
+                    batch for batch in inventory_items
+                    if datetime.fromisoformat(batch["expiry_date"]) <= expiry_threshold
+                ]
 
-
-            # Get upcoming meal plans if consumption filtering is needed
-            upcoming_meals_by_item = {}
+            # Planned use before expiry (consumption timeline, FIFO across batches)
             if filter_mode in ["consumption_only", "both"]:
-                upcoming_meals_by_item = self._get_upcoming_consumption_patterns(expiry_threshold)
+                candidate_ids = {batch["id"] for batch in inventory_items}
+                inventory_items = [
+                    batch for batch in ExpiryRiskEngine(self.db).assess(self.user_id, snapshot.batches)
+                    if batch["id"] in candidate_ids
+                    and not batch["will_be_consumed"]  # Only flag items that won't be used
+                ]
 
             expiring_items = []
 
             for inv_item in inventory_items:
-                try:
-                    if not inv_item.item:
-                        logger.warning(f"Inventory item {inv_item.id} missing item reference")
-                        continue
-
-                    if not inv_item.expiry_date:
-                        continue
-
-                    days_until_expiry = (inv_item.expiry_date - datetime.utcnow()).days
-
-                    # Show items expiring soon OR already expired within last 30 days
-                    # Users can manually remove items via All Items tab when thrown away
-                    expired_lookback_days = 30
-                    if days_until_expiry < -expired_lookback_days:
-                        continue  # Skip items expired more than 30 days ago
-
-                    # Apply consumption pattern filter
-                    if filter_mode == "consumption_only":
-                        # Only include if item WON'T be consumed before expiry
-                        item_id = inv_item.item.id
-                        will_be_consumed = self._will_be_consumed_before_expiry(
-                            item_id,
-                            inv_item.expiry_date,
-                            inv_item.quantity_grams,
-                            upcoming_meals_by_item
-                        )
-                        if will_be_consumed:
-                            continue  # Skip items that will be consumed
-
-                    elif filter_mode == "both":
-                        # Include if expires soon AND won't be consumed
-                        item_id = inv_item.item.id
-                        will_be_consumed = self._will_be_consumed_before_expiry(
-                            item_id,
-                            inv_item.expiry_date,
-                            inv_item.quantity_grams,
-                            upcoming_meals_by_item
-                        )
-                        # Only flag as expiring if it won't be used
-                        if will_be_consumed:
-                            continue
-
-                    expiring_items.append({
-                        "inventory_id": inv_item.id,
-                        "item_id": inv_item.item.id,
-                        "item_name": inv_item.item.canonical_name,
-                        "quantity_grams": float(inv_item.quantity_grams),
-                        "expiry_date": inv_item.expiry_date.isoformat(),
-                        "days_remaining": days_until_expiry,
-                        "priority": "urgent" if days_until_expiry <= 1 else "high" if days_until_expiry <= 2 else "medium",
-                        "category": inv_item.item.category or "other",
-                        "recipe_suggestions": []  # To be populated by LLM-based recipe suggester
-                    })
-
-                except Exception as e:
-                    logger.warning(f"Error processing inventory item {inv_item.id}: {str(e)}")
-                    continue
+                expiry_date = inv_item["expiry_date"]
+                if isinstance(expiry_date, str):
+                    expiry_date = datetime.fromisoformat(expiry_date)
+
+                days_until_expiry = (expiry_date - now).days
+
+                # Show items expiring soon OR already expired within last 30 days
+                # Users can manually remove items via All Items tab when thrown away
+                expired_lookback_days = 30
+                if days_until_expiry < -expired_lookback_days:
+                    continue  # Skip items expired more than 30 days ago
+
+                expiring_items.append({
+                    "inventory_id": inv_item["id"],
+                    "item_id": inv_item["item_id"],
+                    "item_name": inv_item["item_name"],
+                    "quantity_grams": float(inv_item["quantity_grams"]),
+                    "expiry_date": expiry_date.isoformat(),
+                    "days_remaining": days_until_expiry,
+                    "priority": "urgent" if days_until_expiry <= 1 else "high" if days_until_expiry <= 2 else "medium",
+                    "category": inv_item["category"] or "other",
+                    "recipe_suggestions": []  # To be populated by LLM-based recipe suggester
+                })
             
             # Sort by urgency (expired first, then by days)
             expiring_items.sort(key=lambda x: (x["days_remaining"], x["item_name"]))
@@ -820,100 +788,6 @@ class TrackingAgent:
             logger.error(f"Error checking expiring items: {str(e)}")
             return {"success": False, "error": f"Failed to check expiring items: {str(e)}"}
 
-    def _get_upcoming_consumption_patterns(self, until_date: datetime) -> Dict[int, List[Dict]]:
-        """
-        Get upcoming meal plans and aggregate by item_id
-        Returns: {item_id: [{"planned_date": datetime, "quantity_needed": float}, ...]}
-        """
-        try:
-            # Query upcoming planned meals
-            upcoming_meals = self.db.query(MealLog).options(
-                joinedload(MealLog.recipe).joinedload(Recipe.ingredients).joinedload(RecipeIngredient.item)
-            ).filter(
-                and_(
-                    MealLog.user_id == self.user_id,
-                    MealLog.planned_datetime.isnot(None),
-                    MealLog.planned_datetime >= datetime.utcnow(),
-                    MealLog.planned_datetime <= until_date,
-                    MealLog.was_skipped == False,
-                    MealLog.consumed_datetime.is_(None)  # Not yet consumed
-                )
-            ).all()
-
-            # Aggregate by item_id
-            consumption_by_item = {}
-
-            for meal in upcoming_meals:
-                if not meal.recipe or not meal.recipe.ingredients:
-                    continue
-
-                for ingredient in meal.recipe.ingredients:
-                    if not ingredient.item:
-                        continue
-
-                    item_id = ingredient.item_id
-                    quantity_needed = ingredient.quantity_grams * meal.portion_multiplier
-
-                    if item_id not in consumption_by_item:
-                        consumption_by_item[item_id] = []
-
-                    consumption_by_item[item_id].append({
-                        "planned_date": meal.planned_datetime,
-                        "quantity_needed": quantity_needed,
-                        "meal_type": meal.meal_type,
-                        "recipe_name": meal.recipe.name
-                    })
-
-            logger.info(f"Found {len(consumption_by_item)} unique items in upcoming meals")
-            return consumption_by_item
-
-        except Exception as e:
-            logger.error(f"Error getting consumption patterns: {str(e)}")
-            return {}
-
-    def _will_be_consumed_before_expiry(
-        self,
-        item_id: int,
-        expiry_date: datetime,
-        available_quantity: float,
-        consumption_patterns: Dict[int, List[Dict]]
-    ) -> bool:
-        """
-        Determine if an item will be fully consumed before expiry
-
-        Returns:
-            True if item will be consumed, False if it will expire unused
-        """
-        if item_id not in consumption_patterns:
-            # No upcoming meals planned with this item
-            return False
-
-        planned_uses = consumption_patterns[item_id]
-
-        # Filter only uses before expiry
-        uses_before_expiry = [
-            use for use in planned_uses
-            if use["planned_date"] <= expiry_date
-        ]
-
-        if not uses_before_expiry:
-            return False
-
-        # Calculate total quantity needed before expiry
-        total_needed = sum(use["quantity_needed"] for use in uses_before_expiry)
-
-        # Item will be consumed if planned usage >= 80% of available quantity
-        # (80% threshold accounts for typical cooking variations)
-        consumption_threshold = 0.8
-        will_consume = total_needed >= (available_quantity * consumption_threshold)
-
-        logger.debug(
-            f"Item {item_id}: {total_needed}g needed vs {available_quantity}g available "
-            f"before expiry - will_consume: {will_consume}"
-        )
-
-        return will_consume
-
     async def calculate_inventory_status(self) -> Dict[str, Any]:
         """Calculate comprehensive inventory status with optimization"""
         try:
@@ -972,23 +846,13 @@ class TrackingAgent:
             for item_id in required_items:
                 required_items[item_id] = required_items[item_id] * weekly_multiplier * 1.2  # 20% buffer
             
-            # Get current inventory with optimization
-            current_inventory = {}
-            inventory_items = self.db.query(UserInventory).options(
-                joinedload(UserInventory.item)
-            ).filter(
-                and_(
-                    UserInventory.user_id == self.user_id,
-                    UserInventory.quantity_grams > 0
-                )
-            ).all()
-
-            
-            
-            for inv_item in inventory_items:
-                if inv_item.item:
-                    current_inventory[inv_item.item_id] = inv_item.quantity_grams
-            
+            # Current stock per item (summed across batches) from the inventory snapshot
+            snapshot = inventory_snapshots.get(self.db, self.user_id)
+            current_inventory = {
+                item_id: item["quantity_grams"]
+                for item_id, item in snapshot.items.items()
+                if item["quantity_grams"] > 0
+            }
 
             
             # Calculate status
@@ -1011,10 +875,14 @@ class TrackingAgent:
             item_count = 0
             category_stats = {}
 
+            items_by_id = {
+                item.id: item
+                for item in self.db.query(Item).filter(Item.id.in_(list(required_items))).all()
+            }
             
             for item_id, required_qty in required_items.items():
                 try:
-                    item = self.db.query(Item).filter(Item.id == item_id).first()
+                    item = items_by_id.get(item_id)
                     if not item:
                         continue
                     
@@ -1098,195 +966,14 @@ class TrackingAgent:
             return {"success": False, "error": f"Failed to calculate inventory status: {str(e)}"}
     
     def generate_restock_list(self) -> Dict[str, Any]:
-        """Generate intelligent restock list combining upcoming meal needs and historical patterns"""
+        """
+        Generate intelligent restock list combining upcoming meal needs and historical patterns
+        (per-item usage, planned need and stock come from SQL aggregates, see RestockEngine)
+        """
         try:
-            # STEP 1: Get upcoming planned meals (next 7 days) - PRIORITY DATA
-            seven_days_from_now = datetime.utcnow() + timedelta(days=7)
-            upcoming_items = self._get_upcoming_consumption_patterns(seven_days_from_now)
-
-            # STEP 2: Get historical consumption data (last 14 days) - TREND DATA
-            two_weeks_ago = datetime.utcnow() - timedelta(days=30)
-
-            recent_logs = self.db.query(MealLog).options(
-                joinedload(MealLog.recipe).joinedload(Recipe.ingredients).joinedload(RecipeIngredient.item)
-            ).filter(
-                and_(
-                    MealLog.user_id == self.user_id,
-                    MealLog.consumed_datetime >= two_weeks_ago,
-                    MealLog.recipe_id.isnot(None)
-                )
-            ).all()
-
-            # Calculate historical item usage patterns
-            item_usage = {}
-            recipe_count = {}
-
-            for log in recent_logs:
-                if not log.recipe:
-                    continue
-
-                recipe_count[log.recipe_id] = recipe_count.get(log.recipe_id, 0) + 1
-
-                try:
-                    ingredients = log.recipe.ingredients
-                    portion_multiplier = log.portion_multiplier or 1.0
-
-                    for ingredient in ingredients:
-                        if not ingredient.item:
-                            continue
-
-                        item_id = ingredient.item_id
-                        quantity = ingredient.quantity_grams * portion_multiplier
-
-                        if item_id not in item_usage:
-                            item_usage[item_id] = {
-                                "total_used": 0,
-                                "usage_count": 0,
-                                "recipes": set(),
-                                "avg_per_use": 0
-                            }
-
-                        item_usage[item_id]["total_used"] += quantity
-                        item_usage[item_id]["usage_count"] += 1
-                        item_usage[item_id]["recipes"].add(log.recipe_id)
-
-                except Exception as e:
-                    logger.warning(f"Error processing recipe ingredients for restock: {str(e)}")
-                    continue
-
-            # Calculate averages
-            for item_id, usage_data in item_usage.items():
-                if usage_data["usage_count"] > 0:
-                    usage_data["avg_per_use"] = usage_data["total_used"] / usage_data["usage_count"]
-
-            # STEP 3: Get current inventory
-            current_inventory = {}
-            inventory_items = self.db.query(UserInventory).options(
-                joinedload(UserInventory.item)
-            ).filter(
-                UserInventory.user_id == self.user_id
-            ).all()
-
-            for inv_item in inventory_items:
-                if inv_item.item:
-                    current_inventory[inv_item.item_id] = {
-                        "quantity": inv_item.quantity_grams,
-                        "expiry": inv_item.expiry_date
-                    }
-
-            # Generate restock list
-            restock_list = {
-                "urgent": [],     # Can't cook planned meals OR critically low stock
-                "soon": [],       # < 50% of recommended stock
-                "routine": [],    # < 70% stock for frequently used items
-                "bulk_opportunities": []
-            }
-
-            # Calculate weekly multiplier from historical data
-            days_of_data = len(set(log.consumed_datetime.date() for log in recent_logs if log.consumed_datetime))
-            weekly_multiplier = (7 / days_of_data) if days_of_data > 0 else 0
-
-            # STEP 4: Combine all items from both upcoming meals and historical usage
-            all_items = set(upcoming_items.keys()) | set(item_usage.keys())
-
-            for item_id in all_items:
-                try:
-                    item = self.db.query(Item).filter(Item.id == item_id).first()
-                    if not item:
-                        continue
-
-                    current_stock = current_inventory.get(item_id, {}).get("quantity", 0)
-
-                    # Calculate upcoming requirement (next 7 days planned meals)
-                    upcoming_requirement = sum(
-                        use["quantity_needed"] for use in upcoming_items.get(item_id, [])
-                    )
-
-                    # Calculate historical weekly requirement (with 20% buffer)
-                    historical_weekly = 0
-                    usage_data = item_usage.get(item_id, {})
-                    usage_count = usage_data.get("usage_count", 0)
-
-                    if usage_data and weekly_multiplier > 0:
-                        historical_weekly = usage_data["total_used"] * weekly_multiplier * 1.2
-
-                    # Smart recommendation: prioritize upcoming needs, but consider historical patterns
-                    recommended_stock = max(upcoming_requirement, historical_weekly)
-
-                    # Calculate shortage
-                    shortage = max(recommended_stock - current_stock, 0)
-
-                    # Skip if no shortage and not needed for upcoming meals
-                    if shortage == 0 and upcoming_requirement == 0:
-                        continue
-
-                    # Calculate stock metrics
-                    stock_percentage = (current_stock / recommended_stock * 100) if recommended_stock > 0 else 100
-                    days_supply = (current_stock / (recommended_stock / 7)) if recommended_stock > 0 else 0
-
-                    restock_info = {
-                        "item_id": item_id,
-                        "item_name": item.canonical_name,
-                        "category": item.category or "other",
-                        "current_quantity": round(current_stock, 1),
-                        "recommended_quantity": round(shortage, 1),
-                        "priority": "",  # Will be set below
-                        "usage_frequency": usage_count,
-                        "days_until_depleted": int(days_supply) if days_supply > 0 else 0
-                    }
-
-                    # Check for expiry urgency
-                    inventory_item = current_inventory.get(item_id, {})
-                    if inventory_item.get("expiry"):
-                        try:
-                            expiry_date = inventory_item["expiry"]
-                            if isinstance(expiry_date, str):
-                                expiry_date = datetime.fromisoformat(expiry_date)
-                            days_to_expiry = (expiry_date - datetime.utcnow()).days
-                            restock_info["days_to_expiry"] = days_to_expiry
-
-                            if days_to_expiry <= 3:
-                                restock_info["expiry_urgency"] = "urgent"
-                            elif days_to_expiry <= 7:
-                                restock_info["expiry_urgency"] = "soon"
-                        except Exception as e:
-                            logger.warning(f"Error processing expiry for item {item_id}: {str(e)}")
-
-                    # PRIORITY LOGIC: Prioritize upcoming meal needs
-                    if current_stock < upcoming_requirement:
-                        # Can't cook planned meals - URGENT
-                        restock_info["priority"] = "urgent"
-                        restock_list["urgent"].append(restock_info)
-                    elif stock_percentage < 20 or restock_info.get("expiry_urgency") == "urgent":
-                        # Critically low stock - URGENT
-                        restock_info["priority"] = "urgent"
-                        restock_list["urgent"].append(restock_info)
-                    elif stock_percentage < 50 or restock_info.get("expiry_urgency") == "soon":
-                        # Low stock - SOON
-                        restock_info["priority"] = "soon"
-                        restock_list["soon"].append(restock_info)
-                    elif stock_percentage < 70 and usage_count >= 3:
-                        # Frequently used, medium stock - ROUTINE
-                        restock_info["priority"] = "routine"
-                        restock_list["routine"].append(restock_info)
-
-                    # Check for bulk buying opportunities
-                    if usage_data and usage_count >= 5 and len(usage_data.get("recipes", [])) >= 3:
-                        if item.category in ["grains", "protein", "spices"]:
-                            restock_list["bulk_opportunities"].append({
-                                **restock_info,
-                                "bulk_suggestion": f"Buy {round(recommended_stock * 4, 1)}g (1 month supply)",
-                                "bulk_reason": f"Used in {len(usage_data['recipes'])} recipes, {usage_count} times"
-                            })
-
-                except Exception as e:
-                    logger.warning(f"Error processing item {item_id} for restock list: {str(e)}")
-                    continue
-            
-            # Sort each category by priority
-            restock_list["urgent"].sort(key=lambda x: (x["days_until_depleted"], -x["usage_frequency"]))
-            restock_list["soon"].sort(key=lambda x: (x["days_until_depleted"], -x["usage_frequency"]))
-            restock_list["routine"].sort(key=lambda x: (-x["usage_frequency"], x["days_until_depleted"]))
+            result = RestockEngine(self.db).restock_list(self.user_id)
+            restock_list = result["restock_list"]
+            days_of_data = result["days_of_data"]
 
             # Calculate summary
             total_items = sum(len(restock_list[category]) for category in ["urgent", "soon", "routine"])
@@ -1419,60 +1106,32 @@ class TrackingAgent:
             print(f"[ACHIEVEMENT CHECK] ⚠️ Redis unavailable - deduplication disabled\n")
 
         try:
-            # Check for streak achievements
-            recent_logs = self.db.query(MealLog).filter(
-                and_(
-                    MealLog.user_id == self.user_id,
-                    MealLog.consumed_datetime >= datetime.utcnow() - timedelta(days=7),
-                    MealLog.consumed_datetime.isnot(None)
-                )
-            ).count()
-
-            print(f"[ACHIEVEMENT CHECK - STREAK] Recent logs (last 7 days): {recent_logs}")
-
-            # 7-day streak achievement
-            if recent_logs >= 21:  # 3 meals per day for 7 days
-                streak_days = recent_logs // 3
-                print(f"[ACHIEVEMENT CHECK - STREAK] Calculated streak days: {streak_days}")
+            # Check for streak achievements (maintained streak counter, each milestone once per run)
+            streak_service = StreakService(self.db)
+            milestone = streak_service.award_milestone(self.user_id)
 
-                streak_type = None
-                streak_message = None
+            print(f"[ACHIEVEMENT CHECK - STREAK] Current streak: {streak_service.get_current_streak(self.user_id)} days")
 
-                if streak_days == 7:
-                    streak_type = "streak_7day"
-                    streak_message = "7-day meal logging streak! You're building lasting habits!"
-                elif streak_days == 14:
-                    streak_type = "streak_14day"
-                    streak_message = "Amazing! 14-day meal streak - you're on fire!"
-                elif streak_days == 30:
-                    streak_type = "streak_30day"
-                    streak_message = "Incredible! 30-day meal streak - habit mastery achieved!"
-
-                if streak_type:
-                    # Check Redis deduplication
-                    achievement_key = f"achievement_sent:{self.user_id}:{streak_type}:{today}"
-
-                    if redis_client and redis_client.exists(achievement_key):
-                        print(f"[ACHIEVEMENT CHECK - STREAK] ⏭️  SKIPPED - {streak_type} already sent today")
-                    else:
-                        print(f"[ACHIEVEMENT CHECK - STREAK] ✅ {streak_type} achieved!")
-                        achievements.append({
-                            "type": "streak",
-                            "message": streak_message
-                        })
-
-                        # Mark as sent with 24-hour TTL
-                        if redis_client:
-                            redis_client.setex(achievement_key, 86400, "1")
-                            print(f"[ACHIEVEMENT CHECK - STREAK] 🔑 Set dedup flag: {achievement_key}")
+            if milestone:
+                streak_messages = {
+                    7: "7-day meal logging streak! You're building lasting habits!",
+                    14: "Amazing! 14-day meal streak - you're on fire!",
+                    30: "Incredible! 30-day meal streak - habit mastery achieved!",
+                }
+                print(f"[ACHIEVEMENT CHECK - STREAK] ✅ streak_{milestone}day achieved!")
+                achievements.append({
+                    "type": "streak",
+                    "message": streak_messages[milestone]
+                })
+                self.db.commit()
             else:
-                print(f"[ACHIEVEMENT CHECK - STREAK] ❌ No streak achievement (need 21+ logs, have {recent_logs})")
+                print("[ACHIEVEMENT CHECK - STREAK] ❌ No new streak milestone")
 
             # Daily completion achievement
             today_logs = self.db.query(MealLog).filter(
                 and_(
                     MealLog.user_id == self.user_id,
-                    func.date(MealLog.consumed_datetime) == datetime.utcnow().date(),
+                    in_range(MealLog.consumed_datetime, utc_day_bounds(datetime.utcnow().date())),
                     MealLog.consumed_datetime.isnot(None)
                 )
             ).count()
@@ -1864,7 +1523,7 @@ class TrackingAgent:
         """NEW: Schedule meal reminders for upcoming meals"""
         try:
             from datetime import datetime, timedelta
-            from sqlalchemy import and_, func
+            from sqlalchemy import and_
             
             # Get today's upcoming meals (not yet consumed)
             now = datetime.utcnow()
@@ -1920,11 +1579,12 @@ class TrackingAgent:
     def _check_low_stock(self) -> List[Dict]:
         """Quick check for low stock items (for WebSocket broadcast)"""
         try:
-            inventory = self.state.current_inventory
+            snapshot = inventory_snapshots.get(self.db, self.user_id)
             low_stock = []
             
-            for item in inventory:
-                percentage = item.get("percentage_of_optimal", 100)
+            for item in snapshot.items.values():
+                # Percentage of the low-stock line, summed across batches
+                percentage = round(item["quantity_grams"] / LOW_STOCK_GRAMS * 100, 1)
                 if percentage < 30:
                     low_stock.append({
                         "item_name": item["item_name"],
@@ -1941,18 +1601,16 @@ class TrackingAgent:
     def _check_expiring_items_quick(self) -> List[Dict]:
         """Quick check for expiring items (for WebSocket broadcast)"""
         try:
-            inventory = self.state.current_inventory
+            snapshot = inventory_snapshots.get(self.db, self.user_id)
             expiring = []
             
-            for item in inventory:
-                if item.get("days_until_expiry") is not None:
-                    days = item["days_until_expiry"]
-                    if days <= 3:
-                        expiring.append({
-                            "item_name": item["item_name"],
-                            "days_remaining": days,
-                            "priority": "urgent" if days <= 0 else "high"
-                        })
+            for item in snapshot.expiring_within(3):
+                days = item["days_until_expiry"]
+                expiring.append({
+                    "item_name": item["item_name"],
+                    "days_remaining": days,
+                    "priority": "urgent" if days <= 0 else "high"
+                })
             
             return expiring
         except Exception as e:
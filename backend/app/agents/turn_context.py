@@ -0,0 +1,110 @@
+"""
+Request-scoped context for one /chat/v2 turn.
+
+A turn runs load_context, one or more generate_response passes and tool
+calls. Each of them used to open its own SessionLocal() and build a fresh
+UserContext. Building a UserContext creates ConsumptionService,
+IntelligentInventoryService (item table + normalizer) and PlanningAgent
+(MealPlanOptimizer), so a tool-loop turn repeated that work 3-5 times.
+
+turn_scope() opens a TurnContext for the turn and publishes it through a
+contextvar. LangGraph copies the context into node tasks and the executor
+threads that run sync tools, so every node and tool of the turn sees the same
+object. The TurnContext holds one DB session and one UserContext per user;
+the UserContext memoizes its sub-results, so each is computed once per turn.
+
+Tools may run in parallel threads. use_turn() serializes access to the
+shared session with a lock. Outside a turn (scripts, tests) use_turn()
+falls back to a throwaway scope.
+
+Usage:
+    with turn_scope(db):
+        result = await app.ainvoke(state, config)
+
+    # in a node or tool
+    with use_turn(user_id) as context:
+        stats = context.build_context(minimal=True)
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.agents.nutrition_context import UserContext
+
+logger = logging.getLogger(__name__)
+
+_current_turn: ContextVar[Optional["TurnContext"]] = ContextVar("nutrition_turn", default=None)
+
+
+class TurnContext:
+    """One DB session and one memoizing UserContext per user for a chat turn"""
+
+    def __init__(self, db: Optional[Session] = None):
+        self._db = db
+        self._owns_session = db is None
+        self._contexts: Dict[int, UserContext] = {}
+        self.lock = threading.RLock()
+
+    @property
+    def db(self) -> Session:
+        if self._db is None:
+            from app.models.database import SessionLocal
+            self._db = SessionLocal()
+        return self._db
+
+    def user_context(self, user_id: int) -> UserContext:
+        """The turn's UserContext for user_id (built once)"""
+        if user_id not in self._contexts:
+            self._contexts[user_id] = UserContext(self.db, user_id)
+        return self._contexts[user_id]
+
+    def close(self):
+        """Close the session if the turn opened it"""
+        if self._owns_session and self._db is not None:
+            self._db.close()
+        self._db = None
+        self._contexts.clear()
+
+
+def current_turn() -> Optional[TurnContext]:
+    """The active turn, if any"""
+    return _current_turn.get()
+
+
+@contextmanager
+def turn_scope(db: Optional[Session] = None) -> Iterator[TurnContext]:
+    """Make a TurnContext current for the duration of a graph run"""
+    turn = TurnContext(db)
+    token = _current_turn.set(turn)
+    try:
+        yield turn
+    finally:
+        _current_turn.reset(token)
+        turn.close()
+
+
+@contextmanager
+def use_turn(user_id: int) -> Iterator[UserContext]:
+    """
+    The current turn's UserContext for user_id, with the turn's lock held.
+
+    Rolls the shared session back if the block raises, so one failed tool
+    does not poison the rest of the turn.
+    """
+    turn = _current_turn.get()
+    if turn is None:
+        with turn_scope() as turn:
+            yield turn.user_context(user_id)
+        return
+
+    with turn.lock:
+        try:
+            yield turn.user_context(user_id)
+        except Exception:
+            turn.db.rollback()
+            raise
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List, Dict, Optional
 from app.models.database import get_db, UserInventory, Item, User
 from app.services.inventory_service import IntelligentInventoryService
+from app.core.events import EventType, event_bus
 from app.services.auth import get_current_user_dependency as get_current_user
 from pydantic import BaseModel
-from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -171,56 +171,36 @@ def get_inventory_items(
     category: Optional[str] = None,
     low_stock_only: bool = False,
     expiring_soon: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: next_cursor of the previous page"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's inventory items with filters"""
-    # OPTIMIZATION: Eager load Item to avoid N+1 query problem
-    query = db.query(UserInventory).options(
-        joinedload(UserInventory.item)
-    ).filter(UserInventory.user_id == current_user.id)
-
-    if low_stock_only:
-        query = query.filter(UserInventory.quantity_grams < 100)
-
-    if expiring_soon:
-        three_days_later = datetime.now() + timedelta(days=3)
-        query = query.filter(UserInventory.expiry_date <= three_days_later)
-
-    inventory_items = query.all()
-
-    # Format response
-    items = []
-
-    for inv in inventory_items:
-        # Use eager-loaded relationship instead of querying
-        item = inv.item
-
-        # Skip if item not found or doesn't match category filter
-        if not item:
-            continue
-
-        if category and item.category != category:
-            continue
+    """
+    Get user's inventory items with filters
 
-        days_until_expiry = None
-        if inv.expiry_date:
-            days_until_expiry = (inv.expiry_date - datetime.now()).days
+    Filters, item join and (optional) keyset pagination run in SQL; rows are
+    streamed from the database instead of loaded as ORM objects.
+    """
+    service = IntelligentInventoryService(db)
+    rows = service.iter_user_inventory(
+        current_user.id,
+        category=category,
+        low_stock_only=low_stock_only,
+        expiring_soon=expiring_soon,
+        after_id=after_id,
+        limit=limit
+    )
 
-        items.append({
-            "id": inv.id,
-            "item_id": item.id,
-            "item_name": item.canonical_name,
-            "category": item.category,
-            "quantity_grams": inv.quantity_grams,
-            "expiry_date": inv.expiry_date.isoformat() if inv.expiry_date else None,
-            "days_until_expiry": days_until_expiry,
-            "is_depleted": (inv.quantity_grams or 0) <= 0  # Flag for fully consumed items
-        })
+    items = [
+        {**row, "is_depleted": (row["quantity_grams"] or 0) <= 0}  # Flag for fully consumed items
+        for row in rows
+    ]
 
     return {
         "count": len(items),
-        "items": items
+        "items": items,
+        "next_cursor": items[-1]["id"] if limit and len(items) == limit else None
     }
 
 @router.post("/deduct-meal")
@@ -294,5 +274,6 @@ def remove_inventory_item(
     
     db.delete(item)
     db.commit()
+    event_bus.notify(EventType.INVENTORY_UPDATED, {'user_id': current_user.id})
     
     return {"status": "deleted", "message": "Item removed from inventory"}
\ No newline at end of file
@@ -11,7 +11,9 @@ from pydantic import BaseModel, Field, validator
 
 from app.models.database import get_db, User
 from app.agents.nutrition_agent import NutritionAgent
+from app.services.nutrition_rollup import NutritionRollupService
 from app.services.auth import get_current_user
+from app.core.dates import day_bounds, in_range
 
 router = APIRouter(prefix="/nutrition", tags=["Nutrition"])
 
@@ -448,7 +450,7 @@ async def get_next_meal_recommendations(
     next_meal = db.query(MealLog).filter(
         and_(
             MealLog.user_id == current_user.id,
-            func.date(MealLog.planned_datetime) == today,
+            in_range(MealLog.planned_datetime, day_bounds(today)),
             MealLog.consumed_datetime.is_(None),
             MealLog.was_skipped.is_(False)
         )
@@ -751,38 +753,34 @@ async def get_weekly_nutrition_trends(
     - Macro distribution changes
     - Progress towards goals
     """
-    agent = NutritionAgent(db, current_user.id)
-    
     trends = {
         "success": True,
         "period": f"Last {weeks} weeks",
         "weekly_data": []
     }
     
-    # Get data for each week
+    # One rollup row per day covers every week
+    today = datetime.utcnow().date()
+    daily_rollups = NutritionRollupService(db).get_days(
+        current_user.id, today - timedelta(weeks=weeks, days=-1), today
+    )
+    
+    # Get data for each week (the most recent one ends today)
     for week_offset in range(weeks):
-        week_start = datetime.utcnow() - timedelta(weeks=week_offset+1)
-        week_end = week_start + timedelta(days=7)
-        
-        # Get meal logs for this week
-        from app.models.database import MealLog
+        week_end = today - timedelta(weeks=week_offset)
+        week_start = week_end - timedelta(days=6)
         
-        meal_logs = db.query(MealLog).filter(
-            and_(
-                MealLog.user_id == current_user.id,
-                MealLog.planned_datetime >= week_start,
-                MealLog.planned_datetime < week_end
-            )
-        ).all()
+        week_days = [day for day in daily_rollups if week_start <= day.date <= week_end]
+        total_meals = sum(day.meals_planned for day in week_days)
         
-        if meal_logs:
-            consumed = [log for log in meal_logs if log.consumed_datetime]
+        if total_meals:
+            consumed_meals = sum(day.meals_consumed for day in week_days)
             
             week_data = {
-                "week_start": week_start.date().isoformat(),
-                "compliance_rate": (len(consumed) / len(meal_logs) * 100) if meal_logs else 0,
-                "total_meals": len(meal_logs),
-                "consumed_meals": len(consumed)
+                "week_start": week_start.isoformat(),
+                "compliance_rate": consumed_meals / total_meals * 100,
+                "total_meals": total_meals,
+                "consumed_meals": consumed_meals
             }
             
             trends["weekly_data"].append(week_data)
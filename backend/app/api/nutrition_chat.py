@@ -3,6 +3,8 @@ Nutrition Chat API - LLM-Powered Intelligent Nutrition Assistant
 
 Endpoints:
 - POST /nutrition/chat - Process user query and return intelligent response
+- POST /nutrition/chat/v2 - LangGraph agent (conversation memory, tools)
+- POST /nutrition/chat/v2/stream - Same agent, streamed as Server-Sent Events
 - GET /nutrition/chat/history - Get chat history (future)
 - GET /nutrition/context - Get current user context
 
@@ -10,10 +12,13 @@ Author: NutriLens AI Team
 Created: 2025-11-10
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 from pydantic import BaseModel
+from contextlib import aclosing
+import json
 import logging
 
 from app.models.database import get_db, User
@@ -22,9 +27,13 @@ from app.agents.nutrition_intelligence import NutritionIntelligence
 from app.agents.nutrition_context import UserContext
 from app.agents.graph_instance import get_compiled_graph
 from app.agents.nutrition_graph import NutritionState
+from app.agents.turn_context import turn_scope
+from app.agents.chat_stream import ChatStream
+from app.agents.intent_router import get_intent_router
 from app.services.llm_client import LLMClient
 from app.core.config import settings
 from app.core.mongodb import save_chat_message
+from app.services.websocket_manager import websocket_manager
 from langchain_core.messages import HumanMessage, AIMessage
 import uuid
 import time
@@ -234,6 +243,7 @@ async def health_check():
     - LLM client status
     - Available providers
     - Cache statistics
+    - Intent router hit rate and latency (local vs LLM classification)
     """
     try:
         llm_client = get_llm_client()
@@ -247,6 +257,7 @@ async def health_check():
                 "cache_enabled": stats["cache_enabled"],
                 "cache_size": stats["cache_size"]
             },
+            "intent_router": get_intent_router().metrics.snapshot(),
             "services": {
                 "context_builder": "operational",
                 "intent_classifier": "operational",
@@ -264,6 +275,33 @@ async def health_check():
 
 # ==================== LangGraph V2 Endpoint (New!) ====================
 
+def _initial_state(query: str, user_id: int, session_id: str) -> NutritionState:
+    """Graph input for one chat turn"""
+    return {
+        "messages": [HumanMessage(content=query)],
+        "user_context": {},
+        "intent": None,
+        "confidence": 0.0,
+        "entities": {},
+        "user_id": user_id,
+        "session_id": session_id,
+        "turn_count": 0,
+        "processing_time_ms": 0,
+        "cost_usd": 0.0
+    }
+
+
+def _final_reply(result: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """(response text, intent) from the graph's final state"""
+    messages = (result or {}).get("messages", [])
+    assistant_messages = [msg for msg in messages if isinstance(msg, AIMessage)]
+    last_message = assistant_messages[-1] if assistant_messages else None
+
+    if last_message:
+        return last_message.content, result.get("intent", "unknown")
+    return "I'm sorry, I couldn't process your request.", "error"
+
+
 @router.post("/chat/v2", response_model=ChatResponse)
 async def chat_with_langgraph(
     request: ChatRequest,
@@ -315,36 +353,18 @@ async def chat_with_langgraph(
         app = get_compiled_graph()
 
         # Prepare initial state
-        initial_state: NutritionState = {
-            "messages": [HumanMessage(content=request.query)],
-            "user_context": {},
-            "intent": None,
-            "confidence": 0.0,
-            "entities": {},
-            "user_id": current_user.id,
-            "session_id": session_id,
-            "turn_count": 0,
-            "processing_time_ms": 0,
-            "cost_usd": 0.0
-        }
+        initial_state = _initial_state(request.query, current_user.id, session_id)
 
         # Configure with thread_id for state persistence
         config = {"configurable": {"thread_id": session_id}}
 
-        # Invoke pre-compiled graph
-        result = await app.ainvoke(initial_state, config=config)
+        # Invoke pre-compiled graph; nodes and tools share this request's
+        # session and one memoized UserContext for the turn
+        with turn_scope(db):
+            result = await app.ainvoke(initial_state, config=config)
 
         # Extract response from result
-        messages = result.get("messages", [])
-        assistant_messages = [msg for msg in messages if isinstance(msg, AIMessage)]
-        last_message = assistant_messages[-1] if assistant_messages else None
-
-        if last_message:
-            response_text = last_message.content
-            intent = result.get("intent", "unknown")
-        else:
-            response_text = "I'm sorry, I couldn't process your request."
-            intent = "error"
+        response_text, intent = _final_reply(result)
 
         # Calculate metrics
         processing_time = int((time.time() - start_time) * 1000)
@@ -382,3 +402,130 @@ async def chat_with_langgraph(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process query: {str(e)}"
         )
+
+
+# ==================== LangGraph V2 Streaming ====================
+
+async def stream_chat_turn(query: str, user_id: int, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run one /chat/v2 turn, yielding client events as the graph produces them.
+
+    Emits start, node/tool events and token deltas (app/agents/chat_stream.py),
+    then done with the same fields as ChatResponse (or error). Opens its own
+    turn session: request-scoped dependencies are closed before a streaming
+    response body runs.
+    """
+    start_time = time.time()
+    session_id = session_id or str(uuid.uuid4())
+    yield {"event": "start", "session_id": session_id}
+
+    try:
+        logger.info(f"[V2 stream] Processing message for user={user_id}, session={session_id}")
+
+        stream = ChatStream(
+            get_compiled_graph(),
+            _initial_state(query, user_id, session_id),
+            {"configurable": {"thread_id": session_id}}
+        )
+        with turn_scope():
+            async for event in stream.events():
+                yield event
+
+        result = stream.final_state or {}
+        response_text, intent = _final_reply(result)
+        processing_time = int((time.time() - start_time) * 1000)
+
+        await save_chat_message(user_id=user_id, session_id=session_id, role="user", content=query)
+        await save_chat_message(
+            user_id=user_id,
+            session_id=session_id,
+            role="assistant",
+            content=response_text,
+            intent=intent
+        )
+
+        yield {
+            "event": "done",
+            "success": True,
+            "response": response_text,
+            "intent": intent,
+            "processing_time_ms": processing_time,
+            "first_token_ms": stream.first_token_ms,
+            "cost_usd": result.get("cost_usd", 0.0),
+            "session_id": session_id
+        }
+
+    except Exception as e:
+        logger.error(f"Error in LangGraph chat stream: {str(e)}", exc_info=True)
+        yield {"event": "error", "message": f"Failed to process query: {str(e)}", "session_id": session_id}
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events frame"""
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+@router.post("/chat/v2/stream")
+async def chat_with_langgraph_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chat with the LangGraph assistant, streamed as Server-Sent Events (V2)
+
+    Same agent and conversation memory as /chat/v2, but the answer arrives
+    as it is generated instead of after the whole run:
+
+    ```
+    event: start              data: {"session_id": "abc-123"}
+    event: node_start         data: {"node": "classify_intent"}
+    event: node_end           data: {"node": "classify_intent", "intent": "stats", "confidence": 0.95}
+    event: tool_start         data: {"tool": "get_nutrition_stats"}
+    event: token              data: {"delta": "Your protein"}
+    event: done               data: {"response": "...", "intent": "stats", "first_token_ms": 640, ...}
+    ```
+
+    Clients show tokens as they arrive; `done` carries the ChatResponse
+    fields. Failures are sent as an `error` event. The same events are
+    available on the WebSocket channel (message type "chat").
+    """
+    async def event_source():
+        async for event in stream_chat_turn(request.query, current_user.id, request.session_id):
+            yield _sse(event)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_chat_to_websocket(websocket: WebSocket, user_id: int, message: Dict[str, Any]):
+    """
+    Answer a WebSocket "chat" message with the streamed turn.
+
+    Events go to the requesting connection only (as event_type "chat_<event>",
+    tagged with the client's request_id), not through the user's Redis channel.
+
+    Client message: {"type": "chat", "query": "...", "session_id": "...", "request_id": "..."}
+    """
+    query = (message.get("query") or "").strip()
+    if not query:
+        await websocket_manager.send_to_connection(websocket, {
+            "event_type": "chat_error",
+            "request_id": message.get("request_id"),
+            "message": "Missing query"
+        })
+        return
+
+    async with aclosing(stream_chat_turn(query, user_id, message.get("session_id"))) as events:
+        async for event in events:
+            payload = {key: value for key, value in event.items() if key != "event"}
+            sent = await websocket_manager.send_to_connection(websocket, {
+                "event_type": f"chat_{event['event']}",
+                "request_id": message.get("request_id"),
+                **payload
+            })
+            if not sent:
+                break  # Client went away; closing the generator ends the run
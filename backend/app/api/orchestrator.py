@@ -9,7 +9,7 @@ WhatsApp agent passes user_id directly (no JWT auth needed for these endpoints).
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_
 from datetime import datetime, date
 from typing import Optional
 from pydantic import BaseModel
@@ -17,8 +17,12 @@ from pydantic import BaseModel
 from app.models.database import get_db, User, MealLog, MealPlan
 from app.agents.tracking_agent import TrackingAgent
 from app.services.consumption_services import ConsumptionService
+from app.core.events import EventType, event_bus
+from app.services.streak_service import StreakService
+from app.services.nutrition_rollup import NutritionRollupService
 from app.services.llm_nutrition_estimator import estimate_nutrition_with_llm
 from app.core.config import settings
+from app.core.dates import day_bounds, in_range
 
 logger = logging.getLogger(__name__)
 
@@ -101,7 +105,7 @@ async def get_planned_meal(
                 MealLog.user_id == user_id,
                 MealLog.meal_plan_id == active_plan.id,
                 MealLog.meal_type == meal_type.lower(),
-                func.date(MealLog.planned_datetime) == today
+                in_range(MealLog.planned_datetime, day_bounds(today))
             )
         ).first()
 
@@ -309,7 +313,7 @@ async def log_external_meal(
                     MealLog.user_id == request.user_id,
                     MealLog.meal_plan_id == active_plan.id,
                     MealLog.meal_type == request.meal_type.lower(),
-                    func.date(MealLog.planned_datetime) == today,
+                    in_range(MealLog.planned_datetime, day_bounds(today)),
                     MealLog.consumed_datetime.is_(None),
                     MealLog.was_skipped == False
                 )
@@ -340,8 +344,11 @@ async def log_external_meal(
             )
             db.add(meal_log)
 
+        StreakService(db).record_meal(request.user_id, meal_log.planned_datetime.date())
+        NutritionRollupService(db).refresh_day(request.user_id, meal_log.planned_datetime.date())
         db.commit()
         db.refresh(meal_log)
+        event_bus.notify(EventType.MEAL_LOGGED, {'user_id': request.user_id})
 
         logger.info(f"[LOG_EXTERNAL_MEAL] Final meal_log_id: {meal_log.id}, Action: {'REPLACED' if existing_pending_meal else 'CREATED'}")
 
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from app.models.database import get_db, ReceiptScan, ReceiptPendingItem, User, Item
 from app.services.inventory_service import IntelligentInventoryService
+from app.services.item_catalog import item_catalog
 from app.services.s3_service import S3Service
 from app.services.auth import get_current_user_dependency as get_current_user
 from app.core.config import settings
@@ -117,10 +118,9 @@ async def upload_receipt(
                 logger.info(f"Enriching {len(needs_confirmation)} unmatched items...")
                 from app.services.receipt_item_enricher import ReceiptItemEnricher
 
-                items_list = db.query(Item).all()
                 enricher = ReceiptItemEnricher(
                     openai_api_key=settings.openai_api_key,
-                    existing_items=items_list
+                    existing_items=inventory_service.catalog.items
                 )
 
                 # Extract item names for enrichment
@@ -303,6 +303,7 @@ async def confirm_and_seed_items(
     seeded_count = 0
     added_count = 0
     seeded_items = []
+    seeded_orm_items = []
 
     for item_data in request.items:
         pending_id = item_data.get("pending_item_id")
@@ -361,6 +362,7 @@ async def confirm_and_seed_items(
                 db.flush()  # Get the ID
 
                 item_id = new_item.id
+                seeded_orm_items.append(new_item)
                 seeded_count += 1
                 seeded_items.append({
                     "canonical_name": pending_item.canonical_name,
@@ -389,6 +391,10 @@ async def confirm_and_seed_items(
 
     db.commit()
 
+    # Fold newly seeded items into the shared catalog (no full reload)
+    if seeded_orm_items:
+        item_catalog.add_items(seeded_orm_items)
+
     return {
         "status": "success",
         "seeded_count": seeded_count,
@@ -14,6 +14,10 @@ from app.models.database import get_db, User, MealLog
 from app.services.auth import get_current_user_dependency as get_current_user
 from app.agents.tracking_agent import TrackingAgent
 from app.services.consumption_services import ConsumptionService
+from app.core.events import EventType, event_bus
+from app.services.streak_service import StreakService
+from app.services.nutrition_rollup import NutritionRollupService
+from app.core.dates import day_bounds, in_range
 from app.schemas.tracking import (
     # Request schemas
     LogMealRequest,
@@ -380,10 +384,10 @@ async def manual_food_entry(
         # Parse and normalize food item
         # This would call the item normalizer service
         from app.services.item_normalizer import IntelligentItemNormalizer
-        from app.models.database import Item
         from app.core.config import settings
-        items_list = db.query(Item).all()
-        normalizer = IntelligentItemNormalizer(items_list, settings.openai_api_key)
+        normalizer = IntelligentItemNormalizer(
+            None, settings.openai_api_key, catalog=tracking_agent.inventory_service.catalog
+        )
 
         # Fixed: normalize_item() doesn't exist, using normalize() instead
         raw_input = f"{request.quantity} {request.food_name}"
@@ -434,7 +438,10 @@ async def manual_food_entry(
         )
         
         db.add(manual_log)
+        StreakService(db).record_meal(current_user.id, manual_log.planned_datetime.date())
+        NutritionRollupService(db).refresh_day(current_user.id, manual_log.planned_datetime.date())
         db.commit()
+        event_bus.notify(EventType.MEAL_LOGGED, {'user_id': current_user.id})
         
         # Update daily totals
         today_summary = consumption_service.get_today_summary(current_user.id)
@@ -925,7 +932,7 @@ async def log_external_meal(
     """
     try:
         from datetime import datetime
-        from sqlalchemy import and_, func
+        from sqlalchemy import and_
         from sqlalchemy.orm import joinedload
         from app.models.database import Recipe
 
@@ -1008,8 +1015,11 @@ async def log_external_meal(
 
             db.add(meal_log)
 
+        StreakService(db).record_meal(current_user.id, meal_log.planned_datetime.date())
+        NutritionRollupService(db).refresh_day(current_user.id, meal_log.planned_datetime.date())
         db.commit()
         db.refresh(meal_log)
+        event_bus.notify(EventType.MEAL_LOGGED, {'user_id': current_user.id})
 
         # Get updated daily summary
         today_summary = consumption_service.get_today_summary(current_user.id)
@@ -1021,7 +1031,7 @@ async def log_external_meal(
         ).filter(
             and_(
                 MealLog.user_id == current_user.id,
-                func.date(MealLog.planned_datetime) == today,
+                in_range(MealLog.planned_datetime, day_bounds(today)),
                 MealLog.consumed_datetime.is_(None),
                 MealLog.was_skipped == False,
                 MealLog.recipe_id.isnot(None)  # Only planned meals with recipes
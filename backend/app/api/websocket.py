@@ -3,6 +3,7 @@
 WebSocket API Endpoints for Real-time Tracking Updates
 """
 
+import asyncio
 import logging
 import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
@@ -10,6 +11,7 @@ from typing import Optional
 
 from app.services.websocket_manager import websocket_manager
 from app.services.auth import verify_token
+from app.api.nutrition_chat import stream_chat_to_websocket
 from app.models.database import get_db, User
 from sqlalchemy.orm import Session
 
@@ -71,6 +73,9 @@ async def tracking_websocket_endpoint(
     - pong: Response to ping (keep-alive)
     - echo: Debug message echo
     - subscribe: Subscribe to specific event types
+    - chat: Nutrition chat turn {"query", "session_id", "request_id"}, answered on
+      this connection with chat_start, chat_node_start/end, chat_tool_start/end,
+      chat_token deltas and chat_done (see POST /nutrition/chat/v2/stream)
     """
     
     # Authenticate user
@@ -91,7 +96,10 @@ async def tracking_websocket_endpoint(
         return
     
     logger.info(f"WebSocket connection established for user {user_id}")
-    
+
+    # Streamed chat turns run alongside the receive loop (so pongs keep flowing)
+    chat_tasks = set()
+
     try:
         # Listen for client messages
         while True:
@@ -101,6 +109,13 @@ async def tracking_websocket_endpoint(
             try:
                 # Parse JSON message
                 message = json.loads(data)
+
+                # Chat turns stream their events back on this connection
+                if message.get("type") == "chat":
+                    task = asyncio.create_task(stream_chat_to_websocket(websocket, user_id, message))
+                    chat_tasks.add(task)
+                    task.add_done_callback(chat_tasks.discard)
+                    continue
                 
                 # Handle message via manager
                 await websocket_manager.handle_client_message(websocket, user_id, message)
@@ -123,6 +138,8 @@ async def tracking_websocket_endpoint(
         
     finally:
         # Always clean up connection
+        for task in chat_tasks:
+            task.cancel()
         await websocket_manager.disconnect(websocket, user_id)
         logger.info(f"WebSocket cleanup completed for user {user_id}")
 
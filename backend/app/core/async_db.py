@@ -0,0 +1,53 @@
+# backend/app/core/async_db.py
+"""Async PostgreSQL engine (asyncpg) for async-native agent tools."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Created on first use, inside the running event loop (asyncpg pools are loop-bound)
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get or create the async engine with a bounded connection pool."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        logger.info(
+            f"Creating async PostgreSQL engine (pool_size={settings.async_db_pool_size}, "
+            f"max_overflow={settings.async_db_max_overflow})"
+        )
+        _async_engine = create_async_engine(
+            settings.async_database_url,
+            pool_size=settings.async_db_pool_size,
+            max_overflow=settings.async_db_max_overflow,
+            pool_timeout=settings.async_db_pool_timeout,
+            pool_pre_ping=True
+        )
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Async session on a pooled connection (one per concurrent tool call)."""
+    get_async_engine()
+    async with _async_session_factory() as session:
+        yield session
+
+
+async def close_async_engine():
+    """Dispose the async engine and its pool."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+        logger.info("Async PostgreSQL engine disposed")
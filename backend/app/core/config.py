@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     postgres_db: str
     postgres_host: str
     postgres_port: int
+    async_db_pool_size: int = 10     # asyncpg pool for async agent tools
+    async_db_max_overflow: int = 5
+    async_db_pool_timeout: int = 10  # seconds to wait for a pooled connection
 
     # Redis
     redis_host: str
@@ -22,6 +25,8 @@ class Settings(BaseSettings):
     mongodb_user: str = "nutri"
     mongodb_password: str = "nutri"
     mongodb_db: str = "nutrilens_agent"
+    checkpoint_max_per_thread: int = 20  # LangGraph checkpoints kept per conversation
+    intent_router_threshold: float = 0.75  # below this, intent classification falls back to the LLM
 
     # MinIO
     minio_endpoint: str
@@ -74,6 +79,13 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
+
     @property
     def redis_url(self) -> str:
         return f"redis://{self.redis_host}:{self.redis_port}/0"
@@ -0,0 +1,80 @@
+# backend/app/core/dates.py
+"""
+Calendar-day ranges for timestamp columns.
+
+Filtering with func.date(column) == day wraps the column in a function, so
+the database cannot use an index on it. These helpers turn a calendar day
+into a half-open [start, end) range that the (user_id, <timestamp>)
+composite indexes on meal_logs can serve.
+
+MealLog.planned_datetime holds the meal's wall-clock time (plans are laid
+out from the user's meal windows), so its day bounds are plain local
+midnights. consumed_datetime is stamped with datetime.utcnow(), so its
+bounds are the user's local midnights converted to naive UTC.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
+
+
+def resolve_timezone(name: Optional[str]) -> tzinfo:
+    """ZoneInfo for an IANA name, UTC if missing or unknown"""
+    if not name:
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone '{name}', using UTC")
+        return UTC
+
+
+def get_user_timezone(db: Session, user_id: int) -> tzinfo:
+    """The user's timezone from their notification preferences (UTC by default)"""
+    from app.models.database import NotificationPreference
+
+    name = db.query(NotificationPreference.timezone).filter(
+        NotificationPreference.user_id == user_id
+    ).scalar()
+    return resolve_timezone(name)
+
+
+def local_now(tz: Optional[tzinfo] = None, now: Optional[datetime] = None) -> datetime:
+    """Current wall-clock time in tz as a naive datetime (now is naive UTC)"""
+    now = now or datetime.utcnow()
+    return now.replace(tzinfo=UTC).astimezone(tz or UTC).replace(tzinfo=None)
+
+
+def local_today(tz: Optional[tzinfo] = None, now: Optional[datetime] = None) -> date:
+    """Today's date in tz (now is naive UTC)"""
+    return local_now(tz, now).date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """[midnight, next midnight) of a calendar day as naive wall-clock datetimes"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def utc_day_bounds(day: date, tz: Optional[tzinfo] = None) -> Tuple[datetime, datetime]:
+    """[midnight, next midnight) of the local day in tz, as naive UTC datetimes"""
+    start, end = day_bounds(day)
+    tz = tz or UTC
+    return (
+        start.replace(tzinfo=tz).astimezone(UTC).replace(tzinfo=None),
+        end.replace(tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+    )
+
+
+def in_range(column, bounds: Tuple[datetime, datetime]):
+    """Sargable column filter for half-open bounds"""
+    start, end = bounds
+    return and_(column >= start, column < end)
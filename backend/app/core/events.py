@@ -4,6 +4,7 @@ Event system for real-time updates
 """
 
 from typing import Dict, List, Callable, Any
+from datetime import datetime
 import asyncio
 import logging
 from enum import Enum
@@ -38,6 +39,20 @@ class EventBus:
         if event_type in self.listeners:
             self.listeners[event_type].remove(callback)
     
+    def notify(self, event_type: EventType, data: Dict[str, Any]):
+        """
+        Dispatch an event to synchronous listeners right away (cache
+        invalidation after a commit). Coroutine listeners are only reached
+        through emit().
+        """
+        for callback in self.listeners.get(event_type, []):
+            if asyncio.iscoroutinefunction(callback):
+                continue
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Error in event listener: {str(e)}")
+    
     async def emit(self, event_type: EventType, data: Dict[str, Any]):
         """Emit an event to all listeners"""
         event = {
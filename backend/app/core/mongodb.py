@@ -11,15 +11,15 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Synchronous client (for LangGraph checkpointer which doesn't support async yet)
+# Synchronous client (for startup collection/index setup)
 _sync_client: Optional[MongoClient] = None
 
-# Async client (for manual operations like chat history)
+# Async client (LangGraph checkpointer, chat history and queries)
 _async_client: Optional[AsyncIOMotorClient] = None
 
 
 def get_mongo_sync_client() -> MongoClient:
-    """Get or create synchronous MongoDB client for LangGraph."""
+    """Get or create synchronous MongoDB client for startup setup."""
     global _sync_client
     if _sync_client is None:
         logger.info(f"Connecting to MongoDB at {settings.mongodb_url}")
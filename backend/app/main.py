@@ -6,6 +6,7 @@ from app.core.config import settings
 from app.services.websocket_manager import websocket_manager
 from app.core.events import event_bus
 from app.core.mongodb import init_mongodb_collections, close_mongo_clients
+from app.core.async_db import close_async_engine
 from app.agents.graph_instance import initialize_nutrition_graph
 import asyncio
 import logging
@@ -38,6 +39,10 @@ async def lifespan(app: FastAPI):
     close_mongo_clients()
     print("✅ MongoDB clients closed")
 
+    # Shutdown: Dispose the async PostgreSQL pool used by agent tools
+    await close_async_engine()
+    print("✅ Async PostgreSQL engine closed")
+
 app = FastAPI(
     title="NutriLens API",
     description="AI-powered nutrition planning system",
@@ -1,5 +1,5 @@
 #/backend/models/database.py
-from sqlalchemy import create_engine, Column, Integer, String, Float, JSON, DateTime, ForeignKey, Text, Boolean, Time, Enum
+from sqlalchemy import create_engine, Column, Integer, String, Float, JSON, Date, DateTime, ForeignKey, Text, Boolean, Time, Enum, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -287,6 +287,17 @@ class MealLog(Base):
     recipe = relationship("Recipe", back_populates="meal_logs")
     meal_plan = relationship("MealPlan", back_populates="meal_logs")
 
+    # Per-user day/period range scans (filter with app.core.dates, not func.date)
+    __table_args__ = (
+        Index("ix_meal_logs_user_planned", "user_id", "planned_datetime"),
+        Index("ix_meal_logs_user_consumed", "user_id", "consumed_datetime"),
+        Index(
+            "ix_meal_logs_user_pending", "user_id", "planned_datetime",
+            postgresql_where=text("consumed_datetime IS NULL AND was_skipped = false"),
+            sqlite_where=text("consumed_datetime IS NULL AND was_skipped = 0")
+        ),
+    )
+
 class UserInventory(Base):
     __tablename__ = "user_inventory"
     
@@ -332,6 +343,40 @@ class AgentInteraction(Base):
     
     user = relationship("User", back_populates="agent_interactions")
 
+class UserStreak(Base):
+    """Meal logging streak counter, maintained as meals are logged"""
+    __tablename__ = "user_streaks"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    current_streak = Column(Integer, default=0, nullable=False)  # consecutive days ending on last_logged_date
+    longest_streak = Column(Integer, default=0, nullable=False)
+    last_logged_date = Column(Date, nullable=True)
+    milestone_awarded = Column(Integer, default=0, nullable=False)  # highest milestone awarded in the current run
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DailyNutritionRollup(Base):
+    """Per-user daily intake and meal counts (by planned date), kept current as meals change"""
+    __tablename__ = "daily_nutrition_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    calories = Column(Float, default=0, nullable=False)  # consumed meals only
+    protein_g = Column(Float, default=0, nullable=False)
+    carbs_g = Column(Float, default=0, nullable=False)
+    fat_g = Column(Float, default=0, nullable=False)
+    fiber_g = Column(Float, default=0, nullable=False)
+    meals_planned = Column(Integer, default=0, nullable=False)  # every meal log of the day
+    meals_consumed = Column(Integer, default=0, nullable=False)
+    meals_skipped = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class NutritionRollupUser(Base):
+    """Users whose daily_nutrition_rollup rows have been built (also when they have no meals)"""
+    __tablename__ = "nutrition_rollup_users"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rebuilt_at = Column(DateTime, default=datetime.utcnow)
+
 class WhatsappLog(Base):
     __tablename__ = "whatsapp_logs"
     
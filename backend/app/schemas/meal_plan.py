@@ -76,6 +76,7 @@ class MealSwapRequest(BaseModel):
     meal_type: MealType
     new_recipe_id: int
     reason: Optional[str] = None
+    rebalance_day: bool = Field(False, description="Re-optimize the day's other pending meals around the new recipe")
 
 class MealLogCreate(BaseModel):
     recipe_id: int
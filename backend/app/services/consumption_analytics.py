@@ -0,0 +1,329 @@
+# backend/app/services/consumption_analytics.py
+"""
+Columnar meal log analytics.
+
+Loads a user's meal logs for a window ONCE (plain columns with the recipe
+title/goals joined in, no ORM hydration) into a pandas DataFrame and
+computes every pattern block with group-bys over meal type / weekday /
+recipe, instead of re-filtering a list of MealLog objects per meal type and
+weekday for each block and querying Recipe per top recipe. Cost is one
+query plus O(meals) vectorized work, so 90- and 365-day windows are cheap.
+
+Results are plain Python types (JSON-serializable), in the shapes
+ConsumptionService.generate_consumption_analytics / get_meal_patterns return.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models.database import MealLog, Recipe
+
+logger = logging.getLogger(__name__)
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+COLUMNS = [
+    "meal_type", "planned", "consumed", "was_skipped", "skip_reason",
+    "portion", "recipe_id", "recipe_title", "recipe_goals"
+]
+
+
+def time_consistency(std_dev: float, count: int) -> str:
+    """Label for the (population) standard deviation of meal times in hours"""
+    if count < 2:
+        return "insufficient_data"
+    if std_dev < 0.5:  # Within 30 minutes
+        return "very_consistent"
+    elif std_dev < 1.0:  # Within 1 hour
+        return "consistent"
+    elif std_dev < 2.0:  # Within 2 hours
+        return "somewhat_consistent"
+    return "inconsistent"
+
+
+class MealLogFrame:
+    """One user's meal logs for a window as a DataFrame, with all pattern blocks"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.copy()
+        frame["planned"] = pd.to_datetime(frame["planned"])
+        frame["consumed"] = pd.to_datetime(frame["consumed"])
+        frame["is_consumed"] = frame["consumed"].notna()
+        frame["skipped"] = frame["was_skipped"].fillna(False).astype(bool)
+        frame["weekday"] = frame["planned"].dt.weekday
+        frame["hour"] = frame["consumed"].dt.hour + frame["consumed"].dt.minute / 60
+        frame["portion"] = pd.to_numeric(frame["portion"], errors="coerce")
+        self.frame = frame
+
+        # Consumed meals with a recorded (non-zero) portion
+        self.portions = frame[frame["is_consumed"] & frame["portion"].fillna(0).ne(0)]
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        user_id: int,
+        since: datetime,
+        newest_first: bool = False
+    ) -> "MealLogFrame":
+        """All of the user's meal logs planned since `since`, in one query"""
+        order = MealLog.planned_datetime.desc() if newest_first else MealLog.planned_datetime
+        rows = db.query(
+            MealLog.meal_type,
+            MealLog.planned_datetime,
+            MealLog.consumed_datetime,
+            MealLog.was_skipped,
+            MealLog.skip_reason,
+            MealLog.portion_multiplier,
+            MealLog.recipe_id,
+            Recipe.title,
+            Recipe.goals
+        ).outerjoin(
+            Recipe, MealLog.recipe_id == Recipe.id
+        ).filter(
+            MealLog.user_id == user_id,
+            MealLog.planned_datetime >= since
+        ).order_by(order, MealLog.id).all()
+
+        return cls(pd.DataFrame.from_records(rows, columns=COLUMNS))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    # ===== PER MEAL TYPE =====
+
+    def _by_meal_type(self) -> pd.DataFrame:
+        """planned / consumed / skipped counts per meal type"""
+        return self.frame.groupby("meal_type").agg(
+            planned=("meal_type", "size"),
+            consumed=("is_consumed", "sum"),
+            skipped=("skipped", "sum")
+        )
+
+    def _skip_reasons(self) -> Dict[str, Dict[str, int]]:
+        """{meal_type: {reason: count}} over skipped meals"""
+        reason = self.frame["skip_reason"]
+        skipped = self.frame[self.frame["skipped"] & reason.notna() & reason.ne("")]
+        reasons: Dict[str, Dict[str, int]] = {}
+        for (meal_type, reason), count in skipped.groupby(["meal_type", "skip_reason"]).size().items():
+            reasons.setdefault(meal_type, {})[reason] = int(count)
+        return reasons
+
+    def meal_timing(self) -> Dict:
+        """Average/earliest/latest consumption hour and consistency per meal type"""
+        consumed = self.frame[self.frame["is_consumed"]].groupby("meal_type")["hour"]
+        stats = consumed.agg(["mean", "min", "max", "count"])
+        stats["std"] = consumed.std(ddof=0)
+
+        timing = {}
+        for meal_type in MEAL_TYPES:
+            if meal_type not in stats.index:
+                continue
+            row = stats.loc[meal_type]
+            timing[meal_type] = {
+                "average_time": round(float(row["mean"]), 1),
+                "earliest": float(row["min"]),
+                "latest": float(row["max"]),
+                "consistency": time_consistency(float(row["std"]), int(row["count"]))
+            }
+        return timing
+
+    def skip_frequency(self) -> Dict:
+        """Skip counts, rates and reasons per meal type"""
+        counts = self._by_meal_type()
+        reasons = self._skip_reasons()
+
+        frequency = {}
+        for meal_type in MEAL_TYPES:
+            if meal_type not in counts.index:
+                continue
+            planned, skipped = int(counts.at[meal_type, "planned"]), int(counts.at[meal_type, "skipped"])
+            frequency[meal_type] = {
+                "total_planned": planned,
+                "total_skipped": skipped,
+                "skip_rate": round((skipped / planned) * 100, 1),
+                "common_reasons": reasons.get(meal_type, {})
+            }
+        return frequency
+
+    def skip_patterns(self) -> Dict:
+        """Skip rate, reasons and skipped weekdays per meal type"""
+        counts = self._by_meal_type()
+        reasons = self._skip_reasons()
+        skip_days = self.frame[self.frame["skipped"]].groupby(["meal_type", "weekday"]).size()
+
+        patterns = {}
+        for meal_type in MEAL_TYPES:
+            if meal_type not in counts.index:
+                continue
+            days = skip_days.get(meal_type, pd.Series(dtype=int))
+            patterns[meal_type] = {
+                "skip_rate": round((int(counts.at[meal_type, "skipped"]) / int(counts.at[meal_type, "planned"])) * 100, 1),
+                "common_reasons": reasons.get(meal_type, {}),
+                "skip_days": {WEEKDAYS[day]: int(count) for day, count in days.items()}
+            }
+        return patterns
+
+    # ===== PORTIONS =====
+
+    def portions_by_meal_type(self) -> Dict[str, float]:
+        """Average portion per meal type"""
+        means = self.portions.groupby("meal_type")["portion"].mean()
+        return {meal_type: round(float(means[meal_type]), 2) for meal_type in MEAL_TYPES if meal_type in means.index}
+
+    def portion_trends(self) -> Dict:
+        """Portion statistics (logs in load order)"""
+        if self.portions.empty:
+            return {"no_data": True}
+
+        values = self.portions["portion"].to_numpy()
+        return {
+            "average_portion": round(float(values.mean()), 2),
+            "min_portion": float(values.min()),
+            "max_portion": float(values.max()),
+            "trend": "increasing" if len(values) > 5 and values[-3:].tolist() > values[:3].tolist() else "stable",
+            "by_meal_type": self.portions_by_meal_type()
+        }
+
+    def portion_patterns(self) -> Dict:
+        """Average portion and last-5 vs first-5 trend"""
+        if self.portions.empty:
+            return {}
+
+        values = self.portions["portion"].to_numpy()
+        return {
+            "average": round(float(values.mean()), 2),
+            "trend": "increasing" if values[-5:].sum() / 5 > values[:5].sum() / 5 else "stable",
+            "by_meal_type": self.portions_by_meal_type()
+        }
+
+    # ===== RECIPES =====
+
+    def _consumed_recipe_logs(self) -> pd.DataFrame:
+        return self.frame[self.frame["is_consumed"] & self.frame["recipe_id"].notna()]
+
+    def _top_recipes(self, limit: int) -> pd.DataFrame:
+        """Most consumed recipes (times, title, goals), most frequent first"""
+        counts = self._consumed_recipe_logs().groupby("recipe_id").agg(
+            times=("recipe_id", "size"),
+            title=("recipe_title", "first"),
+            goals=("recipe_goals", "first")
+        )
+        top = counts.sort_values("times", ascending=False, kind="stable").head(limit)
+        return top[top["title"].notna()]
+
+    def favorite_recipes(self, limit: int = 10) -> Dict:
+        """Top recipes with their share of all logged meals"""
+        if self._consumed_recipe_logs().empty:
+            return {"no_data": True}
+
+        total = len(self.frame)
+        return {
+            row.title: {"count": int(row.times), "percentage": round((int(row.times) / total) * 100, 1)}
+            for row in self._top_recipes(limit).itertuples()
+        }
+
+    def recipe_frequencies(self, limit: int = 10) -> Dict:
+        """Top recipes with count, frequency label and goals"""
+        total = len(self.frame)
+        return {
+            row.title: {
+                "count": int(row.times),
+                "frequency": f"{int(row.times)}/{total*100:.1f}%",
+                "goals": row.goals if isinstance(row.goals, list) else []
+            }
+            for row in self._top_recipes(limit).itertuples()
+        }
+
+    # ===== WEEKDAYS =====
+
+    def _by_weekday(self) -> pd.DataFrame:
+        return self.frame.groupby("weekday").agg(
+            planned=("weekday", "size"),
+            consumed=("is_consumed", "sum")
+        )
+
+    def weekly_patterns(self) -> Dict:
+        """Planned/consumed/compliance per weekday"""
+        counts = self._by_weekday()
+        return {
+            WEEKDAYS[day]: {
+                "planned": int(row["planned"]),
+                "consumed": int(row["consumed"]),
+                "compliance": round((int(row["consumed"]) / int(row["planned"])) * 100, 1)
+            }
+            for day, row in counts.iterrows()
+        }
+
+    def weekday_compliance(self) -> Dict:
+        """Compliance and approximate weekly meal count per weekday"""
+        counts = self._by_weekday()
+        return {
+            WEEKDAYS[day]: {
+                "compliance": round((int(row["consumed"]) / int(row["planned"])) * 100, 1),
+                "meal_count": int(row["planned"]) // 4  # Approximate weeks
+            }
+            for day, row in counts.iterrows()
+        }
+
+    # ===== INSIGHTS =====
+
+    def improvement_insights(self) -> List[str]:
+        """Actionable insights from overall compliance and skip reasons"""
+        insights = []
+
+        total = len(self.frame)
+        if total > 0:
+            compliance_rate = (int(self.frame["is_consumed"].sum()) / total) * 100
+
+            if compliance_rate < 70:
+                insights.append("Focus on meal prep to improve adherence")
+                insights.append("Consider simpler recipes for busy days")
+            elif compliance_rate < 90:
+                insights.append("Great progress! Small adjustments can get you to 90%+")
+            else:
+                insights.append("Excellent adherence! You're on track for your goals")
+
+        reasons = self.frame.loc[self.frame["skipped"], "skip_reason"].dropna()
+        reasons = reasons[reasons != ""]
+        if not reasons.empty:
+            most_common_reason = reasons.value_counts(sort=True).index[0].lower()
+            if "time" in most_common_reason:
+                insights.append("Time constraints are your main challenge - try quick recipes")
+            elif "appetite" in most_common_reason:
+                insights.append("Consider smaller portions or different meal timing")
+
+        return insights
+
+    def success_factors(self) -> List[str]:
+        """Best main meal and weekday vs weekend compliance"""
+        factors = []
+
+        counts = self._by_meal_type()
+        main_meals = counts.loc[counts.index.intersection(["breakfast", "lunch", "dinner"])]
+        if not main_meals.empty:
+            compliance = main_meals["consumed"] / main_meals["planned"] * 100
+            best_meal = compliance.idxmax()
+            if compliance[best_meal] > 80:
+                factors.append(f"Strong {best_meal} compliance ({compliance[best_meal]:.0f}%)")
+
+        weekend = self.frame["weekday"] >= 5
+        if weekend.any() and (~weekend).any():
+            weekday_compliance = float(self.frame.loc[~weekend, "is_consumed"].mean())
+            weekend_compliance = float(self.frame.loc[weekend, "is_consumed"].mean())
+
+            if weekday_compliance > weekend_compliance + 0.2:
+                factors.append("Better compliance on weekdays")
+            elif weekend_compliance > weekday_compliance + 0.2:
+                factors.append("Better compliance on weekends")
+
+        return factors
@@ -7,17 +7,22 @@ Handles all meal logging database operations with atomic transactions
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, date
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, desc
 import logging
 import json
 
 from app.models.database import (
-    User, UserProfile, UserGoal, MealLog, Recipe, 
-    RecipeIngredient, Item, UserInventory, MealPlan,
-    AgentInteraction
+    User, UserProfile, UserGoal, MealLog, Item, UserInventory,
+    AgentInteraction, DailyNutritionRollup
 )
 from app.services.inventory_service import IntelligentInventoryService
+from app.core.events import EventType, event_bus
+from app.services.streak_service import StreakService
+from app.services.nutrition_rollup import NutritionRollupService
+from app.services.day_meals import macro_grams, shown_meals_filter
+from app.services.consumption_analytics import MealLogFrame
 from app.core.config import settings
+from app.core.dates import day_bounds, get_user_timezone, in_range, local_today
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,7 @@ class ConsumptionService:
     def __init__(self, db: Session):
         self.db = db
         self.inventory_service = IntelligentInventoryService(db)
+        self.rollup_service = NutritionRollupService(db)
     
     # ===== REQUIRED SPRINT FUNCTIONS (5 functions with exact signatures) =====
     
@@ -40,6 +46,7 @@ class ConsumptionService:
             
             # Get or create meal log
             if meal_data.get("meal_log_id"):
+                # Row lock so two devices logging the same meal serialize here
                 meal_log = self.db.query(MealLog).options(
                     joinedload(MealLog.recipe)
                 ).filter(
@@ -47,7 +54,7 @@ class ConsumptionService:
                         MealLog.id == meal_data["meal_log_id"],
                         MealLog.user_id == user_id
                     )
-                ).first()
+                ).with_for_update(of=MealLog).first()
 
                 
                 if not meal_log:
@@ -73,18 +80,32 @@ class ConsumptionService:
             meal_log.portion_multiplier = meal_data.get("portion_multiplier", 1.0)
             meal_log.was_skipped = False
 
+            # Keep the streak counter current (never fails the meal log)
+            try:
+                with self.db.begin_nested():
+                    StreakService(self.db).record_meal(user_id, meal_log.planned_datetime.date())
+            except Exception as e:
+                logger.warning(f"Streak update failed for user {user_id}: {str(e)}")
+
             
-            # Auto-deduct ingredients from inventory
+            # Auto-deduct ingredients from inventory (same transaction)
             inventory_changes = []
 
             if meal_log.recipe_id:
                 deduction_result = self.auto_deduct_ingredients(
                     recipe_id=meal_log.recipe_id,
                     portion_multiplier=meal_log.portion_multiplier,
-                    user_id=user_id
+                    user_id=user_id,
+                    commit=False
                 )
                 inventory_changes = deduction_result.get("deducted_items", [])
-            
+
+            self.rollup_service.refresh_day(user_id, meal_log.planned_datetime.date())
+
+            # Meal log, streak, rollup and inventory changes are committed together
+            self.db.commit()
+            event_bus.notify(EventType.MEAL_LOGGED, {'user_id': user_id})
+
             # Calculate consumed macros
             macros = self._calculate_meal_macros(meal_log)
 
@@ -116,62 +137,61 @@ class ConsumptionService:
                 
         except Exception as e:
             logger.error(f"Error in log_meal_consumption: {str(e)}")
+            self.db.rollback()
             return {"status": "error", "error": str(e)}
     
-    def auto_deduct_ingredients(self, recipe_id: int, portion_multiplier: float, user_id: int) -> Dict[str, Any]:
+    def auto_deduct_ingredients(
+        self,
+        recipe_id: int,
+        portion_multiplier: float,
+        user_id: int,
+        commit: bool = True
+    ) -> Dict[str, Any]:
         """
         REQUIRED FUNCTION 2: Auto-deduct ingredients with concurrency handling
+
+        The whole recipe x portion is deducted in one transaction: the user's
+        batches are locked with one SELECT ... FOR UPDATE and consumed
+        oldest-expiry-first. Pass commit=False to join the caller's transaction.
         """
         try:
-            # Get recipe ingredients with optimized query
-            ingredients = self.db.query(RecipeIngredient).options(
-                joinedload(RecipeIngredient.item)
-            ).filter(
-                RecipeIngredient.recipe_id == recipe_id
-            ).all()
-            
-            if not ingredients:
+            deductions = self.inventory_service.deduct_recipe(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                portion_multiplier=portion_multiplier,
+                commit=commit
+            )
+
+            if not deductions:
                 return {
                     "success": True,
                     "deducted_items": [],
                     "message": "No ingredients to deduct"
                 }
-            
+
             deducted_items = []
             failed_deductions = []
-            
-            for ingredient in ingredients:
-                try:
-                    quantity_to_deduct = ingredient.quantity_grams * portion_multiplier
-                    
-                    # Use inventory service for atomic deduction
-                    result = self.inventory_service.deduct_item(
-                        user_id=user_id,
-                        item_id=ingredient.item_id,
-                        quantity_grams=quantity_to_deduct
-                    )
-                    
-                    if result.get("success"):
-                        deducted_items.append({
-                            "item_id": ingredient.item_id,
-                            "item_name": ingredient.item.canonical_name if ingredient.item else "Unknown",
-                            "quantity_deducted": quantity_to_deduct,
-                            "remaining_quantity": result.get("remaining_quantity", 0)
-                        })
-                    else:
-                        failed_deductions.append({
-                            "item_id": ingredient.item_id,
-                            "item_name": ingredient.item.canonical_name if ingredient.item else "Unknown",
-                            "error": result.get("error", "Deduction failed")
-                        })
-                        
-                except Exception as e:
-                    logger.warning(f"Error deducting ingredient {ingredient.item_id}: {str(e)}")
+
+            for deduction in deductions.values():
+                item_name = deduction["item_name"] or "Unknown"
+                if not deduction["in_inventory"]:
                     failed_deductions.append({
-                        "item_id": ingredient.item_id,
-                        "error": str(e)
+                        "item_id": deduction["item_id"],
+                        "item_name": item_name,
+                        "error": "Item not in inventory"
                     })
-            
+                    continue
+
+                deducted_item = {
+                    "item_id": deduction["item_id"],
+                    "item_name": item_name,
+                    "quantity_deducted": deduction["deducted"],
+                    "remaining_quantity": deduction["remaining"]
+                }
+                if deduction["shortage"] > 0:
+                    deducted_item["warning"] = f"Only {deduction['deducted']}g available, deducted all"
+                deducted_items.append(deducted_item)
+
             return {
                 "success": True,
                 "deducted_items": deducted_items,
@@ -182,6 +202,8 @@ class ConsumptionService:
             
         except Exception as e:
             logger.error(f"Error in auto_deduct_ingredients: {str(e)}")
+            if commit:
+                self.db.rollback()
             return {"success": False, "error": str(e)}
     
     def track_portions(self, user_id: int, meal_data: Dict) -> Dict[str, Any]:
@@ -211,6 +233,7 @@ class ConsumptionService:
                 if meal_log:
                     old_portion = meal_log.portion_multiplier or 1.0
                     meal_log.portion_multiplier = portion_multiplier
+                    self.rollup_service.refresh_day(user_id, meal_log.planned_datetime.date())
                     self.db.commit()
                     
                     # Learn from portion adjustment
@@ -268,7 +291,14 @@ class ConsumptionService:
             meal_log.was_skipped = True
             meal_log.skip_reason = reason
             meal_log.consumed_datetime = None
+            self.rollup_service.refresh_day(user_id, meal_log.planned_datetime.date())
+            try:
+                with self.db.begin_nested():
+                    StreakService(self.db).remove_meal(user_id, meal_log.planned_datetime.date())
+            except Exception as e:
+                logger.warning(f"Streak update failed for user {user_id}: {str(e)}")
             self.db.commit()
+            event_bus.notify(EventType.MEAL_SKIPPED, {'user_id': user_id})
             
             # Analyze skip patterns
             skip_analysis = self._analyze_skip_patterns(user_id, meal_log.meal_type)
@@ -300,32 +330,28 @@ class ConsumptionService:
         try:
             start_date = datetime.utcnow() - timedelta(days=days)
             
-            # Optimized single query with all needed joins
-            meal_logs = self.db.query(MealLog).options(
-                joinedload(MealLog.recipe)
-            ).filter(
-                and_(
-                    MealLog.user_id == user_id,
-                    MealLog.planned_datetime >= start_date
-                )
-            ).order_by(MealLog.planned_datetime.desc()).all()
+            # One columnar load of the window; every block is a group-by over it
+            meal_logs = MealLogFrame.load(self.db, user_id, start_date, newest_first=True)
             
-            if not meal_logs:
+            if meal_logs.empty:
                 return {
                     "success": True,
                     "message": "No consumption data available",
                     "analytics": {}
                 }
             
+            # Per-day compliance and macros come from the daily rollup
+            daily_rollups = self.rollup_service.get_days(user_id, start_date.date(), date.today())
+            
             analytics = {
-                "meal_timing_patterns": self._analyze_meal_timing(meal_logs),
-                "skip_frequency": self._analyze_skip_frequency(meal_logs),
-                "portion_trends": self._analyze_portion_trends(meal_logs),
-                "favorite_recipes": self._analyze_favorite_recipes(meal_logs),
-                "daily_compliance": self._analyze_daily_compliance(meal_logs),
-                "macro_consistency": self._analyze_macro_consistency(meal_logs),
-                "weekly_patterns": self._analyze_weekly_patterns(meal_logs),
-                "improvement_insights": self._generate_improvement_insights(meal_logs)
+                "meal_timing_patterns": meal_logs.meal_timing(),
+                "skip_frequency": meal_logs.skip_frequency(),
+                "portion_trends": meal_logs.portion_trends(),
+                "favorite_recipes": meal_logs.favorite_recipes(),
+                "daily_compliance": self._analyze_daily_compliance(daily_rollups),
+                "macro_consistency": self._analyze_macro_consistency(daily_rollups),
+                "weekly_patterns": meal_logs.weekly_patterns(),
+                "improvement_insights": meal_logs.improvement_insights()
             }
             
             return {
@@ -349,47 +375,18 @@ class ConsumptionService:
         This prevents duplicate pending meals when a new plan is generated
         """
         try:
-            today = date.today()
-
-            # Get active meal plan to filter correctly
-            active_plan = self.db.query(MealPlan).filter(
-                and_(
-                    MealPlan.user_id == user_id,
-                    MealPlan.is_active == True
-                )
-            ).first()
+            today = local_today(get_user_timezone(self.db, user_id))
 
-            # Build optimized query with smart filtering
-            query = self.db.query(MealLog).options(
+            # Active plan meals OR consumed/skipped from any plan OR manual entries
+            meal_logs = self.db.query(MealLog).options(
                 joinedload(MealLog.recipe)
             ).filter(
                 and_(
                     MealLog.user_id == user_id,
-                    func.date(MealLog.planned_datetime) == today
-                )
-            )
-
-            # Filter logic: show active plan meals OR consumed/skipped from any plan OR manual entries
-            if active_plan:
-                query = query.filter(
-                    or_(
-                        MealLog.meal_plan_id == active_plan.id,  # Active plan meals
-                        MealLog.consumed_datetime.isnot(None),   # Already consumed (any plan)
-                        MealLog.was_skipped == True,             # Already skipped (any plan)
-                        MealLog.meal_plan_id.is_(None)          # Manual entries
-                    )
+                    in_range(MealLog.planned_datetime, day_bounds(today)),
+                    shown_meals_filter()
                 )
-            else:
-                # No active plan: show only manual entries or consumed/skipped
-                query = query.filter(
-                    or_(
-                        MealLog.meal_plan_id.is_(None),
-                        MealLog.consumed_datetime.isnot(None),
-                        MealLog.was_skipped == True
-                    )
-                )
-
-            meal_logs = query.all()
+            ).all()
             
             # Get user profile and goals in parallel query
             user_data = self.db.query(UserProfile, UserGoal).outerjoin(
@@ -462,12 +459,7 @@ class ConsumptionService:
                 }
                 
                 if user_goal and user_goal.macro_targets:
-                    macro_targets = user_goal.macro_targets
-                    summary["targets"].update({
-                        "protein_g": (target_calories * macro_targets.get("protein", 0.3)) / 4,
-                        "carbs_g": (target_calories * macro_targets.get("carbs", 0.4)) / 4,
-                        "fat_g": (target_calories * macro_targets.get("fat", 0.3)) / 9
-                    })
+                    summary["targets"].update(macro_grams(target_calories, user_goal.macro_targets))
                     
                     for macro in ["protein", "carbs", "fat"]:
                         target_key = f"{macro}_g"
@@ -509,53 +501,42 @@ class ConsumptionService:
             today = datetime.utcnow().date()
             start_date = today - timedelta(days=days)
 
-            meal_logs = (
-                self.db.query(MealLog)
-                .options(joinedload(MealLog.recipe))
-                .filter(
-                    and_(
-                        MealLog.user_id == user_id,
-                        func.date(MealLog.planned_datetime) >= start_date,
-                        func.date(MealLog.planned_datetime) <= today,  # ✅ exclude future logs
-                    )
-                )
-                .order_by(MealLog.planned_datetime.desc())
-                .all()
-            )
-
-            # Group by date
+            # Daily totals come from the rollup (one row per day, newest first)
             history = {}
-            for log in meal_logs:
-                log_date = log.planned_datetime.date().isoformat()
-
-                if log_date not in history:
-                    history[log_date] = {
-                        "planned": 0,
-                        "consumed": 0,
-                        "skipped": 0,
-                        "calories": 0,
-                        "macros": {"protein_g": 0, "carbs_g": 0, "fat_g": 0},
-                        "meals": [] if include_details else None,
-                    }
-
-                history[log_date]["planned"] += 1
+            for day in reversed(self.rollup_service.get_days(user_id, start_date, today)):
+                history[day.date.isoformat()] = {
+                    "planned": day.meals_planned,
+                    "consumed": day.meals_consumed,
+                    "skipped": day.meals_skipped,
+                    "calories": day.calories,
+                    "macros": {"protein_g": day.protein_g, "carbs_g": day.carbs_g, "fat_g": day.fat_g},
+                    "meals": [] if include_details else None,
+                }
 
-                if log.consumed_datetime:
-                    history[log_date]["consumed"] += 1
-                    macros = self._calculate_meal_macros(log)
-                    history[log_date]["calories"] += macros.get("calories", 0)
-                    for key in ["protein_g", "carbs_g", "fat_g"]:
-                        history[log_date]["macros"][key] += macros.get(key, 0)
-                elif log.was_skipped:
-                    history[log_date]["skipped"] += 1
+            if include_details and history:
+                meal_logs = (
+                    self.db.query(MealLog)
+                    .options(joinedload(MealLog.recipe))
+                    .filter(
+                        and_(
+                            MealLog.user_id == user_id,
+                            MealLog.planned_datetime >= datetime.combine(start_date, datetime.min.time()),
+                            MealLog.planned_datetime < datetime.combine(today + timedelta(days=1), datetime.min.time()),  # ✅ exclude future logs
+                        )
+                    )
+                    .order_by(MealLog.planned_datetime.desc())
+                    .all()
+                )
 
-                if include_details and history[log_date]["meals"] is not None:
-                    history[log_date]["meals"].append({
-                        "meal_type": log.meal_type,
-                        "recipe": log.recipe.title if log.recipe else "External",
-                        "status": "consumed" if log.consumed_datetime else ("skipped" if log.was_skipped else "pending"),
-                        "time": log.consumed_datetime.isoformat() if log.consumed_datetime else log.planned_datetime.isoformat(),
-                    })
+                for log in meal_logs:
+                    log_date = log.planned_datetime.date().isoformat()
+                    if log_date in history:
+                        history[log_date]["meals"].append({
+                            "meal_type": log.meal_type,
+                            "recipe": log.recipe.title if log.recipe else "External",
+                            "status": "consumed" if log.consumed_datetime else ("skipped" if log.was_skipped else "pending"),
+                            "time": log.consumed_datetime.isoformat() if log.consumed_datetime else log.planned_datetime.isoformat(),
+                        })
 
             # Calculate statistics
             total_days = len(history)
@@ -589,100 +570,20 @@ class ConsumptionService:
     def get_meal_patterns(self, user_id: int) -> Dict[str, Any]:
         """Analyze and return meal consumption patterns"""
         try:
-            # Get last 30 days of data
+            # Get last 30 days of data (one columnar load)
             start_date = datetime.utcnow() - timedelta(days=30)
-            
-            meal_logs = self.db.query(MealLog).options(
-                joinedload(MealLog.recipe)
-            ).filter(
-                and_(
-                    MealLog.user_id == user_id,
-                    MealLog.planned_datetime >= start_date
-                )
-            ).all()
+            meal_logs = MealLogFrame.load(self.db, user_id, start_date)
             
             patterns = {
-                "meal_timing": {},
-                "skip_patterns": {},
-                "portion_patterns": {},
-                "favorite_recipes": {},
+                "meal_timing": meal_logs.meal_timing(),
+                "skip_patterns": meal_logs.skip_patterns(),
+                "portion_patterns": meal_logs.portion_patterns(),
+                "favorite_recipes": meal_logs.recipe_frequencies(),
                 "meal_preferences": {},
-                "weekly_patterns": {},
-                "success_factors": []
+                "weekly_patterns": meal_logs.weekday_compliance(),
+                "success_factors": meal_logs.success_factors()
             }
             
-            # Analyze meal timing
-            for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-                type_logs = [log for log in meal_logs 
-                            if log.meal_type == meal_type and log.consumed_datetime]
-                
-                if type_logs:
-                    times = [log.consumed_datetime.hour + log.consumed_datetime.minute/60 
-                            for log in type_logs]
-                    patterns["meal_timing"][meal_type] = {
-                        "average_time": round(sum(times) / len(times), 1),
-                        "earliest": min(times),
-                        "latest": max(times),
-                        "consistency": self._calculate_time_consistency(times)
-                    }
-            
-            # Skip patterns
-            for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-                type_logs = [log for log in meal_logs if log.meal_type == meal_type]
-                skipped = [log for log in type_logs if log.was_skipped]
-                
-                if type_logs:
-                    patterns["skip_patterns"][meal_type] = {
-                        "skip_rate": round((len(skipped) / len(type_logs)) * 100, 1),
-                        "common_reasons": self._get_common_skip_reasons(skipped),
-                        "skip_days": self._get_skip_day_pattern(skipped)
-                    }
-            
-            # Portion patterns
-            portion_logs = [log for log in meal_logs 
-                          if log.consumed_datetime and log.portion_multiplier]
-            
-            if portion_logs:
-                portions = [log.portion_multiplier for log in portion_logs]
-                patterns["portion_patterns"] = {
-                    "average": round(sum(portions) / len(portions), 2),
-                    "trend": "increasing" if portions[-5:] and sum(portions[-5:])/5 > sum(portions[:5])/5 else "stable",
-                    "by_meal_type": self._get_portions_by_meal_type(meal_logs)
-                }
-            
-            # Favorite recipes
-            recipe_counts = {}
-            for log in meal_logs:
-                if log.recipe_id and log.consumed_datetime:
-                    recipe_counts[log.recipe_id] = recipe_counts.get(log.recipe_id, 0) + 1
-            
-            top_recipes = sorted(recipe_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-            for recipe_id, count in top_recipes:
-                recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
-                if recipe:
-                    patterns["favorite_recipes"][recipe.title] = {
-                        "count": count,
-                        "frequency": f"{count}/{len(meal_logs)*100:.1f}%",
-                        "goals": recipe.goals if hasattr(recipe, 'goals') else []
-                    }
-            
-            # Weekly patterns (by day of week)
-            for day in range(7):
-                day_logs = [log for log in meal_logs 
-                           if log.planned_datetime.weekday() == day]
-                consumed = [log for log in day_logs if log.consumed_datetime]
-                
-                if day_logs:
-                    day_name = ["Monday", "Tuesday", "Wednesday", "Thursday", 
-                               "Friday", "Saturday", "Sunday"][day]
-                    patterns["weekly_patterns"][day_name] = {
-                        "compliance": round((len(consumed) / len(day_logs)) * 100, 1),
-                        "meal_count": len(day_logs) // 4  # Approximate weeks
-                    }
-            
-            # Success factors
-            patterns["success_factors"] = self._identify_success_factors(meal_logs)
-            
             return {
                 "success": True,
                 "patterns": patterns,
@@ -715,35 +616,17 @@ class ConsumptionService:
         }
     
     def _get_daily_totals_optimized(self, user_id: int) -> Dict[str, Any]:
-        """Get daily totals with optimized query"""
-        today = date.today()
+        """Get today's (the user's local day) totals from the daily nutrition rollup"""
+        today = local_today(get_user_timezone(self.db, user_id))
+        rollup = self.rollup_service.get_day(user_id, today)
         
-        consumed_logs = self.db.query(MealLog).options(
-            joinedload(MealLog.recipe)
-        ).filter(
-            and_(
-                MealLog.user_id == user_id,
-                func.date(MealLog.planned_datetime) == today,
-                MealLog.consumed_datetime.isnot(None)
-            )
-        ).all()
-        
-        totals = {
-            "calories": 0,
-            "protein_g": 0,
-            "carbs_g": 0,
-            "fat_g": 0,
-            "meals_consumed": len(consumed_logs)
+        return {
+            "calories": rollup.calories if rollup else 0,
+            "protein_g": rollup.protein_g if rollup else 0,
+            "carbs_g": rollup.carbs_g if rollup else 0,
+            "fat_g": rollup.fat_g if rollup else 0,
+            "meals_consumed": rollup.meals_consumed if rollup else 0
         }
-        
-        for log in consumed_logs:
-            macros = self._calculate_meal_macros(log)
-            totals["calories"] += macros.get("calories", 0)
-            totals["protein_g"] += macros.get("protein_g", 0)
-            totals["carbs_g"] += macros.get("carbs_g", 0)
-            totals["fat_g"] += macros.get("fat_g", 0)
-        
-        return totals
     
     def _calculate_remaining_targets(self, user_id: int, daily_totals: Dict) -> Dict[str, Any]:
         """Calculate remaining daily targets"""
@@ -793,12 +676,12 @@ class ConsumptionService:
     
     def _calculate_daily_adherence(self, user_id: int) -> Dict[str, Any]:
         """Calculate daily adherence percentage"""
-        today = date.today()
+        today = local_today(get_user_timezone(self.db, user_id))
         
         today_logs = self.db.query(MealLog).filter(
             and_(
                 MealLog.user_id == user_id,
-                func.date(MealLog.planned_datetime) == today
+                in_range(MealLog.planned_datetime, day_bounds(today))
             )
         ).all()
         
@@ -897,104 +780,13 @@ class ConsumptionService:
         return "Stay hydrated throughout the day!"
     
     # Analytics helper methods (complete implementations)
-    def _analyze_meal_timing(self, meal_logs: List[MealLog]) -> Dict:
-        """Analyze meal timing patterns"""
-        timing_patterns = {}
-        
-        for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-            type_logs = [log for log in meal_logs 
-                        if log.meal_type == meal_type and log.consumed_datetime]
-            
-            if type_logs:
-                times = [log.consumed_datetime.hour + log.consumed_datetime.minute/60 
-                        for log in type_logs]
-                timing_patterns[meal_type] = {
-                    "average_time": round(sum(times) / len(times), 1),
-                    "earliest": min(times),
-                    "latest": max(times),
-                    "consistency": self._calculate_time_consistency(times)
-                }
-        
-        return timing_patterns
-    
-    def _analyze_skip_frequency(self, meal_logs: List[MealLog]) -> Dict:
-        """Analyze skip frequency patterns"""
-        skip_frequency = {}
-        
-        for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-            type_logs = [log for log in meal_logs if log.meal_type == meal_type]
-            skipped = [log for log in type_logs if log.was_skipped]
-            
-            if type_logs:
-                skip_frequency[meal_type] = {
-                    "total_planned": len(type_logs),
-                    "total_skipped": len(skipped),
-                    "skip_rate": round((len(skipped) / len(type_logs)) * 100, 1),
-                    "common_reasons": self._get_common_skip_reasons(skipped)
-                }
-        
-        return skip_frequency
-    
-    def _analyze_portion_trends(self, meal_logs: List[MealLog]) -> Dict:
-        """Analyze portion size trends"""
-        portion_logs = [log for log in meal_logs 
-                       if log.consumed_datetime and log.portion_multiplier]
-        
-        if not portion_logs:
-            return {"no_data": True}
-        
-        portions = [log.portion_multiplier for log in portion_logs]
-        
-        return {
-            "average_portion": round(sum(portions) / len(portions), 2),
-            "min_portion": min(portions),
-            "max_portion": max(portions),
-            "trend": "increasing" if len(portions) > 5 and portions[-3:] > portions[:3] else "stable",
-            "by_meal_type": self._get_portions_by_meal_type(meal_logs)
-        }
-    
-    def _analyze_favorite_recipes(self, meal_logs: List[MealLog]) -> Dict:
-        """Analyze favorite recipes"""
-        recipe_counts = {}
-        for log in meal_logs:
-            if log.recipe_id and log.consumed_datetime:
-                recipe_counts[log.recipe_id] = recipe_counts.get(log.recipe_id, 0) + 1
-        
-        if not recipe_counts:
-            return {"no_data": True}
-        
-        top_recipes = sorted(recipe_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        favorite_recipes = {}
-        
-        for recipe_id, count in top_recipes:
-            recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
-            if recipe:
-                favorite_recipes[recipe.title] = {
-                    "count": count,
-                    "percentage": round((count / len(meal_logs)) * 100, 1)
-                }
-        
-        return favorite_recipes
-    
-    def _analyze_daily_compliance(self, meal_logs: List[MealLog]) -> Dict:
+    def _analyze_daily_compliance(self, daily_rollups: List[DailyNutritionRollup]) -> Dict:
         """Analyze daily compliance patterns"""
-        daily_compliance = {}
-        
-        # Group by date
-        for log in meal_logs:
-            log_date = log.planned_datetime.date().isoformat()
-            if log_date not in daily_compliance:
-                daily_compliance[log_date] = {"planned": 0, "consumed": 0}
-            
-            daily_compliance[log_date]["planned"] += 1
-            if log.consumed_datetime:
-                daily_compliance[log_date]["consumed"] += 1
-        
         # Calculate compliance rates
         compliance_rates = []
-        for date_data in daily_compliance.values():
-            if date_data["planned"] > 0:
-                rate = (date_data["consumed"] / date_data["planned"]) * 100
+        for day in daily_rollups:
+            if day.meals_planned > 0:
+                rate = (day.meals_consumed / day.meals_planned) * 100
                 compliance_rates.append(rate)
         
         if not compliance_rates:
@@ -1007,22 +799,15 @@ class ConsumptionService:
             "consistent_days": len([r for r in compliance_rates if r >= 80])
         }
     
-    def _analyze_macro_consistency(self, meal_logs: List[MealLog]) -> Dict:
+    def _analyze_macro_consistency(self, daily_rollups: List[DailyNutritionRollup]) -> Dict:
         """Analyze macro consistency"""
-        consumed_logs = [log for log in meal_logs if log.consumed_datetime]
-        
-        if not consumed_logs:
-            return {"no_data": True}
-        
-        daily_macros = {}
-        for log in consumed_logs:
-            log_date = log.consumed_datetime.date().isoformat()
-            if log_date not in daily_macros:
-                daily_macros[log_date] = {"calories": 0, "protein_g": 0, "carbs_g": 0, "fat_g": 0}
-            
-            macros = self._calculate_meal_macros(log)
-            for key in ["calories", "protein_g", "carbs_g", "fat_g"]:
-                daily_macros[log_date][key] += macros.get(key, 0)
+        daily_macros = {
+            day.date.isoformat(): {
+                "calories": day.calories, "protein_g": day.protein_g,
+                "carbs_g": day.carbs_g, "fat_g": day.fat_g
+            }
+            for day in daily_rollups if day.meals_consumed > 0
+        }
         
         if not daily_macros:
             return {"no_data": True}
@@ -1040,61 +825,6 @@ class ConsumptionService:
         
         return avg_macros
     
-    def _analyze_weekly_patterns(self, meal_logs: List[MealLog]) -> Dict:
-        """Analyze weekly consumption patterns"""
-        weekly_patterns = {}
-        
-        for day in range(7):
-            day_name = ["Monday", "Tuesday", "Wednesday", "Thursday", 
-                       "Friday", "Saturday", "Sunday"][day]
-            day_logs = [log for log in meal_logs 
-                       if log.planned_datetime.weekday() == day]
-            consumed = [log for log in day_logs if log.consumed_datetime]
-            
-            if day_logs:
-                weekly_patterns[day_name] = {
-                    "planned": len(day_logs),
-                    "consumed": len(consumed),
-                    "compliance": round((len(consumed) / len(day_logs)) * 100, 1)
-                }
-        
-        return weekly_patterns
-    
-    def _generate_improvement_insights(self, meal_logs: List[MealLog]) -> List[str]:
-        """Generate actionable improvement insights"""
-        insights = []
-        
-        # Analyze overall compliance
-        consumed = len([log for log in meal_logs if log.consumed_datetime])
-        total = len(meal_logs)
-        
-        if total > 0:
-            compliance_rate = (consumed / total) * 100
-            
-            if compliance_rate < 70:
-                insights.append("Focus on meal prep to improve adherence")
-                insights.append("Consider simpler recipes for busy days")
-            elif compliance_rate < 90:
-                insights.append("Great progress! Small adjustments can get you to 90%+")
-            else:
-                insights.append("Excellent adherence! You're on track for your goals")
-        
-        # Analyze skip patterns
-        skip_reasons = {}
-        for log in meal_logs:
-            if log.was_skipped and log.skip_reason:
-                reasons = skip_reasons.get(log.skip_reason, 0) + 1
-                skip_reasons[log.skip_reason] = reasons
-        
-        if skip_reasons:
-            most_common_reason = max(skip_reasons.items(), key=lambda x: x[1])
-            if "time" in most_common_reason[0].lower():
-                insights.append("Time constraints are your main challenge - try quick recipes")
-            elif "appetite" in most_common_reason[0].lower():
-                insights.append("Consider smaller portions or different meal timing")
-        
-        return insights
-    
     def _analyze_trends(self, history: Dict) -> Dict[str, Any]:
         """Analyze consumption trends"""
         if not history:
@@ -1131,92 +861,6 @@ class ConsumptionService:
         
         return trends
     
-    def _calculate_time_consistency(self, times: List[float]) -> str:
-        """Calculate how consistent meal times are"""
-        if len(times) < 2:
-            return "insufficient_data"
-        
-        # Calculate standard deviation
-        mean = sum(times) / len(times)
-        variance = sum((t - mean) ** 2 for t in times) / len(times)
-        std_dev = variance ** 0.5
-        
-        if std_dev < 0.5:  # Within 30 minutes
-            return "very_consistent"
-        elif std_dev < 1.0:  # Within 1 hour
-            return "consistent"
-        elif std_dev < 2.0:  # Within 2 hours
-            return "somewhat_consistent"
-        else:
-            return "inconsistent"
-    
-    def _get_common_skip_reasons(self, skipped_logs: List[MealLog]) -> Dict[str, int]:
-        """Get common skip reasons"""
-        reasons = {}
-        for log in skipped_logs:
-            if log.skip_reason:
-                reasons[log.skip_reason] = reasons.get(log.skip_reason, 0) + 1
-        return reasons
-    
-    def _get_skip_day_pattern(self, skipped_logs: List[MealLog]) -> Dict[str, int]:
-        """Get pattern of which days meals are skipped"""
-        skip_days = {}
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        
-        for log in skipped_logs:
-            day_name = days[log.planned_datetime.weekday()]
-            skip_days[day_name] = skip_days.get(day_name, 0) + 1
-        
-        return skip_days
-    
-    def _get_portions_by_meal_type(self, meal_logs: List[MealLog]) -> Dict[str, float]:
-        """Get average portions by meal type"""
-        portions_by_type = {}
-        
-        for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-            type_logs = [log for log in meal_logs 
-                        if log.meal_type == meal_type and log.consumed_datetime and log.portion_multiplier]
-            
-            if type_logs:
-                portions = [log.portion_multiplier for log in type_logs]
-                portions_by_type[meal_type] = round(sum(portions) / len(portions), 2)
-        
-        return portions_by_type
-    
-    def _identify_success_factors(self, meal_logs: List[MealLog]) -> List[str]:
-        """Identify factors contributing to success"""
-        factors = []
-        
-        # Calculate compliance by meal type
-        meal_compliance = {}
-        for meal_type in ["breakfast", "lunch", "dinner"]:
-            type_logs = [log for log in meal_logs if log.meal_type == meal_type]
-            consumed = [log for log in type_logs if log.consumed_datetime]
-            if type_logs:
-                compliance = (len(consumed) / len(type_logs)) * 100
-                meal_compliance[meal_type] = compliance
-        
-        # Identify best performing meal
-        if meal_compliance:
-            best_meal = max(meal_compliance, key=meal_compliance.get)
-            if meal_compliance[best_meal] > 80:
-                factors.append(f"Strong {best_meal} compliance ({meal_compliance[best_meal]:.0f}%)")
-        
-        # Check weekend vs weekday
-        weekday_logs = [log for log in meal_logs if log.planned_datetime.weekday() < 5]
-        weekend_logs = [log for log in meal_logs if log.planned_datetime.weekday() >= 5]
-        
-        if weekday_logs and weekend_logs:
-            weekday_compliance = len([l for l in weekday_logs if l.consumed_datetime]) / len(weekday_logs)
-            weekend_compliance = len([l for l in weekend_logs if l.consumed_datetime]) / len(weekend_logs)
-            
-            if weekday_compliance > weekend_compliance + 0.2:
-                factors.append("Better compliance on weekdays")
-            elif weekend_compliance > weekday_compliance + 0.2:
-                factors.append("Better compliance on weekends")
-        
-        return factors
-    
     def _generate_pattern_insights(self, patterns: Dict) -> List[str]:
         """Generate insights from patterns"""
         insights = []
@@ -0,0 +1,186 @@
+# backend/app/services/daily_summaries.py
+"""
+Daily summary fan-out.
+
+Summaries go out at SUMMARY_HOUR in each user's own timezone
+(NotificationPreference.timezone, UTC by default). The worker calls
+DailySummaryFanout.run() every cycle. run() resolves each distinct timezone
+once, picks the timezones where it is currently SUMMARY_HOUR and that have
+not been sent yet for their local date, and then handles those users in
+chunks of CHUNK_SIZE. Each chunk costs the same few queries no matter how
+many users it holds:
+
+- preferences: one IN query (users who disabled daily summaries are dropped
+  before any summary work)
+- summaries: the day's daily_nutrition_rollup rows (IN query), one grouped
+  count of the meals shown on the day, and one UserProfile query for the
+  calorie targets
+- queueing: one Redis pipeline for every LPUSH/ZADD of the chunk
+
+The old loop ran get_today_summary + _get_user_preferences + a blocking
+LPUSH for every user.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.dates import day_bounds, in_range, local_now, resolve_timezone
+from app.models.database import MealLog, NotificationPreference, User, UserProfile
+from app.services.notification_service import NotificationService, NotificationType
+from app.services.day_meals import shown_meals_filter
+from app.services.nutrition_rollup import MACRO_KEYS, NutritionRollupService
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HOUR = 21  # 9 PM local time
+CHUNK_SIZE = 1000
+
+
+def due_timezones(
+    names: List[Optional[str]],
+    sent: Dict[Optional[str], date],
+    now: Optional[datetime] = None,
+    hour: int = SUMMARY_HOUR
+) -> Dict[Optional[str], date]:
+    """
+    Timezone names where it is `hour` right now and no summary went out for
+    the local date yet, mapped to that local date (None = no preference, UTC).
+    """
+    due = {}
+    for name in names:
+        local = local_now(resolve_timezone(name), now)
+        if local.hour == hour and sent.get(name) != local.date():
+            due[name] = local.date()
+    return due
+
+
+class DailySummaryFanout:
+    """Builds and queues daily summary notifications in bulk"""
+
+    def __init__(self, db: Session, notification_service: NotificationService, chunk_size: int = CHUNK_SIZE):
+        self.db = db
+        self.notification_service = notification_service
+        self.rollup_service = NutritionRollupService(db)
+        self.chunk_size = chunk_size
+
+    def timezone_names(self) -> List[Optional[str]]:
+        """Distinct preference timezones, plus None for users without one"""
+        names = {name for (name,) in self.db.query(NotificationPreference.timezone).distinct()}
+        names.add(None)
+        return sorted(names, key=lambda name: name or "")
+
+    def users_in_timezones(self, names: List[Optional[str]]) -> Dict[Optional[str], List[int]]:
+        """Active users grouped by preference timezone name (None = no preference row/value)"""
+        query = self.db.query(User.id, NotificationPreference.timezone).outerjoin(
+            NotificationPreference, NotificationPreference.user_id == User.id
+        ).filter(User.is_active == True)
+
+        named = [name for name in names if name is not None]
+        conditions = [NotificationPreference.timezone.in_(named)] if named else []
+        if None in names:
+            conditions.append(NotificationPreference.timezone.is_(None))
+        query = query.filter(or_(*conditions))
+
+        users: Dict[Optional[str], List[int]] = defaultdict(list)
+        for user_id, name in query.order_by(User.id):
+            users[name].append(user_id)
+        return dict(users)
+
+    def summaries(self, user_ids: List[int], day: date) -> Dict[int, Dict]:
+        """
+        Notification summaries of the local `day` for many users: the
+        counts, totals, compliance and calorie targets of get_today_summary
+        (without the per-meal list).
+        """
+        rollups = self.rollup_service.get_users_day(user_ids, day)
+
+        # Meals get_today_summary shows: active plan, manual, or already consumed/skipped
+        planned = dict(self.db.query(MealLog.user_id, func.count(MealLog.id)).filter(
+            MealLog.user_id.in_(user_ids),
+            in_range(MealLog.planned_datetime, day_bounds(day)),
+            shown_meals_filter()
+        ).group_by(MealLog.user_id).all())
+
+        targets = {
+            user_id: goal_calories or tdee or 2000
+            for user_id, goal_calories, tdee in self.db.query(
+                UserProfile.user_id, UserProfile.goal_calories, UserProfile.tdee
+            ).filter(UserProfile.user_id.in_(user_ids))
+        }
+
+        summaries = {}
+        for user_id in user_ids:
+            rollup = rollups.get(user_id)
+            consumed = rollup.meals_consumed if rollup else 0
+            skipped = rollup.meals_skipped if rollup else 0
+            meals_planned = max(planned.get(user_id, 0), consumed + skipped)
+            total_macros = {key: round(getattr(rollup, key) if rollup else 0, 1) for key in MACRO_KEYS}
+
+            summary = {
+                "date": day.isoformat(),
+                "meals_planned": meals_planned,
+                "meals_consumed": consumed,
+                "meals_skipped": skipped,
+                "meals_pending": meals_planned - consumed - skipped,
+                "total_calories": total_macros["calories"],
+                "total_macros": total_macros,
+                "compliance_rate": round((consumed / meals_planned) * 100, 1) if meals_planned else 0
+            }
+
+            if user_id in targets:
+                target_calories = targets[user_id]
+                summary["targets"] = {"calories": target_calories}
+                summary["progress"] = {"calories": round((summary["total_calories"] / target_calories) * 100, 1)}
+                summary["remaining_calories"] = max(0.0, round(target_calories - summary["total_calories"], 2))
+
+            summaries[user_id] = summary
+        return summaries
+
+    def send_chunk(self, user_ids: List[int], day: date) -> int:
+        """Queue the summaries of one chunk of users; returns how many were queued"""
+        preferences = self.notification_service.get_preferences_bulk(user_ids)
+        wanted = [
+            user_id for user_id in user_ids
+            if self.notification_service.should_send_notification(
+                preferences[user_id], NotificationType.DAILY_SUMMARY
+            )
+        ]
+        if not wanted:
+            return 0
+
+        summaries = self.summaries(wanted, day)
+
+        notifications = [
+            self.notification_service.build_daily_summary(user_id, summaries[user_id])
+            for user_id in wanted
+        ]
+        return self.notification_service.queue_notifications_bulk(notifications, preferences)
+
+    def run(self, sent: Dict[Optional[str], date], now: Optional[datetime] = None) -> int:
+        """
+        Send the summaries of every timezone that is due. `sent` maps
+        timezone name -> last local date sent and is updated in place.
+        Returns how many notifications were queued.
+        """
+        due = due_timezones(self.timezone_names(), sent, now)
+        if not due:
+            return 0
+
+        queued = 0
+        for name, user_ids in self.users_in_timezones(list(due)).items():
+            for start in range(0, len(user_ids), self.chunk_size):
+                chunk = user_ids[start:start + self.chunk_size]
+                try:
+                    queued += self.send_chunk(chunk, due[name])
+                except Exception as e:
+                    self.db.rollback()
+                    logger.error(f"Error sending daily summaries for {len(chunk)} users in {name or 'UTC'}: {str(e)}")
+
+        sent.update(due)
+        logger.info(f"Queued {queued} daily summaries for timezones {sorted(name or 'UTC' for name in due)}")
+        return queued
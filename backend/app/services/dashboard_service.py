@@ -0,0 +1,290 @@
+# backend/app/services/dashboard_service.py
+"""
+Dashboard read model for the Home Dashboard cards.
+
+The /dashboard/summary endpoint used to build ConsumptionService,
+IntelligentInventoryService (and a full TrackingAgent) per call and
+re-derive the cards from ORM objects. DashboardService computes the four
+cards from a handful of narrow queries instead:
+
+1. Today's meal logs (one row per meal, recipe macros joined)
+2. Profile + goal (one row)
+3. Inventory counts (shared per-user inventory snapshot)
+4. Streak (user_streaks counter, see streak_service)
+
+Summaries are cached per user for CACHE_TTL_SECONDS and invalidated by the
+meal logging, skipping, inventory and plan-save paths (and by the matching
+event bus events). The next meal is resolved on every read, so a cached
+summary never shows a meal whose time has already passed.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, tzinfo
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.dates import day_bounds, get_user_timezone, in_range, local_today
+from app.core.events import EventType, event_bus
+from app.models.database import MealLog, Recipe, User, UserGoal, UserProfile
+from app.services.day_meals import daily_targets, shown_meals_filter
+from app.services.inventory_snapshot import (
+    EXPIRING_WITHIN_DAYS, LOW_STOCK_GRAMS, inventory_snapshots
+)
+from app.services.streak_service import StreakService
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 30
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def find_next_meal(meal_logs: List, now: Optional[datetime] = None) -> tuple:
+    """Find next upcoming meal from today's logs (ORM objects or rows)"""
+    now = now or datetime.now()
+
+    upcoming = [
+        m for m in meal_logs
+        if m.consumed_datetime is None
+        and not m.was_skipped
+        and m.planned_datetime > now
+    ]
+
+    if upcoming:
+        upcoming.sort(key=lambda x: x.planned_datetime)
+        next_meal = upcoming[0]
+        return (
+            next_meal.meal_type.capitalize(),
+            next_meal.planned_datetime.strftime("%I:%M %p")
+        )
+
+    return (None, None)
+
+
+def _percentage(consumed: float, target: float) -> float:
+    return round((consumed / target * 100), 1) if target > 0 else 0
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class DashboardCache:
+    """
+    Per-user summary cache (process-wide, TTL + explicit invalidation).
+
+    Entries also expire when the user's local day rolls over.
+    """
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, tz, day, summary = entry
+        if time.monotonic() > expires_at or day != local_today(tz):
+            return None
+        return summary
+
+    def put(self, user_id: int, summary: Dict, tz: Optional[tzinfo] = None):
+        """Cache a summary built for the user's current local day in tz"""
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, tz, local_today(tz), summary)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's summary (or all summaries)"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+dashboard_cache = DashboardCache()
+
+
+def _invalidate_from_event(data: Dict):
+    if data and data.get('user_id') is not None:
+        dashboard_cache.invalidate(data['user_id'])
+
+
+for _event_type in (
+    EventType.MEAL_LOGGED, EventType.MEAL_SKIPPED,
+    EventType.INVENTORY_UPDATED, EventType.PLAN_GENERATED
+):
+    event_bus.subscribe(_event_type, _invalidate_from_event)
+
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+
+class DashboardService:
+    """Computes the dashboard cards with a few aggregated queries"""
+
+    def __init__(self, db: Session, cache: Optional[DashboardCache] = dashboard_cache):
+        self.db = db
+        self.cache = cache
+
+    def get_summary(self, user_id: int) -> Dict:
+        """
+        Get the four dashboard cards.
+
+        Returns:
+            {'meals_card', 'macros_card', 'inventory_card', 'goal_card'}
+            dicts matching the dashboard response schemas
+        """
+        summary = self.cache.get(user_id) if self.cache else None
+        if summary is None:
+            tz = get_user_timezone(self.db, user_id)
+            summary = self._build_summary(user_id, tz)
+            if self.cache:
+                self.cache.put(user_id, summary, tz)
+
+        next_meal, next_meal_time = find_next_meal(summary['upcoming'])
+        return {
+            'meals_card': {
+                **summary['meals_card'],
+                'next_meal': next_meal,
+                'next_meal_time': next_meal_time
+            },
+            'macros_card': summary['macros_card'],
+            'inventory_card': summary['inventory_card'],
+            'goal_card': summary['goal_card']
+        }
+
+    def _build_summary(self, user_id: int, tz: tzinfo) -> Dict:
+        meal_logs = self._today_meal_logs(user_id, tz)
+        profile, goal = self._profile_and_goal(user_id)
+
+        meals_card, consumed = self._meals_card(meal_logs)
+        return {
+            'meals_card': meals_card,
+            # Pending meals, for resolving the next meal at read time
+            'upcoming': [log for log in meal_logs if log.consumed_datetime is None and not log.was_skipped],
+            'macros_card': self._macros_card(consumed, profile, goal),
+            'inventory_card': self._inventory_card(user_id),
+            'goal_card': self._goal_card(profile, goal, StreakService(self.db).get_current_streak(user_id))
+        }
+
+    # ===== QUERIES =====
+
+    def _today_meal_logs(self, user_id: int, tz: tzinfo) -> List:
+        """
+        Today's meals (the user's local day): active plan meals +
+        consumed/skipped meals from any plan + manual entries (shown_meals_filter,
+        as in ConsumptionService.get_today_summary)
+        """
+        today = local_today(tz)
+
+        return self.db.query(
+            MealLog.meal_type,
+            MealLog.planned_datetime,
+            MealLog.consumed_datetime,
+            MealLog.was_skipped,
+            MealLog.portion_multiplier,
+            MealLog.external_meal,
+            Recipe.macros_per_serving
+        ).outerjoin(
+            Recipe, MealLog.recipe_id == Recipe.id
+        ).filter(
+            MealLog.user_id == user_id,
+            in_range(MealLog.planned_datetime, day_bounds(today)),
+            shown_meals_filter()
+        ).all()
+
+    def _profile_and_goal(self, user_id: int) -> tuple:
+        row = self.db.query(UserProfile, UserGoal).select_from(User).outerjoin(
+            UserProfile, UserProfile.user_id == User.id
+        ).outerjoin(
+            UserGoal, UserGoal.user_id == User.id
+        ).filter(User.id == user_id).first()
+
+        return (row[0], row[1]) if row else (None, None)
+
+    def _inventory_card(self, user_id: int) -> Dict:
+        snapshot = inventory_snapshots.get(self.db, user_id)
+
+        return {
+            'expiring_soon_count': len(snapshot.expiring_within(EXPIRING_WITHIN_DAYS)),
+            'low_stock_count': len(snapshot.low_stock(LOW_STOCK_GRAMS)),
+            'out_of_stock_count': sum(1 for batch in snapshot.batches if batch['quantity_grams'] == 0),
+            'total_items': snapshot.total_items
+        }
+
+    # ===== CARDS =====
+
+    @staticmethod
+    def _meals_card(meal_logs: List) -> tuple:
+        """Meal counts and consumed macro totals"""
+        consumed = {'calories': 0, 'protein_g': 0, 'carbs_g': 0, 'fat_g': 0}
+        meals_consumed = meals_skipped = 0
+
+        for log in meal_logs:
+            if log.consumed_datetime:
+                meals_consumed += 1
+                if log.external_meal:
+                    macros, multiplier = log.external_meal, 1.0
+                else:
+                    macros, multiplier = log.macros_per_serving or {}, log.portion_multiplier or 1.0
+                for key in consumed:
+                    consumed[key] += (macros.get(key, 0) or 0) * multiplier
+            elif log.was_skipped:
+                meals_skipped += 1
+
+        return {
+            'meals_planned': len(meal_logs),
+            'meals_consumed': meals_consumed,
+            'meals_skipped': meals_skipped
+        }, consumed
+
+    @staticmethod
+    def _macros_card(consumed: Dict, profile, goal) -> Dict:
+        # Same targets as the daily summary and chat (day_meals.daily_targets)
+        targets = daily_targets(
+            (profile.goal_calories or profile.tdee) if profile else None,
+            goal.macro_targets if goal else None
+        )
+
+        card = {}
+        for name, key in (('calories', 'calories'), ('protein', 'protein_g'), ('carbs', 'carbs_g'), ('fat', 'fat_g')):
+            card[f'{name}_consumed'] = round(consumed[key], 1)
+            card[f'{name}_target'] = round(targets[key], 1)
+            card[f'{name}_percentage'] = _percentage(consumed[key], targets[key])
+        return card
+
+    @staticmethod
+    def _goal_card(profile, goal, current_streak: int) -> Dict:
+        current_weight = profile.weight_kg if profile and profile.weight_kg else 70.0
+        target_weight = goal.target_weight if goal and goal.target_weight is not None else current_weight
+        goal_type = goal.goal_type if goal else "maintain_weight"
+        goal_type = getattr(goal_type, 'value', goal_type)
+
+        # No starting weight is stored, so progress is measured from the current weight
+        starting_weight = current_weight
+        if goal_type in ["lose_weight", "fat_loss"]:
+            total_to_lose = starting_weight - target_weight
+            progress_pct = ((starting_weight - current_weight) / total_to_lose * 100) if total_to_lose > 0 else 0
+        elif goal_type in ["gain_weight", "muscle_gain"]:
+            total_to_gain = target_weight - starting_weight
+            progress_pct = ((current_weight - starting_weight) / total_to_gain * 100) if total_to_gain > 0 else 0
+        else:
+            progress_pct = 100.0 if abs(current_weight - target_weight) < 2 else 0
+
+        return {
+            'goal_type': goal_type,
+            'current_weight': round(current_weight, 1),
+            'target_weight': round(target_weight, 1),
+            'weight_change': round(target_weight - current_weight, 1),
+            'current_streak': current_streak,
+            'goal_progress_percentage': round(max(0, min(100, progress_pct)), 1)
+        }
@@ -0,0 +1,69 @@
+# backend/app/services/day_meals.py
+"""
+Which meal logs make up a user's day, and the daily targets they are
+measured against.
+
+ConsumptionService.get_today_summary, the dashboard, the daily summary
+notifications, UserContext and the async chat tools all show the same meals
+and targets, so the rules live here once:
+
+- shown_meals_filter: meals of the active plan, manual entries and meals
+  already consumed or skipped under any plan (pending meals of a replaced
+  plan are hidden, so regenerating a plan does not duplicate them)
+- daily_targets / macro_grams: calorie target with the goal's macro split
+  in grams, defaults until onboarding is complete
+"""
+
+from typing import Dict, Optional
+
+from sqlalchemy import or_, select
+
+from app.models.database import MealLog, MealPlan
+
+DEFAULT_TARGETS = {"calories": 2000, "protein_g": 100, "carbs_g": 250, "fat_g": 65, "fiber_g": 25}
+
+
+def shown_meals_filter():
+    """
+    MealLog filter for the meals shown for a day (any number of users).
+    The active plan check is correlated on the log's own plan, so the
+    enclosing query must not join meal_plans itself.
+    """
+    in_active_plan = select(MealPlan.id).where(
+        MealPlan.id == MealLog.meal_plan_id,
+        MealPlan.is_active == True
+    ).exists()
+
+    return or_(
+        in_active_plan,
+        MealLog.meal_plan_id.is_(None),         # Manual entries
+        MealLog.consumed_datetime.isnot(None),  # Already consumed (any plan)
+        MealLog.was_skipped == True             # Already skipped (any plan)
+    )
+
+
+def macro_grams(calories: float, macro_targets: Dict) -> Dict[str, float]:
+    """Protein/carbs/fat grams of a calorie target split by macro_targets fractions"""
+    return {
+        "protein_g": (calories * macro_targets.get("protein", 0.3)) / 4,
+        "carbs_g": (calories * macro_targets.get("carbs", 0.4)) / 4,
+        "fat_g": (calories * macro_targets.get("fat", 0.3)) / 9,
+    }
+
+
+def daily_targets(goal_calories: Optional[float], macro_targets: Optional[Dict]) -> Dict[str, float]:
+    """
+    Daily calorie, macro and fiber targets.
+
+    A missing calorie goal or macro split falls back on its own (2000 kcal,
+    0.3/0.4/0.3 split); DEFAULT_TARGETS only when neither is set.
+    """
+    if not goal_calories and not macro_targets:
+        return dict(DEFAULT_TARGETS)
+
+    calories = goal_calories or DEFAULT_TARGETS["calories"]
+    return {
+        "calories": calories,
+        **macro_grams(calories, macro_targets or {}),
+        "fiber_g": DEFAULT_TARGETS["fiber_g"]
+    }
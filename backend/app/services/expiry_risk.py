@@ -0,0 +1,252 @@
+# backend/app/services/expiry_risk.py
+"""
+Expiry risk from a precomputed consumption timeline.
+
+TrackingAgent.check_expiring_items used to rebuild upcoming consumption from
+MealLog -> Recipe -> RecipeIngredient -> Item joined loads on every call and
+then filter planned uses per inventory item in Python. Instead:
+
+1. ConsumptionTimeline: cumulative planned grams per item per day over the
+   next HORIZON_DAYS, from ONE grouped query over pending meal logs x recipe
+   ingredients. Stored as a compact (items x days) float32 array and rebuilt
+   only when plans or logged/skipped meals change (or the day rolls over)
+2. ExpiryRiskEngine.assess: for every batch at once, planned need up to its
+   expiry date is a lookup into the cumulative array, minus the stock of
+   earlier-expiring batches of the same item (consumed first, FIFO)
+
+A batch counts as used up when the need left for it covers at least
+CONSUMPTION_THRESHOLD of its quantity (allowing for cooking variations).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.events import EventType, event_bus
+from app.models.database import MealLog, RecipeIngredient
+
+logger = logging.getLogger(__name__)
+
+HORIZON_DAYS = 14
+CONSUMPTION_THRESHOLD = 0.8
+TIMELINE_TTL_SECONDS = 3600
+
+
+# ============================================================================
+# TIMELINE
+# ============================================================================
+
+@dataclass
+class ConsumptionTimeline:
+    """Cumulative planned grams per item, by day from start_date"""
+    user_id: int
+    start_date: date
+    item_index: Dict[int, int]
+    cumulative: np.ndarray  # shape (len(item_index), HORIZON_DAYS), float32
+
+    @classmethod
+    def empty(cls, user_id: int, start_date: date) -> "ConsumptionTimeline":
+        return cls(user_id, start_date, {}, np.zeros((0, HORIZON_DAYS), dtype=np.float32))
+
+    @classmethod
+    def from_rows(cls, user_id: int, start_date: date, rows: Iterable[tuple]) -> "ConsumptionTimeline":
+        """rows: (item_id, planned date, grams)"""
+        item_index: Dict[int, int] = {}
+        entries = []
+        for item_id, day, grams in rows:
+            if isinstance(day, str):  # SQLite returns 'YYYY-MM-DD'
+                day = date.fromisoformat(day)
+            offset = (day - start_date).days
+            if item_id is None or not 0 <= offset < HORIZON_DAYS:
+                continue
+            entries.append((item_index.setdefault(item_id, len(item_index)), offset, grams or 0))
+
+        daily = np.zeros((len(item_index), HORIZON_DAYS), dtype=np.float32)
+        for row, offset, grams in entries:
+            daily[row, offset] += grams
+
+        return cls(user_id, start_date, item_index, np.cumsum(daily, axis=1, dtype=np.float32))
+
+    def planned_until(self, item_id: int, until: datetime) -> float:
+        """Planned grams of an item from start_date through until's date"""
+        row = self.item_index.get(item_id)
+        offset = (until.date() - self.start_date).days
+        if row is None or offset < 0:
+            return 0.0
+        return float(self.cumulative[row, min(offset, HORIZON_DAYS - 1)])
+
+
+def _pending_usage_query(db: Session, user_ids: List[int], since: datetime):
+    """(user_id, item_id, planned date, grams) for pending meals in the horizon"""
+    day = func.date(MealLog.planned_datetime)
+    grams = func.sum(RecipeIngredient.quantity_grams * func.coalesce(MealLog.portion_multiplier, 1.0))
+    return db.query(
+        MealLog.user_id, RecipeIngredient.item_id, day, grams
+    ).join(
+        RecipeIngredient, RecipeIngredient.recipe_id == MealLog.recipe_id
+    ).filter(
+        MealLog.user_id.in_(user_ids),
+        MealLog.planned_datetime >= since,
+        MealLog.planned_datetime < datetime.combine(since.date(), datetime.min.time()) + timedelta(days=HORIZON_DAYS),
+        MealLog.was_skipped == False,
+        MealLog.consumed_datetime.is_(None)
+    ).group_by(
+        MealLog.user_id, RecipeIngredient.item_id, day
+    )
+
+
+def build_timelines(db: Session, user_ids: List[int], now: Optional[datetime] = None) -> Dict[int, ConsumptionTimeline]:
+    """Timelines for several users from one grouped query"""
+    now = now or datetime.utcnow()
+    rows_by_user: Dict[int, List[tuple]] = {user_id: [] for user_id in user_ids}
+    if user_ids:
+        for user_id, item_id, day, grams in _pending_usage_query(db, user_ids, now).all():
+            rows_by_user[user_id].append((item_id, day, grams))
+
+    return {
+        user_id: ConsumptionTimeline.from_rows(user_id, now.date(), rows)
+        for user_id, rows in rows_by_user.items()
+    }
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class TimelineCache:
+    """Per-user timelines (process-wide, TTL + plan/meal event invalidation)"""
+
+    def __init__(self, ttl_seconds: float = TIMELINE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, user_id: int) -> Optional[ConsumptionTimeline]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, timeline = entry
+        if time.monotonic() > expires_at or timeline.start_date != datetime.utcnow().date():
+            return None
+        return timeline
+
+    def get(self, db: Session, user_id: int) -> ConsumptionTimeline:
+        timeline = self._fresh(user_id)
+        if timeline is None:
+            timeline = self.prefetch(db, [user_id])[user_id]
+        return timeline
+
+    def prefetch(self, db: Session, user_ids: List[int]) -> Dict[int, ConsumptionTimeline]:
+        """Build and cache the timelines of users without a fresh one (one query)"""
+        cached = {user_id: self._fresh(user_id) for user_id in user_ids}
+        missing = [user_id for user_id, timeline in cached.items() if timeline is None]
+
+        built = build_timelines(db, missing)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for user_id, timeline in built.items():
+                self._entries[user_id] = (expires_at, timeline)
+
+        cached.update(built)
+        return cached
+
+    def invalidate(self, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+consumption_timelines = TimelineCache()
+
+
+def _invalidate_from_event(data: Dict):
+    if data and data.get('user_id') is not None:
+        consumption_timelines.invalidate(data['user_id'])
+
+
+for _event_type in (EventType.PLAN_GENERATED, EventType.MEAL_LOGGED, EventType.MEAL_SKIPPED):
+    event_bus.subscribe(_event_type, _invalidate_from_event)
+
+
+# ============================================================================
+# RISK
+# ============================================================================
+
+class ExpiryRiskEngine:
+    """Vectorized "will this batch be used before it expires?" checks"""
+
+    def __init__(self, db: Session, timelines: TimelineCache = consumption_timelines):
+        self.db = db
+        self.timelines = timelines
+
+    def assess(self, user_id: int, batches: List[Dict]) -> List[Dict]:
+        """
+        Args:
+            batches: dicts with item_id, quantity_grams and expiry_date
+                     (datetime or ISO string); batches without expiry are skipped
+
+        Returns:
+            The dated batches (same order) with planned_use_grams (need left
+            for this batch after earlier-expiring batches, at most its
+            quantity), unused_grams and will_be_consumed added
+        """
+        dated = [
+            {
+                **batch,
+                'expiry_date': (
+                    datetime.fromisoformat(batch['expiry_date'])
+                    if isinstance(batch['expiry_date'], str) else batch['expiry_date']
+                )
+            }
+            for batch in batches if batch.get('expiry_date')
+        ]
+        if not dated:
+            return []
+
+        timeline = self.timelines.get(self.db, user_id)
+
+        item_rows = np.array([timeline.item_index.get(b['item_id'], -1) for b in dated])
+        offsets = np.array([(b['expiry_date'].date() - timeline.start_date).days for b in dated])
+        quantities = np.array([b['quantity_grams'] or 0 for b in dated], dtype=np.float64)
+
+        # Planned need through each batch's expiry day
+        need = np.zeros(len(dated))
+        has_need = (item_rows >= 0) & (offsets >= 0)
+        if has_need.any():
+            need[has_need] = timeline.cumulative[
+                item_rows[has_need], np.minimum(offsets[has_need], HORIZON_DAYS - 1)
+            ]
+
+        # Stock of earlier-expiring batches of the same item is used first
+        item_ids = np.array([b['item_id'] for b in dated])
+        order = np.lexsort((offsets, item_ids))
+        sorted_qty = quantities[order]
+        running = np.cumsum(sorted_qty)
+        group_start = np.r_[True, item_ids[order][1:] != item_ids[order][:-1]]
+        group_offset = np.maximum.accumulate(np.where(group_start, running - sorted_qty, 0))
+        before = np.empty_like(quantities)
+        before[order] = running - sorted_qty - group_offset
+
+        # A batch cannot supply more than it holds
+        planned_use = np.clip(need - before, 0, quantities)
+        unused = np.clip(quantities - planned_use, 0, None)
+        consumed = planned_use >= quantities * CONSUMPTION_THRESHOLD
+
+        return [
+            {
+                **batch,
+                'planned_use_grams': round(float(planned_use[i]), 1),
+                'unused_grams': round(float(unused[i]), 1),
+                'will_be_consumed': bool(consumed[i])
+            }
+            for i, batch in enumerate(dated)
+        ]
@@ -5,17 +5,20 @@ import pulp
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
+import copy
 import logging
+import time
 from collections import defaultdict
 from sqlalchemy.orm import Session
 import random
-from app.models.database import UserProfile, UserGoal, UserPath, UserPreference, Recipe
-from app.models.database import UserGoal, UserInventory, RecipeIngredient
-from sqlalchemy import cast, String, func
+from app.models.database import UserProfile, UserGoal, UserPath, UserPreference, UserInventory
 
 
 logger = logging.getLogger(__name__)
 
+# Meal name of each LP meal slot (index = slot used by _is_recipe_suitable_for_meal)
+MEAL_NAMES = ['breakfast', 'lunch', 'dinner', 'snack', 'meal_4', 'meal_5']
+
 @dataclass
 class OptimizationConstraints:
     """Constraints for meal plan optimization"""
@@ -73,6 +76,7 @@ class MealPlanOptimizer:
         self.recipes = []
         self.days = 0
         self.meals_per_day = 0
+        self.solver_stats = {}
         
     def optimize(
         self,
@@ -81,9 +85,15 @@ class MealPlanOptimizer:
         constraints: OptimizationConstraints = None,
         objective: OptimizationObjective = None,
         available_recipes: List[Dict] = None,
-        inventory: Dict[int, float] = None
+        inventory: Dict[int, float] = None,
+        scored_recipes: Dict[int, RecipeScore] = None
     ) -> Optional[Dict]:
-        """Main optimization with proper constraint handling"""
+        """
+        Main optimization with proper constraint handling
+        
+        With available_recipes, constraints and scored_recipes supplied the
+        optimizer needs no database session (batch planning workers).
+        """
         
         try:
             self.days = days
@@ -108,9 +118,10 @@ class MealPlanOptimizer:
                 return self._generate_simple_plan(days, constraints)
             
             # Score recipes
-            scored_recipes = self._score_recipes(
-                self.recipes, constraints, inventory or {}, user_id
-            )
+            if scored_recipes is None:
+                scored_recipes = self._score_recipes(
+                    self.recipes, constraints, inventory or {}, user_id
+                )
             
             # Try LP optimization with proper constraints
             result = self._solve_lp_problem_fixed(constraints, objective, scored_recipes)
@@ -119,12 +130,20 @@ class MealPlanOptimizer:
                 logger.info("LP optimization successful with valid solution")
                 return result
             
-            # Try with relaxed constraints
-            logger.info("Trying relaxed constraints...")
-            result = self._solve_with_relaxed_constraints_fixed(constraints, scored_recipes, inventory)
+            # CBC hit its time limit without a solution - a relaxed model of the
+            # same size would too, so go straight to the genetic optimizer
+            if self.solver_stats.get('status') != 'Not Solved':
+                # Try with relaxed constraints
+                logger.info("Trying relaxed constraints...")
+                result = self._solve_with_relaxed_constraints_fixed(constraints, scored_recipes, inventory)
+                
+                if result:
+                    logger.info("Relaxed LP successful")
+                    return result
             
-            if result:
-                logger.info("Relaxed LP successful")
+            result = self._solve_with_genetic_algorithm(days, constraints, inventory)
+            if result and self._validate_solution(result, constraints):
+                logger.info("Genetic algorithm fallback successful")
                 return result
             
             # Fallback to greedy
@@ -135,6 +154,294 @@ class MealPlanOptimizer:
             logger.error(f"Optimization failed: {str(e)}", exc_info=True)
             return self._generate_simple_plan(days, constraints)
     
+    # ========================================================================
+    # INCREMENTAL RE-OPTIMIZATION (swaps, eating out, mid-week replans)
+    # ========================================================================
+
+    # Small models: a few seconds is plenty, the warm start is usually optimal
+    REOPTIMIZE_TIME_LIMIT = 5
+    # Objective cost per kcal outside a day's window (macros in kcal-equivalents)
+    DAY_WINDOW_SLACK_PENALTY = 1.0
+
+    def reoptimize(
+        self,
+        user_id: int,
+        week_plan: Dict,
+        free_slots,
+        constraints: OptimizationConstraints = None,
+        available_recipes: List[Dict] = None,
+        inventory: Dict[int, float] = None
+    ) -> Optional[Dict]:
+        """
+        Re-solve only some meal slots of an existing plan.
+
+        Every slot not in free_slots stays fixed: its macros count towards the
+        day's nutrition window and its recipe towards the variety limits.
+        Variables are created for the free slots only and the current
+        assignment is passed to CBC as a warm start, so a mid-week edit
+        solves a model of a few hundred variables instead of rebuilding
+        recipes x days x meals.
+
+        Day windows are soft (penalized slack) because fixed meals - e.g. a
+        restaurant dinner - can already push a day outside them.
+
+        Args:
+            user_id: User ID
+            week_plan: {'day_N': {'meals': {meal_name: recipe}}} (not modified)
+            free_slots: Iterable of (day_index, meal_name) to re-solve
+            constraints: Defaults to the user's constraints
+            available_recipes: Candidate pool (defaults to the user's filtered recipes)
+            inventory: {item_id: quantity_grams} for scoring
+
+        Returns:
+            {'week_plan': updated copy, 'changes': [{'day', 'meal_type', 'recipe'}],
+             'optimization_method', 'solve_time_ms', 'variables'} or None if
+            the slots could not be re-solved
+        """
+        started = time.perf_counter()
+        free_slots = sorted({(int(day), meal_name) for day, meal_name in free_slots})
+        if not free_slots:
+            return None
+
+        try:
+            if not constraints:
+                constraints = self._get_user_constraints(user_id)
+
+            if available_recipes is not None:
+                pool = list(available_recipes)
+            else:
+                pool = self._get_filtered_recipes_fixed(user_id, constraints)
+            pool = self._filter_recipes_by_calories(pool, constraints)
+
+            # Current recipes stay candidates so the warm start is feasible
+            pool_ids = {recipe['id'] for recipe in pool}
+            for day, meal_name in free_slots:
+                current = self._current_recipe(week_plan, day, meal_name)
+                if current and current['id'] not in pool_ids:
+                    pool.append(current)
+                    pool_ids.add(current['id'])
+
+            if not pool:
+                logger.warning(f"No candidate recipes to re-optimize {free_slots}")
+                return None
+
+            scored_recipes = self._score_recipes(pool, constraints, inventory or {}, user_id)
+            result = self._solve_incremental(week_plan, free_slots, pool, scored_recipes, constraints)
+
+        except Exception as e:
+            logger.error(f"Re-optimization failed: {str(e)}", exc_info=True)
+            return None
+
+        if result:
+            result['solve_time_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(
+                f"Re-optimized {len(free_slots)} slots for user {user_id}: "
+                f"{len(result['changes'])} changed, {result['variables']} variables, "
+                f"{result['solve_time_ms']}ms"
+            )
+        return result
+
+    @staticmethod
+    def _current_recipe(week_plan: Dict, day: int, meal_name: str) -> Optional[Dict]:
+        """Recipe currently planned in a slot (None for empty/external meals)"""
+        meal = week_plan.get(f'day_{day}', {}).get('meals', {}).get(meal_name)
+        if not meal or meal.get('is_external') or meal.get('id') is None:
+            return None
+        return meal
+
+    @staticmethod
+    def _meal_slot(meal_name: str) -> int:
+        """LP meal slot of a meal name (unknown names are suitable for anything)"""
+        return MEAL_NAMES.index(meal_name) if meal_name in MEAL_NAMES else len(MEAL_NAMES)
+
+    def _solve_incremental(
+        self,
+        week_plan: Dict,
+        free_slots: List[Tuple[int, str]],
+        pool: List[Dict],
+        scored_recipes: Dict[int, RecipeScore],
+        constraints: OptimizationConstraints
+    ) -> Optional[Dict]:
+        """Build and solve the reduced LP over free_slots only"""
+        problem = pulp.LpProblem("MealPlanReoptimize", pulp.LpMinimize)
+        free_set = set(free_slots)
+        macro_keys = ('calories', 'protein_g', 'carbs_g', 'fat_g')
+
+        days = sorted(
+            int(day_key.split('_')[1]) for day_key in week_plan
+            if day_key.startswith('day_') and day_key.split('_')[1].isdigit()
+        )
+        num_days = (days[-1] + 1) if days else 0
+
+        # Constants contributed by the fixed slots
+        fixed_macros = defaultdict(lambda: dict.fromkeys(macro_keys, 0.0))
+        fixed_days_by_recipe = defaultdict(list)
+        for day in days:
+            for meal_name, meal in (week_plan[f'day_{day}'].get('meals') or {}).items():
+                if not meal or (day, meal_name) in free_set:
+                    continue
+                macros = meal.get('macros_per_serving') or {}
+                for key in macro_keys:
+                    fixed_macros[day][key] += macros.get(key, 0) or 0
+                if not meal.get('is_external') and meal.get('id') is not None:
+                    fixed_days_by_recipe[meal['id']].append(day)
+
+        free_by_day = defaultdict(list)
+        for day, meal_name in free_slots:
+            free_by_day[day].append(meal_name)
+
+        # Decision variables and costs, free slots only
+        target_mid = (constraints.daily_calories_min + constraints.daily_calories_max) / 2
+        slot_vars = {}
+        vars_by_recipe = defaultdict(list)
+        vars_by_day = defaultdict(list)
+        obj_terms = []
+
+        for s_idx, (day, meal_name) in enumerate(free_slots):
+            remaining_cal = max(0.0, target_mid - fixed_macros[day]['calories'])
+            target_cal = remaining_cal / len(free_by_day[day])
+            slot = self._meal_slot(meal_name)
+
+            slot_vars[s_idx] = []
+            for r_idx, recipe in enumerate(pool):
+                if not self._is_recipe_suitable_for_meal(recipe, slot):
+                    continue
+                var = pulp.LpVariable(f"x_{r_idx}_{s_idx}", cat='Binary')
+                slot_vars[s_idx].append((r_idx, var))
+                vars_by_recipe[r_idx].append((day, var))
+                vars_by_day[day].append((r_idx, var))
+
+                score = scored_recipes.get(recipe['id'], RecipeScore(recipe_id=recipe['id']))
+                obj_terms.append(self._recipe_cost(recipe, score, target_cal) * var)
+
+            if not slot_vars[s_idx]:
+                logger.warning(f"No suitable recipe for day {day} {meal_name}")
+                return None
+
+            problem += pulp.lpSum(var for _, var in slot_vars[s_idx]) == 1, f"assign_s{s_idx}"
+
+        # Soft nutrition windows for the affected days
+        penalty = self.DAY_WINDOW_SLACK_PENALTY
+        for day in free_by_day:
+            totals = {
+                key: fixed_macros[day][key] + pulp.lpSum(
+                    (pool[r_idx].get('macros_per_serving', {}).get(key, 0) or 0) * var
+                    for r_idx, var in vars_by_day[day]
+                )
+                for key in macro_keys
+            }
+            min_cal, max_cal = self._day_calorie_window(constraints)
+            bounds = [
+                ('calories', '>=', min_cal, 1),
+                ('calories', '<=', max_cal, 1),
+                ('protein_g', '>=', constraints.daily_protein_min * 0.85, 4),
+            ]
+            if constraints.daily_carbs_max < float('inf'):
+                bounds.append(('carbs_g', '<=', constraints.daily_carbs_max * 1.2, 4))
+            if constraints.daily_fat_max < float('inf'):
+                bounds.append(('fat_g', '<=', constraints.daily_fat_max * 1.2, 9))
+
+            for key, sense, bound, kcal_per_unit in bounds:
+                name = f"{'min' if sense == '>=' else 'max'}_{key}_d{day}"
+                slack = pulp.LpVariable(f"slack_{name}", lowBound=0)
+                if sense == '>=':
+                    problem += totals[key] + slack >= bound, name
+                else:
+                    problem += totals[key] - slack <= bound, name
+                obj_terms.append(penalty * kcal_per_unit * slack)
+
+        # Variety: fixed uses count against the same limits as a full solve
+        max_uses = self._max_uses_per_recipe(num_days)
+        repeat_window = constraints.max_recipe_repeat_in_days
+        for r_idx, uses in vars_by_recipe.items():
+            fixed_days = fixed_days_by_recipe.get(pool[r_idx]['id'], [])
+            problem += (
+                pulp.lpSum(var for _, var in uses) <= max(0, max_uses - len(fixed_days)),
+                f"max_uses_r{r_idx}"
+            )
+
+            if repeat_window > 1:
+                for window_start in range(num_days):
+                    window_end = window_start + repeat_window
+                    window_vars = [var for day, var in uses if window_start <= day < window_end]
+                    if not window_vars:
+                        continue
+                    fixed_in_window = sum(1 for day in fixed_days if window_start <= day < window_end)
+                    if len(window_vars) + fixed_in_window >= 2:
+                        problem += (
+                            pulp.lpSum(window_vars) <= max(0, 1 - fixed_in_window),
+                            f"spacing_r{r_idx}_d{window_start}"
+                        )
+
+        problem += pulp.lpSum(obj_terms), "Objective"
+
+        # Warm start from the current plan
+        warm_start = False
+        for s_idx, (day, meal_name) in enumerate(free_slots):
+            current = self._current_recipe(week_plan, day, meal_name)
+            current_id = current['id'] if current else None
+            for r_idx, var in slot_vars[s_idx]:
+                is_current = pool[r_idx]['id'] == current_id
+                var.setInitialValue(1 if is_current else 0)
+                warm_start = warm_start or is_current
+
+        solver = pulp.PULP_CBC_CMD(msg=0, timeLimit=self.REOPTIMIZE_TIME_LIMIT, warmStart=warm_start)
+        status = problem.solve(solver)
+
+        if status != pulp.LpStatusOptimal:
+            logger.warning(f"Re-optimization LP status: {pulp.LpStatus[status]}")
+            return None
+
+        result = self._apply_incremental_solution(week_plan, free_slots, pool, slot_vars, len(problem.variables()))
+        if result:
+            result['constraints'] = len(problem.constraints)
+        return result
+
+    def _apply_incremental_solution(
+        self,
+        week_plan: Dict,
+        free_slots: List[Tuple[int, str]],
+        pool: List[Dict],
+        slot_vars: Dict[int, List],
+        num_variables: int
+    ) -> Optional[Dict]:
+        """Copy of week_plan with the solved slots filled in and day totals recalculated"""
+        updated = copy.deepcopy(week_plan)
+        changes = []
+
+        for s_idx, (day, meal_name) in enumerate(free_slots):
+            chosen = next((r_idx for r_idx, var in slot_vars[s_idx] if (var.varValue or 0) > 0.5), None)
+            if chosen is None:
+                return None
+
+            recipe = pool[chosen]
+            current = self._current_recipe(week_plan, day, meal_name)
+            day_data = updated.setdefault(f'day_{day}', {'meals': {}})
+            day_data.setdefault('meals', {})[meal_name] = recipe
+
+            if not current or current['id'] != recipe['id']:
+                changes.append({'day': day, 'meal_type': meal_name, 'recipe': recipe})
+
+        for day in {day for day, _ in free_slots}:
+            day_data = updated[f'day_{day}']
+            day_data['day_calories'] = 0
+            day_data['day_macros'] = {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0}
+            for meal in day_data['meals'].values():
+                if meal:
+                    macros = meal.get('macros_per_serving', {})
+                    day_data['day_calories'] += macros.get('calories', 0)
+                    day_data['day_macros']['protein_g'] += macros.get('protein_g', 0)
+                    day_data['day_macros']['carbs_g'] += macros.get('carbs_g', 0)
+                    day_data['day_macros']['fat_g'] += macros.get('fat_g', 0)
+
+        return {
+            'week_plan': updated,
+            'changes': changes,
+            'optimization_method': 'linear_programming_incremental',
+            'variables': num_variables,
+            'success': True
+        }
+    
     def _filter_recipes_by_calories(self, recipes: List[Dict], constraints: OptimizationConstraints) -> List[Dict]:
         """Filter out recipes that make it impossible to meet calorie constraints"""
         min_cal_per_meal = constraints.daily_calories_min / constraints.meals_per_day * 0.5  # Allow flexibility
@@ -159,12 +466,16 @@ class MealPlanOptimizer:
         scored_recipes: Dict[int, RecipeScore]
     ) -> Optional[Dict]:
         """Solve LP with properly implemented constraints"""
+        started = time.perf_counter()
         
         # Create problem
         self.problem = pulp.LpProblem("MealPlan", pulp.LpMinimize)
         
+        # Drop useless (recipe, meal slot) pairs before building the model
+        allowed, presolve_stats = self._presolve(constraints, scored_recipes)
+        
         # Create decision variables
-        self._create_lp_variables()
+        self._create_lp_variables(allowed)
         
         # Set objective with calorie awareness
         self._set_lp_objective_fixed(scored_recipes, objective, constraints)
@@ -173,30 +484,81 @@ class MealPlanOptimizer:
         self._add_assignment_constraints()
         self._add_nutrition_constraints_fixed(constraints)
         self._add_variety_constraints_fixed(constraints)
+        build_time = time.perf_counter() - started
         
         # Solve
         solver = pulp.PULP_CBC_CMD(msg=0, timeLimit=30)  # More time for complex problems
         status = self.problem.solve(solver)
         
+        self.solver_stats = {
+            'status': pulp.LpStatus[status],
+            'variables': len(self.problem.variables()),
+            'constraints': len(self.problem.constraints),
+            'build_time_ms': round(build_time * 1000, 1),
+            'solve_time_ms': round((time.perf_counter() - started - build_time) * 1000, 1),
+            'presolve': presolve_stats.as_dict()
+        }
+        logger.info(f"LP solver stats: {self.solver_stats}")
+        
         if status == pulp.LpStatusOptimal:
             solution = self._extract_lp_solution()
+            solution['solver_stats'] = self.solver_stats
             return solution
         
         logger.warning(f"LP status: {pulp.LpStatus[status]}")
         return None
     
-    def _create_lp_variables(self):
-        """Create binary decision variables"""
+    def _presolve(self, constraints: OptimizationConstraints, scored_recipes: Dict[int, RecipeScore]):
+        """Mask of (recipe, meal slot) pairs worth a variable (see LPPresolver)"""
+        from app.services.lp_presolve import LPPresolver
+        
+        target_cal_per_meal = ((constraints.daily_calories_min + constraints.daily_calories_max) / 2) / constraints.meals_per_day
+        costs = np.array([
+            self._recipe_cost(
+                recipe,
+                scored_recipes.get(recipe['id'], RecipeScore(recipe_id=recipe['id'])),
+                target_cal_per_meal
+            )
+            for recipe in self.recipes
+        ], dtype=np.float64)
+        
+        presolver = LPPresolver(self.recipes, self.meals_per_day, self._is_recipe_suitable_for_meal)
+        return presolver.prune(
+            costs,
+            self._day_calorie_window(constraints),
+            # Every day of the plan can still pick a dominating recipe
+            min_dominators=self.days
+        )
+    
+    def _create_lp_variables(self, allowed: Optional[np.ndarray] = None):
+        """
+        Create binary decision variables
+        
+        Args:
+            allowed: Optional (recipes, meals_per_day) mask from _presolve;
+                recipes without any allowed slot get no entry at all
+        """
         self.x = {}
         
         for r_idx, recipe in enumerate(self.recipes):
+            if allowed is not None:
+                slots = [m for m in range(self.meals_per_day) if allowed[r_idx, m]]
+            else:
+                slots = [m for m in range(self.meals_per_day) if self._is_recipe_suitable_for_meal(recipe, m)]
+            if not slots:
+                continue
+            
             self.x[r_idx] = {}
             for d in range(self.days):
                 self.x[r_idx][d] = {}
-                for m in range(self.meals_per_day):
-                    if self._is_recipe_suitable_for_meal(recipe, m):
-                        var_name = f"x_{r_idx}_{d}_{m}"
-                        self.x[r_idx][d][m] = pulp.LpVariable(var_name, cat='Binary')
+                for m in slots:
+                    var_name = f"x_{r_idx}_{d}_{m}"
+                    self.x[r_idx][d][m] = pulp.LpVariable(var_name, cat='Binary')
+    
+    @staticmethod
+    def _day_calorie_window(constraints: OptimizationConstraints) -> Tuple[float, float]:
+        """Daily calorie bounds used by the LP (20% tolerance for feasibility)"""
+        return constraints.daily_calories_min * 0.8, constraints.daily_calories_max * 1.2
     
     def _set_lp_objective_fixed(self, scored_recipes: Dict, objective: OptimizationObjective, constraints):
         """Objective function that considers calorie requirements"""
@@ -210,16 +572,7 @@ class MealPlanOptimizer:
             if r_idx in self.x:
                 # Get recipe score
                 score = scored_recipes.get(recipe['id'], RecipeScore(recipe_id=recipe['id']))
-                
-                # Base cost from composite score
-                base_cost = max(0, 100 - score.composite_score)
-                
-                # Penalize deviation from target calories
-                recipe_cal = recipe.get('macros_per_serving', {}).get('calories', 0)
-                cal_deviation = abs(recipe_cal - target_cal_per_meal) / target_cal_per_meal if target_cal_per_meal > 0 else 0
-                cal_penalty = cal_deviation * 30  # Strong weight for calorie matching
-                
-                total_cost = base_cost * 0.7 + cal_penalty * 0.3  # Balance scores
+                total_cost = self._recipe_cost(recipe, score, target_cal_per_meal)
                 
                 for d in self.x[r_idx]:
                     for m in self.x[r_idx][d]:
@@ -228,6 +581,19 @@ class MealPlanOptimizer:
         if obj_terms:
             self.problem += pulp.lpSum(obj_terms), "Objective"
     
+    @staticmethod
+    def _recipe_cost(recipe: Dict, score: RecipeScore, target_cal_per_meal: float) -> float:
+        """LP cost of placing a recipe in a slot with the given calorie target"""
+        # Base cost from composite score
+        base_cost = max(0, 100 - score.composite_score)
+        
+        # Penalize deviation from target calories
+        recipe_cal = recipe.get('macros_per_serving', {}).get('calories', 0)
+        cal_deviation = abs(recipe_cal - target_cal_per_meal) / target_cal_per_meal if target_cal_per_meal > 0 else 0
+        cal_penalty = cal_deviation * 30  # Strong weight for calorie matching
+        
+        return base_cost * 0.7 + cal_penalty * 0.3  # Balance scores
+    
     def _add_assignment_constraints(self):
         """Each meal slot gets exactly one recipe"""
         for d in range(self.days):
@@ -263,8 +629,7 @@ class MealPlanOptimizer:
             # Calorie constraints - RELAXED for feasibility
             if daily_calories:
                 # Use 20% tolerance for better feasibility
-                min_cal = constraints.daily_calories_min * 0.8
-                max_cal = constraints.daily_calories_max * 1.2
+                min_cal, max_cal = self._day_calorie_window(constraints)
                 
                 self.problem += pulp.lpSum(daily_calories) >= min_cal, f"min_cal_d{d}"
                 self.problem += pulp.lpSum(daily_calories) <= max_cal, f"max_cal_d{d}"
@@ -296,16 +661,7 @@ class MealPlanOptimizer:
         # For a 7-day plan with max_repeat=2, we want each recipe used at most 2 times
         # Not 3 times as currently happening
         
-        if self.days <= 3:
-            # For short plans, each recipe used at most once
-            max_uses_per_recipe = 1
-        elif self.days <= 5:
-            # For 4-5 day plans, allow 2 uses
-            max_uses_per_recipe = 2
-        else:
-            # For 6-7 day plans, strictly limit to 2 uses
-            # This ensures more variety
-            max_uses_per_recipe = 2
+        max_uses_per_recipe = self._max_uses_per_recipe(self.days)
         
         # Global constraint: limit total uses of each recipe
         for r_idx in self.x:
@@ -338,6 +694,19 @@ class MealPlanOptimizer:
                         self.problem += pulp.lpSum(window_uses) <= 1, f"spacing_r{r_idx}_d{d}_window"
 
 
+    @staticmethod
+    def _max_uses_per_recipe(days: int) -> int:
+        """Global per-recipe use limit for a plan of the given length"""
+        if days <= 3:
+            # For short plans, each recipe used at most once
+            return 1
+        elif days <= 5:
+            # For 4-5 day plans, allow 2 uses
+            return 2
+        # For 6-7 day plans, strictly limit to 2 uses
+        # This ensures more variety
+        return 2
+
     # Alternative simpler approach if the above is too restrictive:
     def _add_variety_constraints_simple(self, constraints: OptimizationConstraints):
         """
@@ -416,6 +785,22 @@ class MealPlanOptimizer:
         
         return None
     
+    def _solve_with_genetic_algorithm(self, days, constraints, inventory):
+        """Vectorized GA over the current recipe pool (fallback when CBC gives up)"""
+        from app.services.genetic_optimizer import GeneticMealOptimizer
+        
+        started = time.perf_counter()
+        try:
+            result = GeneticMealOptimizer(population_size=100, generations=200).optimize(
+                days, constraints.meals_per_day, self.recipes, constraints, inventory or {}
+            )
+        except Exception as e:
+            logger.error(f"Genetic algorithm failed: {str(e)}", exc_info=True)
+            return None
+        
+        logger.info(f"Genetic algorithm finished in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return result
+    
     def _fallback_greedy_algorithm_fixed(self, days, constraints, scored_recipes, inventory):
         """Improved greedy algorithm that respects constraints better"""
         logger.info("Using improved greedy algorithm")
@@ -532,156 +917,45 @@ class MealPlanOptimizer:
         return meal_plan
     
     def _get_filtered_recipes_fixed(self, user_id: int, constraints: OptimizationConstraints) -> List[Dict]:
-        """Get actual recipes from database"""
+        """
+        Get actual recipes from database
 
-        print("\n" + "="*80)
-        print("DEBUG: _get_filtered_recipes_fixed()")
-        print("="*80)
+        Served from the process-wide RecipeCandidateIndex: goal / dietary tag
+        bitset intersection plus prep-time and calorie range scans, instead
+        of JSON LIKE scans and debug count() queries per plan.
+        """
+        from app.services.recipe_index import recipe_candidate_index
 
         # Get user's goal to filter recipes
         goal = self.db.query(UserGoal).filter_by(user_id=user_id, is_active=True).first()
         goal_str = goal.goal_type.value.lower() if goal else None
 
-        print(f"User goal: {goal_str}")
-        print(f"Constraints: daily_cal={constraints.daily_calories_min}-{constraints.daily_calories_max}, meals/day={constraints.meals_per_day}")
-        print(f"Dietary restrictions: {constraints.dietary_restrictions}")
-        print(f"Max prep time: {constraints.max_prep_time_minutes}")
-
-        # Start with all recipes
-        print("\n1. Starting with all recipes in database...")
-        total_recipes = self.db.query(Recipe).count()
-        print(f"   Total recipes in DB: {total_recipes}")
-
-        query = self.db.query(Recipe)
-
-        # Filter by goal if user has one
-        if goal:
-            print(f"\n2. Filtering by goal: {goal_str}")
-            query = query.filter(cast(Recipe.goals, String).contains(goal_str))
-            count_after_goal = query.count()
-            print(f"   Recipes after goal filter: {count_after_goal}")
-
-            # Show sample of filtered recipes
-            sample = query.limit(5).all()
-            print(f"   Sample recipes that passed goal filter:")
-            for r in sample:
-                print(f"     - ID {r.id}: {r.title[:40]} | goals={r.goals} | source={r.source}")
-
-        # Filter by dietary restrictions
-        if constraints.dietary_restrictions:
-            print(f"\n3. Filtering by dietary restrictions: {constraints.dietary_restrictions}")
-            for restriction in constraints.dietary_restrictions:
-                if restriction == 'vegetarian':
-                    query = query.filter(cast(Recipe.dietary_tags, String).contains('vegetarian'))
-                elif restriction == 'vegan':
-                    query = query.filter(cast(Recipe.dietary_tags, String).contains('vegan'))
-            count_after_dietary = query.count()
-            print(f"   Recipes after dietary filter: {count_after_dietary}")
-
-        # Filter by prep time
-        if constraints.max_prep_time_minutes:
-            print(f"\n4. Filtering by prep time: <= {constraints.max_prep_time_minutes} min")
-            query = query.filter(
-                (Recipe.prep_time_min + Recipe.cook_time_min) <= constraints.max_prep_time_minutes
-            )
-            count_after_time = query.count()
-            print(f"   Recipes after prep time filter: {count_after_time}")
-
-        # Execute query
-        print("\n5. Executing query to get all filtered recipes...")
-        recipes_from_db = query.all()
-        print(f"   Total recipes from DB query: {len(recipes_from_db)}")
-
-        # Count by source
-        source_counts = {}
-        for r in recipes_from_db:
-            source = r.source or 'unknown'
-            source_counts[source] = source_counts.get(source, 0) + 1
-        print(f"   Breakdown by source: {source_counts}")
-
-        # Convert to dict format expected by optimizer
-        print("\n6. Applying calorie range filter...")
-        min_cal_per_meal = constraints.daily_calories_min / constraints.meals_per_day * 0.5
-        max_cal_per_meal = constraints.daily_calories_max / constraints.meals_per_day * 1.5
-        print(f"   Calorie range per meal: {min_cal_per_meal:.1f} - {max_cal_per_meal:.1f} cal")
-
-        recipes = []
-        filtered_out_by_calories = []
-
-        for recipe in recipes_from_db:
-            calories = recipe.macros_per_serving.get('calories', 0)
+        recipes = self.select_candidates(recipe_candidate_index.snapshot(self.db), goal_str, constraints)
 
-            # Only include recipes that could fit in the meal plan
-            if min_cal_per_meal <= calories <= max_cal_per_meal:
-                recipes.append({
-                    'id': recipe.id,
-                    'title': recipe.title,
-                    'source': recipe.source,
-                    'suitable_meal_times': recipe.suitable_meal_times or [],
-                    'goals': recipe.goals or [],
-                    'dietary_tags': recipe.dietary_tags or [],
-                    'macros_per_serving': recipe.macros_per_serving,
-                    'prep_time_min': recipe.prep_time_min or 0,
-                    'cook_time_min': recipe.cook_time_min or 0,
-                    'ingredients': []
-                })
-            else:
-                filtered_out_by_calories.append({
-                    'id': recipe.id,
-                    'title': recipe.title[:40],
-                    'source': recipe.source,
-                    'calories': calories
-                })
-
-        print(f"   Recipes passing calorie filter: {len(recipes)}")
-        print(f"   Recipes filtered out by calories: {len(filtered_out_by_calories)}")
-
-        if filtered_out_by_calories:
-            print(f"\n   Sample of recipes filtered out by calorie range:")
-            for r in filtered_out_by_calories[:5]:
-                print(f"     - ID {r['id']}: {r['title']} | {r['calories']:.0f} cal | source={r['source']}")
-
-        # Count by source after calorie filter
-        source_counts_after_cal = {}
-        for r in recipes:
-            source = r.get('source', 'unknown')
-            source_counts_after_cal[source] = source_counts_after_cal.get(source, 0) + 1
-        print(f"\n   Final recipes by source: {source_counts_after_cal}")
-
-        # Show sample of LLM recipes that made it through
-        llm_recipes = [r for r in recipes if r.get('source') == 'llm_generated']
-        print(f"   LLM recipes that passed all filters: {len(llm_recipes)}")
-        if llm_recipes:
-            print(f"   Sample LLM recipes:")
-            for r in llm_recipes[:5]:
-                print(f"     - ID {r['id']}: {r['title'][:40]} | {r['macros_per_serving']['calories']:.0f} cal")
-
-        # If we don't have enough recipes, relax the calorie constraints
-        if len(recipes) < constraints.meals_per_day * 3:
-            print(f"\n7. NOT ENOUGH RECIPES! Relaxing calorie constraints...")
-            print(f"   Need at least {constraints.meals_per_day * 3} recipes, have {len(recipes)}")
-            recipes = []
-            for recipe in recipes_from_db:
-                recipes.append({
-                    'id': recipe.id,
-                    'title': recipe.title,
-                    'source': recipe.source,
-                    'suitable_meal_times': recipe.suitable_meal_times or [],
-                    'goals': recipe.goals or [],
-                    'dietary_tags': recipe.dietary_tags or [],
-                    'macros_per_serving': recipe.macros_per_serving,
-                    'prep_time_min': recipe.prep_time_min or 0,
-                    'cook_time_min': recipe.cook_time_min or 0,
-                    'ingredients': []
-                })
-            print(f"   After relaxing: {len(recipes)} recipes available")
-
-        print("\n" + "="*80)
-        print(f"FINAL: Returning {len(recipes)} recipes to optimizer")
-        print("="*80 + "\n")
+        logger.info(
+            f"Recipe candidates for user {user_id}: {len(recipes)} "
+            f"(goal={goal_str}, dietary={constraints.dietary_restrictions}, "
+            f"max_time={constraints.max_prep_time_minutes})"
+        )
 
         return recipes
     
+    @staticmethod
+    def select_candidates(snapshot, goal: Optional[str], constraints: OptimizationConstraints) -> List[Dict]:
+        """Candidate recipes for a goal and constraints from a RecipeIndexSnapshot"""
+        # Only include recipes that could fit in the meal plan;
+        # relax the calorie range if that leaves too few recipes
+        min_cal_per_meal = constraints.daily_calories_min / constraints.meals_per_day * 0.5
+        max_cal_per_meal = constraints.daily_calories_max / constraints.meals_per_day * 1.5
+
+        return snapshot.select(
+            goal=goal,
+            dietary_restrictions=constraints.dietary_restrictions,
+            max_total_time=constraints.max_prep_time_minutes,
+            calorie_range=(min_cal_per_meal, max_cal_per_meal),
+            min_results=constraints.meals_per_day * 3
+        )
+    
     # Keep all other methods unchanged...
     def _is_recipe_suitable_for_meal(self, recipe: Dict, meal_slot: int) -> bool:
         """Check if recipe suitable for meal slot"""
@@ -713,7 +987,7 @@ class MealPlanOptimizer:
         total_fat = 0
         total_fiber = 0
         
-        meal_names = ['breakfast', 'lunch', 'dinner', 'snack', 'meal_4', 'meal_5']
+        meal_names = MEAL_NAMES
         
         for d in range(self.days):
             day_plan = {
@@ -768,9 +1042,15 @@ class MealPlanOptimizer:
     
     # Include all other helper methods from original...
     def _score_recipes(self, recipes, constraints, inventory, user_id):
-        """Score recipes based on actual user data and inventory"""
-        
-        
+        """
+        Score recipes based on actual user data and inventory
+
+        Delegates to the vectorized RecipeScoringEngine: all candidate
+        ingredients are loaded in ONE query and every score component is
+        computed for the whole pool at once (was one query + Python loop per recipe).
+        """
+        from app.services.recipe_scoring import RecipeScoringEngine
+
         # Get user's goal
         goal = self.db.query(UserGoal).filter_by(user_id=user_id, is_active=True).first()
         user_goal_type = goal.goal_type.value if goal else 'general_health'
@@ -780,101 +1060,15 @@ class MealPlanOptimizer:
         if inventory:
             user_inventory = inventory
         else:
-            inventory_items = self.db.query(UserInventory).filter_by(user_id=user_id).all()
-            for item in inventory_items:
-                user_inventory[item.item_id] = item.quantity_grams
-        
-        scored = {}
-        
-        # Target macros per meal
-        target_cal_per_meal = ((constraints.daily_calories_min + constraints.daily_calories_max) / 2) / constraints.meals_per_day
-        target_protein_per_meal = constraints.daily_protein_min / constraints.meals_per_day
-        target_carbs_per_meal = (constraints.daily_carbs_min + constraints.daily_carbs_max) / 2 / constraints.meals_per_day
-        target_fat_per_meal = (constraints.daily_fat_min + constraints.daily_fat_max) / 2 / constraints.meals_per_day
-        
-        for recipe in recipes:
-            score = RecipeScore(recipe_id=recipe['id'])
-            
-            # 1. Goal alignment (0-100)
-            recipe_goals = recipe.get('goals', [])
-            if user_goal_type in recipe_goals:
-                score.goal_alignment = 100
-            elif any(g in recipe_goals for g in ['maintenance', 'general_health']):
-                score.goal_alignment = 60
-            else:
-                score.goal_alignment = 30
-            
-            # 2. Macro fit (0-100) - how close to target macros
-            macros = recipe.get('macros_per_serving', {})
-            cal_diff = abs(macros.get('calories', 0) - target_cal_per_meal) / target_cal_per_meal if target_cal_per_meal > 0 else 1
-            protein_diff = abs(macros.get('protein_g', 0) - target_protein_per_meal) / target_protein_per_meal if target_protein_per_meal > 0 else 1
-            carbs_diff = abs(macros.get('carbs_g', 0) - target_carbs_per_meal) / target_carbs_per_meal if target_carbs_per_meal > 0 else 1
-            fat_diff = abs(macros.get('fat_g', 0) - target_fat_per_meal) / target_fat_per_meal if target_fat_per_meal > 0 else 1
-            
-            # Average difference (lower is better)
-            avg_diff = (cal_diff * 0.4 + protein_diff * 0.3 + carbs_diff * 0.2 + fat_diff * 0.1)
-            score.macro_fit = max(0, 100 - (avg_diff * 50))  # Convert to 0-100 scale
-            
-            # 3. Timing appropriateness (0-100)
-            # This stays relatively simple as meal timing is handled elsewhere
-            suitable_times = recipe.get('suitable_meal_times', [])
-            if len(suitable_times) >= 3:  # Very flexible
-                score.timing_appropriateness = 100
-            elif len(suitable_times) == 2:
-                score.timing_appropriateness = 75
-            elif len(suitable_times) == 1:
-                score.timing_appropriateness = 50
-            else:
-                score.timing_appropriateness = 100  # If no restriction, it's flexible
-            
-            # 4. Complexity score (0-100, lower is better)
-            prep_time = recipe.get('prep_time_min', 0)
-            cook_time = recipe.get('cook_time_min', 0)
-            total_time = prep_time + cook_time
-            
-            if total_time <= 15:
-                score.complexity_score = 0  # Very quick
-            elif total_time <= 30:
-                score.complexity_score = 30
-            elif total_time <= 45:
-                score.complexity_score = 60
-            else:
-                score.complexity_score = 90  # Complex
-            
-            # 5. Inventory coverage (0-100) - what % of ingredients are available
-            if user_inventory:
-                # Get recipe ingredients
-                recipe_ingredients = self.db.query(RecipeIngredient).filter_by(recipe_id=recipe['id']).all()
-                
-                if recipe_ingredients:
-                    total_ingredients = len(recipe_ingredients)
-                    available_ingredients = 0
-                    
-                    for ingredient in recipe_ingredients:
-                        if ingredient.item_id in user_inventory:
-                            if user_inventory[ingredient.item_id] >= ingredient.quantity_grams:
-                                available_ingredients += 1
-                            elif user_inventory[ingredient.item_id] > 0:
-                                available_ingredients += 0.5  # Partial credit
-                    
-                    score.inventory_coverage = (available_ingredients / total_ingredients) * 100 if total_ingredients > 0 else 0
-                else:
-                    score.inventory_coverage = 50  # No ingredient data, neutral score
-            else:
-                score.inventory_coverage = 50  # No inventory data, neutral score
-            
-            # Calculate composite score
-            score.calculate_composite({
-                'goal': 0.3,
-                'macro': 0.25,
-                'timing': 0.15,
-                'complexity': 0.1,
-                'inventory': 0.2
-            })
-            
-            scored[recipe['id']] = score
-        
-        return scored
+            inventory_items = self.db.query(
+                UserInventory.item_id, UserInventory.quantity_grams
+            ).filter_by(user_id=user_id).all()
+            for item_id, quantity_grams in inventory_items:
+                user_inventory[item_id] = quantity_grams
+        
+        return RecipeScoringEngine(self.db).score(
+            recipes, constraints, user_goal_type, user_inventory
+        )
     
     
     def _get_user_constraints(self, user_id):
@@ -887,49 +1081,59 @@ class MealPlanOptimizer:
         path = self.db.query(UserPath).filter_by(user_id=user_id).first()
         preferences = self.db.query(UserPreference).filter_by(user_id=user_id).first()
         
-        # If no profile, return defaults
-        if not profile or not profile.goal_calories:
-            return OptimizationConstraints(
-                daily_calories_min=1800,
-                daily_calories_max=2200,
-                daily_protein_min=120,
-                meals_per_day=3,
-                max_recipe_repeat_in_days=2
-            )
-        
-        # Get macro ratios from UserGoal.macro_targets JSON
-        # Format: {"protein": 0.35, "carbs": 0.45, "fat": 0.20}
-        protein_ratio = 0.30  # defaults
-        carb_ratio = 0.40
-        fat_ratio = 0.30
-        
-        if goal and goal.macro_targets:
-            protein_ratio = goal.macro_targets.get('protein', 0.30)
-            carb_ratio = goal.macro_targets.get('carbs', 0.40)
-            fat_ratio = goal.macro_targets.get('fat', 0.30)
-        
-        # Convert ratios to grams using goal_calories
-        daily_protein_g = (profile.goal_calories * protein_ratio) / 4  # 4 cal per g protein
-        daily_carbs_g = (profile.goal_calories * carb_ratio) / 4      # 4 cal per g carbs
-        daily_fat_g = (profile.goal_calories * fat_ratio) / 9         # 9 cal per g fat
-        
-        # Get dietary restrictions - convert enum to string if needed
-        dietary_restrictions = []
-        if preferences and preferences.dietary_type:
-            dietary_restrictions = [preferences.dietary_type.value if hasattr(preferences.dietary_type, 'value') else preferences.dietary_type]
-        
+        return build_user_constraints(profile, goal, path, preferences)
+
+
+def build_user_constraints(profile, goal, path, preferences) -> OptimizationConstraints:
+    """
+    Optimization constraints from already loaded user rows (any may be None).
+    
+    Shared by MealPlanOptimizer._get_user_constraints and the batch
+    planning job, which loads these rows for all users in bulk.
+    """
+    # If no profile, return defaults
+    if not profile or not profile.goal_calories:
         return OptimizationConstraints(
-            daily_calories_min=profile.goal_calories * 0.95,
-            daily_calories_max=profile.goal_calories * 1.05,
-            daily_protein_min=daily_protein_g * 0.9,  # Allow 10% flexibility
-            daily_carbs_min=daily_carbs_g * 0.8,
-            daily_carbs_max=daily_carbs_g * 1.2,
-            daily_fat_min=daily_fat_g * 0.8,
-            daily_fat_max=daily_fat_g * 1.2,
-            daily_fiber_min=20,  # Standard recommendation
-            meals_per_day=path.meals_per_day if path else 3,
-            max_recipe_repeat_in_days=2,
-            max_prep_time_minutes=preferences.max_prep_time_weekday if preferences else 60,
-            dietary_restrictions=dietary_restrictions,
-            allergens=preferences.allergies if preferences and preferences.allergies else []
-        )
\ No newline at end of file
+            daily_calories_min=1800,
+            daily_calories_max=2200,
+            daily_protein_min=120,
+            meals_per_day=3,
+            max_recipe_repeat_in_days=2
+        )
+    
+    # Get macro ratios from UserGoal.macro_targets JSON
+    # Format: {"protein": 0.35, "carbs": 0.45, "fat": 0.20}
+    protein_ratio = 0.30  # defaults
+    carb_ratio = 0.40
+    fat_ratio = 0.30
+    
+    if goal and goal.macro_targets:
+        protein_ratio = goal.macro_targets.get('protein', 0.30)
+        carb_ratio = goal.macro_targets.get('carbs', 0.40)
+        fat_ratio = goal.macro_targets.get('fat', 0.30)
+    
+    # Convert ratios to grams using goal_calories
+    daily_protein_g = (profile.goal_calories * protein_ratio) / 4  # 4 cal per g protein
+    daily_carbs_g = (profile.goal_calories * carb_ratio) / 4      # 4 cal per g carbs
+    daily_fat_g = (profile.goal_calories * fat_ratio) / 9         # 9 cal per g fat
+    
+    # Get dietary restrictions - convert enum to string if needed
+    dietary_restrictions = []
+    if preferences and preferences.dietary_type:
+        dietary_restrictions = [preferences.dietary_type.value if hasattr(preferences.dietary_type, 'value') else preferences.dietary_type]
+    
+    return OptimizationConstraints(
+        daily_calories_min=profile.goal_calories * 0.95,
+        daily_calories_max=profile.goal_calories * 1.05,
+        daily_protein_min=daily_protein_g * 0.9,  # Allow 10% flexibility
+        daily_carbs_min=daily_carbs_g * 0.8,
+        daily_carbs_max=daily_carbs_g * 1.2,
+        daily_fat_min=daily_fat_g * 0.8,
+        daily_fat_max=daily_fat_g * 1.2,
+        daily_fiber_min=20,  # Standard recommendation
+        meals_per_day=path.meals_per_day if path else 3,
+        max_recipe_repeat_in_days=2,
+        max_prep_time_minutes=preferences.max_prep_time_weekday if preferences else 60,
+        dietary_restrictions=dietary_restrictions,
+        allergens=preferences.allergies if preferences and preferences.allergies else []
+    )
\ No newline at end of file
@@ -1,37 +1,264 @@
 # backend/app/services/genetic_optimizer.py
+"""
+Genetic Algorithm meal plan optimizer.
+
+The population is an int matrix (individuals × meal slots) of indices into
+the recipe pool. Macros, suitability and inventory usage are pre-extracted
+into arrays once per run (GAProblem), so fitness for the whole population is
+a single NumPy pass via fancy indexing and selection / crossover / mutation
+operate on whole arrays.
+
+For large populations the population can be split into islands that evolve
+independently (optionally in a process pool) and exchange their best
+individuals every `migration_interval` generations.
+"""
 
-import random
-import numpy as np
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, is_dataclass
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+from app.services.recipe_scoring import RecipeMatrix
 
 logger = logging.getLogger(__name__)
 
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+
+
+def meal_type_names(meals_per_day: int) -> List[str]:
+    """Meal type of each meal index (extra meals beyond snack are unrestricted)"""
+    return [MEAL_TYPES[m] if m < len(MEAL_TYPES) else f'meal_{m}' for m in range(meals_per_day)]
+
+
 @dataclass
 class Individual:
     """Represents a meal plan individual in genetic algorithm"""
     genes: List[int]  # Recipe IDs for each meal slot
     fitness: float = 0.0
-    
+
+
+@dataclass
+class GAParams:
+    """Evolution parameters (picklable for island workers)"""
+    mutation_rate: float = 0.1
+    crossover_rate: float = 0.7
+    elitism_rate: float = 0.1
+    tournament_size: int = 3
+    convergence_threshold: float = 0.95
+
+
+class GAProblem:
+    """
+    Array form of one optimization problem.
+
+    Attributes:
+        recipe_ids: (n,) recipe ids (gene value i -> recipe_ids[i])
+        calories / protein: (n,) per serving
+        candidates: per meal index, recipe indices suitable for it
+        inventory_matrix: (n, k) bool, recipe uses inventory item k
+    """
+
+    def __init__(
+        self,
+        days: int,
+        meals_per_day: int,
+        recipes: List[Dict],
+        constraints: Dict,
+        inventory: Dict[int, float]
+    ):
+        self.days = days
+        self.meals_per_day = meals_per_day
+        self.num_slots = days * meals_per_day
+
+        matrix = RecipeMatrix(recipes)
+        self.recipe_ids = matrix.recipe_ids
+        self.calories = matrix.macros[:, 0].copy()
+        self.protein = matrix.macros[:, 1].copy()
+
+        self.calories_min = constraints['daily_calories_min']
+        self.calories_max = constraints['daily_calories_max']
+        self.protein_min = constraints['daily_protein_min']
+
+        # Suitable recipes per meal index (all recipes if none fit)
+        self.candidates = []
+        for meal_type in meal_type_names(meals_per_day):
+            suitable = np.array(
+                [meal_type in (r.get('suitable_meal_times') or []) for r in recipes], dtype=bool
+            )
+            self.candidates.append(np.flatnonzero(suitable) if suitable.any() else np.arange(len(recipes)))
+        # Slot -> meal index, padded candidate table for vectorized sampling
+        self.slot_meal = np.arange(self.num_slots) % meals_per_day
+        self.candidate_counts = np.array([len(c) for c in self.candidates])
+        self.candidate_table = np.zeros((len(self.candidates), self.candidate_counts.max()), dtype=np.int64)
+        for m, cand in enumerate(self.candidates):
+            self.candidate_table[m, :len(cand)] = cand
+
+        # Recipe × inventory item incidence (only items that appear in the pool)
+        self.inventory_size = max(len(inventory or {}), 1)
+        item_cols = {}
+        pairs = []
+        for r_idx, recipe in enumerate(recipes):
+            for ingredient in recipe.get('ingredients', []) or []:
+                item_id = ingredient.get('item_id')
+                if inventory and item_id in inventory:
+                    pairs.append((r_idx, item_cols.setdefault(item_id, len(item_cols))))
+        self.inventory_matrix = np.zeros((len(recipes), len(item_cols)), dtype=bool)
+        for r_idx, col in pairs:
+            self.inventory_matrix[r_idx, col] = True
+
+    def random_population(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """(size, num_slots) genes with a suitable recipe in every slot"""
+        return self.sample_for_slots(np.broadcast_to(np.arange(self.num_slots), (size, self.num_slots)), rng)
+
+    def sample_for_slots(self, slots: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Random suitable recipe index for each slot index in `slots`"""
+        meals = self.slot_meal[slots]
+        picks = (rng.random(slots.shape) * self.candidate_counts[meals]).astype(np.int64)
+        return self.candidate_table[meals, picks]
+
+    def fitness(self, genes: np.ndarray) -> np.ndarray:
+        """
+        Fitness of every individual at once (same rules as the scalar version):
+        100 - calorie/protein window penalties + variety bonus + inventory bonus
+        """
+        size = genes.shape[0]
+        day_calories = self.calories[genes].reshape(size, self.days, self.meals_per_day).sum(axis=2)
+        day_protein = self.protein[genes].reshape(size, self.days, self.meals_per_day).sum(axis=2)
+
+        penalty = (
+            np.maximum(self.calories_min - day_calories, 0) * 0.1 +
+            np.maximum(day_calories - self.calories_max, 0) * 0.1 +
+            np.maximum(self.protein_min - day_protein, 0) * 0.2
+        ).sum(axis=1)
+
+        # Variety bonus: distinct recipes per individual
+        ordered = np.sort(genes, axis=1)
+        unique_recipes = 1 + (np.diff(ordered, axis=1) != 0).sum(axis=1)
+
+        # Inventory usage bonus: share of inventory items used by the plan
+        if self.inventory_matrix.shape[1]:
+            used_items = self.inventory_matrix[genes].any(axis=1).sum(axis=1)
+            inventory_score = used_items / self.inventory_size
+        else:
+            inventory_score = np.zeros(size)
+
+        fitness = 100.0 - penalty + unique_recipes * 0.5 + inventory_score * 10
+        return np.maximum(0, fitness)
+
+
+def _has_converged(fitness: np.ndarray, threshold: float) -> bool:
+    """Average fitness within `threshold` of the best"""
+    if len(fitness) < 2:
+        return True
+    best = fitness.max()
+    return bool(fitness.mean() / best > threshold) if best > 0 else False
+
+
+def evolve(
+    problem: GAProblem,
+    population: np.ndarray,
+    generations: int,
+    params: GAParams,
+    seed=None
+) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Evolve a population for up to `generations` generations.
+
+    Module-level so island workers can run it in a process pool.
+
+    Returns:
+        (population, fitness, converged), sorted by fitness descending
+    """
+    rng = np.random.default_rng(seed)
+    size, num_slots = population.shape
+    elite_count = int(size * params.elitism_rate)
+    num_children = size - elite_count
+    num_pairs = (num_children + 1) // 2
+    tournament_size = min(params.tournament_size, size)
+
+    fitness = problem.fitness(population)
+    order = np.argsort(-fitness, kind='stable')
+    population, fitness = population[order], fitness[order]
+
+    for _ in range(generations):
+        if _has_converged(fitness, params.convergence_threshold):
+            return population, fitness, True
+
+        # Tournament selection for all parents at once
+        contenders = rng.integers(0, size, size=(2 * num_pairs, tournament_size))
+        winners = contenders[np.arange(2 * num_pairs), np.argmax(fitness[contenders], axis=1)]
+        parents1 = population[winners[:num_pairs]]
+        parents2 = population[winners[num_pairs:]]
+
+        # One-point crossover
+        if num_slots > 1:
+            crossing = rng.random(num_pairs) < params.crossover_rate
+            points = rng.integers(1, num_slots, size=num_pairs)
+            head = (np.arange(num_slots) < points[:, None]) | ~crossing[:, None]
+            child1 = np.where(head, parents1, parents2)
+            child2 = np.where(head, parents2, parents1)
+        else:
+            child1, child2 = parents1.copy(), parents2.copy()
+
+        # Interleave children (c1, c2, c1, c2, ...) and mutate one slot per mutant
+        children = np.empty((2 * num_pairs, num_slots), dtype=population.dtype)
+        children[0::2] = child1
+        children[1::2] = child2
+        children = children[:num_children]
+
+        mutants = np.flatnonzero(rng.random(num_children) < params.mutation_rate)
+        if len(mutants):
+            points = rng.integers(0, num_slots, size=len(mutants))
+            children[mutants, points] = problem.sample_for_slots(points, rng)
+
+        population = np.concatenate([population[:elite_count], children])
+        fitness = np.concatenate([fitness[:elite_count], problem.fitness(children)])
+        order = np.argsort(-fitness, kind='stable')
+        population, fitness = population[order], fitness[order]
+
+    return population, fitness, _has_converged(fitness, params.convergence_threshold)
+
+
 class GeneticMealOptimizer:
     """Genetic Algorithm for meal plan optimization"""
-    
+
     def __init__(
         self,
         population_size: int = 50,
         generations: int = 100,
         mutation_rate: float = 0.1,
         crossover_rate: float = 0.7,
-        elitism_rate: float = 0.1
+        elitism_rate: float = 0.1,
+        islands: int = 1,
+        migration_interval: int = 10,
+        migrants: int = 2,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None
     ):
+        """
+        Args:
+            islands: Split the population into this many islands (1 = panmictic)
+            migration_interval: Generations between migrations
+            migrants: Best individuals each island sends to the next one (ring)
+            max_workers: Process pool size for islands; 0 runs islands in-process
+            seed: RNG seed for reproducible runs
+        """
         self.population_size = population_size
         self.generations = generations
-        self.mutation_rate = mutation_rate
-        self.crossover_rate = crossover_rate
-        self.elitism_rate = elitism_rate
+        self.params = GAParams(
+            mutation_rate=mutation_rate,
+            crossover_rate=crossover_rate,
+            elitism_rate=elitism_rate
+        )
+        self.islands = max(1, islands)
+        self.migration_interval = max(1, migration_interval)
+        self.migrants = migrants
+        self.max_workers = max_workers
+        self.seed = seed
         self.population = []
-        
+
     def optimize(
         self,
         days: int,
@@ -41,228 +268,124 @@ class GeneticMealOptimizer:
         inventory: Dict[int, float]
     ) -> Optional[Dict]:
         """Run genetic algorithm optimization"""
-        
-        # Initialize population
-        self.population = self._initialize_population(
-            days, meals_per_day, recipes
-        )
-        
-        # Evolution loop
-        for generation in range(self.generations):
-            # Evaluate fitness
-            for individual in self.population:
-                individual.fitness = self._evaluate_fitness(
-                    individual, days, meals_per_day, recipes,
-                    constraints, inventory
-                )
-                
-            # Sort by fitness
-            self.population.sort(key=lambda x: x.fitness, reverse=True)
-            
-            # Check convergence
-            if self._has_converged():
-                break
-                
-            # Create next generation
-            next_generation = []
-            
-            # Elitism - keep best individuals
-            elite_count = int(self.population_size * self.elitism_rate)
-            next_generation.extend(self.population[:elite_count])
-            
-            # Crossover and mutation
-            while len(next_generation) < self.population_size:
-                # Select parents
-                parent1 = self._tournament_selection()
-                parent2 = self._tournament_selection()
-                
-                # Crossover
-                if random.random() < self.crossover_rate:
-                    child1, child2 = self._crossover(parent1, parent2)
-                else:
-                    child1, child2 = parent1, parent2
-                
-                # Mutation
-                if random.random() < self.mutation_rate:
-                    child1 = self._mutate(child1, recipes)
-                if random.random() < self.mutation_rate:
-                    child2 = self._mutate(child2, recipes)
-                    
-                next_generation.append(child1)
-                if len(next_generation) < self.population_size:
-                    next_generation.append(child2)
-                    
-            self.population = next_generation
-            
-        # Return best solution
-        best_individual = max(self.population, key=lambda x: x.fitness)
-        return self._individual_to_meal_plan(
-            best_individual, days, meals_per_day, recipes
-        )
-        
-    def _initialize_population(
-        self, days: int, meals_per_day: int, recipes: List[Dict]
-    ) -> List[Individual]:
-        """Create initial random population"""
-        population = []
-        total_slots = days * meals_per_day
-        
-        for _ in range(self.population_size):
-            genes = []
-            for slot in range(total_slots):
-                # Random recipe selection
-                suitable_recipes = [
-                    r for r in recipes
-                    if self._is_suitable_for_slot(r, slot, meals_per_day)
-                ]
-                if suitable_recipes:
-                    genes.append(random.choice(suitable_recipes)['id'])
+        if not recipes or days <= 0 or meals_per_day <= 0:
+            return None
+
+        if is_dataclass(constraints):
+            constraints = asdict(constraints)
+
+        problem = GAProblem(days, meals_per_day, recipes, constraints, inventory or {})
+        seeds = np.random.SeedSequence(self.seed)
+
+        if self.islands == 1:
+            rng = np.random.default_rng(seeds.spawn(1)[0])
+            population = problem.random_population(self.population_size, rng)
+            population, fitness, _ = evolve(problem, population, self.generations, self.params, rng)
+        else:
+            population, fitness = self._run_islands(problem, seeds)
+
+        self.population = [
+            Individual(genes=problem.recipe_ids[genes].tolist(), fitness=float(score))
+            for genes, score in zip(population, fitness)
+        ]
+        best = int(np.argmax(fitness))
+        return self._to_meal_plan(population[best], problem, recipes)
+
+    def _run_islands(self, problem: GAProblem, seeds: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray]:
+        """Island model: evolve sub-populations, migrate best individuals in a ring"""
+        island_size = max(self.population_size // self.islands, 4)
+        island_seeds = seeds.spawn(self.islands)
+        rngs = [np.random.default_rng(s) for s in island_seeds]
+        populations = [problem.random_population(island_size, rng) for rng in rngs]
+        fitnesses = [problem.fitness(pop) for pop in populations]
+
+        executor = ProcessPoolExecutor(max_workers=self.max_workers) if self.max_workers != 0 else None
+        try:
+            remaining = self.generations
+            epoch = 0
+            while remaining > 0:
+                steps = min(self.migration_interval, remaining)
+                epoch_seeds = [s.spawn(1)[0] for s in island_seeds]
+
+                if executor:
+                    futures = [
+                        executor.submit(evolve, problem, pop, steps, self.params, seed)
+                        for pop, seed in zip(populations, epoch_seeds)
+                    ]
+                    results = [f.result() for f in futures]
                 else:
-                    genes.append(recipes[0]['id'])  # Fallback
-                    
-            population.append(Individual(genes=genes))
-            
-        return population
-        
-    def _evaluate_fitness(
-        self, individual: Individual, days: int, meals_per_day: int,
-        recipes: List[Dict], constraints: Dict, inventory: Dict[int, float]
-    ) -> float:
-        """Calculate fitness score for an individual"""
-        fitness = 100.0
-        recipe_map = {r['id']: r for r in recipes}
-        
-        # Check constraints
-        for day in range(days):
-            day_calories = 0
-            day_protein = 0
-            
-            for meal in range(meals_per_day):
-                slot = day * meals_per_day + meal
-                recipe = recipe_map.get(individual.genes[slot])
-                
-                if recipe:
-                    day_calories += recipe['macros_per_serving']['calories']
-                    day_protein += recipe['macros_per_serving']['protein_g']
-                    
-            # Calorie constraint penalty
-            if day_calories < constraints['daily_calories_min']:
-                fitness -= (constraints['daily_calories_min'] - day_calories) * 0.1
-            elif day_calories > constraints['daily_calories_max']:
-                fitness -= (day_calories - constraints['daily_calories_max']) * 0.1
-                
-            # Protein constraint penalty
-            if day_protein < constraints['daily_protein_min']:
-                fitness -= (constraints['daily_protein_min'] - day_protein) * 0.2
-                
-        # Variety bonus
-        unique_recipes = len(set(individual.genes))
-        fitness += unique_recipes * 0.5
-        
-        # Inventory usage bonus
-        inventory_score = self._calculate_inventory_score(
-            individual, recipe_map, inventory
-        )
-        fitness += inventory_score * 10
-        
-        return max(0, fitness)
-        
-    def _tournament_selection(self, tournament_size: int = 3) -> Individual:
-        """Select individual using tournament selection"""
-        tournament = random.sample(self.population, tournament_size)
-        return max(tournament, key=lambda x: x.fitness)
-        
-    def _crossover(
-        self, parent1: Individual, parent2: Individual
-    ) -> Tuple[Individual, Individual]:
-        """Perform crossover between two parents"""
-        crossover_point = random.randint(1, len(parent1.genes) - 1)
-        
-        child1_genes = parent1.genes[:crossover_point] + parent2.genes[crossover_point:]
-        child2_genes = parent2.genes[:crossover_point] + parent1.genes[crossover_point:]
-        
-        return Individual(genes=child1_genes), Individual(genes=child2_genes)
-        
-    def _mutate(self, individual: Individual, recipes: List[Dict]) -> Individual:
-        """Mutate an individual"""
-        mutated_genes = individual.genes.copy()
-        mutation_point = random.randint(0, len(mutated_genes) - 1)
-        
-        # Replace with random suitable recipe
-        suitable_recipes = [r['id'] for r in recipes]
-        mutated_genes[mutation_point] = random.choice(suitable_recipes)
-        
-        return Individual(genes=mutated_genes)
-        
-    def _has_converged(self, threshold: float = 0.95) -> bool:
-        """Check if population has converged"""
-        if len(self.population) < 2:
-            return True
-            
-        best_fitness = self.population[0].fitness
-        avg_fitness = sum(ind.fitness for ind in self.population) / len(self.population)
-        
-        return avg_fitness / best_fitness > threshold if best_fitness > 0 else False
-        
-    def _is_suitable_for_slot(
-        self, recipe: Dict, slot: int, meals_per_day: int
-    ) -> bool:
-        """Check if recipe is suitable for meal slot"""
-        meal_type_idx = slot % meals_per_day
-        meal_types = ['breakfast', 'lunch', 'dinner', 'snack'][:meals_per_day]
-        meal_type = meal_types[meal_type_idx]
-        
-        return meal_type in recipe.get('suitable_meal_times', [])
-        
-    def _calculate_inventory_score(
-        self, individual: Individual, recipe_map: Dict,
-        inventory: Dict[int, float]
-    ) -> float:
-        """Calculate inventory usage score"""
-        used_items = set()
-        
-        for recipe_id in individual.genes:
-            recipe = recipe_map.get(recipe_id)
-            if recipe:
-                for ingredient in recipe.get('ingredients', []):
-                    if ingredient['item_id'] in inventory:
-                        used_items.add(ingredient['item_id'])
-                        
-        return len(used_items) / max(len(inventory), 1)
-        
-    def _individual_to_meal_plan(
-        self, individual: Individual, days: int, meals_per_day: int,
-        recipes: List[Dict]
-    ) -> Dict:
-        """Convert individual to meal plan format"""
-        recipe_map = {r['id']: r for r in recipes}
+                    results = [
+                        evolve(problem, pop, steps, self.params, seed)
+                        for pop, seed in zip(populations, epoch_seeds)
+                    ]
+
+                populations = [r[0] for r in results]
+                fitnesses = [r[1] for r in results]
+                remaining -= steps
+                epoch += 1
+
+                if all(r[2] for r in results):
+                    break
+
+                self._migrate(populations, fitnesses)
+
+            logger.info(f"GA islands: {self.islands} x {island_size}, {epoch} epochs")
+        finally:
+            if executor:
+                executor.shutdown()
+
+        population = np.concatenate(populations)
+        fitness = np.concatenate(fitnesses)
+        order = np.argsort(-fitness, kind='stable')
+        return population[order], fitness[order]
+
+    def _migrate(self, populations: List[np.ndarray], fitnesses: List[np.ndarray]):
+        """Best `migrants` of island i replace the worst of island i+1 (populations are sorted)"""
+        count = min(self.migrants, min(len(p) for p in populations) // 2)
+        if count <= 0:
+            return
+        emigrants = [(pop[:count].copy(), fit[:count].copy()) for pop, fit in zip(populations, fitnesses)]
+        for idx, (genes, fitness) in enumerate(emigrants):
+            target = (idx + 1) % len(populations)
+            populations[target][-count:] = genes
+            fitnesses[target][-count:] = fitness
+            order = np.argsort(-fitnesses[target], kind='stable')
+            populations[target] = populations[target][order]
+            fitnesses[target] = fitnesses[target][order]
+
+    def _to_meal_plan(self, genes: np.ndarray, problem: GAProblem, recipes: List[Dict]) -> Dict:
+        """Convert the best gene row to the optimizer's meal plan format"""
         meal_plan = {
             'week_plan': {},
             'total_calories': 0,
-            'avg_macros': {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0}
+            'avg_macros': {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0, 'fiber_g': 0},
+            'optimization_method': 'genetic_algorithm',
+            'success': True
         }
-        
-        meal_types = ['breakfast', 'lunch', 'dinner', 'snack'][:meals_per_day]
-        
-        for day in range(days):
-            day_plan = {}
-            
+        totals = {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0, 'fiber_g': 0}
+        meal_types = meal_type_names(problem.meals_per_day)
+
+        for day in range(problem.days):
+            day_plan = {
+                'meals': {},
+                'day_calories': 0,
+                'day_macros': {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0}
+            }
             for meal_idx, meal_type in enumerate(meal_types):
-                slot = day * meals_per_day + meal_idx
-                recipe = recipe_map.get(individual.genes[slot])
-                
-                if recipe:
-                    day_plan[meal_type] = recipe
-                    meal_plan['total_calories'] += recipe['macros_per_serving']['calories']
-                    
-                    for macro in ['protein_g', 'carbs_g', 'fat_g']:
-                        meal_plan['avg_macros'][macro] += recipe['macros_per_serving'][macro]
-                        
+                recipe = recipes[int(genes[day * problem.meals_per_day + meal_idx])]
+                macros = recipe.get('macros_per_serving', {})
+                day_plan['meals'][meal_type] = recipe
+                day_plan['day_calories'] += macros.get('calories', 0)
+                for macro in day_plan['day_macros']:
+                    day_plan['day_macros'][macro] += macros.get(macro, 0)
+                for macro in totals:
+                    totals[macro] += macros.get(macro, 0)
+
             meal_plan['week_plan'][f'day_{day}'] = day_plan
-            
-        # Calculate averages
-        total_meals = days * meals_per_day
-        for macro in meal_plan['avg_macros']:
-            meal_plan['avg_macros'][macro] /= total_meals if total_meals > 0 else 1
-            
-        return meal_plan
\ No newline at end of file
+            meal_plan['total_calories'] += day_plan['day_calories']
+
+        for macro, total in totals.items():
+            meal_plan['avg_macros'][macro] = round(total / problem.days, 1)
+        meal_plan['avg_daily_calories'] = round(meal_plan['total_calories'] / problem.days, 0)
+
+        return meal_plan
@@ -1,5 +1,6 @@
 #/backend/services/inventory.py
 from typing import List, Dict, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
@@ -9,6 +10,10 @@ from app.models.database import UserInventory, Item, User, MealLog, Recipe, Reci
 
 # NEW: RAG-based normalizer with vector embeddings
 from app.services.item_normalizer_rag import RAGItemNormalizer, NormalizationResult
+from app.services.item_catalog import item_catalog
+from app.services.inventory_snapshot import inventory_snapshots
+from app.core.events import EventType, event_bus
+from app.services.makeable_recipes import MakeableRecipeEngine
 import logging
 from dataclasses import dataclass
 
@@ -53,15 +58,18 @@ class IntelligentInventoryService:
 
     def __init__(self, db: Session):
         self.db = db
-        # Get all items for normalizer initialization
-        items_list = self.db.query(Item).all()
         from app.core.config import settings
 
+        # Shared process-wide item catalog (loaded once, refreshed incrementally)
+        # instead of query(Item).all() + cache rebuild on every request
+        self.catalog = item_catalog.snapshot(db)
+
         # NEW: Initialize RAG normalizer with vector embeddings
         self.normalizer = RAGItemNormalizer(
-            items_list=items_list,
+            items_list=None,
             db=db,  # NEW: Pass db session for vector queries
-            openai_api_key=settings.openai_api_key
+            openai_api_key=settings.openai_api_key,
+            catalog=self.catalog
         )
 
     def _get_default_expiry_days(self, item: Item) -> int:
@@ -102,6 +110,7 @@ class IntelligentInventoryService:
             )
 
             self.db.commit()
+            event_bus.notify(EventType.INVENTORY_UPDATED, {'user_id': user_id})
 
             # Get total remaining quantity across all batches
             batches = self.db.query(UserInventory).filter(
@@ -132,52 +141,30 @@ class IntelligentInventoryService:
     ) -> Dict:
         """
         Deduct item from inventory - PUBLIC METHOD for tracking agent
+        Consumes the oldest-expiry batches first (see deduct_ingredients)
         """
         try:
-            # Find item in inventory
-            inventory_item = self.db.query(UserInventory).filter(
-                and_(
-                    UserInventory.user_id == user_id,
-                    UserInventory.item_id == item_id
-                )
-            ).first()
-            
-            if not inventory_item:
+            deduction = self.deduct_ingredients(user_id, {item_id: quantity_grams})[item_id]
+
+            if not deduction['in_inventory']:
                 return {
                     "success": False,
                     "error": "Item not in inventory",
                     "remaining_quantity": 0
                 }
-            
-            # Get item details
-            item = self.db.query(Item).filter(Item.id == item_id).first()
-            
-            if inventory_item.quantity_grams < quantity_grams:
-                # Not enough quantity
-                deducted = inventory_item.quantity_grams
-                inventory_item.quantity_grams = 0
-                warning = f"Only {deducted}g available, deducted all"
-            else:
-                # Normal deduction
-                inventory_item.quantity_grams -= quantity_grams
-                deducted = quantity_grams
-                warning = None
-            
-            inventory_item.last_updated = datetime.now()
-            self.db.commit()
-            
+
             result = {
                 "success": True,
-                "item": item.canonical_name if item else "Unknown",
-                "quantity_deducted": deducted,
-                "remaining_quantity": inventory_item.quantity_grams
+                "item": deduction['item_name'] or "Unknown",
+                "quantity_deducted": deduction['deducted'],
+                "remaining_quantity": deduction['remaining']
             }
-            
-            if warning:
-                result["warning"] = warning
-            
+
+            if deduction['shortage'] > 0:
+                result["warning"] = f"Only {deduction['deducted']}g available, deducted all"
+
             return result
-            
+
         except Exception as e:
             logger.error(f"Error deducting item: {str(e)}")
             self.db.rollback()
@@ -186,7 +173,121 @@ class IntelligentInventoryService:
                 "error": str(e),
                 "remaining_quantity": 0
             }
-        
+
+    def deduct_ingredients(
+        self,
+        user_id: int,
+        quantities: Dict[int, float],
+        item_names: Optional[Dict[int, str]] = None,
+        commit: bool = True
+    ) -> Dict[int, Dict]:
+        """
+        Deduct several items in one transaction, oldest expiry batch first.
+
+        All of the user's batches for the requested items are locked with a
+        single SELECT ... FOR UPDATE (ordered by item, so concurrent callers
+        lock in the same order) and consumed FIFO in memory. Missing or short
+        items are deducted as far as stock allows.
+
+        Args:
+            quantities: {item_id: grams to deduct}
+            item_names: {item_id: name} if already known (otherwise loaded)
+            commit: commit here; pass False to join the caller's transaction
+
+        Returns:
+            {item_id: {item_id, item_name, requested, deducted, remaining,
+                       shortage, in_inventory}}
+        """
+        quantities = {item_id: qty or 0 for item_id, qty in quantities.items()}
+        if not quantities:
+            return {}
+
+        if item_names is None:
+            item_names = dict(self.db.query(Item.id, Item.canonical_name).filter(
+                Item.id.in_(quantities)
+            ).all())
+
+        batches = self.db.query(UserInventory).filter(
+            UserInventory.user_id == user_id,
+            UserInventory.item_id.in_(quantities)
+        ).order_by(
+            UserInventory.item_id,
+            UserInventory.expiry_date.is_(None),  # undated batches last
+            UserInventory.expiry_date,
+            UserInventory.id
+        ).with_for_update().all()
+
+        batches_by_item = defaultdict(list)
+        for batch in batches:
+            batches_by_item[batch.item_id].append(batch)
+
+        now = datetime.now()
+        results = {}
+        for item_id, requested in quantities.items():
+            item_batches = batches_by_item.get(item_id, [])
+            outstanding = requested
+            for batch in item_batches:
+                if outstanding <= 0:
+                    break
+                available = batch.quantity_grams or 0
+                if available <= 0:
+                    continue
+                taken = min(available, outstanding)
+                batch.quantity_grams = available - taken
+                batch.last_updated = now
+                outstanding -= taken
+
+            results[item_id] = {
+                'item_id': item_id,
+                'item_name': item_names.get(item_id),
+                'requested': requested,
+                'deducted': requested - outstanding,
+                'remaining': sum(batch.quantity_grams or 0 for batch in item_batches),
+                'shortage': outstanding,
+                'in_inventory': bool(item_batches)
+            }
+
+        if commit:
+            self.db.commit()
+            event_bus.notify(EventType.INVENTORY_UPDATED, {'user_id': user_id})
+        else:
+            self.db.flush()
+
+        return results
+
+    def deduct_recipe(
+        self,
+        user_id: int,
+        recipe_id: int,
+        portion_multiplier: float = 1.0,
+        skip_optional: bool = False,
+        commit: bool = True
+    ) -> Dict[int, Dict]:
+        """
+        Deduct a recipe x portion from inventory in one transaction.
+        Ingredients (with item names) come from one query; see
+        deduct_ingredients for locking and FIFO consumption.
+        """
+        query = self.db.query(
+            RecipeIngredient.item_id,
+            RecipeIngredient.quantity_grams,
+            Item.canonical_name
+        ).outerjoin(
+            Item, Item.id == RecipeIngredient.item_id
+        ).filter(
+            RecipeIngredient.recipe_id == recipe_id
+        )
+        if skip_optional:
+            query = query.filter(RecipeIngredient.is_optional == False)
+
+        quantities = defaultdict(float)
+        item_names = {}
+        for item_id, quantity_grams, name in query.order_by(RecipeIngredient.id).all():
+            quantities[item_id] += (quantity_grams or 0) * portion_multiplier
+            item_names[item_id] = name
+
+        return self.deduct_ingredients(user_id, dict(quantities), item_names=item_names, commit=commit)
+
     def add_items_from_text(self, user_id: int, text_input: str) -> Dict:
         """
         Process text input (like receipt) and add to inventory
@@ -365,6 +466,7 @@ class IntelligentInventoryService:
             self.db.add(inventory_item)
 
         self.db.commit()
+        event_bus.notify(EventType.INVENTORY_UPDATED, {'user_id': user_id})
         logger.info(f"   ✅ Committed to database - Final quantity: {inventory_item.quantity_grams}g")
         return inventory_item
     
@@ -378,59 +480,36 @@ class IntelligentInventoryService:
         Intelligently deduct ingredients when a meal is consumed
         Returns what was deducted and any warnings
         """
-        # Get recipe ingredients
-        ingredients = self.db.query(RecipeIngredient).filter(
-            RecipeIngredient.recipe_id == recipe_id
-        ).all()
-        
+        results = self.deduct_recipe(
+            user_id, recipe_id, portion_multiplier, skip_optional=True
+        )
+
         deductions = []
         warnings = []
-        
-        for ingredient in ingredients:
-            if ingredient.is_optional:
-                continue
-            
-            required_amount = ingredient.quantity_grams * portion_multiplier
-            
-            # Find item in inventory
-            inventory_item = self.db.query(UserInventory).filter(
-                and_(
-                    UserInventory.user_id == user_id,
-                    UserInventory.item_id == ingredient.item_id
-                )
-            ).first()
-            
-            if not inventory_item:
-                warnings.append(f"Item {ingredient.item.canonical_name} not in inventory")
+
+        for deduction in results.values():
+            name = deduction['item_name']
+
+            if not deduction['in_inventory']:
+                warnings.append(f"Item {name} not in inventory")
                 continue
-            
-            if inventory_item.quantity_grams < required_amount:
+
+            if deduction['shortage'] > 0:
                 warnings.append(
-                    f"Not enough {ingredient.item.canonical_name}: "
-                    f"needed {required_amount}g, have {inventory_item.quantity_grams}g"
+                    f"Not enough {name}: "
+                    f"needed {deduction['requested']}g, have {deduction['deducted']}g"
                 )
-                # Deduct what's available
-                deducted = inventory_item.quantity_grams
-                inventory_item.quantity_grams = 0
-            else:
-                # Normal deduction
-                inventory_item.quantity_grams -= required_amount
-                deducted = required_amount
-            
-            inventory_item.last_updated = datetime.now()
-            
+
             deductions.append({
-                'item': ingredient.item.canonical_name,
-                'deducted': deducted,
-                'remaining': inventory_item.quantity_grams
+                'item': name,
+                'deducted': deduction['deducted'],
+                'remaining': deduction['remaining']
             })
-            
+
             # Check if item is now low
-            if inventory_item.quantity_grams < 50:  # Less than 50g
-                warnings.append(f"{ingredient.item.canonical_name} is running low")
-        
-        self.db.commit()
-        
+            if deduction['remaining'] < 50:  # Less than 50g
+                warnings.append(f"{name} is running low")
+
         return {
             'deductions': deductions,
             'warnings': warnings,
@@ -442,18 +521,11 @@ class IntelligentInventoryService:
         Get comprehensive inventory status for AI decision making
         This is what the AI agents will use to make intelligent decisions
 
-        OPTIMIZED: Uses eager loading to eliminate N+1 query problem
+        Reads the cached per-user inventory snapshot (see inventory_snapshot)
         """
-        from sqlalchemy.orm import joinedload
+        snapshot = inventory_snapshots.get(self.db, user_id)
 
-        # OPTIMIZATION: Load inventory WITH related items in ONE query
-        inventory = self.db.query(UserInventory).options(
-            joinedload(UserInventory.item)
-        ).filter(
-            UserInventory.user_id == user_id
-        ).all()
-        
-        if not inventory:
+        if not snapshot.batches:
             return InventoryStatus(
                 total_items=0,
                 total_weight_g=0,
@@ -464,56 +536,21 @@ class IntelligentInventoryService:
                 estimated_days_remaining=0,
                 recommendations=["Your inventory is empty. Add items to get started!"]
             )
-        
-        # Calculate totals
-        total_items = len(inventory)
-        total_weight = sum(item.quantity_grams for item in inventory)
-
-        # OPTIMIZATION: Single loop processes all data (was 3 separate loops)
-        expiring_soon = []
-        low_stock = []
-        categories = {}
-        nutritional_capacity = {
-            'calories': 0,
-            'protein_g': 0,
-            'carbs_g': 0,
-            'fat_g': 0
-        }
-
-        three_days_later = datetime.now() + timedelta(days=3)
 
-        for inv_item in inventory:
-            # Item already loaded via joinedload - NO additional query!
-            item = inv_item.item
-
-            if not item:
-                continue
-
-            # Find expiring items
-            if inv_item.expiry_date and inv_item.expiry_date <= three_days_later:
-                expiring_soon.append({
-                    'item': item.canonical_name,
-                    'quantity': inv_item.quantity_grams,
-                    'expires_in_days': (inv_item.expiry_date - datetime.now()).days
-                })
-
-            # Find low stock items
-            if inv_item.quantity_grams < 100:
-                low_stock.append({
-                    'item': item.canonical_name,
-                    'quantity': inv_item.quantity_grams
-                })
-
-            # Category analysis
-            category = item.category or 'uncategorized'
-            categories[category] = categories.get(category, 0) + 1
-
-            # Nutritional capacity
-            if item.nutrition_per_100g:
-                factor = inv_item.quantity_grams / 100
-                for nutrient in nutritional_capacity:
-                    if nutrient in item.nutrition_per_100g:
-                        nutritional_capacity[nutrient] += item.nutrition_per_100g[nutrient] * factor
+        expiring_soon = [
+            {
+                'item': batch['item_name'],
+                'quantity': batch['quantity_grams'],
+                'expires_in_days': batch['days_until_expiry']
+            }
+            for batch in snapshot.expiring_within(3)
+        ]
+        low_stock = [
+            {'item': batch['item_name'], 'quantity': batch['quantity_grams']}
+            for batch in snapshot.low_stock(100)
+        ]
+        categories = dict(snapshot.category_counts)
+        nutritional_capacity = dict(snapshot.nutritional_capacity)
 
         # Estimate days remaining based on user's calorie needs
         user_profile = self.db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
@@ -524,7 +561,7 @@ class IntelligentInventoryService:
 
         # Generate AI recommendations
         recommendations = self._generate_recommendations(
-            inventory,
+            snapshot.batches,
             expiring_soon,
             categories,
             nutritional_capacity,
@@ -532,8 +569,8 @@ class IntelligentInventoryService:
         )
         
         return InventoryStatus(
-            total_items=total_items,
-            total_weight_g=total_weight,
+            total_items=snapshot.total_items,
+            total_weight_g=snapshot.total_weight_g,
             expiring_soon=expiring_soon,
             low_stock=low_stock,
             categories_available=categories,
@@ -542,9 +579,69 @@ class IntelligentInventoryService:
             recommendations=recommendations
         )
     
-    def get_user_inventory(self, user_id: int, category: str = None, low_stock_only: bool = False, expiring_soon: bool = False):
-        """Fetch inventory items for a specific user with optional filters."""
-        query = self.db.query(UserInventory).filter(UserInventory.user_id == user_id)
+    def get_user_inventory(
+        self,
+        user_id: int,
+        category: str = None,
+        low_stock_only: bool = False,
+        expiring_soon: bool = False,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None
+    ):
+        """
+        Fetch inventory items for a specific user with optional filters.
+
+        Without limit/after_id the whole pantry is served from the inventory
+        snapshot. With them, one keyset page (rows with id > after_id, in id
+        order) is read from SQL via iter_user_inventory; next_cursor is the
+        after_id for the following page (None on the last page).
+        """
+        if limit is None and after_id is None:
+            return self._snapshot_inventory(user_id, category, low_stock_only, expiring_soon)
+
+        items = list(self.iter_user_inventory(
+            user_id,
+            category=category,
+            low_stock_only=low_stock_only,
+            expiring_soon=expiring_soon,
+            after_id=after_id,
+            limit=limit
+        ))
+        next_cursor = items[-1]["id"] if limit and len(items) == limit else None
+
+        return {"count": len(items), "items": items, "next_cursor": next_cursor}
+
+    def iter_user_inventory(
+        self,
+        user_id: int,
+        category: str = None,
+        low_stock_only: bool = False,
+        expiring_soon: bool = False,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 200
+    ):
+        """
+        Stream inventory rows (item name/category joined) in id order.
+
+        Filters and keyset pagination are applied in SQL and rows are fetched
+        batch_size at a time, so large pantries never load as ORM objects.
+        """
+        query = self.db.query(
+            UserInventory.id,
+            UserInventory.item_id,
+            UserInventory.quantity_grams,
+            UserInventory.expiry_date,
+            Item.canonical_name,
+            Item.category
+        ).join(
+            Item, Item.id == UserInventory.item_id
+        ).filter(
+            UserInventory.user_id == user_id
+        )
+
+        if category:
+            query = query.filter(Item.category == category)
 
         if low_stock_only:
             query = query.filter(UserInventory.quantity_grams < 100)
@@ -553,33 +650,66 @@ class IntelligentInventoryService:
             three_days_later = datetime.now() + timedelta(days=3)
             query = query.filter(UserInventory.expiry_date <= three_days_later)
 
-        inventory_items = query.all()
+        if after_id is not None:
+            query = query.filter(UserInventory.id > after_id)
+
+        query = query.order_by(UserInventory.id)
+        if limit:
+            query = query.limit(limit)
+
+        now = datetime.now()
+        for inv_id, item_id, quantity, expiry_date, name, item_category in query.yield_per(batch_size):
+            yield {
+                "id": inv_id,
+                "item_id": item_id,
+                "item_name": name,
+                "category": item_category,
+                "quantity_grams": quantity,
+                "expiry_date": expiry_date.isoformat() if expiry_date else None,
+                "days_until_expiry": (expiry_date - now).days if expiry_date else None
+            }
+
+    def _snapshot_inventory(self, user_id: int, category: str, low_stock_only: bool, expiring_soon: bool) -> Dict:
+        """Whole filtered pantry from the inventory snapshot"""
+        snapshot = inventory_snapshots.get(self.db, user_id)
+
+        if expiring_soon:
+            batches = snapshot.expiring_within(3)
+        else:
+            now = datetime.now()
+            batches = [
+                {
+                    **batch,
+                    'days_until_expiry': (
+                        (datetime.fromisoformat(batch['expiry_date']) - now).days
+                        if batch['expiry_date'] else None
+                    )
+                }
+                for batch in snapshot.batches if batch['item_name'] is not None
+            ]
 
         items = []
-        for inv in inventory_items:
-            item = self.db.query(Item).filter(Item.id == inv.item_id).first()
-            if category and item.category != category:
+        for batch in batches:
+            if low_stock_only and batch['quantity_grams'] >= 100:
+                continue
+            if category and batch['category'] != category:
                 continue
-
-            days_until_expiry = None
-            if inv.expiry_date:
-                days_until_expiry = (inv.expiry_date - datetime.now()).days
 
             items.append({
-                "id": inv.id,
-                "item_id": item.id,
-                "item_name": item.canonical_name,
-                "category": item.category,
-                "quantity_grams": inv.quantity_grams,
-                "expiry_date": inv.expiry_date.isoformat() if inv.expiry_date else None,
-                "days_until_expiry": days_until_expiry
+                "id": batch['id'],
+                "item_id": batch['item_id'],
+                "item_name": batch['item_name'],
+                "category": batch['category'],
+                "quantity_grams": batch['quantity_grams'],
+                "expiry_date": batch['expiry_date'],
+                "days_until_expiry": batch['days_until_expiry']
             })
 
-        return {"count": len(items), "items": items}
+        return {"count": len(items), "items": items, "next_cursor": None}
     
     def _generate_recommendations(
         self,
-        inventory: List[UserInventory],
+        inventory: List[Dict],
         expiring_soon: List[Dict],
         categories: Dict,
         nutritional_capacity: Dict,
@@ -623,68 +753,14 @@ class IntelligentInventoryService:
         """
         Check if user has ingredients for a recipe
         Returns detailed availability report for AI planning
+
+        Quantities are summed across the user's expiry batches of each item.
         """
         recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
         if not recipe:
             return {'available': False, 'reason': 'Recipe not found'}
-        
-        ingredients = self.db.query(RecipeIngredient).filter(
-            RecipeIngredient.recipe_id == recipe_id
-        ).all()
-        
-        availability = {
-            'recipe': recipe.title,
-            'can_make': True,
-            'missing_items': [],
-            'insufficient_items': [],
-            'available_items': [],
-            'coverage_percentage': 0
-        }
-        
-        total_ingredients = 0
-        available_count = 0
-        
-        for ingredient in ingredients:
-            if ingredient.is_optional:
-                continue
-            
-            total_ingredients += 1
-            
-            # Check inventory
-            inventory_item = self.db.query(UserInventory).filter(
-                and_(
-                    UserInventory.user_id == user_id,
-                    UserInventory.item_id == ingredient.item_id
-                )
-            ).first()
-            
-            item = self.db.query(Item).filter(Item.id == ingredient.item_id).first()
-            
-            if not inventory_item:
-                availability['missing_items'].append({
-                    'item': item.canonical_name,
-                    'required': ingredient.quantity_grams
-                })
-                availability['can_make'] = False
-            elif inventory_item.quantity_grams < ingredient.quantity_grams:
-                availability['insufficient_items'].append({
-                    'item': item.canonical_name,
-                    'required': ingredient.quantity_grams,
-                    'available': inventory_item.quantity_grams,
-                    'shortage': ingredient.quantity_grams - inventory_item.quantity_grams
-                })
-                availability['can_make'] = False
-            else:
-                availability['available_items'].append({
-                    'item': item.canonical_name,
-                    'required': ingredient.quantity_grams,
-                    'available': inventory_item.quantity_grams
-                })
-                available_count += 1
-        
-        availability['coverage_percentage'] = (available_count / total_ingredients * 100) if total_ingredients > 0 else 0
-        
-        return availability
+
+        return MakeableRecipeEngine(self.db).availability(user_id, [recipe])[recipe.id]
     
     def get_makeable_recipes(
         self,
@@ -695,7 +771,9 @@ class IntelligentInventoryService:
         """
         Find recipes user can make with current inventory
 
-        Uses optimized SQL pre-filtering to avoid checking all recipes.
+        Presence and quantity coverage for all recipes are computed in one
+        grouped query against the user's aggregated inventory (see
+        MakeableRecipeEngine), instead of an availability check per candidate.
         Returns categorized results: fully_makeable (100%) and partially_makeable (>=80%)
 
         Args:
@@ -709,117 +787,7 @@ class IntelligentInventoryService:
                 'partially_makeable': [recipe_data, ...]
             }
         """
-        from sqlalchemy import func, case, Float
-
-        # Step 1: Get user inventory
-        user_inventory = self.db.query(
-            UserInventory.item_id,
-            UserInventory.quantity_grams
-        ).filter(
-            UserInventory.user_id == user_id,
-            UserInventory.quantity_grams > 0
-        ).all()
-
-        if not user_inventory:
-            return {'fully_makeable': [], 'partially_makeable': []}
-
-        user_items = {item_id: qty for item_id, qty in user_inventory}
-        user_item_ids = set(user_items.keys())
-
-        # Step 2: SQL pre-filtering - only fetch recipes with >= threshold match
-        # This avoids checking all recipes one by one
-        recipe_match_subquery = self.db.query(
-            Recipe.id.label('recipe_id'),
-            func.count(RecipeIngredient.id).label('total_ingredients'),
-            func.sum(
-                case((RecipeIngredient.item_id.in_(user_item_ids), 1), else_=0)
-            ).label('matching_ingredients'),
-            (func.sum(
-                case((RecipeIngredient.item_id.in_(user_item_ids), 1), else_=0)
-            ).cast(Float) * 100.0 / func.count(RecipeIngredient.id)).label('estimated_match_pct')
-        ).join(
-            RecipeIngredient, Recipe.id == RecipeIngredient.recipe_id
-        ).filter(
-            RecipeIngredient.is_optional == False
-        ).group_by(
-            Recipe.id
-        ).having(
-            func.count(RecipeIngredient.id) > 0  # Recipe must have ingredients
-        ).subquery()
-
-        # Fetch promising recipes (3x limit as buffer for quantity validation)
-        recipe_candidates = self.db.query(
-            Recipe,
-            recipe_match_subquery.c.total_ingredients,
-            recipe_match_subquery.c.matching_ingredients,
-            recipe_match_subquery.c.estimated_match_pct
-        ).join(
-            recipe_match_subquery,
-            Recipe.id == recipe_match_subquery.c.recipe_id
-        ).filter(
-            recipe_match_subquery.c.estimated_match_pct >= partial_threshold
-        ).order_by(
-            recipe_match_subquery.c.estimated_match_pct.desc(),
-            Recipe.prep_time_min.asc()
-        ).limit(limit * 3).all()
-
-        # Step 3: Validate quantities for promising recipes only
-        fully_makeable = []
-        partially_makeable = []
-
-        for recipe, total_ing, matching_ing, estimated_pct in recipe_candidates:
-            # Get detailed availability (validates actual quantities)
-            availability = self.check_recipe_availability(user_id, recipe.id)
-
-            # Extract ingredient names
-            available_names = [item['item'] for item in availability['available_items']]
-            missing_names = [item['item'] for item in availability['missing_items']]
-            missing_names.extend([item['item'] for item in availability['insufficient_items']])
-
-            total_ingredients = len(available_names) + len(missing_names)
-            actual_match_pct = availability['coverage_percentage']
-
-            # Skip if quantity check reveals it's below threshold
-            if actual_match_pct < partial_threshold:
-                continue
-
-            # Build complete recipe data with all required fields
-            recipe_data = {
-                'recipe_id': recipe.id,
-                'recipe_name': recipe.title,
-                'description': recipe.description,
-                'prep_time_minutes': recipe.prep_time_min,
-                'servings': recipe.servings,
-                'available_ingredients': len(available_names),
-                'total_ingredients': total_ingredients,
-                'available_ingredient_names': available_names,
-                'match_percentage': round(actual_match_pct, 1),
-                'macros': recipe.macros_per_serving,
-                'goals': recipe.goals
-            }
-
-            if availability['can_make']:
-                # 100% match - fully makeable
-                fully_makeable.append(recipe_data)
-            else:
-                # Partial match (80-99%)
-                recipe_data['missing_ingredient_names'] = missing_names
-                partially_makeable.append(recipe_data)
-
-            # Early exit if we have enough in both categories
-            if len(fully_makeable) >= limit and len(partially_makeable) >= limit:
-                break
-
-        # Final sorting
-        fully_makeable.sort(key=lambda x: x.get('prep_time_minutes', 999))
-        partially_makeable.sort(
-            key=lambda x: (-x.get('match_percentage', 0), x.get('prep_time_minutes', 999))
-        )
-
-        return {
-            'fully_makeable': fully_makeable[:limit],
-            'partially_makeable': partially_makeable[:limit]
-        }
+        return MakeableRecipeEngine(self.db).makeable_recipes(user_id, limit, partial_threshold)
 
     async def process_receipt_items(
         self,
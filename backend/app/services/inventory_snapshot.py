@@ -0,0 +1,395 @@
+# backend/app/services/inventory_snapshot.py
+"""
+Per-user inventory snapshot.
+
+get_inventory_status, get_user_inventory, the dashboard inventory card and
+the TrackingAgent inventory checks all used to re-read and re-aggregate the
+same user_inventory rows, often several times within one request. The
+snapshot is built from ONE inventory x item query and holds:
+
+- batches (one entry per user_inventory row, item name/category joined)
+- per-item aggregated quantities and earliest expiry
+- expiry bucket counts, category counts and nutritional capacity
+
+Snapshots are stored as JSON in Redis (shared across workers), rebuilt lazily
+on the first read after a change and invalidated by the INVENTORY_UPDATED and
+MEAL_LOGGED events. Every invalidation also bumps a per-user generation
+counter; a snapshot is only written, and only served, under the generation it
+was built from, so an invalidation racing a rebuild is never lost.
+When Redis is unreachable a process-local store is used instead, and the
+invalidations it missed are replayed once it is reachable again. Anything relative to "now" (days until expiry, what is expiring) is
+evaluated at read time from the stored expiry dates.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.events import EventType, event_bus
+from app.models.database import Item, UserInventory
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_SECONDS = 300
+REDIS_RETRY_SECONDS = 30
+KEY_PREFIX = "inventory:snapshot:"
+GENERATION_PREFIX = "inventory:generation:"
+GENERATION_ALL_KEY = f"{GENERATION_PREFIX}all"
+
+EXPIRING_WITHIN_DAYS = 3
+LOW_STOCK_GRAMS = 100
+
+NUTRIENTS = ('calories', 'protein_g', 'carbs_g', 'fat_g')
+
+
+# ============================================================================
+# SNAPSHOT
+# ============================================================================
+
+@dataclass
+class InventorySnapshot:
+    """Aggregated view of one user's inventory"""
+    user_id: int
+    built_at: datetime
+    batches: List[Dict]  # id, item_id, item_name, category, quantity_grams, expiry_date
+    items: Dict[int, Dict] = field(default_factory=dict)  # item_id -> totals
+    expiry_buckets: Dict[str, int] = field(default_factory=dict)
+    category_counts: Dict[str, int] = field(default_factory=dict)
+    nutritional_capacity: Dict[str, float] = field(default_factory=dict)
+    total_weight_g: float = 0
+    generation: str = ''  # Cache invalidation generation it was built under
+
+    @property
+    def total_items(self) -> int:
+        return len(self.batches)
+
+    @classmethod
+    def build(cls, db: Session, user_id: int) -> "InventorySnapshot":
+        """Build from one inventory x item query"""
+        rows = db.query(
+            UserInventory.id,
+            UserInventory.item_id,
+            UserInventory.quantity_grams,
+            UserInventory.expiry_date,
+            Item.canonical_name,
+            Item.category,
+            Item.nutrition_per_100g
+        ).outerjoin(
+            Item, Item.id == UserInventory.item_id
+        ).filter(
+            UserInventory.user_id == user_id
+        ).order_by(UserInventory.id).all()
+
+        now = datetime.now()
+        batches = []
+        items = {}
+        buckets = {'expired': 0, 'within_3_days': 0, 'within_7_days': 0, 'later': 0, 'no_expiry': 0}
+        categories = defaultdict(int)
+        capacity = dict.fromkeys(NUTRIENTS, 0.0)
+        total_weight = 0.0
+
+        for batch_id, item_id, quantity, expiry_date, name, category, nutrition in rows:
+            quantity = quantity or 0
+            total_weight += quantity
+            batches.append({
+                'id': batch_id,
+                'item_id': item_id,
+                'item_name': name,
+                'category': category,
+                'quantity_grams': quantity,
+                'expiry_date': expiry_date.isoformat() if expiry_date else None
+            })
+
+            # Rows without a catalog item only count towards totals
+            if name is None:
+                continue
+
+            item = items.setdefault(item_id, {
+                'item_id': item_id,
+                'item_name': name,
+                'category': category,
+                'quantity_grams': 0.0,
+                'batches': 0,
+                'earliest_expiry': None
+            })
+            item['quantity_grams'] += quantity
+            item['batches'] += 1
+            if expiry_date and (item['earliest_expiry'] is None or expiry_date.isoformat() < item['earliest_expiry']):
+                item['earliest_expiry'] = expiry_date.isoformat()
+
+            if expiry_date is None:
+                buckets['no_expiry'] += 1
+            elif expiry_date < now:
+                buckets['expired'] += 1
+            elif expiry_date <= now + timedelta(days=3):
+                buckets['within_3_days'] += 1
+            elif expiry_date <= now + timedelta(days=7):
+                buckets['within_7_days'] += 1
+            else:
+                buckets['later'] += 1
+
+            categories[category or 'uncategorized'] += 1
+
+            if nutrition:
+                factor = quantity / 100
+                for nutrient in NUTRIENTS:
+                    if nutrient in nutrition:
+                        capacity[nutrient] += (nutrition[nutrient] or 0) * factor
+
+        return cls(
+            user_id=user_id,
+            built_at=now,
+            batches=batches,
+            items=items,
+            expiry_buckets=buckets,
+            category_counts=dict(categories),
+            nutritional_capacity=capacity,
+            total_weight_g=total_weight
+        )
+
+    # ===== READ HELPERS =====
+
+    def expiring_within(self, days: int = EXPIRING_WITHIN_DAYS, now: Optional[datetime] = None) -> List[Dict]:
+        """Batches (with a catalog item) expiring within `days`, expired ones included"""
+        now = now or datetime.now()
+        cutoff = now + timedelta(days=days)
+        expiring = []
+        for batch in self.batches:
+            if batch['item_name'] is None or not batch['expiry_date']:
+                continue
+            expiry_date = datetime.fromisoformat(batch['expiry_date'])
+            if expiry_date <= cutoff:
+                expiring.append({**batch, 'days_until_expiry': (expiry_date - now).days})
+        return expiring
+
+    def low_stock(self, threshold: float = LOW_STOCK_GRAMS) -> List[Dict]:
+        """Batches (with a catalog item) below `threshold` grams"""
+        return [
+            batch for batch in self.batches
+            if batch['item_name'] is not None and batch['quantity_grams'] < threshold
+        ]
+
+    def quantity(self, item_id: int) -> float:
+        """Total grams of an item across batches"""
+        item = self.items.get(item_id)
+        return item['quantity_grams'] if item else 0
+
+    # ===== SERIALIZATION =====
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'user_id': self.user_id,
+            'built_at': self.built_at.isoformat(),
+            'batches': self.batches,
+            'items': self.items,
+            'expiry_buckets': self.expiry_buckets,
+            'category_counts': self.category_counts,
+            'nutritional_capacity': self.nutritional_capacity,
+            'total_weight_g': self.total_weight_g,
+            'generation': self.generation
+        })
+
+    @classmethod
+    def from_json(cls, payload: str) -> "InventorySnapshot":
+        data = json.loads(payload)
+        return cls(
+            user_id=data['user_id'],
+            built_at=datetime.fromisoformat(data['built_at']),
+            batches=data['batches'],
+            items={int(item_id): item for item_id, item in data['items'].items()},
+            expiry_buckets=data['expiry_buckets'],
+            category_counts=data['category_counts'],
+            nutritional_capacity=data['nutritional_capacity'],
+            total_weight_g=data['total_weight_g'],
+            generation=data.get('generation', '')
+        )
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class InventorySnapshotCache:
+    """
+    Redis-backed snapshot store with lazy rebuilds.
+
+    Falls back to a process-local dict (same TTL) while Redis is unreachable,
+    retrying the connection every REDIS_RETRY_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: int = SNAPSHOT_TTL_SECONDS, redis_client=None, use_redis: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._redis = redis_client
+        self._redis_down_until = 0.0
+        self._local: Dict[int, tuple] = {}
+        self._local_epoch = 0
+        self._local_generations: Dict[int, int] = {}
+        # Invalidations Redis missed while unreachable (None = all users)
+        self._pending_invalidations: set = set()
+        self._lock = threading.Lock()
+
+    def _client(self):
+        if not self.use_redis or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                from app.core.config import settings
+
+                self._redis = redis.Redis.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=0.5,
+                    socket_timeout=0.5
+                )
+            except Exception as e:
+                logger.warning(f"Inventory snapshot cache: Redis unavailable ({str(e)})")
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+                return None
+        if self._pending_invalidations and not self._replay_invalidations(self._redis):
+            return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"Inventory snapshot cache: falling back to local store ({str(e)})")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _replay_invalidations(self, client) -> bool:
+        """Apply invalidations missed while Redis was down; False if it still is"""
+        with self._lock:
+            pending, self._pending_invalidations = self._pending_invalidations, set()
+        try:
+            if None in pending:
+                self._invalidate_redis(client, None)
+            else:
+                for user_id in pending:
+                    self._invalidate_redis(client, user_id)
+            return True
+        except Exception as e:
+            with self._lock:
+                self._pending_invalidations |= pending
+            self._redis_failed(e)
+            return False
+
+    @staticmethod
+    def _invalidate_redis(client, user_id: Optional[int]):
+        if user_id is None:
+            client.incr(GENERATION_ALL_KEY)
+            keys = list(client.scan_iter(f"{KEY_PREFIX}*"))
+            if keys:
+                client.delete(*keys)
+        else:
+            client.incr(f"{GENERATION_PREFIX}{user_id}")
+            client.delete(f"{KEY_PREFIX}{user_id}")
+
+    def _local_generation(self, user_id: int) -> str:
+        return f"local:{self._local_epoch}:{self._local_generations.get(user_id, 0)}"
+
+    def _generation(self, user_id: int) -> str:
+        """Current invalidation generation of a user's snapshot"""
+        client = self._client()
+        if client is not None:
+            try:
+                return ":".join(
+                    value or "0"
+                    for value in client.mget(GENERATION_ALL_KEY, f"{GENERATION_PREFIX}{user_id}")
+                )
+            except Exception as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            return self._local_generation(user_id)
+
+    def _read(self, user_id: int) -> Tuple[Optional[str], str]:
+        """(cached payload or None, current generation) in one round-trip"""
+        client = self._client()
+        if client is not None:
+            try:
+                payload, all_generation, user_generation = client.mget(
+                    f"{KEY_PREFIX}{user_id}", GENERATION_ALL_KEY, f"{GENERATION_PREFIX}{user_id}"
+                )
+                return payload, f"{all_generation or 0}:{user_generation or 0}"
+            except Exception as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            generation = self._local_generation(user_id)
+            entry = self._local.get(user_id)
+        if entry is None or time.monotonic() > entry[0]:
+            return None, generation
+        return entry[1], generation
+
+    def _write(self, user_id: int, payload: str):
+        client = self._client()
+        if client is not None:
+            try:
+                client.setex(f"{KEY_PREFIX}{user_id}", self.ttl_seconds, payload)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            self._local[user_id] = (time.monotonic() + self.ttl_seconds, payload)
+
+    def get(self, db: Session, user_id: int) -> InventorySnapshot:
+        """Cached snapshot, rebuilt if missing, expired, invalidated or built on another day"""
+        payload, generation = self._read(user_id)
+        if payload:
+            try:
+                snapshot = InventorySnapshot.from_json(payload)
+                if snapshot.generation == generation and snapshot.built_at.date() == date.today():
+                    return snapshot
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Discarding unreadable inventory snapshot for user {user_id}: {str(e)}")
+
+        snapshot = InventorySnapshot.build(db, user_id)
+        snapshot.generation = generation
+
+        # Invalidated while building: serve this one, but don't cache it
+        if self._generation(user_id) == generation:
+            self._write(user_id, snapshot.to_json())
+        return snapshot
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's snapshot (or all snapshots) and bump its generation"""
+        with self._lock:
+            if user_id is None:
+                self._local.clear()
+                self._local_epoch += 1
+            else:
+                self._local.pop(user_id, None)
+                self._local_generations[user_id] = self._local_generations.get(user_id, 0) + 1
+
+        if not self.use_redis:
+            return
+
+        client = self._client()
+        if client is not None:
+            try:
+                self._invalidate_redis(client, user_id)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+
+        with self._lock:
+            self._pending_invalidations.add(user_id)
+
+
+inventory_snapshots = InventorySnapshotCache()
+
+
+def _invalidate_from_event(data: Dict):
+    if data and data.get('user_id') is not None:
+        inventory_snapshots.invalidate(data['user_id'])
+
+
+for _event_type in (EventType.INVENTORY_UPDATED, EventType.MEAL_LOGGED):
+    event_bus.subscribe(_event_type, _invalidate_from_event)
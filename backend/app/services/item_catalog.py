@@ -0,0 +1,366 @@
+"""
+Shared Item Catalog for Nutrilens
+=================================
+
+Process-wide, versioned in-memory view of the ``items`` table.
+
+Before this, every IntelligentInventoryService / TrackingAgent / manual-entry
+request ran ``db.query(Item).all()`` (embeddings included) and rebuilt the
+normalizer caches from scratch. The catalog loads the table ONCE per process
+into compact ``__slots__`` records and publishes immutable snapshots with
+name/alias/category/token indexes that every normalizer shares.
+
+New items are folded in incrementally:
+- Local inserts (receipt confirm-and-seed, recipe ingredient auto-seed) call
+  ``add_items()`` right after the flush/commit
+- Inserts from other worker processes are picked up by a cheap
+  ``WHERE id > db_max_id`` refresh, at most every REFRESH_INTERVAL_SECONDS.
+  db_max_id is the highest id READ FROM THE DB, so local add_items() calls
+  never move it past rows other workers have not committed yet
+- Items have no updated_at, so edits (names, aliases, nutrition) and rows
+  committed out of id order are picked up by a full reload every
+  FULL_RELOAD_INTERVAL_SECONDS
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.database import Item
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# RECORDS
+# ============================================================================
+
+class CatalogItem:
+    """
+    Compact, read-only copy of an Item row.
+
+    Exposes the same attributes the normalizers and enrichers read from ORM
+    Items, without the embedding text or SQLAlchemy instance state.
+    """
+
+    __slots__ = (
+        'id',
+        'canonical_name',
+        'aliases',
+        'category',
+        'unit',
+        'density_g_per_ml',
+        'nutrition_per_100g',
+        'fdc_id',
+        'is_staple',
+    )
+
+    def __init__(
+        self,
+        id: int,
+        canonical_name: str,
+        aliases: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        unit: Optional[str] = None,
+        density_g_per_ml: Optional[float] = None,
+        nutrition_per_100g: Optional[Dict] = None,
+        fdc_id: Optional[str] = None,
+        is_staple: bool = False
+    ):
+        self.id = id
+        self.canonical_name = canonical_name
+        self.aliases = tuple(aliases or ())
+        self.category = category
+        self.unit = unit or "g"
+        self.density_g_per_ml = density_g_per_ml
+        self.nutrition_per_100g = nutrition_per_100g or {}
+        self.fdc_id = fdc_id
+        self.is_staple = bool(is_staple)
+
+    @classmethod
+    def from_row(cls, row) -> "CatalogItem":
+        """Build from an ORM Item or a column tuple with the same attribute names"""
+        return cls(
+            id=row.id,
+            canonical_name=row.canonical_name,
+            aliases=row.aliases,
+            category=row.category,
+            unit=row.unit,
+            density_g_per_ml=row.density_g_per_ml,
+            nutrition_per_100g=row.nutrition_per_100g,
+            fdc_id=row.fdc_id,
+            is_staple=row.is_staple,
+        )
+
+    def __repr__(self) -> str:
+        return f"CatalogItem(id={self.id}, canonical_name={self.canonical_name!r})"
+
+
+class CatalogSnapshot:
+    """
+    Immutable, versioned set of catalog records plus lookup indexes.
+
+    Snapshots are never mutated after publication, so a normalizer can hold
+    one for the whole request while the catalog moves on to a newer version.
+    """
+
+    __slots__ = (
+        'version',
+        'items',
+        'by_id',
+        'by_name',
+        'by_alias',
+        'by_category',
+        'by_tokens',
+        'max_id',
+    )
+
+    def __init__(self, version: int, items: List[CatalogItem]):
+        self.version = version
+        self.items = items
+        self.by_id: Dict[int, CatalogItem] = {}
+        self.by_name: Dict[str, CatalogItem] = {}
+        self.by_alias: Dict[str, CatalogItem] = {}
+        self.by_category: Dict[str, List[CatalogItem]] = {}
+        self.by_tokens: Dict[str, List[CatalogItem]] = {}
+        self.max_id = 0
+
+        for item in items:
+            self._index(item)
+
+    def _index(self, item: CatalogItem):
+        self.by_id[item.id] = item
+        self.by_name[item.canonical_name.lower()] = item
+
+        for alias in item.aliases:
+            self.by_alias[alias.lower()] = item
+
+        category = item.category or 'uncategorized'
+        self.by_category.setdefault(category, []).append(item)
+
+        for token in item.canonical_name.lower().split('_'):
+            self.by_tokens.setdefault(token, []).append(item)
+
+        if item.id > self.max_id:
+            self.max_id = item.id
+
+    def extended(self, new_items: List[CatalogItem]) -> "CatalogSnapshot":
+        """
+        Return a new snapshot with new_items added.
+
+        Copies the index containers (cheap compared to a table load) so the
+        current snapshot stays untouched for readers still holding it.
+        """
+        snapshot = CatalogSnapshot.__new__(CatalogSnapshot)
+        snapshot.version = self.version + 1
+        snapshot.items = list(self.items)
+        snapshot.by_id = dict(self.by_id)
+        snapshot.by_name = dict(self.by_name)
+        snapshot.by_alias = dict(self.by_alias)
+        snapshot.by_category = {k: list(v) for k, v in self.by_category.items()}
+        snapshot.by_tokens = {k: list(v) for k, v in self.by_tokens.items()}
+        snapshot.max_id = self.max_id
+
+        for item in new_items:
+            if item.id in snapshot.by_id:
+                continue
+            snapshot.items.append(item)
+            snapshot._index(item)
+
+        return snapshot
+
+    def get(self, item_id: int) -> Optional[CatalogItem]:
+        return self.by_id.get(item_id)
+
+    def as_cache(self) -> Dict:
+        """Cache dict in the shape the normalizers' _build_cache() produced"""
+        return {
+            'by_id': self.by_id,
+            'by_name': self.by_name,
+            'by_alias': self.by_alias,
+            'by_category': self.by_category,
+            'by_tokens': self.by_tokens,
+            'all_items': self.items,
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+# ============================================================================
+# CATALOG
+# ============================================================================
+
+class ItemCatalog:
+    """
+    Process-wide holder of the current CatalogSnapshot.
+
+    Reads are lock-free (a single attribute read); loads and incremental
+    refreshes are serialized by a lock and publish a new snapshot.
+    """
+
+    # How often snapshot() checks the DB for rows inserted by other workers
+    REFRESH_INTERVAL_SECONDS = 30
+
+    # How often snapshot() reloads the whole table to pick up edited rows
+    FULL_RELOAD_INTERVAL_SECONDS = 600
+
+    # Only the columns the catalog keeps - never the embedding text
+    _COLUMNS = (
+        Item.id,
+        Item.canonical_name,
+        Item.aliases,
+        Item.category,
+        Item.unit,
+        Item.density_g_per_ml,
+        Item.nutrition_per_100g,
+        Item.fdc_id,
+        Item.is_staple,
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        # Highest id seen in a DB read (load/refresh) - unlike snapshot.max_id,
+        # not raised by add_items()
+        self._db_max_id = 0
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        """
+        Get the current snapshot, loading or incrementally refreshing as needed.
+
+        Args:
+            db: Session used only when a load/refresh is actually required
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load(db)
+
+        now = time.monotonic()
+        if now - self._last_full_load >= self.FULL_RELOAD_INTERVAL_SECONDS:
+            return self.reload(db)
+
+        if now - self._last_refresh >= self.REFRESH_INTERVAL_SECONDS:
+            self.refresh(db)
+            return self._snapshot
+
+        return snapshot
+
+    def load(self, db: Session) -> CatalogSnapshot:
+        """Full load of the items table (first use, or after invalidate())"""
+        with self._lock:
+            # Another thread may have loaded while we waited for the lock
+            if self._snapshot is not None:
+                return self._snapshot
+            return self._load_locked(db)
+
+    def reload(self, db: Session) -> CatalogSnapshot:
+        """Replace the snapshot with a fresh full load (picks up edited rows)"""
+        with self._lock:
+            return self._load_locked(db)
+
+    def _load_locked(self, db: Session) -> CatalogSnapshot:
+        started = time.perf_counter()
+        rows = db.query(*self._COLUMNS).order_by(Item.id).all()
+        items = [CatalogItem.from_row(row) for row in rows]
+
+        self._snapshot = CatalogSnapshot(version=self.version + 1, items=items)
+        self._db_max_id = self._snapshot.max_id
+        self._last_refresh = self._last_full_load = time.monotonic()
+
+        logger.info(
+            f"Item catalog loaded: {len(items)} items "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return self._snapshot
+
+    def refresh(self, db: Session) -> int:
+        """
+        Fold in rows inserted since the last load/refresh (id > db_max_id).
+
+        Rows already registered locally via add_items() come back here too
+        and are skipped by extended().
+
+        Returns:
+            Number of new items added to the catalog
+        """
+        if self._snapshot is None:
+            self.load(db)
+            return 0
+
+        with self._lock:
+            current = self._snapshot
+            rows = db.query(*self._COLUMNS).filter(
+                Item.id > self._db_max_id
+            ).order_by(Item.id).all()
+            self._last_refresh = time.monotonic()
+
+            if not rows:
+                return 0
+
+            self._db_max_id = rows[-1].id
+            new_items = [CatalogItem.from_row(row) for row in rows if row.id not in current.by_id]
+            if not new_items:
+                return 0
+
+            self._snapshot = current.extended(new_items)
+            logger.info(
+                f"Item catalog refreshed: +{len(new_items)} items (version {self._snapshot.version})"
+            )
+            return len(new_items)
+
+    def add_items(self, items: Iterable) -> None:
+        """
+        Register freshly inserted Items (ORM objects with ids assigned).
+
+        No-op until the catalog has been loaded - the first load will see them.
+        """
+        new_items = [CatalogItem.from_row(item) for item in items if item.id is not None]
+        if not new_items:
+            return
+
+        with self._lock:
+            if self._snapshot is None:
+                return
+            self._snapshot = self._snapshot.extended(new_items)
+            logger.info(
+                f"Item catalog: +{len(new_items)} items (version {self._snapshot.version})"
+            )
+
+    def lookup(self, db: Session, item_id: int) -> Optional[CatalogItem]:
+        """Get an item by id, refreshing once if it was inserted by another worker"""
+        item = self.snapshot(db).get(item_id)
+        if item is None:
+            self.refresh(db)
+            item = self._snapshot.get(item_id)
+        return item
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; next access reloads the whole table (e.g. after bulk edits)"""
+        with self._lock:
+            self._snapshot = None
+            self._last_refresh = 0.0
+            self._last_full_load = 0.0
+            self._db_max_id = 0
+
+
+# Global catalog instance (one per worker process)
+item_catalog = ItemCatalog()
+
+
+def get_item_catalog(db: Session) -> CatalogSnapshot:
+    """Convenience accessor for the current catalog snapshot"""
+    return item_catalog.snapshot(db)
@@ -77,10 +77,19 @@ class IntelligentItemNormalizer:
     3. LLM threshold: 0.75 (lower because more context-aware)
     """
 
-    def __init__(self, items_list: List[Item], openai_api_key: str = None):
-        """Initialize with inventory items"""
-        self.items_list = items_list
-        self.items_cache = self._build_cache()
+    def __init__(self, items_list: Optional[List[Item]], openai_api_key: str = None, catalog=None):
+        """
+        Initialize with inventory items
+
+        Pass catalog (a shared CatalogSnapshot from item_catalog) to reuse its
+        prebuilt indexes instead of rebuilding them from items_list.
+        """
+        if catalog is not None:
+            self.items_list = catalog.items
+            self.items_cache = catalog.as_cache()
+        else:
+            self.items_list = items_list or []
+            self.items_cache = self._build_cache()
         self.brand_patterns = self._load_brand_patterns()
         self.unit_patterns = self._compile_unit_patterns()
         self.common_misspellings = self._load_common_misspellings()
@@ -100,6 +109,7 @@ class IntelligentItemNormalizer:
     def _build_cache(self) -> Dict:
         """Build intelligent cache with multiple access patterns"""
         cache = {
+            'by_id': {},
             'by_name': {},
             'by_alias': {},
             'by_category': {},
@@ -108,6 +118,7 @@ class IntelligentItemNormalizer:
         }
 
         for item in self.items_list:
+            cache['by_id'][item.id] = item
             cache['by_name'][item.canonical_name.lower()] = item
 
             for alias in item.aliases:
@@ -616,10 +627,7 @@ If no match found: {{"matched_item_id": null, "quantity_grams": <estimated_grams
 
                     if matched_id:
                         # Find matched item
-                        matched_item = next(
-                            (i for i in self.items_cache['all_items'] if i.id == matched_id),
-                            None
-                        )
+                        matched_item = self.items_cache['by_id'].get(matched_id)
 
                         if matched_item:
                             # Success!
@@ -87,21 +87,28 @@ class RAGItemNormalizer:
 
     def __init__(
         self,
-        items_list: List[Item],
+        items_list: Optional[List[Item]],
         db: Session,
-        openai_api_key: str
+        openai_api_key: str,
+        catalog=None
     ):
         """
         Initialize RAG normalizer
 
         Args:
-            items_list: List of Item objects from database
+            items_list: List of Item objects from database (ignored when catalog is given)
             db: SQLAlchemy session for vector queries
             openai_api_key: OpenAI API key for embeddings and LLM
+            catalog: Shared CatalogSnapshot from item_catalog - reuses its
+                prebuilt indexes instead of rebuilding them per request
         """
-        self.items_list = items_list
         self.db = db
-        self.items_cache = self._build_cache()
+        if catalog is not None:
+            self.items_list = catalog.items
+            self.items_cache = catalog.as_cache()
+        else:
+            self.items_list = items_list or []
+            self.items_cache = self._build_cache()
 
         # Initialize embedding service
         from app.services.embedding_service import EmbeddingService
@@ -118,17 +125,20 @@ class RAGItemNormalizer:
         self.vector_llm_threshold = 0.75    # Send to LLM below this
         self.auto_add_threshold = 0.75      # Auto-add items above this
 
-        logger.info(f"RAG Normalizer initialized with {len(items_list)} items")
+        logger.info(f"RAG Normalizer initialized with {len(self.items_list)} items")
 
     def _build_cache(self) -> Dict:
         """Build lookup caches for fast exact/alias matching"""
         cache = {
+            'by_id': {},
             'by_name': {},
             'by_alias': {},
             'all_items': self.items_list
         }
 
         for item in self.items_list:
+            cache['by_id'][item.id] = item
+
             # Canonical name lookup (case-insensitive)
             cache['by_name'][item.canonical_name.lower()] = item
 
@@ -150,6 +160,17 @@ class RAGItemNormalizer:
         text = ''.join(c for c in text if c.isalnum() or c == '_')
         return text
 
+    def _get_item_by_id(self, item_id: int) -> Optional[Item]:
+        """
+        O(1) id lookup; falls back to the shared catalog for items inserted
+        by another worker since this normalizer's snapshot was taken
+        """
+        item = self.items_cache['by_id'].get(item_id)
+        if item is None:
+            from app.services.item_catalog import item_catalog
+            item = item_catalog.lookup(self.db, item_id)
+        return item
+
     # ========================================================================
     # RAG PIPELINE - ITEM MATCHING
     # ========================================================================
@@ -301,10 +322,7 @@ class RAGItemNormalizer:
             # Convert to (Item, similarity) tuples
             matches = []
             for row in result:
-                item = next(
-                    (i for i in self.items_cache['all_items'] if i.id == row['id']),
-                    None
-                )
+                item = self._get_item_by_id(row['id'])
                 if item:
                     matches.append((item, row['similarity']))
             print("vector matches", matches)
@@ -384,10 +402,7 @@ If no good match: {{"matched": false, "item_id": null, "confidence": 0.0, "reaso
 
             if llm_result.get("matched") and llm_result.get("item_id"):
                 # Find matched item
-                matched_item = next(
-                    (i for i in self.items_cache['all_items'] if i.id == llm_result["item_id"]),
-                    None
-                )
+                matched_item = self._get_item_by_id(llm_result["item_id"])
 
                 if matched_item:
                     confidence = llm_result.get("confidence", 0.80)
@@ -0,0 +1,166 @@
+# backend/app/services/lp_presolve.py
+"""
+Pre-solve model reduction for the meal plan LP.
+
+MealPlanOptimizer used to carry every candidate recipe into the model: a
+recipe suitable for no slot still got an (empty) variable dict and was walked
+by every variety constraint loop, and recipes that could never be part of a
+feasible day were left for CBC to discover. Solve time grows superlinearly
+with the number of binaries, so this pass keeps only useful
+(recipe, meal slot) pairs before the model is built:
+
+- Unsuitable: recipe not suitable for the meal slot
+- Calorie infeasible: no combination with the other slots' candidates can
+  land the day inside the calorie window
+- Dominated: at least `min_dominators` kept recipes for the same slot have
+  about the same calories, no higher cost, no less protein and no more
+  carbs/fat - every day can still pick a dominating recipe instead
+
+The result is a (recipes × meals_per_day) boolean mask; variables are
+created for every day of an allowed pair.
+"""
+
+import logging
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.services.recipe_scoring import RecipeMatrix
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PresolveStats:
+    """What the pre-solve pass removed (counts of recipe × meal slot pairs)"""
+    recipes: int = 0
+    candidate_pairs: int = 0
+    unsuitable: int = 0
+    calorie_infeasible: int = 0
+    dominated: int = 0
+    kept_pairs: int = 0
+    kept_recipes: int = 0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+class LPPresolver:
+    """Prune (recipe, meal slot) pairs that cannot be useful in the LP"""
+
+    # Recipes within this many kcal are interchangeable for dominance
+    CALORIE_TOLERANCE = 25.0
+    # Calorie-fit pruning can cascade (removing an extreme recipe tightens the
+    # other slots' ranges); a couple of passes reach the fixpoint in practice
+    MAX_CALORIE_PASSES = 3
+
+    def __init__(
+        self,
+        recipes: List[Dict],
+        meals_per_day: int,
+        is_suitable: Callable[[Dict, int], bool]
+    ):
+        self.recipes = recipes
+        self.meals_per_day = meals_per_day
+        self.macros = RecipeMatrix(recipes).macros
+        self.suitable = np.array(
+            [[is_suitable(recipe, m) for m in range(meals_per_day)] for recipe in recipes],
+            dtype=bool
+        ).reshape(len(recipes), meals_per_day)
+
+    def prune(
+        self,
+        costs: np.ndarray,
+        day_calorie_window: Tuple[float, float],
+        min_dominators: int
+    ) -> Tuple[np.ndarray, PresolveStats]:
+        """
+        Args:
+            costs: (n,) LP objective cost per recipe
+            day_calorie_window: (min, max) calories the day constraint allows
+            min_dominators: Dominating recipes required before dropping one
+
+        Returns:
+            (allowed, stats) - allowed is an (n, meals_per_day) bool mask
+        """
+        n, meals = self.suitable.shape
+        stats = PresolveStats(recipes=n, candidate_pairs=n * meals)
+
+        allowed = self.suitable.copy()
+        stats.unsuitable = int(stats.candidate_pairs - allowed.sum())
+
+        before = int(allowed.sum())
+        allowed = self._prune_calorie_infeasible(allowed, day_calorie_window)
+        stats.calorie_infeasible = before - int(allowed.sum())
+
+        before = int(allowed.sum())
+        for m in range(meals):
+            allowed[:, m] = self._prune_dominated(allowed[:, m], costs, min_dominators)
+        stats.dominated = before - int(allowed.sum())
+
+        stats.kept_pairs = int(allowed.sum())
+        stats.kept_recipes = int(allowed.any(axis=1).sum())
+        return allowed, stats
+
+    def _prune_calorie_infeasible(self, allowed: np.ndarray, window: Tuple[float, float]) -> np.ndarray:
+        """Drop pairs whose calories cannot be completed into a day inside the window"""
+        min_day, max_day = window
+        calories = self.macros[:, 0]
+        meals = allowed.shape[1]
+
+        for _ in range(self.MAX_CALORIE_PASSES):
+            if not allowed.any(axis=0).all():
+                # A slot has no candidates - the LP is infeasible anyway, leave it to CBC
+                return allowed
+
+            slot_min = np.array([calories[allowed[:, m]].min() for m in range(meals)])
+            slot_max = np.array([calories[allowed[:, m]].max() for m in range(meals)])
+
+            pruned = allowed.copy()
+            for m in range(meals):
+                others_min = slot_min.sum() - slot_min[m]
+                others_max = slot_max.sum() - slot_max[m]
+                fits = (calories + others_min <= max_day) & (calories + others_max >= min_day)
+                pruned[:, m] &= fits
+
+            if not pruned.any(axis=0).all():
+                # No feasible day exists at all - keep the model as is for CBC to report
+                return allowed
+            if (pruned == allowed).all():
+                return pruned
+            allowed = pruned
+
+        return allowed
+
+    def _prune_dominated(self, column: np.ndarray, costs: np.ndarray, min_dominators: int) -> np.ndarray:
+        """
+        Greedy pass in (cost, index) order: a recipe is kept unless at least
+        min_dominators already kept recipes dominate it.
+        """
+        rows = np.flatnonzero(column)
+        if min_dominators <= 0 or len(rows) <= min_dominators:
+            return column
+
+        order = rows[np.lexsort((rows, costs[rows]))]
+        kept = np.zeros(len(order), dtype=np.int64)
+        num_kept = 0
+
+        for row in order:
+            if num_kept >= min_dominators:
+                k = kept[:num_kept]
+                dominating = (
+                    (costs[k] <= costs[row]) &
+                    (np.abs(self.macros[k, 0] - self.macros[row, 0]) <= self.CALORIE_TOLERANCE) &
+                    (self.macros[k, 1] >= self.macros[row, 1]) &
+                    (self.macros[k, 2] <= self.macros[row, 2]) &
+                    (self.macros[k, 3] <= self.macros[row, 3])
+                )
+                if int(dominating.sum()) >= min_dominators:
+                    continue
+            kept[num_kept] = row
+            num_kept += 1
+
+        result = np.zeros_like(column)
+        result[kept[:num_kept]] = True
+        return result
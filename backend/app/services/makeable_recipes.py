@@ -0,0 +1,212 @@
+# backend/app/services/makeable_recipes.py
+"""
+Set-based "what can I cook?" engine.
+
+get_makeable_recipes used to pre-filter recipes by ingredient presence and
+then call check_recipe_availability per candidate (one UserInventory and one
+Item query per ingredient). Here:
+
+1. The user's inventory is aggregated per item (summed across expiry
+   batches) in a subquery
+2. Presence and quantity coverage of every recipe are computed in ONE
+   grouped query (recipe_ingredients LEFT JOIN aggregated inventory)
+3. Ingredient details for the selected recipes come from ONE join with items
+
+so the query count no longer grows with candidates x ingredients.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import Float, case, func
+from sqlalchemy.orm import Session
+
+from app.models.database import Item, Recipe, RecipeIngredient, UserInventory
+
+logger = logging.getLogger(__name__)
+
+
+class MakeableRecipeEngine:
+    """Recipe availability against a user's inventory, computed set-wise"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ===== QUERIES =====
+
+    def inventory_subquery(self, user_id: int):
+        """(item_id, quantity_grams) summed across all of the user's batches"""
+        return self.db.query(
+            UserInventory.item_id.label('item_id'),
+            func.coalesce(func.sum(UserInventory.quantity_grams), 0).label('quantity_grams')
+        ).filter(
+            UserInventory.user_id == user_id
+        ).group_by(
+            UserInventory.item_id
+        ).subquery()
+
+    def coverage_subquery(self, user_id: int):
+        """
+        Per-recipe counts over required (non-optional) ingredients:
+        total, present (item in inventory), covered (enough quantity) and
+        match_pct (covered / total * 100)
+        """
+        inventory = self.inventory_subquery(user_id)
+        required = func.coalesce(RecipeIngredient.quantity_grams, 0)
+        covered = func.sum(case((inventory.c.quantity_grams >= required, 1), else_=0))
+
+        query = self.db.query(
+            RecipeIngredient.recipe_id.label('recipe_id'),
+            func.count(RecipeIngredient.id).label('total_ingredients'),
+            func.sum(case((inventory.c.item_id.isnot(None), 1), else_=0)).label('present_ingredients'),
+            covered.label('covered_ingredients'),
+            (covered.cast(Float) * 100.0 / func.count(RecipeIngredient.id)).label('match_pct')
+        ).outerjoin(
+            inventory, inventory.c.item_id == RecipeIngredient.item_id
+        ).filter(
+            RecipeIngredient.is_optional == False
+        )
+        return query.group_by(RecipeIngredient.recipe_id).subquery()
+
+    def availability(self, user_id: int, recipes: List[Recipe]) -> Dict[int, Dict]:
+        """
+        Detailed availability reports (check_recipe_availability format) for
+        several recipes: one inventory aggregate + one ingredient/item join.
+        """
+        if not recipes:
+            return {}
+
+        recipe_ids = [recipe.id for recipe in recipes]
+        inventory = self.inventory_subquery(user_id)
+        rows = self.db.query(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.quantity_grams,
+            Item.canonical_name,
+            inventory.c.item_id,
+            inventory.c.quantity_grams
+        ).outerjoin(
+            Item, Item.id == RecipeIngredient.item_id
+        ).outerjoin(
+            inventory, inventory.c.item_id == RecipeIngredient.item_id
+        ).filter(
+            RecipeIngredient.recipe_id.in_(recipe_ids),
+            RecipeIngredient.is_optional == False
+        ).order_by(
+            RecipeIngredient.recipe_id, RecipeIngredient.id
+        ).all()
+
+        ingredients = defaultdict(list)
+        for recipe_id, required, name, stocked_item_id, stocked in rows:
+            ingredients[recipe_id].append((required, name, stocked_item_id, stocked))
+
+        return {
+            recipe.id: self._availability_report(recipe.title, ingredients.get(recipe.id, []))
+            for recipe in recipes
+        }
+
+    @staticmethod
+    def _availability_report(title: str, ingredients: List[tuple]) -> Dict:
+        availability = {
+            'recipe': title,
+            'can_make': True,
+            'missing_items': [],
+            'insufficient_items': [],
+            'available_items': [],
+            'coverage_percentage': 0
+        }
+
+        for required, name, stocked_item_id, stocked in ingredients:
+            required = required or 0
+            if stocked_item_id is None:
+                availability['missing_items'].append({'item': name, 'required': required})
+                availability['can_make'] = False
+            elif (stocked or 0) < required:
+                availability['insufficient_items'].append({
+                    'item': name,
+                    'required': required,
+                    'available': stocked or 0,
+                    'shortage': required - (stocked or 0)
+                })
+                availability['can_make'] = False
+            else:
+                availability['available_items'].append({
+                    'item': name,
+                    'required': required,
+                    'available': stocked
+                })
+
+        if ingredients:
+            availability['coverage_percentage'] = len(availability['available_items']) / len(ingredients) * 100
+        return availability
+
+    # ===== RANKING =====
+
+    def makeable_recipes(
+        self,
+        user_id: int,
+        limit: int = 10,
+        partial_threshold: float = 80.0
+    ) -> Dict[str, List[Dict]]:
+        """
+        Fully makeable (100% quantity coverage) and partially makeable
+        (>= partial_threshold) recipes, best first.
+        """
+        coverage = self.coverage_subquery(user_id)
+
+        def top(*criteria, order_by):
+            return self.db.query(Recipe, coverage.c.match_pct).join(
+                coverage, Recipe.id == coverage.c.recipe_id
+            ).filter(
+                coverage.c.total_ingredients > 0,
+                *criteria
+            ).order_by(*order_by, Recipe.id).limit(limit).all()
+
+        fully = top(
+            coverage.c.covered_ingredients == coverage.c.total_ingredients,
+            order_by=(Recipe.prep_time_min.asc(),)
+        )
+        partial = top(
+            coverage.c.covered_ingredients < coverage.c.total_ingredients,
+            coverage.c.match_pct >= partial_threshold,
+            order_by=(coverage.c.match_pct.desc(), Recipe.prep_time_min.asc())
+        )
+
+        reports = self.availability(user_id, [recipe for recipe, _ in fully + partial])
+
+        fully_makeable = [self._recipe_data(recipe, reports[recipe.id]) for recipe, _ in fully]
+        partially_makeable = []
+        for recipe, _ in partial:
+            availability = reports[recipe.id]
+            recipe_data = self._recipe_data(recipe, availability)
+            recipe_data['missing_ingredient_names'] = (
+                [item['item'] for item in availability['missing_items']] +
+                [item['item'] for item in availability['insufficient_items']]
+            )
+            partially_makeable.append(recipe_data)
+
+        return {
+            'fully_makeable': fully_makeable,
+            'partially_makeable': partially_makeable
+        }
+
+    @staticmethod
+    def _recipe_data(recipe: Recipe, availability: Dict) -> Dict:
+        available_names = [item['item'] for item in availability['available_items']]
+        return {
+            'recipe_id': recipe.id,
+            'recipe_name': recipe.title,
+            'description': recipe.description,
+            'prep_time_minutes': recipe.prep_time_min,
+            'servings': recipe.servings,
+            'available_ingredients': len(available_names),
+            'total_ingredients': (
+                len(available_names) +
+                len(availability['missing_items']) +
+                len(availability['insufficient_items'])
+            ),
+            'available_ingredient_names': available_names,
+            'match_percentage': round(availability['coverage_percentage'], 1),
+            'macros': recipe.macros_per_serving,
+            'goals': recipe.goals
+        }
@@ -5,14 +5,19 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
-from sqlalchemy import and_, func, cast, String, Float
+from sqlalchemy import and_, or_, func, cast, String, Float
 
-from app.models.database import MealPlan, MealLog, Recipe, UserInventory
+from app.core.events import EventType, event_bus
+from app.models.database import MealPlan, MealLog, Recipe, UserInventory, UserPath
 from app.schemas.meal_plan import (
     MealPlanCreate, MealPlanUpdate, MealPlanResponse,
     MealSwapRequest, MealLogCreate
 )
 from app.services.inventory_service import IntelligentInventoryService
+from app.services.final_meal_optimizer import MealPlanOptimizer
+from app.services.meal_plan_writer import meal_time_map
+from app.services.nutrition_rollup import NutritionRollupService
+from app.services.streak_service import StreakService
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +54,7 @@ class MealPlanService:
             self.db.add(meal_plan)
             self.db.commit()
             self.db.refresh(meal_plan)
+            event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user_id})
             # create meal logging 
             for day_key, day_data in meal_plan.plan_data['week_plan'].items():
                 for meal_type, meal in day_data['meals'].items():
@@ -115,6 +121,7 @@ class MealPlanService:
             self.db.commit()
 
             if result > 0:
+                event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user_id})
                 logger.info(f"Deactivated {result} expired meal plan(s) for user {user_id}")
 
             return result
@@ -152,6 +159,7 @@ class MealPlanService:
             
             self.db.commit()
             self.db.refresh(meal_plan)
+            event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user_id})
             
             logger.info(f"Updated meal plan {plan_id}")
             return MealPlanResponse.from_orm(meal_plan)
@@ -216,26 +224,17 @@ class MealPlanService:
         # Swap the meal using to_dict()
         week_data[day_key]['meals'][swap_request.meal_type] = new_recipe.to_dict()
 
-        # Recalculate day totals
-        day_calories = 0
-        day_protein = 0
-        day_carbs = 0
-        day_fat = 0
+        # Optionally re-solve the rest of the day around the new recipe
+        rebalanced = []
+        if swap_request.rebalance_day:
+            other_meals = [m for m in week_data[day_key]['meals'] if m != swap_request.meal_type]
+            rebalanced = self._reoptimize_slots(
+                user_id, meal_plan, week_data,
+                self._pending_slots(meal_plan, swap_request.day, other_meals)
+            )
 
-        for meal in week_data[day_key]['meals'].values():
-            if meal:
-                macros = meal.get('macros_per_serving', {})
-                day_calories += macros.get('calories', 0)
-                day_protein += macros.get('protein_g', 0)
-                day_carbs += macros.get('carbs_g', 0)
-                day_fat += macros.get('fat_g', 0)
-
-        week_data[day_key]['day_calories'] = day_calories
-        week_data[day_key]['day_macros'] = {
-            'protein_g': day_protein,
-            'carbs_g': day_carbs,
-            'fat_g': day_fat
-        }
+        # Recalculate day totals
+        day_calories, day_macros = self._recalculate_day_totals(week_data[day_key])
 
         # Update total calories and average macros for entire plan
         self._recalculate_plan_totals(meal_plan)
@@ -244,37 +243,12 @@ class MealPlanService:
         flag_modified(meal_plan, 'plan_data')
 
         # Sync MealLog: Update or create log entry for the new meal
-        # Query for existing log by meal_plan_id, day_index, and meal_type
-        existing_log = self.db.query(MealLog).filter_by(
-            meal_plan_id=meal_plan.id,
-            day_index=swap_request.day,
-            meal_type=swap_request.meal_type
-        ).first()
-
-        # Calculate planned datetime (week_start_date + day_index)
-        planned_datetime = meal_plan.week_start_date + timedelta(days=swap_request.day)
-
-        if existing_log:
-            # Update existing log with new recipe
-            existing_log.recipe_id = new_recipe.id
-            existing_log.planned_datetime = planned_datetime
-            logger.info(f"Updated MealLog {existing_log.id} with new recipe {new_recipe.id}")
-        else:
-            # Create new log entry for the swapped meal
-            new_log = MealLog(
-                user_id=user_id,
-                recipe_id=new_recipe.id,
-                meal_type=swap_request.meal_type,
-                planned_datetime=planned_datetime,
-                meal_plan_id=meal_plan.id,
-                day_index=swap_request.day,
-                portion_multiplier=1.0
-            )
-            self.db.add(new_log)
-            logger.info(f"Created new MealLog for recipe {new_recipe.id} at day {swap_request.day}, {swap_request.meal_type}")
+        log_entry = self._sync_meal_log(user_id, meal_plan, swap_request.day, swap_request.meal_type, new_recipe.id)
+        NutritionRollupService(self.db).refresh_day(user_id, log_entry.planned_datetime.date())
 
         self.db.commit()
         self.db.refresh(meal_plan)
+        event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user_id})
 
         logger.info(f"Swapped meal for user {user_id}: day {swap_request.day}, "
                     f"{swap_request.meal_type}, old recipe: {old_recipe_title}, "
@@ -286,9 +260,13 @@ class MealPlanService:
             'day': swap_request.day,
             'meal_type': swap_request.meal_type,
             'new_recipe': new_recipe.to_dict(),
+            'rebalanced_meals': [
+                {'meal_type': change['meal_type'], 'recipe': change['recipe']}
+                for change in rebalanced
+            ],
             'day_totals': {
                 'calories': day_calories,
-                'macros': week_data[day_key]['day_macros']
+                'macros': day_macros
             }
         }
 
@@ -339,6 +317,10 @@ class MealPlanService:
                         'remaining': updated.get('remaining_quantity', 0)
                     })
             
+            # Rollup days are keyed on planned_datetime (optional here); a log
+            # without one is not part of any day's rollup
+            if log_entry.planned_datetime:
+                NutritionRollupService(self.db).refresh_day(user_id, log_entry.planned_datetime.date())
             self.db.commit()
             
             # Calculate consumed macros
@@ -542,6 +524,10 @@ class MealPlanService:
         """
         Adjust meal plan when eating out
         
+        The meal is replaced by an external entry and the day's later meals
+        that are still pending are re-optimized around it (everything else in
+        the plan stays fixed).
+        
         Args:
             user_id: User ID
             day: Day of the week (0-6)
@@ -561,53 +547,65 @@ class MealPlanService:
             if not meal_plan:
                 raise ValueError("No active meal plan")
             
+            # Handle both flat and nested week_plan structures
+            if 'week_plan' in meal_plan.plan_data:
+                week_data = meal_plan.plan_data['week_plan']
+            else:
+                week_data = meal_plan.plan_data
+            
             day_key = f"day_{day}"
-            if day_key not in meal_plan.plan_data['week_plan']:
+            if day_key not in week_data:
                 raise ValueError(f"Day {day} not in plan")
             
             # Mark meal as external
-            meal_plan.plan_data['week_plan'][day_key]['meals'][meal_type] = {
+            external_macros = {
+                'calories': external_calories,
+                'protein_g': external_calories * 0.3 / 4,  # Rough estimate
+                'carbs_g': external_calories * 0.4 / 4,
+                'fat_g': external_calories * 0.3 / 9
+            }
+            day_meals = week_data[day_key].setdefault('meals', {})
+            day_meals[meal_type] = {
                 'title': 'Eating Out',
                 'is_external': True,
-                'macros_per_serving': {
-                    'calories': external_calories,
-                    'protein_g': external_calories * 0.3 / 4,  # Rough estimate
-                    'carbs_g': external_calories * 0.4 / 4,
-                    'fat_g': external_calories * 0.3 / 9
-                }
+                'macros_per_serving': external_macros
             }
             
+            # Re-solve the remaining meals of the day
+            meal_order = list(day_meals.keys())
+            remaining_meals = meal_order[meal_order.index(meal_type) + 1:]
+            adjusted = self._reoptimize_slots(
+                user_id, meal_plan, week_data,
+                self._pending_slots(meal_plan, day, remaining_meals)
+            )
+            
             # Recalculate totals
+            day_calories, _ = self._recalculate_day_totals(week_data[day_key])
             self._recalculate_plan_totals(meal_plan)
+            flag_modified(meal_plan, 'plan_data')
+            
+            # The restaurant meal counts as eaten at the slot's time
+            log_entry = self._sync_meal_log(user_id, meal_plan, day, meal_type, None)
+            log_entry.external_meal = {'dish_name': 'Eating Out', **external_macros}
+            log_entry.portion_multiplier = 1
+            log_entry.consumed_datetime = log_entry.planned_datetime
+            log_entry.was_skipped = False
+            self.db.flush()
+            NutritionRollupService(self.db).refresh_day(user_id, log_entry.planned_datetime.date())
+            StreakService(self.db).record_meal(user_id, log_entry.planned_datetime.date())
             
             self.db.commit()
-
-            log_entry = self.db.query(MealLog).filter_by(
-                user_id=user_id,
-                planned_datetime=day_date,
-                meal_type=meal_type
-            ).first()
-
-            if log_entry:
-                log_entry.status = 'eaten_external'
-                log_entry.recipe_id = None
-                log_entry.portion_multiplier = 1
-            else:
-                log_entry = MealLog(
-                    user_id=user_id,
-                    planned_datetime=day_date,
-                    meal_type=meal_type,
-                    status='eaten_external',
-                    portion_multiplier=1
-                )
-                self.db.add(log_entry)
-
+            event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user_id})
             
             return {
                 'success': True,
                 'day': day,
                 'meal_type': meal_type,
                 'external_calories': external_calories,
+                'adjusted_meals': {
+                    change['meal_type']: change['recipe'] for change in adjusted
+                },
+                'day_calories': day_calories,
                 'message': f"Adjusted day {day+1} for eating out"
             }
             
@@ -616,6 +614,98 @@ class MealPlanService:
             logger.error(f"Error adjusting for eating out: {str(e)}")
             raise
     
+    def _pending_slots(self, meal_plan: MealPlan, day: int, meal_types: List[str]) -> List[tuple]:
+        """(day, meal_type) slots that have not been eaten or skipped yet"""
+        done = {
+            meal_type for (meal_type,) in self.db.query(MealLog.meal_type).filter(
+                MealLog.meal_plan_id == meal_plan.id,
+                MealLog.day_index == day,
+                or_(MealLog.consumed_datetime.isnot(None), MealLog.was_skipped == True)
+            )
+        }
+        return [(day, meal_type) for meal_type in meal_types if meal_type not in done]
+    
+    def _reoptimize_slots(self, user_id: int, meal_plan: MealPlan, week_data: Dict, free_slots: List[tuple]) -> List[Dict]:
+        """
+        Re-solve free_slots with the LP optimizer (all other slots fixed,
+        warm-started from the current plan) and apply the result in place.
+        Does not commit; the caller commits and notifies PLAN_GENERATED.
+        
+        Returns:
+            Changed slots; empty if nothing changed or the re-solve failed
+            (the plan is then left as is)
+        """
+        if not free_slots:
+            return []
+        
+        result = MealPlanOptimizer(self.db).reoptimize(user_id, week_data, free_slots)
+        if not result:
+            logger.warning(f"Could not re-optimize {free_slots} for user {user_id}, keeping current meals")
+            return []
+        
+        for day, meal_type in free_slots:
+            week_data[f"day_{day}"]['meals'][meal_type] = result['week_plan'][f"day_{day}"]['meals'][meal_type]
+        
+        for change in result['changes']:
+            self._sync_meal_log(user_id, meal_plan, change['day'], change['meal_type'], change['recipe']['id'])
+        
+        return result['changes']
+    
+    def _sync_meal_log(self, user_id: int, meal_plan: MealPlan, day: int, meal_type: str, recipe_id: Optional[int]) -> MealLog:
+        """
+        Update or create the planned MealLog of a plan slot. Existing logs keep
+        their time of day; new ones get the meal window time like
+        MealPlanWriter.build_meal_log_rows.
+        """
+        # Query for existing log by meal_plan_id, day_index, and meal_type
+        log_entry = self.db.query(MealLog).filter_by(
+            meal_plan_id=meal_plan.id,
+            day_index=day,
+            meal_type=meal_type
+        ).first()
+        
+        # Calculate planned date (week_start_date + day_index)
+        planned_date = meal_plan.week_start_date + timedelta(days=day)
+        
+        if log_entry:
+            log_entry.recipe_id = recipe_id
+            log_entry.planned_datetime = datetime.combine(planned_date.date(), log_entry.planned_datetime.time())
+            logger.info(f"Updated MealLog {log_entry.id} with recipe {recipe_id}")
+        else:
+            meal_windows = self.db.query(UserPath.meal_windows).filter(UserPath.user_id == user_id).scalar()
+            hour, minute = map(int, meal_time_map(meal_windows).get(meal_type.lower(), '12:00').split(':'))
+            planned_datetime = planned_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            log_entry = MealLog(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                meal_type=meal_type,
+                planned_datetime=planned_datetime,
+                meal_plan_id=meal_plan.id,
+                day_index=day,
+                portion_multiplier=1.0
+            )
+            self.db.add(log_entry)
+            logger.info(f"Created new MealLog for recipe {recipe_id} at day {day}, {meal_type}")
+        
+        return log_entry
+    
+    def _recalculate_day_totals(self, day_data: Dict):
+        """Recalculate and store a day's calories and macros"""
+        day_calories = 0
+        day_macros = {'protein_g': 0, 'carbs_g': 0, 'fat_g': 0}
+        
+        for meal in day_data.get('meals', {}).values():
+            if meal:
+                macros = meal.get('macros_per_serving', {})
+                day_calories += macros.get('calories', 0)
+                day_macros['protein_g'] += macros.get('protein_g', 0)
+                day_macros['carbs_g'] += macros.get('carbs_g', 0)
+                day_macros['fat_g'] += macros.get('fat_g', 0)
+        
+        day_data['day_calories'] = day_calories
+        day_data['day_macros'] = day_macros
+        return day_calories, day_macros
+    
     def _recalculate_plan_totals(self, meal_plan: MealPlan):
         """Recalculate total calories and average macros for plan"""
         total_calories = 0
@@ -0,0 +1,178 @@
+# backend/app/services/meal_plan_writer.py
+"""
+Bulk persistence for generated meal plans.
+
+Writes any number of plans in ONE transaction with set-based statements:
+
+1. UPDATE meal_plans SET is_active = false for all affected users
+2. Multi-row INSERT of the new meal_plans rows (ids returned in input order)
+3. Multi-row INSERT of every planned meal_logs row, linked by meal_plan_id
+   (ids returned in input order)
+4. Bulk UPDATE (by primary key) of plan_data with the meal log ids mapped back into
+   each day as day['meal_log_ids'] = {meal_type: meal_log_id}
+5. Refresh of the daily nutrition rollups of every planned (user, date)
+
+instead of one ORM object (and flush) per plan and per meal.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.events import EventType, event_bus
+from app.models.database import MealLog, MealPlan
+from app.services.nutrition_rollup import NutritionRollupService
+
+logger = logging.getLogger(__name__)
+
+# Planned time of day when the user has no meal window for a meal
+DEFAULT_MEAL_TIMES = {
+    'breakfast': '08:00',
+    'lunch': '13:00',
+    'dinner': '19:00',
+    'snack': '16:00'
+}
+
+
+def meal_time_map(meal_windows: Optional[List[Dict]]) -> Dict[str, str]:
+    """{meal_type: 'HH:MM'} from UserPath.meal_windows, with defaults filled in"""
+    times = {}
+    for window in meal_windows or []:
+        meal_type = window.get('meal', '').lower()
+        times[meal_type] = window.get('start', DEFAULT_MEAL_TIMES.get(meal_type, '12:00'))
+
+    for meal_type, default_time in DEFAULT_MEAL_TIMES.items():
+        times.setdefault(meal_type, default_time)
+    return times
+
+
+def build_meal_log_rows(
+    user_id: int,
+    meal_plan_id: int,
+    start_date: datetime,
+    week_plan: Dict,
+    meal_times: Dict[str, str]
+) -> List[Dict]:
+    """Planned MealLog rows (column dicts) for every filled slot of a plan"""
+    rows = []
+    for day_key, day_data in week_plan.items():
+        # Extract the numeric day offset (e.g., 'day_0' → 0)
+        day_offset = int(day_key.split('_')[1])
+        planned_date = start_date + timedelta(days=day_offset)
+
+        for meal_name, recipe in (day_data.get('meals') or {}).items():
+            if not recipe or recipe.get('id') is None:
+                continue  # Skip empty/external meal slots
+
+            hour, minute = map(int, meal_times.get(meal_name.lower(), '12:00').split(':'))
+            rows.append({
+                'user_id': user_id,
+                'recipe_id': recipe['id'],
+                'meal_type': meal_name,
+                'planned_datetime': planned_date.replace(hour=hour, minute=minute, second=0, microsecond=0),
+                'consumed_datetime': None,
+                'was_skipped': False,
+                'portion_multiplier': 1.0,
+                'meal_plan_id': meal_plan_id,
+                'day_index': day_offset
+            })
+    return rows
+
+
+class MealPlanWriter:
+    """Set-based writer for one or many generated plans"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save_plans(self, plans: List[Dict]) -> List[int]:
+        """
+        Deactivate the users' current plans and insert the new plans and their
+        planned meal logs in a single transaction. Each plan's week_plan is
+        updated in place with the new meal log ids (day['meal_log_ids']).
+
+        Args:
+            plans: Dicts with user_id, start_date (datetime), week_plan,
+                grocery_list, total_calories, avg_macros and optionally
+                meal_windows (UserPath.meal_windows)
+
+        Returns:
+            New meal plan ids, in input order
+        """
+        if not plans:
+            return []
+
+        now = datetime.now()
+        try:
+            self.db.execute(
+                update(MealPlan)
+                .where(MealPlan.user_id.in_({plan['user_id'] for plan in plans}), MealPlan.is_active == True)
+                .values(is_active=False)
+                .execution_options(synchronize_session=False)
+            )
+
+            plan_ids = self.db.execute(
+                insert(MealPlan).returning(MealPlan.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'user_id': plan['user_id'],
+                        'week_start_date': plan['start_date'],
+                        'plan_data': plan['week_plan'],
+                        'grocery_list': plan.get('grocery_list', {}),
+                        'total_calories': plan['total_calories'],
+                        'avg_macros': plan['avg_macros'],
+                        'created_at': now,
+                        'is_active': True
+                    }
+                    for plan in plans
+                ]
+            ).scalars().all()
+
+            log_rows = []
+            log_plans = []
+            for plan, plan_id in zip(plans, plan_ids):
+                rows = build_meal_log_rows(
+                    plan['user_id'], plan_id, plan['start_date'], plan['week_plan'],
+                    meal_time_map(plan.get('meal_windows'))
+                )
+                log_rows.extend(rows)
+                log_plans.extend([plan] * len(rows))
+
+            if log_rows:
+                log_ids = self.db.execute(
+                    insert(MealLog).returning(MealLog.id, sort_by_parameter_order=True),
+                    log_rows
+                ).scalars().all()
+
+                for plan, row, log_id in zip(log_plans, log_rows, log_ids):
+                    day = plan['week_plan'][f"day_{row['day_index']}"]
+                    day.setdefault('meal_log_ids', {})[row['meal_type']] = log_id
+
+                # ORM bulk UPDATE by primary key (executemany)
+                self.db.execute(
+                    update(MealPlan),
+                    [
+                        {'id': plan_id, 'plan_data': plan['week_plan']}
+                        for plan, plan_id in zip(plans, plan_ids)
+                    ]
+                )
+
+                NutritionRollupService(self.db).refresh(
+                    (row['user_id'], row['planned_datetime'].date()) for row in log_rows
+                )
+
+            self.db.commit()
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving {len(plans)} meal plans: {str(e)}")
+            raise
+
+        for plan in plans:
+            event_bus.notify(EventType.PLAN_GENERATED, {'user_id': plan['user_id']})
+
+        logger.info(f"Saved {len(plan_ids)} meal plans with {len(log_rows)} meal logs")
+        return list(plan_ids)
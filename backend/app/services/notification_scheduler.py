@@ -8,12 +8,13 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_
 
 from app.models.database import User, UserProfile, MealLog, MealPlan
 from app.services.notification_service import NotificationService, NotificationPriority
 from app.services.consumption_services import ConsumptionService
 from app.core.config import settings
+from app.core.dates import day_bounds, get_user_timezone, in_range, local_now, local_today
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +43,14 @@ class NotificationScheduler:
     async def _schedule_user_meal_reminders(self, user_id: int) -> None:
         """Schedule today's meal reminders for a specific user"""
         try:
-            # Get today's planned meals
-            today = datetime.utcnow().date()
+            # Get today's pending meals (user's local day; served by the pending-meal index)
+            tz = get_user_timezone(self.db, user_id)
+            today = local_today(tz)
+            now = local_now(tz)
             planned_meals = self.db.query(MealLog).filter(
                 and_(
                     MealLog.user_id == user_id,
-                    func.date(MealLog.planned_datetime) == today,
+                    in_range(MealLog.planned_datetime, day_bounds(today)),
                     MealLog.consumed_datetime.is_(None),
                     MealLog.was_skipped == False
                 )
@@ -57,8 +60,8 @@ class NotificationScheduler:
                 # Calculate reminder time (30 minutes before)
                 reminder_time = meal.planned_datetime - timedelta(minutes=30)
                 
-                # Only schedule if reminder time is in the future
-                if reminder_time > datetime.utcnow():
+                # Only schedule if reminder time is in the future (planned times are local)
+                if reminder_time > now:
                     await self.notification_service.send_meal_reminder(
                         user_id=user_id,
                         meal_type=meal.meal_type,
@@ -21,6 +21,7 @@ from app.models.database import (
     AgentInteraction, NotificationPreference, NotificationLog
 )
 from app.core.config import settings
+from app.core.dates import UTC, local_now, resolve_timezone
 
 logger = logging.getLogger(__name__)
 
@@ -303,10 +304,21 @@ class NotificationService:
     ) -> bool:
         """Send daily summary notification"""
         
+        notification_data = self.build_daily_summary(user_id, summary_data, priority)
+        return await self._queue_notification(notification_data)
+
+    def build_daily_summary(
+        self,
+        user_id: int,
+        summary_data: Dict[str, Any],
+        priority: NotificationPriority = NotificationPriority.LOW
+    ) -> Dict[str, Any]:
+        """Daily summary notification payload (queued by send_daily_summary or in bulk)"""
+        
         meals_consumed = summary_data.get("meals_consumed", 0)
         compliance_rate = summary_data.get("compliance_rate", 0)
         
-        notification_data = {
+        return {
             "type": NotificationType.DAILY_SUMMARY,
             "user_id": user_id,
             "priority": priority,
@@ -316,8 +328,6 @@ class NotificationService:
             "action_url": "/summary",
             "created_at": datetime.utcnow().isoformat()
         }
-        
-        return await self._queue_notification(notification_data)
     
     async def send_weekly_report(
         self,
@@ -363,7 +373,7 @@ class NotificationService:
             notification_type = notification_data["type"]
             print(f"\n[QUEUE NOTIFICATION] Checking if notification type '{notification_type}' is enabled...")
 
-            if not self._should_send_notification(preferences, notification_type):
+            if not self.should_send_notification(preferences, notification_type):
                 print(f"[QUEUE NOTIFICATION] ❌ Notification type '{notification_type}' is DISABLED for user")
                 logger.info(f"Notification {notification_type} disabled for user {notification_data['user_id']}")
                 return True  # Return True as this is expected behavior
@@ -429,6 +439,43 @@ class NotificationService:
             logger.error(f"Failed to schedule notification: {str(e)}")
             return False
     
+    def queue_notifications_bulk(self, notifications: List[Dict], preferences: Dict[int, Dict]) -> int:
+        """
+        Queue many notifications in one Redis round trip.
+
+        Same rules as _queue_notification (disabled types are dropped, quiet
+        hours go to the scheduled set), but with prefetched preferences
+        ({user_id: prefs}) and every LPUSH/ZADD sent through one pipeline.
+        Returns how many notifications were queued or scheduled.
+        """
+        pipeline = self.redis_client.pipeline(transaction=False)
+        queued = 0
+        now = datetime.utcnow()
+
+        for notification_data in notifications:
+            user_prefs = preferences.get(notification_data["user_id"]) or self._preferences_from_row(None)
+            if not self.should_send_notification(user_prefs, notification_data["type"]):
+                continue
+
+            if not self._is_allowed_time(user_prefs, notification_data["priority"]):
+                next_allowed_time = self._calculate_next_allowed_time(user_prefs)
+                scheduled_data = {
+                    **notification_data,
+                    "scheduled_for": next_allowed_time.isoformat(),
+                    "original_created_at": notification_data["created_at"]
+                }
+                pipeline.zadd("notifications:scheduled", {json.dumps(scheduled_data): next_allowed_time.timestamp()})
+            else:
+                notification_data["retry_count"] = 0
+                notification_data["max_retries"] = self.max_retries
+                notification_data["queued_at"] = now.isoformat()
+                pipeline.lpush(f"notifications:{notification_data['priority']}", json.dumps(notification_data))
+            queued += 1
+
+        if queued:
+            pipeline.execute()
+        return queued
+    
     async def process_notification_queue(self):
         """Main queue processor - runs continuously"""
         logger.info("Starting notification queue processor")
@@ -742,6 +789,25 @@ class NotificationService:
     
     # ===== HELPER METHODS =====
     
+    @staticmethod
+    def _preferences_from_row(prefs: Optional[NotificationPreference]) -> Dict:
+        """Preference dict for a NotificationPreference row (defaults if None)"""
+        if prefs:
+            return {
+                "enabled_providers": prefs.enabled_providers or [NotificationProvider.PUSH],
+                "enabled_types": prefs.enabled_types or [t.value for t in NotificationType],
+                "quiet_hours_start": prefs.quiet_hours_start or 22,  # 10 PM
+                "quiet_hours_end": prefs.quiet_hours_end or 7,       # 7 AM
+                "timezone": prefs.timezone or "UTC"
+            }
+        return {
+            "enabled_providers": [NotificationProvider.PUSH],
+            "enabled_types": [t.value for t in NotificationType],
+            "quiet_hours_start": 22,
+            "quiet_hours_end": 7,
+            "timezone": "UTC"
+        }
+
     def _get_user_preferences(self, user_id: int) -> Dict:
         """Get user notification preferences"""
         try:
@@ -749,39 +815,27 @@ class NotificationService:
             prefs = self.db.query(NotificationPreference).filter(
                 NotificationPreference.user_id == user_id
             ).first()
-            
-            if prefs:
-                return {
-                    "enabled_providers": prefs.enabled_providers or [NotificationProvider.PUSH],
-                    "enabled_types": prefs.enabled_types or [t.value for t in NotificationType],
-                    "quiet_hours_start": prefs.quiet_hours_start or 22,  # 10 PM
-                    "quiet_hours_end": prefs.quiet_hours_end or 7,       # 7 AM
-                    "timezone": prefs.timezone or "UTC"
-                }
-            else:
-                # Return defaults
-                return {
-                    "enabled_providers": [NotificationProvider.PUSH],
-                    "enabled_types": [t.value for t in NotificationType],
-                    "quiet_hours_start": 22,
-                    "quiet_hours_end": 7,
-                    "timezone": "UTC"
-                }
+            return self._preferences_from_row(prefs)
                 
         except Exception as e:
             logger.error(f"Error getting user preferences: {str(e)}")
-            return {
-                "enabled_providers": [NotificationProvider.PUSH],
-                "enabled_types": [t.value for t in NotificationType],
-                "quiet_hours_start": 22,
-                "quiet_hours_end": 7,
-                "timezone": "UTC"
-            }
+            return self._preferences_from_row(None)
+
+    def get_preferences_bulk(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """Preferences of many users from one query (defaults for users without a row)"""
+        rows = self.db.query(NotificationPreference).filter(
+            NotificationPreference.user_id.in_(user_ids)
+        ).all()
+        by_user = {prefs.user_id: prefs for prefs in rows}
+        return {user_id: self._preferences_from_row(by_user.get(user_id)) for user_id in user_ids}
     
-    def _should_send_notification(self, preferences: Dict, notification_type: str) -> bool:
+    def should_send_notification(self, preferences: Dict, notification_type: str) -> bool:
         """Check if user wants this type of notification"""
         enabled_types = preferences.get("enabled_types", [])
         return notification_type in enabled_types
+
+    # Former private name, kept for existing callers
+    _should_send_notification = should_send_notification
     
     def _is_allowed_time(self, preferences: Dict, priority: str) -> bool:
         """Check if current time is allowed for notifications"""
@@ -790,7 +844,7 @@ class NotificationService:
             if priority == NotificationPriority.URGENT:
                 return True
             
-            current_hour = datetime.utcnow().hour
+            current_hour = local_now(resolve_timezone(preferences.get("timezone"))).hour
             quiet_start = preferences.get("quiet_hours_start", 22)
             quiet_end = preferences.get("quiet_hours_end", 7)
             
@@ -811,15 +865,17 @@ class NotificationService:
     def _calculate_next_allowed_time(self, preferences: Dict) -> datetime:
         """Calculate next allowed time for notifications"""
         quiet_end = preferences.get("quiet_hours_end", 7)
+        tz = resolve_timezone(preferences.get("timezone"))
         
-        now = datetime.utcnow()
+        now = local_now(tz)
         next_allowed = now.replace(hour=quiet_end, minute=0, second=0, microsecond=0)
         
         # If quiet end time has passed today, use tomorrow
         if next_allowed <= now:
             next_allowed += timedelta(days=1)
         
-        return next_allowed
+        # Back to naive UTC like every other timestamp in the queue
+        return next_allowed.replace(tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
     
     def _generate_email_html(self, notification_data: Dict) -> str:
         """Generate HTML content for email notifications"""
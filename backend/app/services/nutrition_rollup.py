@@ -0,0 +1,234 @@
+# backend/app/services/nutrition_rollup.py
+"""
+Per-user daily nutrition rollups.
+
+daily_nutrition_rollup holds one row per user and planned date with the
+consumed calories/macros/fiber and the planned/consumed/skipped meal counts.
+Writers call refresh() for the (user, date) pairs they touched, inside their
+own transaction, so the rollup commits together with the meal logs. Each
+refresh reads only the touched days' meal logs (plain columns, no ORM
+hydration). Users whose rollup was never built (no nutrition_rollup_users
+row) are rebuilt from their full history by the first write that touches
+them. History, analytics and trend views read the rollups instead of loading
+every MealLog + Recipe of the period, so they are O(days).
+
+Reads never write: for users not built yet they aggregate the requested
+days in memory and return transient rows.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models.database import DailyNutritionRollup, MealLog, NutritionRollupUser, Recipe
+
+logger = logging.getLogger(__name__)
+
+MACRO_KEYS = ("calories", "protein_g", "carbs_g", "fat_g", "fiber_g")
+
+RollupKey = Tuple[int, date]
+
+
+def meal_macros(
+    macros_per_serving: Optional[Dict],
+    portion_multiplier: Optional[float],
+    external_meal: Optional[Dict] = None
+) -> Dict[str, float]:
+    """Macros of one meal (external meal macros win over the recipe's)"""
+    if external_meal:
+        # Manual food entries keep their estimate under 'macros'
+        values = external_meal if "calories" in external_meal else external_meal.get("macros") or {}
+        return {key: values.get(key, 0) or 0 for key in MACRO_KEYS}
+    if not macros_per_serving:
+        return {key: 0 for key in MACRO_KEYS}
+
+    multiplier = portion_multiplier or 1.0
+    return {key: (macros_per_serving.get(key, 0) or 0) * multiplier for key in MACRO_KEYS}
+
+
+def aggregate_days(rows: Iterable) -> Dict[RollupKey, Dict]:
+    """
+    Sum meal log rows into rollup values per (user_id, planned date).
+
+    Args:
+        rows: (user_id, planned_datetime, consumed_datetime, was_skipped,
+            portion_multiplier, external_meal, macros_per_serving) tuples
+    """
+    days: Dict[RollupKey, Dict] = defaultdict(lambda: {
+        **{key: 0.0 for key in MACRO_KEYS},
+        "meals_planned": 0, "meals_consumed": 0, "meals_skipped": 0
+    })
+
+    for user_id, planned, consumed, skipped, portion, external_meal, macros_per_serving in rows:
+        if planned is None:
+            continue
+        day = days[(user_id, planned.date())]
+        day["meals_planned"] += 1
+
+        if consumed:
+            day["meals_consumed"] += 1
+            for key, value in meal_macros(macros_per_serving, portion, external_meal).items():
+                day[key] += value
+        elif skipped:
+            day["meals_skipped"] += 1
+
+    return dict(days)
+
+
+class NutritionRollupService:
+    """Maintains and reads the daily_nutrition_rollup table"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _meal_rows(self, user_ids: Iterable[int], start: Optional[date] = None, end: Optional[date] = None):
+        """Meal log columns needed for the rollup, planned between start and end (inclusive)"""
+        query = self.db.query(
+            MealLog.user_id,
+            MealLog.planned_datetime,
+            MealLog.consumed_datetime,
+            MealLog.was_skipped,
+            MealLog.portion_multiplier,
+            MealLog.external_meal,
+            Recipe.macros_per_serving
+        ).outerjoin(Recipe, MealLog.recipe_id == Recipe.id).filter(
+            MealLog.user_id.in_(list(user_ids))
+        )
+        if start is not None:
+            query = query.filter(MealLog.planned_datetime >= datetime.combine(start, time.min))
+        if end is not None:
+            query = query.filter(MealLog.planned_datetime < datetime.combine(end + timedelta(days=1), time.min))
+        return query.all()
+
+    def _write(self, days: Dict[RollupKey, Dict], keys: Iterable[RollupKey]):
+        """Replace the rollup rows of keys with days (keys without meals are removed)"""
+        by_user: Dict[int, List[date]] = defaultdict(list)
+        for user_id, day in keys:
+            by_user[user_id].append(day)
+
+        for user_id, user_days in by_user.items():
+            self.db.execute(
+                delete(DailyNutritionRollup)
+                .where(DailyNutritionRollup.user_id == user_id, DailyNutritionRollup.date.in_(user_days))
+                .execution_options(synchronize_session=False)
+            )
+
+        now = datetime.utcnow()
+        rows = [
+            {"user_id": user_id, "date": day, **values, "updated_at": now}
+            for (user_id, day), values in days.items()
+        ]
+        if rows:
+            self.db.execute(insert(DailyNutritionRollup), rows)
+
+    def _users_without_rollup(self, user_ids: Iterable[int]) -> List[int]:
+        """Users whose rollup was never built (never refreshed or backfilled)"""
+        user_ids = set(user_ids)
+        known = {
+            user_id for (user_id,) in self.db.query(NutritionRollupUser.user_id).filter(
+                NutritionRollupUser.user_id.in_(user_ids)
+            )
+        }
+        return sorted(user_ids - known)
+
+    def _transient_days(self, user_ids: Iterable[int], start: date, end: date) -> List[DailyNutritionRollup]:
+        """Rollup rows for start..end computed from meal_logs, not added to the session"""
+        aggregated = aggregate_days(self._meal_rows(user_ids, start, end))
+        return [
+            DailyNutritionRollup(user_id=user_id, date=day, **values)
+            for (user_id, day), values in sorted(aggregated.items(), key=lambda item: item[0][1])
+        ]
+
+    def refresh(self, keys: Iterable[RollupKey]):
+        """
+        Recompute the rollup rows of the given (user_id, planned date) pairs
+        from meal_logs. Users without any rollup yet get their whole history
+        rebuilt instead. Runs in the caller's transaction (does not commit).
+        """
+        keys = {(user_id, day) for user_id, day in keys if user_id is not None and day is not None}
+        if not keys:
+            return
+
+        self.db.flush()
+        missing = self._users_without_rollup({user_id for user_id, _ in keys})
+        self.rebuild(missing)
+
+        keys = {key for key in keys if key[0] not in missing}
+        if not keys:
+            return
+
+        days = {day for _, day in keys}
+        rows = self._meal_rows({user_id for user_id, _ in keys}, min(days), max(days))
+        aggregated = {key: values for key, values in aggregate_days(rows).items() if key in keys}
+        self._write(aggregated, keys)
+
+    def refresh_day(self, user_id: int, day: date):
+        """Recompute one user's rollup for one planned date"""
+        self.refresh([(user_id, day)])
+
+    def rebuild(self, user_ids: Iterable[int]):
+        """
+        Rebuild every rollup row of the given users from their full meal log
+        history and mark them built (users without meals too, so the rebuild
+        is not repeated). Runs in the caller's transaction (does not commit).
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+
+        self.db.flush()
+        for table in (DailyNutritionRollup, NutritionRollupUser):
+            self.db.execute(
+                delete(table)
+                .where(table.user_id.in_(user_ids))
+                .execution_options(synchronize_session=False)
+            )
+        aggregated = aggregate_days(self._meal_rows(user_ids))
+        self._write(aggregated, [])
+
+        now = datetime.utcnow()
+        self.db.execute(insert(NutritionRollupUser), [{"user_id": user_id, "rebuilt_at": now} for user_id in user_ids])
+
+    def get_days(self, user_id: int, start: date, end: date) -> List[DailyNutritionRollup]:
+        """
+        Rollup rows for start..end (inclusive), oldest first. Days without
+        meals have no row. Read-only: users whose rollup was never built get
+        transient rows computed from their meal logs.
+        """
+        if self._users_without_rollup([user_id]):
+            return self._transient_days([user_id], start, end)
+
+        return self.db.query(DailyNutritionRollup).filter(
+            DailyNutritionRollup.user_id == user_id,
+            DailyNutritionRollup.date >= start,
+            DailyNutritionRollup.date <= end
+        ).order_by(DailyNutritionRollup.date).all()
+
+    def get_day(self, user_id: int, day: date) -> Optional[DailyNutritionRollup]:
+        """Rollup row of one day, None if nothing was planned or logged"""
+        rows = self.get_days(user_id, day, day)
+        return rows[0] if rows else None
+
+    def get_users_day(self, user_ids: Iterable[int], day: date) -> Dict[int, DailyNutritionRollup]:
+        """
+        Rollup rows of one day for many users ({user_id: row}, users without
+        meals that day are absent). Read-only: users whose rollup was never
+        built get transient rows computed from their meal logs.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        missing = self._users_without_rollup(user_ids)
+        built = sorted(set(user_ids) - set(missing))
+        rows = self.db.query(DailyNutritionRollup).filter(
+            DailyNutritionRollup.user_id.in_(built),
+            DailyNutritionRollup.date == day
+        ).all() if built else []
+        if missing:
+            rows += self._transient_days(missing, day, day)
+        return {row.user_id: row for row in rows}
@@ -0,0 +1,343 @@
+# backend/app/services/recipe_index.py
+"""
+Recipe Candidate Index
+======================
+
+Process-wide, in-memory bitset index over the ``recipes`` table used by the
+meal plan optimizer for candidate selection.
+
+_get_filtered_recipes_fixed used to filter with ``cast(Recipe.goals, String)``
+and ``cast(dietary_tags, String)`` LIKE scans, ran several count() queries
+just for debug output and converted ORM rows to dicts on every plan. The
+index keeps:
+
+- Bitsets (NumPy bool arrays) keyed by goal and dietary tag
+- Pre-extracted calories and total prep+cook time arrays
+- Prep-time buckets for coarse "quick recipe" lookups
+- The optimizer's recipe dict for every row, built once
+
+so candidate selection becomes a bitset intersection plus a range scan.
+
+New recipes are folded in incrementally: LLMRecipeGenerationPipeline calls
+``add_recipes()`` after its commit, and rows imported by other processes
+(Spoonacular/seed scripts) are picked up with a ``WHERE id > db_max_id``
+refresh at most every REFRESH_INTERVAL_SECONDS. db_max_id only advances on
+DB reads, never on add_recipes(). Recipes have no updated_at, so edits
+(macros, tags) and deletes are picked up by a full reload every
+FULL_RELOAD_INTERVAL_SECONDS, or right away via reload()/invalidate().
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.database import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (minutes, inclusive) of the prep-time buckets
+PREP_TIME_BUCKETS = (15, 30, 45, 60, 90)
+
+
+def _recipe_to_dict(recipe) -> Dict:
+    """Optimizer recipe dict (same shape as Recipe.to_dict())"""
+    return {
+        'id': recipe.id,
+        'title': recipe.title,
+        'source': recipe.source,
+        'suitable_meal_times': recipe.suitable_meal_times or [],
+        'goals': recipe.goals or [],
+        'dietary_tags': recipe.dietary_tags or [],
+        'macros_per_serving': recipe.macros_per_serving,
+        'prep_time_min': recipe.prep_time_min or 0,
+        'cook_time_min': recipe.cook_time_min or 0,
+        'ingredients': []
+    }
+
+
+def prep_time_bucket(total_minutes: float) -> int:
+    """Index into PREP_TIME_BUCKETS (len(PREP_TIME_BUCKETS) = slower than all)"""
+    for idx, upper in enumerate(PREP_TIME_BUCKETS):
+        if total_minutes <= upper:
+            return idx
+    return len(PREP_TIME_BUCKETS)
+
+
+class RecipeIndexSnapshot:
+    """
+    Immutable, versioned index over a set of recipes.
+
+    Row i of every array corresponds to records[i].
+    """
+
+    def __init__(self, version: int, records: List[Dict]):
+        self.version = version
+        self.records = records
+        n = len(records)
+
+        self.recipe_ids = np.fromiter((r['id'] for r in records), dtype=np.int64, count=n)
+        self.max_id = int(self.recipe_ids.max()) if n else 0
+
+        self.calories = np.zeros(n, dtype=np.float64)
+        # NULL prep/cook time never satisfies a max-time filter (SQL semantics)
+        self.total_time = np.full(n, np.inf, dtype=np.float64)
+        self.by_goal: Dict[str, np.ndarray] = {}
+        self.by_dietary_tag: Dict[str, np.ndarray] = {}
+        self.by_prep_bucket: Dict[int, np.ndarray] = {}
+
+        for idx, record in enumerate(records):
+            macros = record['macros_per_serving'] or {}
+            self.calories[idx] = macros.get('calories', 0) or 0
+            if record['_has_times']:
+                self.total_time[idx] = record['prep_time_min'] + record['cook_time_min']
+
+            for goal in record['goals']:
+                self._bitset(self.by_goal, str(goal).lower(), n)[idx] = True
+            for tag in record['dietary_tags']:
+                self._bitset(self.by_dietary_tag, str(tag).lower(), n)[idx] = True
+            self._bitset(self.by_prep_bucket, prep_time_bucket(self.total_time[idx]), n)[idx] = True
+
+    @staticmethod
+    def _bitset(index: Dict, key, n: int) -> np.ndarray:
+        if key not in index:
+            index[key] = np.zeros(n, dtype=bool)
+        return index[key]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def all_rows(self) -> np.ndarray:
+        return np.ones(len(self), dtype=bool)
+
+    def goal(self, goal: str) -> np.ndarray:
+        return self.by_goal.get(goal.lower(), np.zeros(len(self), dtype=bool))
+
+    def dietary_tag(self, tag: str) -> np.ndarray:
+        return self.by_dietary_tag.get(tag.lower(), np.zeros(len(self), dtype=bool))
+
+    def max_total_time(self, minutes: float) -> np.ndarray:
+        """Range scan: prep + cook <= minutes"""
+        return self.total_time <= minutes
+
+    def calorie_range(self, min_cal: float, max_cal: float) -> np.ndarray:
+        """Range scan on pre-extracted calories per serving"""
+        return (self.calories >= min_cal) & (self.calories <= max_cal)
+
+    def select(
+        self,
+        goal: Optional[str],
+        dietary_restrictions: List[str],
+        max_total_time: Optional[float],
+        calorie_range: Optional[tuple] = None,
+        min_results: int = 0
+    ) -> List[Dict]:
+        """Candidate recipe dicts (see RecipeCandidateIndex.select_candidates)"""
+        mask = self.all_rows()
+
+        if goal:
+            mask &= self.goal(goal)
+
+        for restriction in dietary_restrictions or []:
+            if restriction == 'vegetarian':
+                mask &= self.dietary_tag('vegetarian') | self.dietary_tag('vegan')
+            elif restriction == 'vegan':
+                mask &= self.dietary_tag('vegan')
+
+        if max_total_time:
+            mask &= self.max_total_time(max_total_time)
+
+        if calorie_range:
+            calorie_mask = mask & self.calorie_range(*calorie_range)
+            if int(calorie_mask.sum()) >= min_results:
+                mask = calorie_mask
+
+        logger.debug(
+            f"Recipe candidates: {int(mask.sum())}/{len(self)} "
+            f"(goal={goal}, dietary={dietary_restrictions}, max_time={max_total_time})"
+        )
+        return self.to_dicts(mask)
+
+    def to_dicts(self, mask: np.ndarray) -> List[Dict]:
+        """Materialize optimizer recipe dicts for the selected rows (shallow copies)"""
+        dicts = []
+        for idx in np.flatnonzero(mask).tolist():
+            record = dict(self.records[idx])
+            record.pop('_has_times', None)
+            dicts.append(record)
+        return dicts
+
+
+class RecipeCandidateIndex:
+    """
+    Process-wide holder of the current RecipeIndexSnapshot.
+
+    Same lifecycle as the shared item catalog: lazy full load, incremental
+    id > db_max_id refresh, periodic full reload, copy-on-write snapshots
+    for lock-free reads.
+    """
+
+    REFRESH_INTERVAL_SECONDS = 60
+
+    # How often snapshot() rebuilds from the whole table to pick up edits
+    FULL_RELOAD_INTERVAL_SECONDS = 600
+
+    # Only the columns the optimizer needs - never embeddings/instructions
+    _COLUMNS = (
+        Recipe.id,
+        Recipe.title,
+        Recipe.source,
+        Recipe.suitable_meal_times,
+        Recipe.goals,
+        Recipe.dietary_tags,
+        Recipe.macros_per_serving,
+        Recipe.prep_time_min,
+        Recipe.cook_time_min,
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[RecipeIndexSnapshot] = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        # Highest id seen in a DB read - not raised by add_recipes()
+        self._db_max_id = 0
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    @staticmethod
+    def _record(row) -> Dict:
+        record = _recipe_to_dict(row)
+        record['_has_times'] = row.prep_time_min is not None and row.cook_time_min is not None
+        return record
+
+    def snapshot(self, db: Session) -> RecipeIndexSnapshot:
+        """Current snapshot, loading or incrementally refreshing as needed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load(db)
+
+        now = time.monotonic()
+        if now - self._last_full_load >= self.FULL_RELOAD_INTERVAL_SECONDS:
+            return self.reload(db)
+
+        if now - self._last_refresh >= self.REFRESH_INTERVAL_SECONDS:
+            self.refresh(db)
+            return self._snapshot
+
+        return snapshot
+
+    def load(self, db: Session) -> RecipeIndexSnapshot:
+        """Full load of the recipes table"""
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            return self._load_locked(db)
+
+    def reload(self, db: Session) -> RecipeIndexSnapshot:
+        """Rebuild from the whole table (picks up edited and deleted recipes)"""
+        with self._lock:
+            return self._load_locked(db)
+
+    def _load_locked(self, db: Session) -> RecipeIndexSnapshot:
+        started = time.perf_counter()
+        rows = db.query(*self._COLUMNS).order_by(Recipe.id).all()
+        self._snapshot = RecipeIndexSnapshot(self.version + 1, [self._record(row) for row in rows])
+        self._db_max_id = self._snapshot.max_id
+        self._last_refresh = self._last_full_load = time.monotonic()
+
+        logger.info(
+            f"Recipe index built: {len(rows)} recipes "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return self._snapshot
+
+    def refresh(self, db: Session) -> int:
+        """Fold in recipes inserted since the last load/refresh (id > db_max_id)"""
+        if self._snapshot is None:
+            self.load(db)
+            return 0
+
+        with self._lock:
+            current = self._snapshot
+            rows = db.query(*self._COLUMNS).filter(
+                Recipe.id > self._db_max_id
+            ).order_by(Recipe.id).all()
+            self._last_refresh = time.monotonic()
+
+            if not rows:
+                return 0
+
+            self._db_max_id = rows[-1].id
+            return self._publish(current, [self._record(row) for row in rows])
+
+    def add_recipes(self, recipes: Iterable) -> None:
+        """
+        Register freshly committed Recipe objects.
+
+        No-op until the index has been built - the first load will see them.
+        """
+        records = [self._record(recipe) for recipe in recipes if recipe.id is not None]
+        if not records:
+            return
+
+        with self._lock:
+            if self._snapshot is None:
+                return
+            self._publish(self._snapshot, records)
+
+    def _publish(self, current: RecipeIndexSnapshot, new_records: List[Dict]) -> int:
+        known = set(current.recipe_ids.tolist())
+        new_records = [r for r in new_records if r['id'] not in known]
+        if not new_records:
+            return 0
+        # Bitsets are rebuilt from the cached records (no DB access)
+        self._snapshot = RecipeIndexSnapshot(current.version + 1, current.records + new_records)
+        logger.info(
+            f"Recipe index: +{len(new_records)} recipes (version {self._snapshot.version})"
+        )
+        return len(new_records)
+
+    def invalidate(self) -> None:
+        """Drop the index; next access rebuilds it (e.g. after recipe edits/deletes)"""
+        with self._lock:
+            self._snapshot = None
+            self._last_refresh = 0.0
+            self._last_full_load = 0.0
+            self._db_max_id = 0
+
+    def select_candidates(
+        self,
+        db: Session,
+        goal: Optional[str],
+        dietary_restrictions: List[str],
+        max_total_time: Optional[float],
+        calorie_range: Optional[tuple] = None,
+        min_results: int = 0
+    ) -> List[Dict]:
+        """
+        Candidate recipes for a user.
+
+        Args:
+            goal: Goal value (e.g. 'muscle_gain') or None for any
+            dietary_restrictions: e.g. ['vegetarian']; vegetarian also admits vegan
+            max_total_time: Max prep + cook minutes, or None/0 for no limit
+            calorie_range: (min, max) calories per serving
+            min_results: If the calorie range leaves fewer than this, it is
+                dropped (same relaxation the optimizer applied before)
+
+        Returns:
+            Optimizer recipe dicts
+        """
+        return self.snapshot(db).select(
+            goal, dietary_restrictions, max_total_time, calorie_range, min_results
+        )
+
+
+# Global index instance (one per worker process)
+recipe_candidate_index = RecipeCandidateIndex()
@@ -22,6 +22,7 @@ from openai import OpenAI
 from app.models.database import Item
 from app.services.fdc_service import FDCService
 from app.services.embedding_service import EmbeddingService
+from app.services.item_catalog import item_catalog
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -148,9 +149,18 @@ class RecipeIngredientProcessor:
         normalized_name = food_name.lower().replace(' ', '_')
 
         # Method 1: Exact canonical_name match (case-insensitive)
-        exact = self.db.query(Item).filter(
-            func.lower(Item.canonical_name) == normalized_name
-        ).first()
+        # Served from the shared catalog's name index - no DB round-trip.
+        # The catalog can lag rows committed by other workers, so a miss still
+        # checks the DB before the ingredient is treated as new (auto-seeding
+        # an existing canonical_name would fail on the unique constraint)
+        exact = item_catalog.snapshot(self.db).by_name.get(normalized_name)
+
+        if not exact:
+            exact = self.db.query(Item).filter(
+                func.lower(Item.canonical_name) == normalized_name
+            ).first()
+            if exact:
+                item_catalog.add_items([exact])
 
         if exact:
             return exact, "exact"
@@ -263,6 +273,9 @@ class RecipeIngredientProcessor:
         self.db.commit()
         self.db.refresh(new_item)
 
+        # Make the new item visible to normalizers without reloading the table
+        item_catalog.add_items([new_item])
+
         logger.info(f"    Created new item: {new_item.canonical_name} (id={new_item.id})")
 
         return new_item
@@ -22,6 +22,7 @@ from app.models.database import Recipe, RecipeIngredient
 from app.services.llm_recipe_generator import StructuredRecipeGenerator, RecipeStructured
 from app.services.recipe_ingredient_processor import RecipeIngredientProcessor
 from app.services.embedding_service import EmbeddingService
+from app.services.recipe_index import recipe_candidate_index
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -151,6 +152,9 @@ class LLMRecipeGenerationPipeline:
             self.db.commit()
             self.db.refresh(recipe_record)
 
+            # Make the recipe an optimizer candidate without rebuilding the index
+            recipe_candidate_index.add_recipes([recipe_record])
+
             logger.info(f"✓ Created recipe ID={recipe_record.id}")
             logger.info(f"✓ Created {len(recipe_ingredient_records)} recipe_ingredient records")
 
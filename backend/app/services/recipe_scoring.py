@@ -0,0 +1,281 @@
+# backend/app/services/recipe_scoring.py
+"""
+Vectorized recipe scoring for the meal plan optimizer.
+
+MealPlanOptimizer._score_recipes used to issue one RecipeIngredient query per
+candidate recipe and score each recipe in Python loops. This module loads all
+candidate ingredients in ONE query into array form and computes every score
+component for all recipes at once with NumPy:
+
+- RecipeMatrix: per-recipe macro vectors + recipe×item sparse ingredient matrix
+- RecipeScoringEngine: goal alignment, macro fit, timing, complexity and
+  inventory coverage as array expressions, returned as the same RecipeScore
+  objects the LP stage already consumes
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.models.database import RecipeIngredient
+
+logger = logging.getLogger(__name__)
+
+# Column order of RecipeMatrix.macros
+MACRO_KEYS = ('calories', 'protein_g', 'carbs_g', 'fat_g')
+
+
+class RecipeMatrix:
+    """
+    Array form of a candidate recipe pool.
+
+    Attributes:
+        recipe_ids: (n,) recipe ids, row order of every other array
+        macros: (n, 4) calories / protein_g / carbs_g / fat_g per serving
+        total_time: (n,) prep + cook minutes
+        meal_time_counts: (n,) number of suitable_meal_times
+        goals: per-recipe goal sets (for goal alignment)
+        item_ids: (k,) item ids, column order of the ingredient matrix
+        ing_rows / ing_cols / ing_qty: one entry per RecipeIngredient row
+            (COO triplets, duplicates preserved)
+        has_ingredients: whether ingredient rows were loaded
+    """
+
+    def __init__(self, recipes: List[Dict]):
+        n = len(recipes)
+        self.recipe_ids = np.fromiter((r['id'] for r in recipes), dtype=np.int64, count=n)
+        self.row_of = {int(rid): idx for idx, rid in enumerate(self.recipe_ids)}
+
+        self.macros = np.zeros((n, len(MACRO_KEYS)), dtype=np.float64)
+        self.total_time = np.zeros(n, dtype=np.float64)
+        self.meal_time_counts = np.zeros(n, dtype=np.int64)
+        self.goals = []
+
+        for idx, recipe in enumerate(recipes):
+            macros = recipe.get('macros_per_serving') or {}
+            for col, key in enumerate(MACRO_KEYS):
+                self.macros[idx, col] = macros.get(key, 0) or 0
+            self.total_time[idx] = (recipe.get('prep_time_min', 0) or 0) + (recipe.get('cook_time_min', 0) or 0)
+            self.meal_time_counts[idx] = len(recipe.get('suitable_meal_times', []) or [])
+            self.goals.append(frozenset(recipe.get('goals', []) or []))
+
+        self.item_ids = np.zeros(0, dtype=np.int64)
+        self.ing_rows = np.zeros(0, dtype=np.int64)
+        self.ing_cols = np.zeros(0, dtype=np.int64)
+        self.ing_qty = np.zeros(0, dtype=np.float64)
+        self.has_ingredients = False
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def load_ingredients(self, db: Session) -> "RecipeMatrix":
+        """Load ingredient rows for ALL recipes in a single query"""
+        if len(self) == 0:
+            self.has_ingredients = True
+            return self
+
+        rows = db.query(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.item_id,
+            RecipeIngredient.quantity_grams
+        ).filter(
+            RecipeIngredient.recipe_id.in_(self.recipe_ids.tolist())
+        ).all()
+
+        self.set_ingredients(rows)
+        return self
+
+    def set_ingredients(self, rows) -> "RecipeMatrix":
+        """Build COO triplets from (recipe_id, item_id, quantity_grams) rows"""
+        recipe_idx = []
+        item_ids = []
+        quantities = []
+        for recipe_id, item_id, quantity in rows:
+            row = self.row_of.get(recipe_id)
+            if row is None:
+                continue
+            recipe_idx.append(row)
+            item_ids.append(item_id if item_id is not None else -1)
+            quantities.append(quantity or 0)
+
+        self.item_ids, cols = np.unique(np.asarray(item_ids, dtype=np.int64), return_inverse=True)
+        self.ing_rows = np.asarray(recipe_idx, dtype=np.int64)
+        self.ing_cols = cols.astype(np.int64)
+        self.ing_qty = np.asarray(quantities, dtype=np.float64)
+        self.has_ingredients = True
+        return self
+
+    @property
+    def ingredient_matrix(self) -> sparse.csr_matrix:
+        """recipe×item grams matrix (duplicate rows for the same item are summed)"""
+        return sparse.coo_matrix(
+            (self.ing_qty, (self.ing_rows, self.ing_cols)),
+            shape=(len(self), len(self.item_ids))
+        ).tocsr()
+
+    def inventory_vector(self, inventory: Dict[int, float]):
+        """
+        Align an {item_id: grams} dict to the ingredient columns.
+
+        Returns:
+            (quantities, present) arrays of shape (k,)
+        """
+        quantities = np.zeros(len(self.item_ids), dtype=np.float64)
+        present = np.zeros(len(self.item_ids), dtype=bool)
+        for col, item_id in enumerate(self.item_ids.tolist()):
+            if item_id in inventory:
+                present[col] = True
+                quantities[col] = inventory[item_id] or 0
+        return quantities, present
+
+
+class RecipeScoringEngine:
+    """Score a whole candidate pool at once"""
+
+    # Composite weights (same as RecipeScore.calculate_composite defaults used by the optimizer)
+    WEIGHTS = {
+        'goal': 0.3,
+        'macro': 0.25,
+        'timing': 0.15,
+        'complexity': 0.1,
+        'inventory': 0.2
+    }
+
+    def __init__(self, db: Session = None):
+        self.db = db
+
+    def score(
+        self,
+        recipes: List[Dict],
+        constraints,
+        user_goal_type: str,
+        inventory: Dict[int, float],
+        matrix: Optional[RecipeMatrix] = None
+    ) -> Dict:
+        """
+        Score all recipes against the user's goal, targets and inventory.
+
+        Args:
+            recipes: Optimizer recipe dicts
+            constraints: OptimizationConstraints
+            user_goal_type: e.g. 'muscle_gain'
+            inventory: {item_id: quantity_grams}
+            matrix: Prebuilt RecipeMatrix for these recipes (built if omitted)
+
+        Returns:
+            {recipe_id: RecipeScore}
+        """
+        from app.services.final_meal_optimizer import RecipeScore
+
+        if not recipes:
+            return {}
+
+        if matrix is None:
+            matrix = RecipeMatrix(recipes)
+        if inventory and not matrix.has_ingredients:
+            matrix.load_ingredients(self.db)
+
+        goal = self.goal_alignment(matrix, user_goal_type)
+        macro = self.macro_fit(matrix, constraints)
+        timing = self.timing_appropriateness(matrix)
+        complexity = self.complexity(matrix)
+        coverage = self.inventory_coverage(matrix, inventory)
+
+        w = self.WEIGHTS
+        composite = (
+            w['goal'] * goal +
+            w['macro'] * macro +
+            w['timing'] * timing +
+            w['complexity'] * (100 - complexity) +
+            w['inventory'] * coverage
+        )
+
+        scored = {}
+        for idx, recipe_id in enumerate(matrix.recipe_ids.tolist()):
+            scored[recipe_id] = RecipeScore(
+                recipe_id=recipe_id,
+                goal_alignment=float(goal[idx]),
+                macro_fit=float(macro[idx]),
+                timing_appropriateness=float(timing[idx]),
+                complexity_score=float(complexity[idx]),
+                inventory_coverage=float(coverage[idx]),
+                composite_score=float(composite[idx])
+            )
+
+        return scored
+
+    # ========================================================================
+    # SCORE COMPONENTS (each returns an (n,) array)
+    # ========================================================================
+
+    @staticmethod
+    def goal_alignment(matrix: RecipeMatrix, user_goal_type: str) -> np.ndarray:
+        """100 if recipe targets the user's goal, 60 if general, else 30"""
+        exact = np.fromiter((user_goal_type in g for g in matrix.goals), dtype=bool, count=len(matrix))
+        general = np.fromiter(
+            (('maintenance' in g) or ('general_health' in g) for g in matrix.goals),
+            dtype=bool, count=len(matrix)
+        )
+        return np.select([exact, general], [100.0, 60.0], default=30.0)
+
+    @staticmethod
+    def macro_fit(matrix: RecipeMatrix, constraints) -> np.ndarray:
+        """0-100, weighted relative distance from per-meal macro targets"""
+        meals = constraints.meals_per_day
+        targets = np.array([
+            ((constraints.daily_calories_min + constraints.daily_calories_max) / 2) / meals,
+            constraints.daily_protein_min / meals,
+            (constraints.daily_carbs_min + constraints.daily_carbs_max) / 2 / meals,
+            (constraints.daily_fat_min + constraints.daily_fat_max) / 2 / meals,
+        ])
+        weights = np.array([0.4, 0.3, 0.2, 0.1])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diffs = np.where(
+                targets > 0,
+                np.abs(matrix.macros - targets) / np.where(targets > 0, targets, 1),
+                1.0
+            )
+            # Unbounded targets (inf) give nan, which the scalar max(0, ...) mapped to 0
+            return np.fmax(0.0, 100 - (diffs @ weights) * 50)
+
+    @staticmethod
+    def timing_appropriateness(matrix: RecipeMatrix) -> np.ndarray:
+        """Flexible (0 or 3+ meal times) = 100, two = 75, one = 50"""
+        counts = matrix.meal_time_counts
+        return np.select([counts == 2, counts == 1], [75.0, 50.0], default=100.0)
+
+    @staticmethod
+    def complexity(matrix: RecipeMatrix) -> np.ndarray:
+        """0-90 by total prep + cook time (lower is simpler)"""
+        t = matrix.total_time
+        return np.select([t <= 15, t <= 30, t <= 45], [0.0, 30.0, 60.0], default=90.0)
+
+    @staticmethod
+    def inventory_coverage(matrix: RecipeMatrix, inventory: Dict[int, float]) -> np.ndarray:
+        """
+        % of ingredients available: full credit if enough stock, half credit
+        if some stock. Neutral 50 without inventory or ingredient data.
+        """
+        n = len(matrix)
+        if not inventory:
+            return np.full(n, 50.0)
+
+        stock, present = matrix.inventory_vector(inventory)
+        row_stock = stock[matrix.ing_cols]
+        row_present = present[matrix.ing_cols]
+
+        credit = np.where(
+            row_present & (row_stock >= matrix.ing_qty),
+            1.0,
+            np.where(row_present & (row_stock > 0), 0.5, 0.0)
+        )
+
+        available = np.bincount(matrix.ing_rows, weights=credit, minlength=n)
+        totals = np.bincount(matrix.ing_rows, minlength=n)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, available / np.maximum(totals, 1) * 100, 50.0)
@@ -0,0 +1,202 @@
+# backend/app/services/restock_engine.py
+"""
+Restock list from SQL aggregates.
+
+TrackingAgent.generate_restock_list used to load 30 days of consumed meal
+logs with a recipe -> ingredients -> item joinedload, walk the object graph
+to build per-item usage, repeat a similar walk for the upcoming meals and
+then look up every item separately. Here the per-item numbers come from ONE
+statement:
+
+- historical usage: SUM(quantity_grams * portion_multiplier), uses and
+  distinct recipes per item over consumed meals
+- planned usage: the same sum over pending (not consumed / skipped) meals
+- current stock: quantity summed across batches, earliest expiry of stocked
+  batches
+
+joined to items, plus one COUNT(DISTINCT day) for the analysis period. The
+urgent / soon / routine / bulk buckets are derived from those rows directly.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, select, union
+from sqlalchemy.orm import Session
+
+from app.models.database import Item, MealLog, RecipeIngredient, UserInventory
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 30
+UPCOMING_DAYS = 7
+HISTORICAL_BUFFER = 1.2
+BULK_CATEGORIES = ("grains", "protein", "spices")
+
+
+class RestockEngine:
+    """Per-item usage vs. stock, bucketed by restock priority"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ===== AGGREGATES =====
+
+    def _usage_subquery(self, user_id: int, *criteria):
+        """Per-item grams, uses and distinct recipes over the matching meal logs"""
+        return select(
+            RecipeIngredient.item_id.label('item_id'),
+            func.sum(
+                RecipeIngredient.quantity_grams * func.coalesce(MealLog.portion_multiplier, 1.0)
+            ).label('grams'),
+            func.count().label('uses'),
+            func.count(func.distinct(MealLog.recipe_id)).label('recipes')
+        ).join(
+            RecipeIngredient, RecipeIngredient.recipe_id == MealLog.recipe_id
+        ).where(
+            MealLog.user_id == user_id,
+            MealLog.recipe_id.isnot(None),
+            *criteria
+        ).group_by(RecipeIngredient.item_id).subquery()
+
+    def _stock_subquery(self, user_id: int):
+        stocked_expiry = case((UserInventory.quantity_grams > 0, UserInventory.expiry_date))
+        return select(
+            UserInventory.item_id.label('item_id'),
+            func.coalesce(func.sum(UserInventory.quantity_grams), 0).label('quantity'),
+            func.min(stocked_expiry).label('earliest_expiry')
+        ).where(
+            UserInventory.user_id == user_id
+        ).group_by(UserInventory.item_id).subquery()
+
+    def item_rows(self, user_id: int, now: Optional[datetime] = None) -> List:
+        """One row per item used recently or planned: usage, planned need and stock"""
+        now = now or datetime.utcnow()
+        history = self._usage_subquery(
+            user_id,
+            MealLog.consumed_datetime >= now - timedelta(days=HISTORY_DAYS)
+        )
+        planned = self._usage_subquery(
+            user_id,
+            MealLog.planned_datetime >= now,
+            MealLog.planned_datetime <= now + timedelta(days=UPCOMING_DAYS),
+            MealLog.was_skipped == False,
+            MealLog.consumed_datetime.is_(None)
+        )
+        stock = self._stock_subquery(user_id)
+        item_ids = union(select(history.c.item_id), select(planned.c.item_id)).subquery()
+
+        return self.db.query(
+            Item.id,
+            Item.canonical_name,
+            Item.category,
+            func.coalesce(history.c.grams, 0).label('total_used'),
+            func.coalesce(history.c.uses, 0).label('usage_count'),
+            func.coalesce(history.c.recipes, 0).label('recipe_count'),
+            func.coalesce(planned.c.grams, 0).label('upcoming_requirement'),
+            func.coalesce(stock.c.quantity, 0).label('current_stock'),
+            stock.c.earliest_expiry
+        ).join(
+            item_ids, item_ids.c.item_id == Item.id
+        ).outerjoin(
+            history, history.c.item_id == Item.id
+        ).outerjoin(
+            planned, planned.c.item_id == Item.id
+        ).outerjoin(
+            stock, stock.c.item_id == Item.id
+        ).order_by(Item.id).all()
+
+    def days_of_data(self, user_id: int, now: Optional[datetime] = None) -> int:
+        """Distinct days with a consumed recipe meal in the history window"""
+        now = now or datetime.utcnow()
+        return self.db.query(
+            func.count(func.distinct(func.date(MealLog.consumed_datetime)))
+        ).filter(
+            MealLog.user_id == user_id,
+            MealLog.consumed_datetime >= now - timedelta(days=HISTORY_DAYS),
+            MealLog.recipe_id.isnot(None)
+        ).scalar() or 0
+
+    # ===== BUCKETS =====
+
+    def restock_list(self, user_id: int, now: Optional[datetime] = None) -> Dict:
+        """
+        Returns:
+            {'restock_list': {'urgent', 'soon', 'routine', 'bulk_opportunities'},
+             'days_of_data': int}
+        """
+        now = now or datetime.utcnow()
+        days_of_data = self.days_of_data(user_id, now)
+        weekly_multiplier = (7 / days_of_data) if days_of_data > 0 else 0
+
+        restock_list = {
+            "urgent": [],     # Can't cook planned meals OR critically low stock
+            "soon": [],       # < 50% of recommended stock
+            "routine": [],    # < 70% stock for frequently used items
+            "bulk_opportunities": []
+        }
+
+        for row in self.item_rows(user_id, now):
+            current_stock = float(row.current_stock)
+            upcoming_requirement = float(row.upcoming_requirement)
+            historical_weekly = float(row.total_used) * weekly_multiplier * HISTORICAL_BUFFER
+
+            # Prioritize upcoming needs, but consider historical patterns
+            recommended_stock = max(upcoming_requirement, historical_weekly)
+            shortage = max(recommended_stock - current_stock, 0)
+
+            # Skip if no shortage and not needed for upcoming meals
+            if shortage == 0 and upcoming_requirement == 0:
+                continue
+
+            stock_percentage = (current_stock / recommended_stock * 100) if recommended_stock > 0 else 100
+            days_supply = (current_stock / (recommended_stock / 7)) if recommended_stock > 0 else 0
+
+            restock_info = {
+                "item_id": row.id,
+                "item_name": row.canonical_name,
+                "category": row.category or "other",
+                "current_quantity": round(current_stock, 1),
+                "recommended_quantity": round(shortage, 1),
+                "priority": "",
+                "usage_frequency": row.usage_count,
+                "days_until_depleted": int(days_supply) if days_supply > 0 else 0
+            }
+
+            expiry_date = row.earliest_expiry
+            if isinstance(expiry_date, str):  # SQLite returns MIN() over datetimes as text
+                expiry_date = datetime.fromisoformat(expiry_date)
+            if expiry_date:
+                days_to_expiry = (expiry_date - now).days
+                restock_info["days_to_expiry"] = days_to_expiry
+                if days_to_expiry <= 3:
+                    restock_info["expiry_urgency"] = "urgent"
+                elif days_to_expiry <= 7:
+                    restock_info["expiry_urgency"] = "soon"
+
+            if current_stock < upcoming_requirement:
+                # Can't cook planned meals
+                restock_info["priority"] = "urgent"
+            elif stock_percentage < 20 or restock_info.get("expiry_urgency") == "urgent":
+                restock_info["priority"] = "urgent"
+            elif stock_percentage < 50 or restock_info.get("expiry_urgency") == "soon":
+                restock_info["priority"] = "soon"
+            elif stock_percentage < 70 and row.usage_count >= 3:
+                restock_info["priority"] = "routine"
+
+            if restock_info["priority"]:
+                restock_list[restock_info["priority"]].append(restock_info)
+
+            if row.usage_count >= 5 and row.recipe_count >= 3 and row.category in BULK_CATEGORIES:
+                restock_list["bulk_opportunities"].append({
+                    **restock_info,
+                    "bulk_suggestion": f"Buy {round(recommended_stock * 4, 1)}g (1 month supply)",
+                    "bulk_reason": f"Used in {row.recipe_count} recipes, {row.usage_count} times"
+                })
+
+        restock_list["urgent"].sort(key=lambda x: (x["days_until_depleted"], -x["usage_frequency"]))
+        restock_list["soon"].sort(key=lambda x: (x["days_until_depleted"], -x["usage_frequency"]))
+        restock_list["routine"].sort(key=lambda x: (-x["usage_frequency"], x["days_until_depleted"]))
+
+        return {"restock_list": restock_list, "days_of_data": days_of_data}
@@ -0,0 +1,153 @@
+# backend/app/services/streak_service.py
+"""
+Meal logging streaks.
+
+A streak is a run of consecutive days with at least one consumed meal (by
+planned date). Streaks are computed from ONE grouped query over the user's
+distinct logged dates (gaps-and-islands over the sorted dates) instead of a
+COUNT query per day, and kept in the user_streaks counter, which is updated
+incrementally whenever a meal is logged and recomputed when a meal inside
+the current run is skipped. The dashboard streak card and the streak
+achievements both read the counter; each milestone (STREAK_MILESTONES) is
+awarded once per run.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.database import MealLog, UserStreak
+
+logger = logging.getLogger(__name__)
+
+STREAK_MILESTONES = (7, 14, 30)
+
+
+def streak_runs(logged_dates: List[date]) -> Tuple[Optional[date], int, int]:
+    """
+    Gaps-and-islands over sorted distinct dates.
+
+    Returns:
+        (last_logged_date, length of the run ending on it, longest run)
+    """
+    if not logged_dates:
+        return None, 0, 0
+
+    current = longest = 1
+    for previous, day in zip(logged_dates, logged_dates[1:]):
+        current = current + 1 if day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+
+    return logged_dates[-1], current, longest
+
+
+class StreakService:
+    """Reads and maintains the per-user streak counter"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def logged_dates(self, user_id: int) -> List[date]:
+        """Distinct days with a consumed meal, oldest first (one grouped query)"""
+        day = func.date(MealLog.planned_datetime)
+        rows = self.db.query(day).filter(
+            MealLog.user_id == user_id,
+            MealLog.consumed_datetime.isnot(None)
+        ).group_by(day).order_by(day).all()
+
+        # SQLite returns 'YYYY-MM-DD' strings, PostgreSQL returns dates
+        return [
+            date.fromisoformat(value) if isinstance(value, str) else value
+            for (value,) in rows if value is not None
+        ]
+
+    def recompute(self, user_id: int) -> UserStreak:
+        """Rebuild the counter from meal log history"""
+        self.db.flush()
+        last_date, current, longest = streak_runs(self.logged_dates(user_id))
+
+        streak = self.db.get(UserStreak, user_id)
+        if streak is None:
+            streak = UserStreak(user_id=user_id)
+            self.db.add(streak)
+        streak.last_logged_date = last_date
+        streak.current_streak = current
+        streak.longest_streak = longest
+        if (streak.milestone_awarded or 0) > current:
+            # The run got shorter: only milestones it still reaches stay awarded
+            streak.milestone_awarded = max((m for m in STREAK_MILESTONES if m <= current), default=0)
+        self.db.flush()
+        return streak
+
+    def record_meal(self, user_id: int, logged_date: date) -> UserStreak:
+        """
+        Update the counter for a meal consumed on logged_date (planned date).
+        Back-dated logs and users without a counter fall back to recompute().
+        """
+        streak = self.db.query(UserStreak).filter(
+            UserStreak.user_id == user_id
+        ).with_for_update().first()
+
+        if streak is None or streak.last_logged_date is None or logged_date < streak.last_logged_date:
+            return self.recompute(user_id)
+
+        if logged_date == streak.last_logged_date:
+            return streak
+
+        if logged_date - streak.last_logged_date == timedelta(days=1):
+            streak.current_streak += 1
+        else:
+            streak.current_streak = 1
+            streak.milestone_awarded = 0
+        streak.last_logged_date = logged_date
+        streak.longest_streak = max(streak.longest_streak or 0, streak.current_streak)
+        return streak
+
+    def remove_meal(self, user_id: int, meal_date: date):
+        """
+        Update the counter after a meal planned on meal_date stopped counting
+        (un-logged or skipped). Only days inside the current run can change it.
+        """
+        streak = self.db.query(UserStreak).filter(
+            UserStreak.user_id == user_id
+        ).with_for_update().first()
+
+        if streak is None or streak.last_logged_date is None:
+            return
+        if streak.last_logged_date - timedelta(days=streak.current_streak - 1) <= meal_date <= streak.last_logged_date:
+            self.recompute(user_id)
+
+    def get_current_streak(self, user_id: int, today: Optional[date] = None) -> int:
+        """
+        Consecutive days with logged meals ending today (0 if nothing logged
+        today). A missing counter is created in the session (flushed, the
+        caller decides whether to commit).
+        """
+        today = today or date.today()
+        streak = self.db.get(UserStreak, user_id)
+        if streak is None:
+            streak = self.recompute(user_id)
+
+        return streak.current_streak if streak.last_logged_date == today else 0
+
+    def award_milestone(self, user_id: int, today: Optional[date] = None) -> Optional[int]:
+        """
+        Highest milestone reached by today's streak that was not awarded in
+        this run yet, marked as awarded (flushed, the caller commits). Uses >=
+        so a milestone day without a check is still awarded later in the run.
+        """
+        current = self.get_current_streak(user_id, today)
+        reached = max((m for m in STREAK_MILESTONES if current >= m), default=None)
+        if reached is None:
+            return None
+
+        streak = self.db.get(UserStreak, user_id)
+        if (streak.milestone_awarded or 0) >= reached:
+            return None
+
+        streak.milestone_awarded = reached
+        self.db.flush()
+        return reached
@@ -7,7 +7,7 @@ Provides context-aware meal and nutrition suggestions
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, date
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, or_
 import logging
 import numpy as np
 from dataclasses import dataclass
@@ -19,6 +19,7 @@ from app.models.database import (
     MealPlan, GoalType, PathType
 )
 from app.services.inventory_service import InventoryService
+from app.core.dates import day_bounds, in_range, utc_day_bounds
 
 logger = logging.getLogger(__name__)
 
@@ -106,7 +107,7 @@ class IntelligentSuggestionEngine:
         
         # Get inventory
         inventory_items = self.inventory_service.get_user_inventory(user_id)
-        inventory_ids = [item["item_id"] for item in inventory_items]
+        inventory_ids = [item["item_id"] for item in inventory_items["items"]]
         
         # Determine time available
         current_hour = datetime.now().hour
@@ -180,7 +181,7 @@ class IntelligentSuggestionEngine:
         consumed_logs = self.db.query(MealLog).filter(
             and_(
                 MealLog.user_id == user_id,
-                func.date(MealLog.consumed_datetime) == today
+                in_range(MealLog.consumed_datetime, utc_day_bounds(today))
             )
         ).all()
         
@@ -208,7 +209,7 @@ class IntelligentSuggestionEngine:
         pending_meals = self.db.query(MealLog).filter(
             and_(
                 MealLog.user_id == user_id,
-                func.date(MealLog.planned_datetime) == today,
+                in_range(MealLog.planned_datetime, day_bounds(today)),
                 MealLog.consumed_datetime.is_(None),
                 MealLog.was_skipped.is_(False)
             )
@@ -242,6 +242,24 @@ class ConnectionManager:
             logger.error(f"Error in broadcast_to_all: {str(e)}")
             return 0
     
+    async def send_to_connection(self, websocket: WebSocket, message: Dict[str, Any]) -> bool:
+        """
+        Send a message to one connection only (e.g. a reply to a client request)
+
+        Args:
+            websocket: WebSocket instance
+            message: Message dictionary to send
+
+        Returns:
+            bool: True if sent successfully
+        """
+        try:
+            message["timestamp"] = message.get("timestamp", datetime.utcnow().isoformat())
+            await self._send_to_websocket(websocket, message)
+            return True
+        except Exception:
+            return False
+
     async def _send_to_websocket(self, websocket: WebSocket, message: Dict[str, Any]):
         """
         Send message to a specific WebSocket connection
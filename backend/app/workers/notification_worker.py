@@ -15,6 +15,7 @@ from sqlalchemy import and_, func
 from app.models.database import engine, User, MealLog
 from app.services.notification_service import NotificationService, NotificationPriority
 from app.services.consumption_services import ConsumptionService
+from app.services.daily_summaries import DailySummaryFanout
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class NotificationWorker:
     def __init__(self):
         self.should_stop = False
         self.session_factory = sessionmaker(bind=engine)
-        self.last_daily_summary = None
+        self.daily_summaries_sent = {}  # timezone name -> local date of the last summaries
         self.last_weekly_report = None
         self.last_meal_reminder_check = None
         self.last_inventory_check = None
@@ -76,14 +77,8 @@ class NotificationWorker:
         current_date = current_time.date()
         
         try:
-            # Daily summaries at 9 PM (only once per day)
-            if (current_hour == 21 and 
-                (self.last_daily_summary is None or self.last_daily_summary != current_date)):
-                
-                # TRIGGER the notifications - NotificationService will queue them
-                await self._trigger_daily_summaries(notification_service, consumption_service)
-                self.last_daily_summary = current_date
-                logger.info("Daily summaries triggered")
+            # Daily summaries at 9 PM local time (once per day per timezone)
+            await self._trigger_daily_summaries()
             
             # Weekly reports on Sunday at 8 PM (only once per week)
             if (current_time.weekday() == 6 and  # Sunday
@@ -178,28 +173,25 @@ class NotificationWorker:
         except Exception as e:
             logger.error(f"Error in _trigger_meal_reminders: {str(e)}")
     
-    async def _trigger_daily_summaries(self, notification_service, consumption_service):
-        """TRIGGER daily summaries for all active users"""
+    async def _trigger_daily_summaries(self):
+        """TRIGGER daily summaries for users whose local time is 9 PM"""
         try:
-            db = self.session_factory()
-            try:
-                active_users = db.query(User).filter(User.is_active == True).all()
-                
-                for user in active_users:
-                    summary = consumption_service.get_today_summary(user.id)
-                    
-                    if summary.get("success"):
-                        # CALL THE API METHOD - This will queue the notification properly
-                        await notification_service.send_daily_summary(
-                            user_id=user.id,
-                            summary_data=summary
-                        )
-                        
-            finally:
-                db.close()
+            # Chunked bulk fan-out runs off the event loop on its own session
+            queued = await asyncio.to_thread(self._fan_out_daily_summaries)
+            if queued:
+                logger.info(f"Daily summaries triggered ({queued} queued)")
                 
         except Exception as e:
             logger.error(f"Error triggering daily summaries: {str(e)}")
+
+    def _fan_out_daily_summaries(self) -> int:
+        """Run the daily summary fan-out (blocking); returns how many were queued"""
+        db = self.session_factory()
+        try:
+            fanout = DailySummaryFanout(db, NotificationService(db))
+            return fanout.run(self.daily_summaries_sent)
+        finally:
+            db.close()
     
     async def _trigger_weekly_reports(self, notification_service, consumption_service):
         """TRIGGER weekly reports for all active users"""
@@ -231,9 +223,13 @@ class NotificationWorker:
         """TRIGGER inventory alerts for all active users"""
         try:
             from app.agents.tracking_agent import TrackingAgent
+            from app.services.expiry_risk import consumption_timelines
 
             active_users = db.query(User).filter(User.is_active == True).all()
 
+            # Consumption timelines for every user from one grouped query
+            consumption_timelines.prefetch(db, [user.id for user in active_users])
+
             alert_count = 0
 
             for user in active_users:
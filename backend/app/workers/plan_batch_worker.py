@@ -0,0 +1,359 @@
+# backend/app/workers/plan_batch_worker.py
+"""
+Batch meal plan generation for many users (e.g. the Sunday-night regeneration)
+
+    python -m app.workers.plan_batch_worker                       # all active users
+    python -m app.workers.plan_batch_worker --users 12 57 --workers 8
+
+PlanningAgent.generate_weekly_meal_plan loads recipes, scores and solves per
+request. Here the recipe catalog (candidate index snapshot) and the
+ingredient matrix are loaded ONCE and handed to every pool worker at start-up,
+per-user inputs are loaded with one query per table, and workers only run
+candidate selection, scoring and the solve - no database access. Finished
+plans are written in bulk by MealPlanWriter every WRITE_BATCH_SIZE plans.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.database import (
+    SessionLocal, User, UserProfile, UserGoal, UserPath, UserPreference,
+    UserInventory, RecipeIngredient
+)
+from app.services.final_meal_optimizer import (
+    MealPlanOptimizer, OptimizationConstraints, build_user_constraints
+)
+from app.services.item_catalog import item_catalog
+from app.services.meal_plan_writer import MealPlanWriter
+from app.services.recipe_index import RecipeIndexSnapshot, recipe_candidate_index
+from app.services.recipe_scoring import RecipeMatrix, RecipeScoringEngine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 200
+
+
+class PlanCatalog:
+    """Recipe candidate snapshot + ingredient triplets shared by all workers"""
+
+    def __init__(self, snapshot: RecipeIndexSnapshot, recipe_ids, item_ids, quantities):
+        self.snapshot = snapshot
+        self.ing_recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.ing_item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.ing_qty = np.asarray(quantities, dtype=np.float64)
+
+    @classmethod
+    def load(cls, db: Session) -> "PlanCatalog":
+        snapshot = recipe_candidate_index.snapshot(db)
+        rows = db.query(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.item_id,
+            RecipeIngredient.quantity_grams
+        ).all()
+        return cls(
+            snapshot,
+            [r[0] for r in rows],
+            [r[1] if r[1] is not None else -1 for r in rows],
+            [r[2] or 0 for r in rows]
+        )
+
+    def ingredient_rows(self, recipe_ids: Iterable[int]) -> List[tuple]:
+        """(recipe_id, item_id, quantity_grams) rows of the given recipes"""
+        mask = np.isin(self.ing_recipe_ids, np.fromiter(recipe_ids, dtype=np.int64))
+        return list(zip(
+            self.ing_recipe_ids[mask].tolist(),
+            self.ing_item_ids[mask].tolist(),
+            self.ing_qty[mask].tolist()
+        ))
+
+
+@dataclass
+class UserPlanJob:
+    """Everything a worker needs to plan one user"""
+    user_id: int
+    constraints: OptimizationConstraints
+    goal: Optional[str]
+    goal_type: str
+    inventory: Dict[int, float]
+    meal_windows: Optional[List[Dict]] = None
+    days: int = 7
+
+
+@dataclass
+class UserPlanResult:
+    user_id: int
+    plan: Optional[Dict] = None
+    solve_ms: float = 0.0
+    method: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    """Per-user solve times and failures of one batch run"""
+    users: int = 0
+    saved: int = 0
+    elapsed_s: float = 0.0
+    solve_ms: Dict[int, float] = field(default_factory=dict)
+    methods: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    failures: Dict[int, str] = field(default_factory=dict)
+
+    def add(self, result: UserPlanResult):
+        # methods are counted once the plan is saved (see BatchPlanGenerator._flush)
+        self.solve_ms[result.user_id] = result.solve_ms
+        if result.error:
+            self.failures[result.user_id] = result.error
+
+    def as_dict(self) -> Dict:
+        times = np.array(list(self.solve_ms.values()) or [0.0])
+        return {
+            'users': self.users,
+            'succeeded': self.users - len(self.failures),
+            'failed': len(self.failures),
+            'saved': self.saved,
+            'elapsed_s': round(self.elapsed_s, 2),
+            'solve_ms': {
+                'p50': round(float(np.percentile(times, 50)), 1),
+                'p95': round(float(np.percentile(times, 95)), 1),
+                'max': round(float(times.max()), 1)
+            },
+            'methods': dict(self.methods),
+            'failures': {str(user_id): error for user_id, error in self.failures.items()}
+        }
+
+
+# Catalog of the current worker process (set by _init_worker)
+_WORKER_CATALOG: Optional[PlanCatalog] = None
+
+
+def _init_worker(catalog: PlanCatalog):
+    global _WORKER_CATALOG
+    _WORKER_CATALOG = catalog
+
+
+def plan_for_user(job: UserPlanJob) -> UserPlanResult:
+    """Select candidates, score and solve one user's plan (no DB access)"""
+    started = time.perf_counter()
+    catalog = _WORKER_CATALOG
+    try:
+        candidates = MealPlanOptimizer.select_candidates(catalog.snapshot, job.goal, job.constraints)
+        if not candidates:
+            raise ValueError("No candidate recipes")
+
+        matrix = RecipeMatrix(candidates)
+        matrix.set_ingredients(catalog.ingredient_rows(matrix.recipe_ids.tolist()))
+        scored_recipes = RecipeScoringEngine().score(
+            candidates, job.constraints, job.goal_type, job.inventory, matrix=matrix
+        )
+
+        plan = MealPlanOptimizer().optimize(
+            job.user_id,
+            days=job.days,
+            constraints=job.constraints,
+            available_recipes=candidates,
+            inventory=job.inventory,
+            scored_recipes=scored_recipes
+        )
+        if not plan or not plan.get('success'):
+            raise ValueError((plan or {}).get('error', 'Optimizer failed to generate plan'))
+
+        return UserPlanResult(
+            user_id=job.user_id,
+            plan=plan,
+            solve_ms=round((time.perf_counter() - started) * 1000, 1),
+            method=plan.get('optimization_method')
+        )
+
+    except Exception as e:
+        return UserPlanResult(
+            user_id=job.user_id,
+            solve_ms=round((time.perf_counter() - started) * 1000, 1),
+            error=str(e)
+        )
+
+
+class BatchPlanGenerator:
+    """Generate and save plans for many users with a process pool"""
+
+    def __init__(
+        self,
+        db: Session,
+        workers: Optional[int] = None,
+        days: int = 7,
+        start_date: Optional[datetime] = None,
+        write_batch_size: int = WRITE_BATCH_SIZE
+    ):
+        self.db = db
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.days = days
+        self.start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.write_batch_size = write_batch_size
+        self.writer = MealPlanWriter(db)
+
+    def load_jobs(self, user_ids: Optional[List[int]] = None) -> List[UserPlanJob]:
+        """Per-user inputs with one query per table"""
+        if user_ids is None:
+            user_ids = [
+                user_id for (user_id,) in self.db.query(User.id).filter(
+                    User.is_active == True,
+                    User.onboarding_completed == True
+                ).order_by(User.id)
+            ]
+        if not user_ids:
+            return []
+
+        profiles = {p.user_id: p for p in self.db.query(UserProfile).filter(UserProfile.user_id.in_(user_ids))}
+        goals = {
+            g.user_id: g for g in self.db.query(UserGoal).filter(
+                UserGoal.user_id.in_(user_ids), UserGoal.is_active == True
+            )
+        }
+        paths = {p.user_id: p for p in self.db.query(UserPath).filter(UserPath.user_id.in_(user_ids))}
+        preferences = {p.user_id: p for p in self.db.query(UserPreference).filter(UserPreference.user_id.in_(user_ids))}
+
+        inventories = defaultdict(dict)
+        for user_id, item_id, quantity in self.db.query(
+            UserInventory.user_id, UserInventory.item_id, UserInventory.quantity_grams
+        ).filter(UserInventory.user_id.in_(user_ids)):
+            inventories[user_id][item_id] = quantity
+
+        jobs = []
+        for user_id in user_ids:
+            goal = goals.get(user_id)
+            path = paths.get(user_id)
+            jobs.append(UserPlanJob(
+                user_id=user_id,
+                constraints=build_user_constraints(
+                    profiles.get(user_id), goal, path, preferences.get(user_id)
+                ),
+                goal=goal.goal_type.value.lower() if goal else None,
+                goal_type=goal.goal_type.value if goal else 'general_health',
+                inventory=inventories.get(user_id, {}),
+                meal_windows=path.meal_windows if path else None,
+                days=self.days
+            ))
+        return jobs
+
+    def run(self, user_ids: Optional[List[int]] = None) -> BatchReport:
+        started = time.perf_counter()
+        report = BatchReport()
+
+        catalog = PlanCatalog.load(self.db)
+        jobs = self.load_jobs(user_ids)
+        report.users = len(jobs)
+        logger.info(
+            f"Batch planning {len(jobs)} users with {self.workers} workers "
+            f"({len(catalog.snapshot)} recipes, {len(catalog.ing_recipe_ids)} ingredient rows)"
+        )
+
+        jobs_by_user = {job.user_id: job for job in jobs}
+        items = item_catalog.snapshot(self.db).by_id
+        pending = []
+
+        if self.workers > 1 and len(jobs) > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(catalog,)
+            )
+            results = executor.map(plan_for_user, jobs, chunksize=max(1, len(jobs) // (self.workers * 8)))
+        else:
+            executor = None
+            _init_worker(catalog)
+            results = map(plan_for_user, jobs)
+
+        try:
+            for result in results:
+                report.add(result)
+                if result.error:
+                    logger.warning(f"User {result.user_id}: failed after {result.solve_ms}ms - {result.error}")
+                    continue
+
+                logger.info(f"User {result.user_id}: {result.method} in {result.solve_ms}ms")
+                pending.append((result, self._plan_row(jobs_by_user[result.user_id], result.plan, catalog, items)))
+                if len(pending) >= self.write_batch_size:
+                    self._flush(pending, report)
+                    pending = []
+
+            self._flush(pending, report)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        report.elapsed_s = time.perf_counter() - started
+        logger.info(f"Batch planning finished: {json.dumps(report.as_dict())}")
+        return report
+
+    def _plan_row(self, job: UserPlanJob, plan: Dict, catalog: PlanCatalog, items: Dict) -> Dict:
+        """MealPlanWriter input with the grocery list built from the shared catalog"""
+        from app.agents.planning_agent import build_grocery_list
+
+        recipe_ids = {
+            recipe['id']
+            for day in plan['week_plan'].values()
+            for recipe in day.get('meals', {}).values()
+            if recipe and recipe.get('id')
+        }
+        ingredient_rows = [
+            (item_id, quantity)
+            for _, item_id, quantity in catalog.ingredient_rows(recipe_ids)
+            if item_id > 0
+        ]
+        grocery_list = build_grocery_list(ingredient_rows, items, job.inventory)
+
+        return {
+            'user_id': job.user_id,
+            'start_date': self.start_date,
+            'week_plan': plan['week_plan'],
+            'grocery_list': grocery_list,
+            'total_calories': plan['total_calories'],
+            'avg_macros': plan['avg_macros'],
+            'meal_windows': job.meal_windows
+        }
+
+    def _flush(self, pending: List[tuple], report: BatchReport):
+        """Save (result, plan row) pairs in one write; their methods count only if it succeeds"""
+        if not pending:
+            return
+        try:
+            self.writer.save_plans([plan for _, plan in pending])
+        except Exception as e:
+            for result, _ in pending:
+                report.failures[result.user_id] = f"save failed: {str(e)}"
+            return
+
+        report.saved += len(pending)
+        for result, _ in pending:
+            report.methods[result.method] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate weekly meal plans for many users")
+    parser.add_argument('--users', type=int, nargs='*', help="User ids (default: all active, onboarded users)")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--start-date', type=datetime.fromisoformat, default=None, help="Plan start (ISO date)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = BatchPlanGenerator(
+            db, workers=args.workers, days=args.days, start_date=args.start_date
+        ).run(args.users or None)
+        print(json.dumps(report.as_dict(), indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
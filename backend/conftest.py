@@ -6,8 +6,9 @@ Provides reusable test fixtures for database, users, meals, etc.
 
 import pytest
 import asyncio
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import redis
@@ -51,6 +52,26 @@ def test_db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_shared_caches(monkeypatch):
+    """
+    Process-wide caches are keyed by user id, which every in-memory database reuses.
+
+    Each test gets empty, process-local stores; the inventory snapshot cache
+    never talks to the shared Redis (its keys would collide with dev data).
+    Services import the singletons by name, so their state is swapped in place.
+    """
+    from app.services.expiry_risk import TimelineCache, consumption_timelines
+    from app.services.inventory_snapshot import InventorySnapshotCache, inventory_snapshots
+
+    for cache, fresh in (
+        (inventory_snapshots, InventorySnapshotCache(use_redis=False)),
+        (consumption_timelines, TimelineCache()),
+    ):
+        for name, value in vars(fresh).items():
+            monkeypatch.setattr(cache, name, value)
+
+
 @pytest.fixture(scope="function")
 def db_session(test_db):
     """Alias for test_db for clearer test code"""
@@ -589,4 +610,31 @@ def assert_database_state():
         
         return results
     
-    return _assert_state
\ No newline at end of file
+    return _assert_state
+
+
+@pytest.fixture
+def record_statements(test_db: Session):
+    """
+    Helper fixture for counting the SQL a block runs:
+
+        with record_statements() as statements:
+            service.get_user_inventory(user_id)
+        assert len(statements) == 1
+    """
+    engine = test_db.get_bind()
+
+    @contextmanager
+    def _record():
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+
+    return _record
@@ -0,0 +1,160 @@
+"""
+Benchmark meal_logs day filters: func.date() vs half-open ranges
+
+This script:
+1. Seeds a scratch copy of meal_logs (meal_logs_bench, default 1M rows,
+   2,000 users x 500 meals) server-side with generate_series
+2. Runs the hot "today's meals" queries with func.date(...) = today and with
+   half-open [midnight, next midnight) ranges, before and after adding the
+   composite/partial indexes from the add_meal_log_range_indexes migration
+3. Prints EXPLAIN (ANALYZE, BUFFERS) plans and timings for each variant
+
+Run against PostgreSQL (settings.database_url). The scratch table is
+dropped at the end; the real meal_logs table is not touched.
+
+    python scripts/benchmark_meal_log_indexes.py [--rows 1000000] [--users 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.models.database import engine
+
+TABLE = "meal_logs_bench"
+
+SEED = f"""
+CREATE TABLE {TABLE} (
+    id serial PRIMARY KEY,
+    user_id integer,
+    recipe_id integer,
+    meal_type varchar(20),
+    planned_datetime timestamp,
+    consumed_datetime timestamp,
+    was_skipped boolean DEFAULT false,
+    portion_multiplier double precision DEFAULT 1.0
+);
+INSERT INTO {TABLE} (user_id, recipe_id, meal_type, planned_datetime, consumed_datetime, was_skipped)
+SELECT
+    1 + (n % :users),
+    1 + (n % 300),
+    (ARRAY['breakfast', 'lunch', 'dinner', 'snack'])[1 + (n / :users) % 4],
+    planned,
+    CASE WHEN planned < now() AND n % 5 <> 0 THEN planned + interval '20 minutes' END,
+    planned < now() AND n % 5 = 0
+FROM (
+    SELECT n, date_trunc('day', now()) - ((n / :users) / 4) * interval '1 day'
+              + (8 + ((n / :users) % 4) * 4) * interval '1 hour' + interval '3 days' AS planned
+    FROM generate_series(0, :rows - 1) AS n
+) seeded;
+CREATE INDEX ix_{TABLE}_user_id ON {TABLE} (user_id);
+CREATE INDEX ix_{TABLE}_planned_datetime ON {TABLE} (planned_datetime);
+ANALYZE {TABLE};
+"""
+
+RANGE_INDEXES = f"""
+CREATE INDEX ix_{TABLE}_user_planned ON {TABLE} (user_id, planned_datetime);
+CREATE INDEX ix_{TABLE}_user_consumed ON {TABLE} (user_id, consumed_datetime);
+CREATE INDEX ix_{TABLE}_user_pending ON {TABLE} (user_id, planned_datetime)
+    WHERE consumed_datetime IS NULL AND was_skipped = false;
+ANALYZE {TABLE};
+"""
+
+QUERIES = {
+    "today's meals (func.date)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id AND date(planned_datetime) = current_date
+    """,
+    "today's meals (range)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id
+          AND planned_datetime >= current_date AND planned_datetime < current_date + 1
+    """,
+    "pending reminders (func.date)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id AND date(planned_datetime) = current_date
+          AND consumed_datetime IS NULL AND was_skipped = false
+    """,
+    "pending reminders (range)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id
+          AND planned_datetime >= current_date AND planned_datetime < current_date + 1
+          AND consumed_datetime IS NULL AND was_skipped = false
+    """,
+    "consumed yesterday (func.date)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id AND date(consumed_datetime) = current_date - 1
+    """,
+    "consumed yesterday (range)": f"""
+        SELECT * FROM {TABLE}
+        WHERE user_id = :user_id
+          AND consumed_datetime >= current_date - 1 AND consumed_datetime < current_date
+    """,
+}
+
+
+def run_queries(conn, label: str, user_id: int, repeat: int):
+    print("\n" + "=" * 80)
+    print(label)
+    print("=" * 80)
+
+    for name, query in QUERIES.items():
+        plan = conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"), {"user_id": user_id}
+        ).scalars().all()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(text(query), {"user_id": user_id}).fetchall()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+        print(f"\n--- {name}: {elapsed_ms:.2f} ms/query")
+        for line in plan:
+            print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ This benchmark needs PostgreSQL (got {engine.dialect.name})")
+        return 1
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        started = time.perf_counter()
+        params = {"rows": args.rows, "users": args.users}
+        for statement in filter(str.strip, SEED.split(";")):
+            conn.execute(text(statement), params if ":rows" in statement else {})
+        print(f"✅ Seeded {args.rows:,} rows for {args.users:,} users in {time.perf_counter() - started:.1f}s")
+
+    user_id = args.users // 2
+    try:
+        with engine.connect() as conn:
+            run_queries(conn, "BEFORE: single-column indexes (user_id, planned_datetime)", user_id, args.repeat)
+
+        with engine.begin() as conn:
+            for statement in filter(str.strip, RANGE_INDEXES.split(";")):
+                conn.execute(text(statement))
+
+        with engine.connect() as conn:
+            run_queries(conn, "AFTER: composite + partial range indexes", user_id, args.repeat)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
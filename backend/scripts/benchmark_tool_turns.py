@@ -0,0 +1,130 @@
+"""
+Benchmark multi-tool chat turns: sequential sync tools vs concurrent async tools
+
+This script replays one LLM message that requests several tools at once
+(nutrition stats, today's meal plan, inventory, makeable recipes) for a user:
+
+1. BEFORE: each tool call opens its own SessionLocal, builds a fresh
+   UserContext and runs one after the other (the original tool path)
+2. AFTER: the tool calls go through the graph's ToolNode inside a turn_scope,
+   so the read-only async tools run concurrently on the asyncpg pool while
+   the service-backed tools share the turn's session and UserContext
+
+and prints p50/p95/mean turn latency for each.
+
+Run against PostgreSQL (settings.database_url) with a user that has a
+profile, a meal plan and some inventory. No data is written.
+
+    python scripts/benchmark_tool_turns.py --user-id 1 [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage
+from langgraph.prebuilt import ToolNode
+
+from app.agents.nutrition_context import UserContext
+from app.agents.nutrition_graph import create_nutrition_tools_v2
+from app.agents.turn_context import turn_scope
+from app.core.async_db import close_async_engine
+from app.models.database import SessionLocal, engine
+
+TOOL_CALLS = [
+    ("get_nutrition_stats", {}),
+    ("get_meal_plan", {}),
+    ("check_inventory", {}),
+    ("get_makeable_recipes", {}),
+]
+
+# What each tool did per call before (fresh session + fresh UserContext)
+BEFORE = {
+    "get_nutrition_stats": lambda context: context.build_context(minimal=True),
+    "get_meal_plan": lambda context: context.build_context(minimal=False),
+    "check_inventory": lambda context: context.build_context(minimal=True),
+    "get_makeable_recipes": lambda context: context.get_makeable_recipes(limit=10),
+}
+
+
+def run_before(user_id: int):
+    for name, _ in TOOL_CALLS:
+        db = SessionLocal()
+        try:
+            BEFORE[name](UserContext(db, user_id))
+        finally:
+            db.close()
+
+
+async def run_after(tool_node: ToolNode, user_id: int):
+    message = AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"user_id": user_id, **args}, "id": f"call_{i}"}
+        for i, (name, args) in enumerate(TOOL_CALLS)
+    ])
+    with turn_scope():
+        result = await tool_node.ainvoke({"messages": [message]})
+    return result["messages"]
+
+
+def report(label: str, timings_ms):
+    timings_ms = sorted(timings_ms)
+    p95 = timings_ms[min(len(timings_ms) - 1, int(len(timings_ms) * 0.95))]
+    print(
+        f"{label:<45} p50 {statistics.median(timings_ms):8.1f} ms   "
+        f"p95 {p95:8.1f} ms   mean {statistics.mean(timings_ms):8.1f} ms"
+    )
+
+
+async def benchmark_after(user_id: int, repeat: int):
+    tool_node = ToolNode(create_nutrition_tools_v2())
+    try:
+        messages = await run_after(tool_node, user_id)  # warm up pool and caches
+        errors = [m.name for m in messages if '"error"' in m.content]
+        if errors:
+            print(f"⚠️ Tools returned errors: {', '.join(errors)}")
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await run_after(tool_node, user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+    finally:
+        await close_async_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ This benchmark needs PostgreSQL (got {engine.dialect.name})")
+        return 1
+
+    print(f"Turn with {len(TOOL_CALLS)} tool calls: {', '.join(name for name, _ in TOOL_CALLS)}\n")
+
+    run_before(args.user_id)  # warm up
+    before = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        run_before(args.user_id)
+        before.append((time.perf_counter() - started) * 1000)
+
+    after = asyncio.run(benchmark_after(args.user_id, args.repeat))
+
+    report("BEFORE: sequential, fresh session per tool", before)
+    report("AFTER: ToolNode, async tools concurrent", after)
+    print(f"\nSpeedup (p50): {statistics.median(before) / statistics.median(after):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Batch FIFO inventory deduction tests
+
+Tests:
+1. A recipe x portion is consumed oldest-expiry-first across batches
+2. Missing and short items are reported, and one locking SELECT + one commit are issued
+3. Logging a meal commits the meal log and the deduction together
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models.database import Item, MealLog, Recipe, RecipeIngredient, UserInventory
+from app.services.consumption_services import ConsumptionService
+from app.services.inventory_service import IntelligentInventoryService
+
+
+@pytest.fixture
+def pantry(test_db, test_user):
+    user = test_user
+    rice, egg, salt = items = [Item(canonical_name=name, category='test') for name in ('rice', 'egg', 'salt')]
+    test_db.add_all(items)
+    test_db.flush()
+
+    recipe = Recipe(title='Egg fried rice', macros_per_serving={'calories': 500})
+    test_db.add(recipe)
+    test_db.flush()
+    test_db.add_all([
+        RecipeIngredient(recipe_id=recipe.id, item_id=rice.id, quantity_grams=150),
+        RecipeIngredient(recipe_id=recipe.id, item_id=egg.id, quantity_grams=100),
+        RecipeIngredient(recipe_id=recipe.id, item_id=salt.id, quantity_grams=5),
+    ])
+
+    now = datetime.now()
+    batches = {
+        'rice_late': UserInventory(user_id=user.id, item_id=rice.id, quantity_grams=500, expiry_date=now + timedelta(days=30)),
+        'rice_undated': UserInventory(user_id=user.id, item_id=rice.id, quantity_grams=500),
+        'rice_soon': UserInventory(user_id=user.id, item_id=rice.id, quantity_grams=100, expiry_date=now + timedelta(days=2)),
+        'egg': UserInventory(user_id=user.id, item_id=egg.id, quantity_grams=60, expiry_date=now + timedelta(days=5)),
+    }
+    test_db.add_all(batches.values())
+    test_db.commit()
+    return {'user_id': user.id, 'recipe_id': recipe.id, 'items': items, 'batches': batches}
+
+
+def test_fifo_across_expiry_batches(test_db, pantry):
+    rice = pantry['items'][0]
+    result = IntelligentInventoryService(test_db).deduct_recipe(
+        pantry['user_id'], pantry['recipe_id'], portion_multiplier=2.0
+    )
+
+    batches = pantry['batches']
+    assert batches['rice_soon'].quantity_grams == 0
+    assert batches['rice_late'].quantity_grams == 300
+    assert batches['rice_undated'].quantity_grams == 500
+    assert result[rice.id]['deducted'] == 300
+    assert result[rice.id]['remaining'] == 800
+    assert result[rice.id]['shortage'] == 0
+
+
+def test_shortages_single_lock_and_commit(test_db, pantry, record_statements):
+    rice, egg, salt = pantry['items']
+    user_id, recipe_id = pantry['user_id'], pantry['recipe_id']
+    commits = []
+
+    event.listen(test_db, 'after_commit', lambda session: commits.append(session))
+    with record_statements() as statements:
+        result = ConsumptionService(test_db).auto_deduct_ingredients(recipe_id, 1.0, user_id)
+
+    assert [item['item_id'] for item in result['deducted_items']] == [rice.id, egg.id]
+    egg_change = result['deducted_items'][1]
+    assert (egg_change['quantity_deducted'], egg_change['remaining_quantity']) == (60, 0)
+    assert 'warning' in egg_change
+    assert result['failed_deductions'] == [
+        {'item_id': salt.id, 'item_name': 'salt', 'error': 'Item not in inventory'}
+    ]
+
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    assert len(selects) == 2  # ingredients + batches
+    assert len(commits) == 1
+
+
+def test_log_meal_commits_with_deduction(test_db, pantry):
+    user_id = pantry['user_id']
+    meal = MealLog(
+        user_id=user_id, recipe_id=pantry['recipe_id'], meal_type='lunch',
+        planned_datetime=datetime.now()
+    )
+    test_db.add(meal)
+    test_db.commit()
+
+    result = ConsumptionService(test_db).log_meal_consumption(user_id, {'meal_log_id': meal.id})
+    assert result['status'] == 'success'
+    assert len(result['inventory_changes']) == 2
+
+    test_db.rollback()  # nothing left pending
+    assert test_db.get(MealLog, meal.id).consumed_datetime is not None
+    assert pantry['batches']['rice_soon'].quantity_grams == 0
+    assert pantry['batches']['rice_late'].quantity_grams == 450
+
+    again = ConsumptionService(test_db).log_meal_consumption(user_id, {'meal_log_id': meal.id})
+    assert again == {'status': 'error', 'error': 'Meal already logged'}
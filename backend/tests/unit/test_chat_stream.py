@@ -0,0 +1,148 @@
+"""
+Chat streaming tests
+
+Tests:
+1. Graph events are mapped to node, tool and token events in order
+2. Only generate_response tokens are streamed; the final state is kept
+3. SSE frames carry the event name and JSON payload
+4. A compiled graph with the real LLM nodes streams generate_response tokens
+"""
+
+import asyncio
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from app.agents import nutrition_graph
+from app.agents.chat_stream import ChatStream
+from app.agents.nutrition_graph import NutritionState, classify_intent_node, generate_response_node
+from app.api.nutrition_chat import _sse
+
+
+def _node(kind, node, output=None):
+    return {
+        "event": kind, "name": node, "metadata": {"langgraph_node": node},
+        "data": {"output": output} if output is not None else {}, "parent_ids": ["root"]
+    }
+
+
+def _token(node, text):
+    return {
+        "event": "on_chat_model_stream", "name": "ChatOpenAI", "metadata": {"langgraph_node": node},
+        "data": {"chunk": AIMessageChunk(content=text)}, "parent_ids": ["root", "node"]
+    }
+
+
+GRAPH_EVENTS = [
+    {"event": "on_chain_start", "name": "LangGraph", "metadata": {}, "data": {}, "parent_ids": []},
+    _node("on_chain_start", "classify_intent"),
+    _token("classify_intent", '{"intent": "stats"}'),
+    _node("on_chain_end", "classify_intent", {"intent": "stats", "confidence": 0.95, "entities": {}}),
+    _node("on_chain_start", "generate_response"),
+    _token("generate_response", ""),  # tool-call chunk without text
+    _node("on_chain_end", "generate_response", {"messages": []}),
+    {"event": "on_tool_start", "name": "get_nutrition_stats", "metadata": {"langgraph_node": "tools"},
+     "data": {}, "parent_ids": ["root"]},
+    {"event": "on_tool_end", "name": "get_nutrition_stats", "metadata": {"langgraph_node": "tools"},
+     "data": {}, "parent_ids": ["root"]},
+    _token("generate_response", "Protein is "),
+    _token("generate_response", "85/150g."),
+    {"event": "on_chain_end", "name": "ChannelWrite", "metadata": {"langgraph_node": "generate_response"},
+     "data": {"output": {}}, "parent_ids": ["root"]},
+    {"event": "on_chain_end", "name": "LangGraph", "metadata": {},
+     "data": {"output": {"intent": "stats", "messages": ["..."]}}, "parent_ids": []},
+]
+
+
+class FakeGraph:
+    def __init__(self, events):
+        self.events = events
+        self.calls = []
+
+    async def astream_events(self, state, config=None, version=None):
+        self.calls.append((state, config, version))
+        for event in self.events:
+            yield event
+
+
+def test_stream_events():
+    async def run():
+        graph = FakeGraph(GRAPH_EVENTS)
+        stream = ChatStream(graph, {"messages": []}, {"configurable": {"thread_id": "s-1"}})
+        events = [event async for event in stream.events()]
+        return graph, stream, events
+
+    graph, stream, events = asyncio.run(run())
+
+    assert graph.calls[0][2] == "v2"
+    assert events == [
+        {"event": "node_start", "node": "classify_intent"},
+        {"event": "node_end", "node": "classify_intent", "intent": "stats", "confidence": 0.95},
+        {"event": "node_start", "node": "generate_response"},
+        {"event": "node_end", "node": "generate_response"},
+        {"event": "tool_start", "tool": "get_nutrition_stats"},
+        {"event": "tool_end", "tool": "get_nutrition_stats"},
+        {"event": "token", "delta": "Protein is "},
+        {"event": "token", "delta": "85/150g."},
+    ]
+    assert stream.final_state == {"intent": "stats", "messages": ["..."]}
+    assert stream.first_token_ms is not None
+
+
+def test_sse_frame():
+    frame = _sse({"event": "token", "delta": "Hi"})
+
+    assert frame.startswith("event: token\ndata: ")
+    assert frame.endswith("\n\n")
+    assert json.loads(frame.split("data: ", 1)[1]) == {"delta": "Hi"}
+
+
+class FakeChatModel(GenericFakeChatModel):
+    """Streams its canned reply word by word; bind_tools is a no-op"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _fake_chat_openai(**kwargs):
+    # classify_intent_node asks for JSON mode, generate_response_node binds tools
+    if "model_kwargs" in kwargs:
+        reply = '{"intent": "conversational", "confidence": 0.9, "entities": {}}'
+    else:
+        reply = "Rest and ice it for a day."
+    return FakeChatModel(messages=iter([AIMessage(content=reply)]))
+
+
+def test_stream_compiled_graph(monkeypatch):
+    monkeypatch.setattr(nutrition_graph, "ChatOpenAI", _fake_chat_openai)
+    workflow = StateGraph(NutritionState)
+    workflow.add_node("classify_intent", classify_intent_node)
+    workflow.add_node("generate_response", generate_response_node)
+    workflow.set_entry_point("classify_intent")
+    workflow.add_edge("classify_intent", "generate_response")
+    workflow.add_edge("generate_response", END)
+    graph = workflow.compile()
+
+    state = {
+        "messages": [HumanMessage(content="my knee hurts after squats")],  # router defers to the LLM
+        "user_context": {
+            "user_id": 1, "goal_type": "general_health", "activity_level": "moderate",
+            "dietary_restrictions": [], "current_date": "2026-03-02", "current_time": "12:00"
+        },
+        "user_id": 1, "session_id": "s-1", "turn_count": 1,
+    }
+
+    async def run():
+        stream = ChatStream(graph, state, {"configurable": {"thread_id": "s-1"}})
+        return stream, [event async for event in stream.events()]
+
+    stream, events = asyncio.run(run())
+
+    tokens = [event["delta"] for event in events if event["event"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Rest and ice it for a day."
+    assert {"event": "node_end", "node": "classify_intent", "intent": "conversational", "confidence": 0.9} in events
+    assert stream.final_state["messages"][-1].content == "Rest and ice it for a day."
+    assert stream.first_token_ms is not None
@@ -0,0 +1,92 @@
+"""
+Async MongoDB checkpointer tests
+
+Tests:
+1. Task writes are buffered and saved with the step's checkpoint in one bulk_write
+2. Error writes are flushed immediately
+3. Old checkpoints are pruned past max_checkpoints
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from langgraph.checkpoint.base import WRITES_IDX_MAP, empty_checkpoint
+
+from app.agents.checkpointer import AsyncMongoCheckpointer
+
+CONFIG = {"configurable": {"thread_id": "session-1", "checkpoint_ns": "", "checkpoint_id": "cp-1"}}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+def _collection(docs=()):
+    collection = MagicMock()
+    for method in ("create_index", "update_one", "bulk_write", "delete_many"):
+        setattr(collection, method, AsyncMock())
+    collection.find.return_value = FakeCursor(list(docs))
+    return collection
+
+
+def _saver(max_checkpoints=20, prune_every=10, stored=()):
+    saver = AsyncMongoCheckpointer(MagicMock(), "nutrilens_agent", max_checkpoints=max_checkpoints, prune_every=prune_every)
+    saver.checkpoint_collection = _collection(stored)
+    saver.writes_collection = _collection()
+    return saver
+
+
+def test_writes_batched_per_step():
+    async def run():
+        saver = _saver()
+        await saver.aput_writes(CONFIG, [("messages", "hi"), ("intent", "stats")], task_id="classify")
+        await saver.aput_writes(CONFIG, [("context", {"calories": 1200})], task_id="load_context")
+        assert not saver.writes_collection.bulk_write.called
+
+        next_config = await saver.aput(CONFIG, empty_checkpoint(), {"step": 1}, {})
+
+        assert next_config["configurable"]["thread_id"] == "session-1"
+        saver.checkpoint_collection.update_one.assert_awaited_once()
+        saver.writes_collection.bulk_write.assert_awaited_once()
+        operations = saver.writes_collection.bulk_write.await_args.args[0]
+        assert len(operations) == 3
+        assert not saver._pending_writes
+
+    asyncio.run(run())
+
+
+def test_error_writes_flush_immediately():
+    async def run():
+        saver = _saver()
+        error_channel = next(iter(WRITES_IDX_MAP))
+        await saver.aput_writes(CONFIG, [("messages", "hi")], task_id="classify")
+        await saver.aput_writes(CONFIG, [(error_channel, "boom")], task_id="tools")
+
+        operations = saver.writes_collection.bulk_write.await_args.args[0]
+        assert len(operations) == 2
+
+    asyncio.run(run())
+
+
+def test_prunes_old_checkpoints():
+    async def run():
+        saver = _saver(max_checkpoints=5, prune_every=10, stored=[{"checkpoint_id": "cp-0"}])
+
+        await saver.aput(CONFIG, empty_checkpoint(), {"step": 3}, {})
+        assert not saver.checkpoint_collection.delete_many.called
+
+        await saver.aput(CONFIG, empty_checkpoint(), {"step": 10}, {})
+        assert saver.checkpoint_collection.find.call_args.kwargs["skip"] == 5
+        stale = {"thread_id": "session-1", "checkpoint_ns": "", "checkpoint_id": {"$lte": "cp-0"}}
+        saver.checkpoint_collection.delete_many.assert_awaited_once_with(stale)
+        saver.writes_collection.delete_many.assert_awaited_once_with(stale)
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+"""
+Columnar consumption analytics tests
+
+Tests:
+1. Pattern blocks computed from one frame (timing, skips, portions, weekdays)
+2. Favorite recipes resolved from the joined recipe columns
+3. generate_consumption_analytics / get_meal_patterns over a 365-day window
+"""
+
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from app.models.database import MealLog, Recipe, User
+from app.services.consumption_analytics import COLUMNS, MealLogFrame
+from app.services.consumption_services import ConsumptionService
+
+MONDAY = date(2026, 3, 2)
+
+
+def _row(day, hour, meal_type, consumed=True, skip_reason=None, portion=1.0, recipe=(1, 'Poha', ['fat_loss'])):
+    planned = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+    return (
+        meal_type, planned, planned + timedelta(minutes=15) if consumed else None,
+        not consumed, skip_reason, portion if consumed else None, *recipe
+    )
+
+
+@pytest.fixture
+def frame():
+    rows = []
+    for offset in range(7):
+        day = MONDAY + timedelta(days=offset)
+        weekend = offset >= 5
+        rows.append(_row(day, 8, 'breakfast'))
+        rows.append(_row(day, 13, 'lunch', portion=1.5, recipe=(2, 'Dal rice', None)))
+        rows.append(_row(day, 19 + offset % 2, 'dinner', consumed=not weekend,
+                         skip_reason='No time' if weekend else None))
+    return MealLogFrame(pd.DataFrame.from_records(rows, columns=COLUMNS))
+
+
+def test_pattern_blocks(frame):
+    timing = frame.meal_timing()
+    assert timing['breakfast'] == {
+        'average_time': 8.2, 'earliest': 8.25, 'latest': 8.25, 'consistency': 'very_consistent'
+    }
+    assert timing['dinner']['consistency'] == 'very_consistent'
+    assert 'snack' not in timing
+
+    skips = frame.skip_frequency()
+    assert skips['dinner'] == {
+        'total_planned': 7, 'total_skipped': 2, 'skip_rate': 28.6, 'common_reasons': {'No time': 2}
+    }
+    assert frame.skip_patterns()['dinner']['skip_days'] == {'Saturday': 1, 'Sunday': 1}
+
+    portions = frame.portion_trends()
+    assert portions['by_meal_type'] == {'breakfast': 1.0, 'lunch': 1.5, 'dinner': 1.0}
+    assert (portions['min_portion'], portions['max_portion']) == (1.0, 1.5)
+
+    weekly = frame.weekly_patterns()
+    assert weekly['Monday'] == {'planned': 3, 'consumed': 3, 'compliance': 100.0}
+    assert weekly['Sunday']['compliance'] == 66.7
+    assert frame.weekday_compliance()['Sunday'] == {'compliance': 66.7, 'meal_count': 0}
+
+    assert 'Time constraints are your main challenge - try quick recipes' in frame.improvement_insights()
+    assert frame.success_factors() == ['Strong breakfast compliance (100%)', 'Better compliance on weekdays']
+
+
+def test_favorite_recipes(frame):
+    favorites = frame.favorite_recipes()
+    assert list(favorites) == ['Poha', 'Dal rice']
+    assert favorites['Poha'] == {'count': 12, 'percentage': 57.1}
+
+    assert frame.recipe_frequencies()['Poha']['goals'] == ['fat_loss']
+    assert frame.recipe_frequencies()['Dal rice']['goals'] == []
+
+    empty = MealLogFrame(pd.DataFrame.from_records([], columns=COLUMNS))
+    assert empty.empty
+    assert empty.favorite_recipes() == {'no_data': True}
+    assert empty.portion_trends() == {'no_data': True}
+
+
+def test_service_reports_over_a_year(test_db):
+    user = User(email='analytics@nutrilens.ai', hashed_password='x', is_active=True)
+    recipe = Recipe(title='Upma', servings=1, macros_per_serving={'calories': 350})
+    test_db.add_all([user, recipe])
+    test_db.flush()
+
+    today = date.today()
+    for offset in range(1, 361):
+        planned = datetime.combine(today - timedelta(days=offset), datetime.min.time()) + timedelta(hours=8)
+        skipped = offset % 10 == 0
+        test_db.add(MealLog(
+            user_id=user.id, recipe_id=recipe.id, meal_type='breakfast', planned_datetime=planned,
+            consumed_datetime=None if skipped else planned, was_skipped=skipped,
+            skip_reason='Low appetite' if skipped else None, portion_multiplier=1.0
+        ))
+    test_db.commit()
+
+    service = ConsumptionService(test_db)
+    result = service.generate_consumption_analytics(user.id, days=365)
+
+    assert result['success']
+    assert result['total_meals_analyzed'] == 360
+    analytics = result['analytics']
+    assert analytics['skip_frequency']['breakfast']['total_skipped'] == 36
+    assert analytics['favorite_recipes']['Upma']['count'] == 324
+    assert analytics['daily_compliance']['consistent_days'] == 324
+
+    patterns = service.get_meal_patterns(user.id)
+    assert patterns['success']
+    breakfast = patterns['patterns']['skip_patterns']['breakfast']
+    assert list(breakfast['common_reasons']) == ['Low appetite']
+    assert 6 <= breakfast['skip_rate'] <= 10
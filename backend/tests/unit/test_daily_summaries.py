@@ -0,0 +1,114 @@
+"""
+Daily summary fan-out tests
+
+Tests:
+1. Timezones are due at 9 PM local time, once per local date
+2. Bulk summaries match the meals get_today_summary shows
+3. run() queues one chunked, pipelined batch per due timezone
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models.database import MealLog, MealPlan, NotificationPreference, Recipe, User, UserProfile
+from app.services.daily_summaries import DailySummaryFanout, due_timezones
+from app.services.notification_service import NotificationService
+
+NOW = datetime(2026, 3, 2, 15, 40)  # UTC; 21:10 in Kolkata, 10:40 in New York
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def fanout(test_db):
+    service = NotificationService(test_db)
+    service.redis_client = MagicMock()
+    return DailySummaryFanout(test_db, service, chunk_size=2)
+
+
+def _user(db, email, timezone=None, enabled_types=None, goal_calories=None):
+    user = User(email=email, hashed_password='x', is_active=True)
+    db.add(user)
+    db.flush()
+    if timezone or enabled_types:
+        db.add(NotificationPreference(
+            user_id=user.id, timezone=timezone,
+            enabled_types=enabled_types or ['daily_summary'],
+            quiet_hours_start=5, quiet_hours_end=5  # no quiet hours, whatever the wall clock
+        ))
+    if goal_calories:
+        db.add(UserProfile(user_id=user.id, goal_calories=goal_calories))
+    return user
+
+
+def _log(db, user_id, hour, recipe_id=None, plan_id=None, consumed=False, skipped=False):
+    planned = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=hour)
+    db.add(MealLog(
+        user_id=user_id, recipe_id=recipe_id, meal_plan_id=plan_id, meal_type='lunch',
+        planned_datetime=planned, consumed_datetime=planned if consumed else None,
+        was_skipped=skipped, portion_multiplier=1.0
+    ))
+
+
+def test_due_timezones():
+    names = [None, 'Asia/Kolkata', 'America/New_York', 'Mars/Olympus_Mons']
+
+    assert due_timezones(names, {}, NOW) == {'Asia/Kolkata': DAY}
+    assert due_timezones(names, {'Asia/Kolkata': DAY}, NOW) == {}
+
+    at_utc_nine = datetime(2026, 3, 2, 21, 5)
+    assert due_timezones(names, {}, at_utc_nine) == {None: DAY, 'Mars/Olympus_Mons': DAY}
+
+
+def test_bulk_summaries(test_db, fanout):
+    user = _user(test_db, 'bulk@nutrilens.ai', goal_calories=1600)
+    other = _user(test_db, 'empty@nutrilens.ai')
+    recipe = Recipe(title='Khichdi', servings=1, macros_per_serving={'calories': 400, 'protein_g': 15})
+    old_plan = MealPlan(user_id=user.id, is_active=False)
+    plan = MealPlan(user_id=user.id, is_active=True)
+    test_db.add_all([recipe, old_plan, plan])
+    test_db.flush()
+
+    _log(test_db, user.id, 8, recipe.id, plan.id, consumed=True)
+    _log(test_db, user.id, 13, recipe.id, plan.id, skipped=True)
+    _log(test_db, user.id, 20, recipe.id, plan.id)
+    _log(test_db, user.id, 20, recipe.id, old_plan.id)  # stale pending log of a replaced plan
+    _log(test_db, user.id, 16, recipe.id, old_plan.id, consumed=True)
+    test_db.commit()
+
+    summaries = fanout.summaries([user.id, other.id], DAY)
+
+    summary = summaries[user.id]
+    assert (summary['meals_planned'], summary['meals_consumed'], summary['meals_skipped'], summary['meals_pending']) == (4, 2, 1, 1)
+    assert summary['compliance_rate'] == 50.0
+    assert summary['total_macros']['protein_g'] == 30
+    assert summary['progress'] == {'calories': 50.0}
+    assert summary['remaining_calories'] == 800
+
+    assert summaries[other.id]['meals_planned'] == 0
+    assert summaries[other.id]['compliance_rate'] == 0
+    assert 'targets' not in summaries[other.id]
+
+
+def test_run_queues_due_timezones_in_chunks(test_db, fanout):
+    kolkata = [_user(test_db, f'in{n}@nutrilens.ai', timezone='Asia/Kolkata') for n in range(3)]
+    _user(test_db, 'muted@nutrilens.ai', timezone='Asia/Kolkata', enabled_types=['meal_reminder'])
+    _user(test_db, 'ny@nutrilens.ai', timezone='America/New_York')
+    _user(test_db, 'utc@nutrilens.ai')
+    _log(test_db, kolkata[0].id, 13, consumed=True)
+    test_db.commit()
+
+    sent = {}
+    assert fanout.run(sent, NOW) == 3
+    assert sent == {'Asia/Kolkata': DAY}
+
+    pipeline = fanout.notification_service.redis_client.pipeline.return_value
+    assert pipeline.execute.call_count == 2  # chunks of 2 + 2, one muted
+    pushed = [json.loads(call.args[1]) for call in pipeline.lpush.call_args_list]
+    assert sorted(item['user_id'] for item in pushed) == sorted(user.id for user in kolkata)
+    assert {item['data']['date'] for item in pushed} == {'2026-03-02'}
+
+    # Already sent for the local day
+    assert fanout.run(sent, NOW + timedelta(minutes=20)) == 0
@@ -0,0 +1,146 @@
+"""
+Dashboard read model tests
+
+Tests:
+1. Cards match ConsumptionService / IntelligentInventoryService results
+2. Cached summaries are reused until invalidated
+3. Logging a meal through ConsumptionService invalidates the shared cache
+4. Cached summaries expire when the user's local day rolls over
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.database import (
+    Item, MealLog, MealPlan, Recipe, User, UserGoal, UserInventory, UserProfile
+)
+from app.services import dashboard_service
+from app.services.consumption_services import ConsumptionService
+from app.services.dashboard_service import DashboardCache, DashboardService, dashboard_cache
+from app.services.inventory_service import IntelligentInventoryService
+
+
+@pytest.fixture
+def dashboard_user(test_db):
+    dashboard_cache.invalidate()
+    user = User(email='dash@nutrilens.ai', hashed_password='x', is_active=True)
+    test_db.add(user)
+    test_db.flush()
+    test_db.add(UserProfile(user_id=user.id, name='Dash', weight_kg=80, goal_calories=2400))
+    test_db.add(UserGoal(
+        user_id=user.id, goal_type='fat_loss', target_weight=72,
+        macro_targets={'protein': 0.3, 'carbs': 0.4, 'fat': 0.3}
+    ))
+
+    recipe = Recipe(
+        title='Bowl', macros_per_serving={'calories': 600, 'protein_g': 45, 'carbs_g': 60, 'fat_g': 18}
+    )
+    test_db.add(recipe)
+    test_db.flush()
+
+    plan = MealPlan(user_id=user.id, week_start_date=datetime.now(), plan_data={}, is_active=True)
+    old_plan = MealPlan(user_id=user.id, week_start_date=datetime.now(), plan_data={}, is_active=False)
+    test_db.add_all([plan, old_plan])
+    test_db.flush()
+
+    today = datetime.combine(date.today(), datetime.min.time())
+    test_db.add_all([
+        MealLog(user_id=user.id, recipe_id=recipe.id, meal_type='breakfast', meal_plan_id=plan.id,
+                planned_datetime=today + timedelta(hours=8), consumed_datetime=today + timedelta(hours=8),
+                portion_multiplier=1.5),
+        MealLog(user_id=user.id, recipe_id=recipe.id, meal_type='lunch', meal_plan_id=plan.id,
+                planned_datetime=today + timedelta(hours=13), was_skipped=True),
+        MealLog(user_id=user.id, recipe_id=recipe.id, meal_type='dinner', meal_plan_id=plan.id,
+                planned_datetime=today + timedelta(hours=23, minutes=59)),
+        # Pending meal of a replaced plan is not shown
+        MealLog(user_id=user.id, recipe_id=recipe.id, meal_type='dinner', meal_plan_id=old_plan.id,
+                planned_datetime=today + timedelta(hours=19)),
+        # Manual entry
+        MealLog(user_id=user.id, meal_type='snack', planned_datetime=today + timedelta(hours=16),
+                consumed_datetime=today + timedelta(hours=16),
+                external_meal={'calories': 200, 'protein_g': 5, 'carbs_g': 30, 'fat_g': 6}),
+        # Yesterday
+        MealLog(user_id=user.id, recipe_id=recipe.id, meal_type='dinner',
+                planned_datetime=today - timedelta(hours=5), consumed_datetime=today - timedelta(hours=5)),
+    ])
+
+    items = [Item(canonical_name=name, category='test') for name in ('egg', 'milk', 'salt')]
+    test_db.add_all(items)
+    test_db.flush()
+    now = datetime.now()
+    test_db.add_all([
+        UserInventory(user_id=user.id, item_id=items[0].id, quantity_grams=600, expiry_date=now + timedelta(days=1)),
+        UserInventory(user_id=user.id, item_id=items[1].id, quantity_grams=50, expiry_date=now + timedelta(days=10)),
+        UserInventory(user_id=user.id, item_id=items[2].id, quantity_grams=0),
+    ])
+    test_db.commit()
+    yield user
+    dashboard_cache.invalidate()
+
+
+def test_cards_match_existing_services(test_db, dashboard_user):
+    summary = DashboardService(test_db, cache=None).get_summary(dashboard_user.id)
+
+    today = ConsumptionService(test_db).get_today_summary(dashboard_user.id)
+    meals = summary['meals_card']
+    assert (meals['meals_planned'], meals['meals_consumed'], meals['meals_skipped']) == (
+        today['meals_planned'], today['meals_consumed'], today['meals_skipped']
+    )
+    assert meals['next_meal'] == 'Dinner'
+
+    macros = summary['macros_card']
+    assert macros['calories_consumed'] == round(today['total_calories'], 1) == 1100
+    assert macros['protein_consumed'] == round(today['total_macros']['protein_g'], 1)
+    assert macros['calories_target'] == 2400
+    assert macros['protein_target'] == round(today['targets']['protein_g'], 1) == 180
+
+    status = IntelligentInventoryService(test_db).get_inventory_status(dashboard_user.id)
+    assert summary['inventory_card'] == {
+        'expiring_soon_count': len(status.expiring_soon),
+        'low_stock_count': len(status.low_stock),
+        'out_of_stock_count': 1,
+        'total_items': status.total_items
+    }
+
+    goal = summary['goal_card']
+    assert goal['goal_type'] == 'fat_loss'
+    assert goal['weight_change'] == -8
+    assert goal['current_streak'] == 2
+
+
+def test_cached_summary_until_invalidated(test_db, dashboard_user):
+    service = DashboardService(test_db, cache=DashboardCache(ttl_seconds=600))
+    first = service.get_summary(dashboard_user.id)
+
+    test_db.add(MealLog(
+        user_id=dashboard_user.id, meal_type='snack', planned_datetime=datetime.now(),
+        consumed_datetime=datetime.now(), external_meal={'calories': 100}
+    ))
+    test_db.commit()
+    assert service.get_summary(dashboard_user.id) == first
+
+    service.cache.invalidate(dashboard_user.id)
+    assert service.get_summary(dashboard_user.id)['macros_card']['calories_consumed'] == 1200
+
+
+def test_consumption_service_invalidates_shared_cache(test_db, dashboard_user):
+    service = DashboardService(test_db)
+    assert service.get_summary(dashboard_user.id)['meals_card']['meals_consumed'] == 2
+
+    ConsumptionService(test_db).log_meal_consumption(
+        dashboard_user.id, {'meal_type': 'snack', 'timestamp': datetime.now()}
+    )
+    test_db.commit()
+
+    assert service.get_summary(dashboard_user.id)['meals_card']['meals_consumed'] == 3
+
+
+def test_cache_expires_on_local_day(monkeypatch):
+    cache = DashboardCache(ttl_seconds=600)
+    monkeypatch.setattr(dashboard_service, 'local_today', lambda tz=None: date(2026, 3, 1))
+    cache.put(1, {'meals_card': {}})
+    assert cache.get(1) == {'meals_card': {}}
+
+    monkeypatch.setattr(dashboard_service, 'local_today', lambda tz=None: date(2026, 3, 2))
+    assert cache.get(1) is None
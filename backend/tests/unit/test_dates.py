@@ -0,0 +1,58 @@
+"""
+Calendar-day range tests
+
+Tests:
+1. Local dates and half-open bounds in the user's timezone
+2. Unknown timezones fall back to UTC
+3. Range filters select exactly one day of meal logs
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.core.dates import (
+    UTC, day_bounds, get_user_timezone, in_range, local_now, local_today,
+    resolve_timezone, utc_day_bounds
+)
+from app.models.database import MealLog, NotificationPreference, User
+
+
+def test_local_day_and_utc_bounds():
+    kolkata = resolve_timezone("Asia/Kolkata")
+    now = datetime(2026, 3, 1, 20, 0)  # UTC
+
+    assert local_now(kolkata, now) == datetime(2026, 3, 2, 1, 30)
+    assert local_today(kolkata, now) == date(2026, 3, 2)
+    assert local_today(None, now) == date(2026, 3, 1)
+
+    assert day_bounds(date(2026, 3, 2)) == (datetime(2026, 3, 2), datetime(2026, 3, 3))
+    assert utc_day_bounds(date(2026, 3, 2), kolkata) == (
+        datetime(2026, 3, 1, 18, 30), datetime(2026, 3, 2, 18, 30)
+    )
+
+
+def test_unknown_timezone_falls_back_to_utc(test_db):
+    assert resolve_timezone("Mars/Olympus_Mons") is UTC
+    assert resolve_timezone(None) is UTC
+
+    user = User(email='tz@nutrilens.ai', hashed_password='x', is_active=True)
+    test_db.add(user)
+    test_db.flush()
+    assert get_user_timezone(test_db, user.id) is UTC
+
+    test_db.add(NotificationPreference(user_id=user.id, timezone="America/New_York"))
+    test_db.flush()
+    assert str(get_user_timezone(test_db, user.id)) == "America/New_York"
+
+
+def test_in_range_selects_one_day(test_db):
+    day = date(2026, 3, 2)
+    start, end = day_bounds(day)
+    for planned in (start - timedelta(seconds=1), start, end - timedelta(seconds=1), end):
+        test_db.add(MealLog(user_id=1, meal_type='lunch', planned_datetime=planned))
+    test_db.flush()
+
+    rows = test_db.query(MealLog.planned_datetime).filter(
+        MealLog.user_id == 1, in_range(MealLog.planned_datetime, day_bounds(day))
+    ).order_by(MealLog.planned_datetime).all()
+
+    assert [planned for (planned,) in rows] == [start, end - timedelta(seconds=1)]
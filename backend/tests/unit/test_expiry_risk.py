@@ -0,0 +1,88 @@
+"""
+Expiry risk engine tests
+
+Tests:
+1. The consumption timeline accumulates pending planned grams per item per day
+2. Batches are covered oldest-expiry-first against the planned need up to their expiry
+3. Plan / meal events rebuild the cached timeline
+"""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.core.events import EventType, event_bus
+from app.models.database import Item, MealLog, Recipe, RecipeIngredient, User
+from app.services.expiry_risk import ExpiryRiskEngine, build_timelines, consumption_timelines
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def planned_user(test_db):
+    user = User(email='expiry@nutrilens.ai', hashed_password='x', is_active=True)
+    spinach = Item(canonical_name='spinach', category='vegetables')
+    test_db.add_all([user, spinach])
+    test_db.flush()
+
+    recipe = Recipe(title='Saag')
+    test_db.add(recipe)
+    test_db.flush()
+    test_db.add(RecipeIngredient(recipe_id=recipe.id, item_id=spinach.id, quantity_grams=100))
+
+    def plan(days, **kwargs):
+        test_db.add(MealLog(
+            user_id=user.id, recipe_id=recipe.id, meal_type='lunch',
+            planned_datetime=datetime.combine((NOW + timedelta(days=days)).date(), time(12)), **kwargs
+        ))
+
+    plan(1, portion_multiplier=2.0)
+    plan(3)
+    plan(2, was_skipped=True)
+    plan(2, consumed_datetime=NOW)
+    test_db.commit()
+    return user, spinach, plan
+
+
+def test_timeline_cumulative_need(test_db, planned_user):
+    user, spinach, _ = planned_user
+    timeline = build_timelines(test_db, [user.id], now=NOW)[user.id]
+
+    row = timeline.cumulative[timeline.item_index[spinach.id]]
+    assert timeline.cumulative.dtype.name == 'float32'
+    assert row[:5].tolist() == [0, 200, 200, 300, 300]
+    assert timeline.planned_until(spinach.id, NOW + timedelta(days=2)) == 200
+    assert timeline.planned_until(spinach.id, NOW - timedelta(days=1)) == 0
+
+
+def test_fifo_batches_against_need(test_db, planned_user):
+    user, spinach, _ = planned_user
+    batches = [
+        {'id': 1, 'item_id': spinach.id, 'quantity_grams': 150, 'expiry_date': NOW + timedelta(days=2)},
+        {'id': 2, 'item_id': spinach.id, 'quantity_grams': 200, 'expiry_date': (NOW + timedelta(days=5)).isoformat()},
+        {'id': 3, 'item_id': spinach.id, 'quantity_grams': 100, 'expiry_date': NOW + timedelta(days=1)},
+        {'id': 4, 'item_id': 999, 'quantity_grams': 50, 'expiry_date': NOW + timedelta(days=1)},
+        {'id': 5, 'item_id': spinach.id, 'quantity_grams': 10, 'expiry_date': None},
+    ]
+    risk = {b['id']: b for b in ExpiryRiskEngine(test_db).assess(user.id, batches)}
+
+    assert 5 not in risk
+    # Day 1 batch is used up first (200g planned by day 1, it holds 100g), day 2 batch gets the rest
+    assert (risk[3]['planned_use_grams'], risk[3]['unused_grams'], risk[3]['will_be_consumed']) == (100, 0, True)
+    assert (risk[1]['planned_use_grams'], risk[1]['will_be_consumed']) == (100, False)
+    assert risk[1]['unused_grams'] == 50
+    # 300g planned in total, 250g already covered by earlier batches
+    assert (risk[2]['planned_use_grams'], risk[2]['will_be_consumed']) == (50, False)
+    assert risk[4]['will_be_consumed'] is False
+
+
+def test_events_rebuild_timeline(test_db, planned_user):
+    user, spinach, plan = planned_user
+    assert consumption_timelines.get(test_db, user.id).planned_until(spinach.id, NOW + timedelta(days=5)) == 300
+
+    plan(4)
+    test_db.commit()
+    assert consumption_timelines.get(test_db, user.id).planned_until(spinach.id, NOW + timedelta(days=5)) == 300
+
+    event_bus.notify(EventType.PLAN_GENERATED, {'user_id': user.id})
+    assert consumption_timelines.get(test_db, user.id).planned_until(spinach.id, NOW + timedelta(days=5)) == 400
@@ -0,0 +1,81 @@
+"""
+Vectorized genetic optimizer tests
+
+Tests:
+1. Population fitness matches the scalar fitness rules
+2. Plans fill every slot with a suitable recipe (reproducible with a seed)
+3. Island model, in-process and in a process pool
+"""
+
+import numpy as np
+import pytest
+
+from app.services.genetic_optimizer import GAProblem, GeneticMealOptimizer
+
+CONSTRAINTS = {'daily_calories_min': 1800, 'daily_calories_max': 2200, 'daily_protein_min': 100}
+
+
+def _recipe(recipe_id, meal_time, calories, protein, item_ids=()):
+    return {
+        'id': recipe_id,
+        'suitable_meal_times': [meal_time],
+        'macros_per_serving': {'calories': calories, 'protein_g': protein, 'carbs_g': 50, 'fat_g': 15},
+        'ingredients': [{'item_id': item_id} for item_id in item_ids],
+    }
+
+
+@pytest.fixture
+def recipes():
+    pool = []
+    for meal_time, base in (('breakfast', 400), ('lunch', 700), ('dinner', 700)):
+        for k in range(6):
+            pool.append(_recipe(len(pool) + 1, meal_time, base + 20 * k, 25 + 3 * k, item_ids=(k,)))
+    return pool
+
+
+def test_population_fitness_matches_scalar_rules(recipes):
+    problem = GAProblem(2, 3, recipes, CONSTRAINTS, inventory={0: 100, 1: 50, 99: 10})
+    genes = np.array([
+        [0, 6, 12, 0, 6, 12],   # 1800 kcal / 75 g protein per day, reuses 3 recipes
+        [5, 11, 17, 4, 10, 16], # 2100 / 120 and 2040 / 111, 6 distinct recipes
+    ])
+
+    fitness = problem.fitness(genes)
+
+    # 100 - 2 days * (25 g protein short * 0.2) + 3 unique * 0.5 + 1/3 items used * 10
+    assert fitness[0] == pytest.approx(100 - 10 + 1.5 + 10 / 3)
+    # within window, 6 unique, no inventory item used
+    assert fitness[1] == pytest.approx(103)
+
+
+def test_plan_uses_suitable_recipes(recipes):
+    optimizer = GeneticMealOptimizer(population_size=40, generations=50, seed=3)
+
+    plan = optimizer.optimize(3, 3, recipes, CONSTRAINTS, inventory={})
+    again = GeneticMealOptimizer(population_size=40, generations=50, seed=3).optimize(
+        3, 3, recipes, CONSTRAINTS, inventory={}
+    )
+
+    assert plan['optimization_method'] == 'genetic_algorithm'
+    assert set(plan['week_plan']) == {'day_0', 'day_1', 'day_2'}
+    for day in plan['week_plan'].values():
+        for meal_type, recipe in day['meals'].items():
+            assert recipe['suitable_meal_times'] == [meal_type]
+        assert day['day_calories'] >= 1500
+    assert plan == again
+    assert len(optimizer.population) == 40
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_island_model(recipes, max_workers):
+    optimizer = GeneticMealOptimizer(
+        population_size=60, generations=30, islands=3, migration_interval=5,
+        max_workers=max_workers, seed=11
+    )
+
+    plan = optimizer.optimize(2, 3, recipes, CONSTRAINTS, inventory={})
+
+    assert len(plan['week_plan']) == 2
+    assert len(optimizer.population) == 60
+    fitness = [ind.fitness for ind in optimizer.population]
+    assert fitness == sorted(fitness, reverse=True)
@@ -0,0 +1,79 @@
+"""
+Intent router tests
+
+Tests:
+1. Unambiguous rule matches are routed locally with entities
+2. Paraphrases of exemplars are routed by the nearest centroid
+3. Ambiguous or unfamiliar queries defer to the LLM
+4. Metrics report hit rate and latency per source
+"""
+
+import pytest
+
+from app.agents.intent_router import RULE_CONFIDENCE, IntentRouter, extract_entities
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(threshold=0.75)
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("How is my protein?", "stats"),
+    ("am I on track today", "stats"),
+    ("what if I eat 2 samosas, how would my calories look?", "what_if"),
+    ("can I fit ice cream?", "what_if"),
+    ("what should I eat for dinner", "meal_suggestion"),
+    ("what's for lunch?", "meal_plan"),
+    ("swap my breakfast", "meal_plan"),
+    ("do I have eggs?", "inventory"),
+    ("explain macros", "conversational"),
+])
+def test_rules(router, query, intent):
+    routed = router.route(query)
+
+    assert (routed.intent, routed.source, routed.confidence) == (intent, "rules", RULE_CONFIDENCE)
+
+
+def test_centroid(router):
+    routed = router.route("show tomorrow's meals")
+
+    assert (routed.intent, routed.source) == ("meal_plan", "centroid")
+    assert router.threshold <= routed.confidence < RULE_CONFIDENCE
+    assert routed.entities == {"time_period": "tomorrow"}
+
+
+@pytest.mark.parametrize("query", [
+    "my knee hurts after squats",
+    "does protein affect muscle growth",
+    "can I eat eggs every day?",
+    "can I have a snack?",
+    "how many calories are in a banana",
+])
+def test_defers_to_llm(router, query):
+    assert router.match_rules(query) is None
+    assert router.route(query) is None
+
+
+def test_ambiguous_rules_defer(router):
+    assert router.match_rules("do I have anything planned for lunch") is None  # inventory and meal plan
+
+
+def test_entities():
+    assert extract_entities("How much protein and fibre left for dinner tonight?") == {
+        "nutrients": ["protein", "fiber"], "meal_type": "dinner", "time_period": "today"
+    }
+    assert extract_entities("hello") == {}
+
+
+def test_metrics(router):
+    router.route("how is my protein?")
+    router.route("show tomorrow's meals")
+    router.route("my knee hurts after squats")
+    router.metrics.record("llm", 420.0)
+
+    metrics = router.metrics.snapshot()
+    assert metrics["by_source"] == {"rules": 1, "centroid": 1, "deferred": 1, "llm": 1}
+    # Deferrals stay in the denominator whether or not the LLM call succeeds
+    assert (metrics["total"], metrics["hit_rate"]) == (3, round(2 / 3, 3))
+    assert metrics["latency"]["llm"]["p95_ms"] == 420.0
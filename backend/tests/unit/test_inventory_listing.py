@@ -0,0 +1,68 @@
+"""
+Inventory listing tests
+
+Tests:
+1. Keyset pages cover every matching row exactly once, in id order
+2. Each page is one SQL statement with filters applied in the database
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import Item, UserInventory
+from app.services.inventory_service import IntelligentInventoryService
+
+
+@pytest.fixture
+def pantry_user(test_db, test_user):
+    user = test_user
+    items = [Item(canonical_name=f'item {n}', category='grains' if n % 2 else 'dairy') for n in range(25)]
+    test_db.add_all(items)
+    test_db.flush()
+
+    now = datetime.now()
+    test_db.add_all([
+        UserInventory(user_id=user.id, item_id=item.id, quantity_grams=50 if n % 3 == 0 else 500,
+                      expiry_date=now + timedelta(days=n))
+        for n, item in enumerate(items)
+    ])
+    test_db.commit()
+    return user
+
+
+def _all_pages(service, user_id, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page = service.get_user_inventory(user_id, limit=limit, after_id=cursor, **filters)
+        pages.append(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_all_rows(test_db, pantry_user):
+    service = IntelligentInventoryService(test_db)
+    full = service.get_user_inventory(pantry_user.id)
+
+    pages = _all_pages(service, pantry_user.id, limit=10)
+    rows = [row for page in pages for row in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [row['id'] for row in rows] == sorted(row['id'] for row in full['items'])
+    assert rows == sorted(full['items'], key=lambda row: row['id'])
+
+    grains = [row for page in _all_pages(service, pantry_user.id, limit=4, category='grains') for row in page]
+    assert len(grains) == 12
+    assert all(row['category'] == 'grains' for row in grains)
+
+
+def test_page_is_one_filtered_query(test_db, pantry_user, record_statements):
+    service = IntelligentInventoryService(test_db)
+    user_id = pantry_user.id
+
+    with record_statements() as statements:
+        page = service.get_user_inventory(user_id, low_stock_only=True, expiring_soon=True, limit=50)
+
+    assert len(statements) == 1
+    assert [row['quantity_grams'] for row in page['items']] == [50, 50]
+    assert page['next_cursor'] is None
@@ -0,0 +1,164 @@
+"""
+Per-user inventory snapshot tests
+
+Tests:
+1. Snapshot aggregates batches per item, expiry bucket, category and nutrient
+2. Readers share one snapshot until an inventory/meal event invalidates it
+3. Snapshots round-trip through a Redis-style client
+4. An invalidation racing a rebuild, or missed while Redis is down, is kept
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.events import EventType, event_bus
+from app.models.database import Item, UserInventory
+from app.services import inventory_snapshot
+from app.services.inventory_service import IntelligentInventoryService
+from app.services.inventory_snapshot import (
+    KEY_PREFIX, InventorySnapshot, InventorySnapshotCache, inventory_snapshots
+)
+
+
+@pytest.fixture
+def stocked_user(test_db, test_user):
+    user = test_user
+    oats = Item(canonical_name='oats', category='grains',
+                nutrition_per_100g={'calories': 380, 'protein_g': 13})
+    milk = Item(canonical_name='milk', category='dairy', nutrition_per_100g={'calories': 60})
+    test_db.add_all([oats, milk])
+    test_db.flush()
+
+    now = datetime.now()
+    test_db.add_all([
+        UserInventory(user_id=user.id, item_id=oats.id, quantity_grams=400, expiry_date=now + timedelta(days=60)),
+        UserInventory(user_id=user.id, item_id=oats.id, quantity_grams=50, expiry_date=now + timedelta(days=2)),
+        UserInventory(user_id=user.id, item_id=milk.id, quantity_grams=1000, expiry_date=now - timedelta(days=1)),
+    ])
+    test_db.commit()
+    return user, oats, milk
+
+
+def test_snapshot_aggregates(test_db, stocked_user):
+    user, oats, milk = stocked_user
+    snapshot = InventorySnapshot.build(test_db, user.id)
+
+    assert snapshot.total_items == 3
+    assert snapshot.quantity(oats.id) == 450
+    assert snapshot.items[oats.id]['batches'] == 2
+    assert snapshot.expiry_buckets['expired'] == 1
+    assert snapshot.expiry_buckets['within_3_days'] == 1
+    assert snapshot.category_counts == {'grains': 2, 'dairy': 1}
+    assert snapshot.nutritional_capacity['calories'] == pytest.approx(380 * 4.5 + 600)
+    assert [b['item_name'] for b in snapshot.expiring_within(3)] == ['oats', 'milk']
+    assert [b['quantity_grams'] for b in snapshot.low_stock()] == [50]
+
+    restored = InventorySnapshot.from_json(snapshot.to_json())
+    assert restored.items == snapshot.items
+    assert restored.built_at == snapshot.built_at
+
+
+def test_readers_share_snapshot_until_event(test_db, stocked_user, record_statements):
+    user, oats, _ = stocked_user
+    service = IntelligentInventoryService(test_db)
+    service.get_inventory_status(user.id)
+
+    with record_statements() as statements:
+        status = service.get_inventory_status(user.id)
+        inventory = service.get_user_inventory(user.id, low_stock_only=True)
+
+    assert not [s for s in statements if 'user_inventory' in s]
+    assert len(status.expiring_soon) == 2
+    assert [item['quantity_grams'] for item in inventory['items']] == [50]
+
+    service.deduct_item(user.id, oats.id, 100)
+    assert inventory_snapshots.get(test_db, user.id).quantity(oats.id) == 350
+
+    test_db.add(UserInventory(user_id=user.id, item_id=oats.id, quantity_grams=10))
+    test_db.commit()
+    assert inventory_snapshots.get(test_db, user.id).quantity(oats.id) == 350
+    event_bus.notify(EventType.MEAL_LOGGED, {'user_id': user.id})
+    assert inventory_snapshots.get(test_db, user.id).quantity(oats.id) == 360
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError('redis down')
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def mget(self, *keys):
+        self._check()
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self._check()
+        self.values[key] = value
+
+    def incr(self, key):
+        self._check()
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, pattern):
+        self._check()
+        return [key for key in self.values if key.startswith(pattern.rstrip('*'))]
+
+
+def test_redis_store(test_db, stocked_user):
+    user, oats, _ = stocked_user
+    client = FakeRedis()
+    cache = InventorySnapshotCache(redis_client=client)
+
+    assert cache.get(test_db, user.id).quantity(oats.id) == 450
+    assert f'{KEY_PREFIX}{user.id}' in client.values
+    assert cache.get(test_db, user.id).items == cache.get(test_db, user.id).items
+
+    cache.invalidate(user.id)
+    assert f'{KEY_PREFIX}{user.id}' not in client.values
+
+
+def test_invalidate_during_rebuild_is_not_lost(test_db, stocked_user, monkeypatch):
+    user, oats, _ = stocked_user
+    client = FakeRedis()
+    cache = InventorySnapshotCache(redis_client=client)
+    build = InventorySnapshot.build
+
+    def build_then_invalidate(db, user_id):
+        snapshot = build(db, user_id)
+        # An inventory change commits and invalidates while this build runs
+        cache.invalidate(user_id)
+        return snapshot
+
+    monkeypatch.setattr(InventorySnapshot, 'build', staticmethod(build_then_invalidate))
+    cache.get(test_db, user.id)
+    assert f'{KEY_PREFIX}{user.id}' not in client.values
+
+
+def test_invalidate_while_redis_down_is_replayed(test_db, stocked_user, monkeypatch):
+    user, oats, _ = stocked_user
+    monkeypatch.setattr(inventory_snapshot, 'REDIS_RETRY_SECONDS', 0)
+    client = FakeRedis()
+    cache = InventorySnapshotCache(redis_client=client)
+    cache.get(test_db, user.id)
+
+    test_db.add(UserInventory(user_id=user.id, item_id=oats.id, quantity_grams=10))
+    test_db.commit()
+    client.down = True
+    cache.invalidate(user.id)
+    client.down = False
+
+    assert cache.get(test_db, user.id).quantity(oats.id) == 460
@@ -0,0 +1,114 @@
+"""
+Shared item catalog tests
+
+Tests:
+1. Full load builds name/alias/token indexes
+2. add_items() publishes a new version without touching the old snapshot
+3. refresh() only folds in rows with id > max_id
+4. Local add_items() does not hide lower-id rows from refresh()
+5. reload() picks up edited rows
+6. Normalizers reuse the snapshot indexes
+"""
+
+from app.models.database import Item
+from app.services.item_catalog import ItemCatalog, CatalogItem
+from app.services.item_normalizer import IntelligentItemNormalizer
+
+
+def _seed_items(db):
+    items = [
+        Item(canonical_name="chicken_breast", aliases=["chicken"], category="protein"),
+        Item(canonical_name="brown_rice", aliases=["rice"], category="grains"),
+    ]
+    db.add_all(items)
+    db.commit()
+    return items
+
+
+def test_load_builds_indexes(test_db):
+    _seed_items(test_db)
+    catalog = ItemCatalog()
+
+    snapshot = catalog.snapshot(test_db)
+
+    assert snapshot.version == 1
+    assert len(snapshot) == 2
+    assert snapshot.by_name["chicken_breast"].category == "protein"
+    assert snapshot.by_alias["rice"].canonical_name == "brown_rice"
+    assert [i.canonical_name for i in snapshot.by_tokens["rice"]] == ["brown_rice"]
+    assert isinstance(snapshot.items[0], CatalogItem)
+
+
+def test_add_items_is_copy_on_write(test_db):
+    _seed_items(test_db)
+    catalog = ItemCatalog()
+    old = catalog.snapshot(test_db)
+
+    new_item = Item(canonical_name="paneer", aliases=["cottage cheese"], category="dairy")
+    test_db.add(new_item)
+    test_db.commit()
+    catalog.add_items([new_item])
+
+    current = catalog.snapshot(test_db)
+    assert current.version == old.version + 1
+    assert "paneer" in current.by_name
+    assert "paneer" not in old.by_name
+    assert current.max_id == new_item.id
+
+
+def test_refresh_is_incremental(test_db):
+    _seed_items(test_db)
+    catalog = ItemCatalog()
+    catalog.snapshot(test_db)
+
+    assert catalog.refresh(test_db) == 0
+
+    test_db.add(Item(canonical_name="spinach", category="vegetables"))
+    test_db.commit()
+
+    assert catalog.refresh(test_db) == 1
+    assert catalog.version == 2
+    assert catalog.lookup(test_db, catalog.snapshot(test_db).max_id).canonical_name == "spinach"
+
+
+def test_local_insert_does_not_skip_other_workers_rows(test_db):
+    _seed_items(test_db)
+    catalog = ItemCatalog()
+    catalog.snapshot(test_db)
+
+    # Another worker's row gets the lower id but is only seen after our insert
+    other = Item(canonical_name="spinach", category="vegetables")
+    local = Item(canonical_name="paneer", category="dairy")
+    test_db.add_all([other, local])
+    test_db.commit()
+    catalog.add_items([local])
+
+    assert catalog.refresh(test_db) == 1
+    assert "spinach" in catalog.snapshot(test_db).by_name
+
+
+def test_reload_picks_up_edits(test_db):
+    items = _seed_items(test_db)
+    catalog = ItemCatalog()
+    old = catalog.snapshot(test_db)
+
+    items[1].aliases = ["rice", "chawal"]
+    test_db.commit()
+    assert catalog.refresh(test_db) == 0
+
+    current = catalog.reload(test_db)
+    assert current.version == old.version + 1
+    assert current.by_alias["chawal"].canonical_name == "brown_rice"
+    assert "chawal" not in old.by_alias
+
+
+def test_normalizer_shares_snapshot_indexes(test_db):
+    _seed_items(test_db)
+    snapshot = ItemCatalog().snapshot(test_db)
+
+    normalizer = IntelligentItemNormalizer(None, catalog=snapshot)
+
+    assert normalizer.items_cache['by_name'] is snapshot.by_name
+    result = normalizer.normalize("500g chicken_breast")
+    assert result.item.id == snapshot.by_name["chicken_breast"].id
+    assert result.quantity_grams == 500
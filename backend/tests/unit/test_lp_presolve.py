@@ -0,0 +1,90 @@
+"""
+LP pre-solve model reduction tests
+
+Tests:
+1. Unsuitable and calorie-infeasible (recipe, meal slot) pairs are dropped
+2. Dominated recipes are dropped only when enough dominators remain
+3. Optimizer plans carry solver statistics from the reduced model
+"""
+
+import numpy as np
+
+from app.services.final_meal_optimizer import MealPlanOptimizer, OptimizationConstraints
+from app.services.lp_presolve import LPPresolver
+
+
+def _recipe(recipe_id, meal_time, calories, protein=30, carbs=50, fat=15):
+    return {
+        'id': recipe_id,
+        'goals': ['general_health'],
+        'suitable_meal_times': [meal_time],
+        'macros_per_serving': {
+            'calories': calories, 'protein_g': protein, 'carbs_g': carbs, 'fat_g': fat
+        },
+        'prep_time_min': 10,
+        'cook_time_min': 10,
+    }
+
+
+def _presolver(recipes):
+    return LPPresolver(recipes, 3, MealPlanOptimizer()._is_recipe_suitable_for_meal)
+
+
+def test_unsuitable_and_calorie_infeasible_pairs():
+    recipes = [
+        _recipe(1, 'breakfast', 400),
+        _recipe(2, 'breakfast', 2500),  # 2500 + 300 + 300 > 2640 for any day
+        _recipe(3, 'lunch', 300),
+        _recipe(4, 'lunch', 700),
+        _recipe(5, 'dinner', 300),
+        _recipe(6, 'dinner', 700),
+    ]
+
+    allowed, stats = _presolver(recipes).prune(np.zeros(6), (1200, 2640), min_dominators=7)
+
+    assert allowed.tolist()[:2] == [[True, False, False], [False, False, False]]
+    assert allowed[3, 1] and allowed[5, 2]
+    assert stats.unsuitable == 12
+    assert stats.calorie_infeasible == 1
+    assert stats.kept_recipes == 5
+
+
+def test_dominated_recipes_need_enough_dominators():
+    recipes = [
+        _recipe(1, 'lunch', 600, protein=40, carbs=50, fat=15),
+        _recipe(2, 'lunch', 610, protein=45, carbs=45, fat=12),
+        _recipe(3, 'lunch', 605, protein=30, carbs=60, fat=20),  # dominated by 1 and 2
+        _recipe(4, 'lunch', 600, protein=60, carbs=70, fat=20),  # more protein, not dominated
+    ]
+    costs = np.array([10.0, 10.0, 20.0, 15.0])
+    presolver = _presolver(recipes)
+    column = presolver.suitable[:, 1]
+
+    assert presolver._prune_dominated(column, costs, 2).tolist() == [True, True, False, True]
+    assert presolver._prune_dominated(column, costs, 3).tolist() == [True, True, True, True]
+
+
+def test_optimizer_reports_solver_stats(test_db):
+    rng = np.random.default_rng(7)
+    recipes = [
+        _recipe(
+            idx, meal_time, float(rng.uniform(300, 900)),
+            protein=float(rng.uniform(10, 60)), carbs=float(rng.uniform(20, 90)),
+            fat=float(rng.uniform(5, 35))
+        )
+        for idx, meal_time in enumerate(['breakfast', 'lunch', 'dinner'] * 15, start=1)
+    ]
+    constraints = OptimizationConstraints(
+        daily_calories_min=1800, daily_calories_max=2200, daily_protein_min=90
+    )
+
+    optimizer = MealPlanOptimizer(test_db)
+    plan = optimizer.optimize(1, days=3, constraints=constraints, available_recipes=recipes)
+
+    stats = plan['solver_stats']
+    assert plan['optimization_method'] == 'linear_programming'
+    assert stats['status'] == 'Optimal'
+    assert stats['variables'] == stats['presolve']['kept_pairs'] * 3
+    assert stats['presolve']['kept_pairs'] <= 45
+    assert stats['constraints'] > 0
+    assert stats['solve_time_ms'] >= 0
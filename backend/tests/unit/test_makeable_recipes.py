@@ -0,0 +1,90 @@
+"""
+Makeable recipe engine tests
+
+Tests:
+1. Quantities are summed across expiry batches; missing vs insufficient items
+2. Recipes are split into fully / partially makeable with a constant number of queries
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import Item, Recipe, RecipeIngredient, UserInventory
+from app.services.inventory_service import IntelligentInventoryService
+from app.services.makeable_recipes import MakeableRecipeEngine
+
+
+@pytest.fixture
+def kitchen(test_db, test_user):
+    user = test_user
+    items = {name: Item(canonical_name=name, category='test') for name in ('rice', 'dal', 'ghee', 'salt', 'paneer')}
+    test_db.add_all(items.values())
+    test_db.flush()
+
+    now = datetime.now()
+    test_db.add_all([
+        # Two rice batches: 150 g + 100 g
+        UserInventory(user_id=user.id, item_id=items['rice'].id, quantity_grams=150, expiry_date=now + timedelta(days=2)),
+        UserInventory(user_id=user.id, item_id=items['rice'].id, quantity_grams=100, expiry_date=now + timedelta(days=20)),
+        UserInventory(user_id=user.id, item_id=items['dal'].id, quantity_grams=100),
+        UserInventory(user_id=user.id, item_id=items['ghee'].id, quantity_grams=5),
+        UserInventory(user_id=user.id, item_id=items['salt'].id, quantity_grams=500),
+    ])
+
+    def recipe(title, prep, ingredients):
+        row = Recipe(title=title, prep_time_min=prep, servings=1)
+        test_db.add(row)
+        test_db.flush()
+        for name, grams, optional in ingredients:
+            test_db.add(RecipeIngredient(
+                recipe_id=row.id, item_id=items[name].id, quantity_grams=grams, is_optional=optional
+            ))
+        return row
+
+    recipes = {
+        'khichdi': recipe('Khichdi', 20, [('rice', 200, False), ('dal', 100, False), ('paneer', 50, True)]),
+        'dal rice': recipe('Dal rice', 10, [('rice', 100, False), ('dal', 50, False), ('salt', 5, False)]),
+        'ghee rice': recipe('Ghee rice', 15, [('rice', 100, False), ('ghee', 10, False), ('salt', 2, False),
+                                              ('dal', 10, False), ('paneer', 10, False)]),
+        'paneer rice': recipe('Paneer rice', 15, [('rice', 100, False), ('paneer', 100, False)]),
+    }
+    test_db.commit()
+    return user, recipes
+
+
+def test_availability_sums_batches(test_db, kitchen):
+    user, recipes = kitchen
+    service = IntelligentInventoryService(test_db)
+
+    khichdi = service.check_recipe_availability(user.id, recipes['khichdi'].id)
+    assert khichdi['can_make'] is True
+    assert khichdi['available_items'][0] == {'item': 'rice', 'required': 200, 'available': 250}
+    assert khichdi['coverage_percentage'] == 100
+
+    ghee_rice = service.check_recipe_availability(user.id, recipes['ghee rice'].id)
+    assert ghee_rice['can_make'] is False
+    assert ghee_rice['insufficient_items'] == [{'item': 'ghee', 'required': 10, 'available': 5, 'shortage': 5}]
+    assert ghee_rice['missing_items'] == [{'item': 'paneer', 'required': 10}]
+    assert ghee_rice['coverage_percentage'] == 60
+
+    assert service.check_recipe_availability(user.id, 9999) == {'available': False, 'reason': 'Recipe not found'}
+
+
+def test_makeable_recipes_with_constant_queries(test_db, kitchen, record_statements):
+    user, recipes = kitchen
+    user_id = user.id
+    with record_statements() as statements:
+        result = IntelligentInventoryService(test_db).get_makeable_recipes(user_id, limit=5, partial_threshold=50)
+
+    assert [r['recipe_name'] for r in result['fully_makeable']] == ['Dal rice', 'Khichdi']
+    assert [r['recipe_name'] for r in result['partially_makeable']] == ['Ghee rice', 'Paneer rice']
+    ghee_rice = result['partially_makeable'][0]
+    assert ghee_rice['match_percentage'] == 60
+    assert ghee_rice['total_ingredients'] == 5
+    assert sorted(ghee_rice['missing_ingredient_names']) == ['ghee', 'paneer']
+    # fully + partially makeable + ingredient details
+    assert len(statements) == 3
+
+    strict = MakeableRecipeEngine(test_db).makeable_recipes(user.id, limit=5, partial_threshold=80)
+    assert strict['partially_makeable'] == []
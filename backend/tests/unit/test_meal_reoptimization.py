@@ -0,0 +1,161 @@
+"""
+Incremental meal plan re-optimization tests
+
+Tests:
+1. Only free slots are re-solved; fixed slots count towards variety limits
+2. An already optimal plan is returned unchanged (warm start)
+3. Eating out re-balances the day's remaining meals, syncs MealLogs (keeping
+   their planned time, logging the restaurant meal as eaten) and notifies
+   the plan change
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.events import EventType, event_bus
+from app.models.database import MealLog, MealPlan, Recipe
+from app.services.final_meal_optimizer import MealPlanOptimizer, OptimizationConstraints
+from app.services.meal_plan_service import MealPlanService
+from app.services.recipe_index import recipe_candidate_index
+
+
+def _recipe(recipe_id, title, meal_time, calories, protein):
+    return {
+        'id': recipe_id,
+        'title': title,
+        'goals': ['general_health'],
+        'dietary_tags': ['vegetarian'],
+        'suitable_meal_times': [meal_time],
+        'macros_per_serving': {
+            'calories': calories,
+            'protein_g': protein,
+            'carbs_g': calories * 0.4 / 4,
+            'fat_g': calories * 0.3 / 9
+        },
+        'prep_time_min': 10,
+        'cook_time_min': 10,
+    }
+
+
+POOL = [
+    _recipe(1, 'Oats', 'breakfast', 500, 30),
+    _recipe(2, 'Poha', 'breakfast', 450, 25),
+    _recipe(3, 'Dal rice', 'lunch', 700, 40),
+    _recipe(4, 'Paneer wrap', 'lunch', 650, 45),
+    _recipe(5, 'Khichdi', 'dinner', 700, 35),
+    _recipe(6, 'Tofu curry', 'dinner', 650, 45),
+    _recipe(7, 'Soup', 'dinner', 250, 15),
+]
+
+
+@pytest.fixture
+def constraints():
+    return OptimizationConstraints(
+        daily_calories_min=1800,
+        daily_calories_max=2200,
+        daily_protein_min=100,
+        meals_per_day=3,
+        max_recipe_repeat_in_days=2
+    )
+
+
+def _by_id(recipe_id):
+    return next(r for r in POOL if r['id'] == recipe_id)
+
+
+def _week(*days):
+    return {
+        f'day_{d}': {'meals': {
+            'breakfast': _by_id(breakfast), 'lunch': _by_id(lunch), 'dinner': _by_id(dinner)
+        }}
+        for d, (breakfast, lunch, dinner) in enumerate(days)
+    }
+
+
+def test_only_free_slots_change(test_db, constraints):
+    week_plan = _week((1, 3, 5), (2, 4, 6))
+
+    result = MealPlanOptimizer(test_db).reoptimize(
+        1, week_plan, [(0, 'dinner')], constraints=constraints, available_recipes=POOL
+    )
+
+    assert result['optimization_method'] == 'linear_programming_incremental'
+    # Tofu curry is fixed on day 1, so the spacing window rules it out on day 0
+    assert result['week_plan']['day_0']['meals']['dinner']['id'] in {5, 7}
+    assert result['week_plan']['day_1'] == week_plan['day_1']
+    assert result['week_plan']['day_0']['meals']['lunch']['id'] == 3
+    # Input plan is not modified
+    assert week_plan['day_0']['meals']['dinner']['id'] == 5
+
+
+def test_optimal_plan_is_unchanged(test_db, constraints):
+    week_plan = _week((1, 3, 5), (2, 4, 6))
+
+    result = MealPlanOptimizer(test_db).reoptimize(
+        1, week_plan, [(0, 'dinner')], constraints=constraints, available_recipes=POOL
+    )
+
+    assert result['changes'] == []
+    assert result['week_plan']['day_0']['day_calories'] == 1900
+
+
+@pytest.fixture
+def active_plan(test_db):
+    recipe_candidate_index.invalidate()
+    recipes = []
+    for recipe in POOL:
+        row = Recipe(**{k: v for k, v in recipe.items() if k != 'id'})
+        recipes.append(row)
+    test_db.add_all(recipes)
+    test_db.flush()
+
+    ids = {recipe['title']: row.id for recipe, row in zip(POOL, recipes)}
+    records = {row.id: row.to_dict() for row in recipes}
+    plan = MealPlan(
+        user_id=1,
+        week_start_date=datetime(2026, 1, 5),
+        plan_data={'day_0': {'meals': {
+            'breakfast': records[ids['Oats']],
+            'lunch': records[ids['Dal rice']],
+            'dinner': records[ids['Khichdi']],
+        }}},
+        is_active=True
+    )
+    test_db.add(plan)
+    test_db.commit()
+
+    yield plan, ids
+    recipe_candidate_index.invalidate()
+
+
+def test_eating_out_rebalances_remaining_meals(test_db, active_plan):
+    plan, ids = active_plan
+    test_db.add(MealLog(
+        user_id=1, recipe_id=ids['Khichdi'], meal_plan_id=plan.id, day_index=0,
+        meal_type='dinner', planned_datetime=datetime(2026, 1, 5, 19, 30)
+    ))
+    test_db.commit()
+    notified = []
+    event_bus.subscribe(EventType.PLAN_GENERATED, notified.append)
+    try:
+        result = MealPlanService(test_db).adjust_for_eating_out(1, 0, 'lunch', 1500)
+    finally:
+        event_bus.unsubscribe(EventType.PLAN_GENERATED, notified.append)
+
+    # 500 (breakfast) + 1500 (restaurant) leaves room for the light dinner only
+    assert result['adjusted_meals']['dinner']['id'] == ids['Soup']
+    test_db.refresh(plan)
+    assert plan.plan_data['day_0']['meals']['breakfast']['id'] == ids['Oats']
+    assert plan.plan_data['day_0']['day_calories'] == 2250
+
+    logs = {log.meal_type: log for log in test_db.query(MealLog).filter_by(meal_plan_id=plan.id)}
+    assert logs['dinner'].recipe_id == ids['Soup']
+    assert logs['dinner'].planned_datetime == datetime(2026, 1, 5, 19, 30)
+    assert logs['lunch'].recipe_id is None
+    assert logs['lunch'].external_meal['calories'] == 1500
+    # New log at the default lunch time, counted as eaten
+    assert logs['lunch'].planned_datetime == datetime(2026, 1, 5, 13, 0)
+    assert logs['lunch'].consumed_datetime == logs['lunch'].planned_datetime
+    # Cached consumption timelines are rebuilt for the changed plan
+    assert notified == [{'user_id': 1}]
@@ -0,0 +1,84 @@
+"""
+Async tool query tests
+
+Tests:
+1. Targets follow day_meals.daily_targets (defaults until onboarding is complete)
+2. Day meals use the active plan filter; stats and pending meals match the old tool output
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.agents.nutrition_queries import (
+    DEFAULT_TARGETS,
+    day_meals_query,
+    day_stats,
+    pending_meals,
+    targets_from_row,
+    targets_query,
+)
+from app.models.database import GoalType, MealLog, MealPlan, PathType, Recipe, User, UserGoal, UserPath, UserProfile
+from app.services.day_meals import daily_targets
+
+DAY = date(2026, 3, 2)
+
+
+def _log(db, user_id, hour, recipe_id=None, plan_id=None, consumed=False, skipped=False, portion=1.0):
+    planned = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=hour)
+    db.add(MealLog(
+        user_id=user_id, recipe_id=recipe_id, meal_plan_id=plan_id, meal_type='lunch',
+        planned_datetime=planned, consumed_datetime=planned if consumed else None,
+        was_skipped=skipped, portion_multiplier=portion
+    ))
+
+
+def test_targets(test_db):
+    user = User(email='targets@nutrilens.ai', hashed_password='x', is_active=True)
+    test_db.add(user)
+    test_db.flush()
+    test_db.add(UserProfile(user_id=user.id, goal_calories=1800))
+    test_db.add(UserGoal(user_id=user.id, goal_type=GoalType.FAT_LOSS, macro_targets={"protein": 0.4, "carbs": 0.3, "fat": 0.3}))
+    test_db.commit()
+
+    assert targets_from_row(test_db.execute(targets_query(user.id)).first()) == DEFAULT_TARGETS  # no path yet
+    assert targets_from_row(test_db.execute(targets_query(999)).first()) == DEFAULT_TARGETS
+
+    test_db.add(UserPath(user_id=user.id, path_type=PathType.TRADITIONAL, meals_per_day=3))
+    test_db.commit()
+
+    targets = targets_from_row(test_db.execute(targets_query(user.id)).first())
+    assert targets == {"calories": 1800, "protein_g": 180, "carbs_g": 135, "fat_g": 60, "fiber_g": 25}
+    assert targets == daily_targets(1800, {"protein": 0.4, "carbs": 0.3, "fat": 0.3})
+    assert daily_targets(1800, None) == {"calories": 1800, "protein_g": 135, "carbs_g": 180, "fat_g": 60, "fiber_g": 25}
+    assert daily_targets(None, None) == DEFAULT_TARGETS
+
+
+def test_day_stats_and_pending_meals(test_db):
+    user = User(email='meals@nutrilens.ai', hashed_password='x', is_active=True)
+    recipe = Recipe(title='Khichdi', servings=1, macros_per_serving={'calories': 400, 'protein_g': 15})
+    test_db.add_all([user, recipe])
+    test_db.flush()
+    old_plan = MealPlan(user_id=user.id, is_active=False)
+    plan = MealPlan(user_id=user.id, is_active=True)
+    test_db.add_all([old_plan, plan])
+    test_db.flush()
+
+    _log(test_db, user.id, 8, recipe.id, plan.id, consumed=True, portion=1.5)
+    _log(test_db, user.id, 13, recipe.id, plan.id, skipped=True)
+    _log(test_db, user.id, 20, recipe.id, plan.id)
+    _log(test_db, user.id, 19, recipe.id, old_plan.id)  # stale pending log of a replaced plan
+    _log(test_db, user.id, 16, recipe.id, old_plan.id, consumed=True)
+    _log(test_db, user.id, 32, recipe.id, plan.id)  # tomorrow
+    test_db.commit()
+
+    rows = test_db.execute(day_meals_query(user.id, DAY)).all()
+    assert len(rows) == 4
+
+    stats = day_stats(rows, {"calories": 2000, "protein_g": 100})
+    assert stats["consumed"]["calories"] == 1000
+    assert stats["consumed"]["protein_g"] == 37.5
+    assert stats["remaining"] == {"calories": 1000, "protein_g": 62.5, "carbs_g": 0, "fat_g": 0}
+    assert (stats["meals_consumed"], stats["meals_pending"], stats["compliance_rate"]) == (2, 1, 50.0)
+
+    assert pending_meals(rows) == [
+        {"meal_type": "lunch", "recipe": "Khichdi", "time": "20:00", "calories": 400, "protein_g": 15}
+    ]
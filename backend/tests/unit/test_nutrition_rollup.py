@@ -0,0 +1,134 @@
+"""
+Daily nutrition rollup tests
+
+Tests:
+1. Aggregation of meal log rows per (user, planned date)
+2. Reads of users without rollups are computed in memory and write nothing
+3. Logging, skipping and portion edits keep the rollup current
+4. Consumption history is served from the rollups
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.database import DailyNutritionRollup, MealLog, NutritionRollupUser, Recipe, User
+from app.services.consumption_services import ConsumptionService
+from app.services.nutrition_rollup import NutritionRollupService, aggregate_days
+
+TODAY = date.today()
+MACROS = {"calories": 400, "protein_g": 30, "carbs_g": 40, "fat_g": 10, "fiber_g": 5}
+
+
+@pytest.fixture
+def user(test_db):
+    user = User(email='rollup@nutrilens.ai', hashed_password='x', is_active=True)
+    test_db.add(user)
+    test_db.commit()
+    return user
+
+
+@pytest.fixture
+def recipe(test_db):
+    recipe = Recipe(title='Paneer bowl', servings=1, macros_per_serving=MACROS)
+    test_db.add(recipe)
+    test_db.commit()
+    return recipe
+
+
+def _log(db, user_id, day, recipe_id=None, consumed=False, skipped=False, portion=1.0):
+    planned = datetime.combine(day, datetime.min.time()) + timedelta(hours=13)
+    log = MealLog(
+        user_id=user_id, recipe_id=recipe_id, meal_type='lunch', planned_datetime=planned,
+        consumed_datetime=planned if consumed else None, was_skipped=skipped,
+        portion_multiplier=portion
+    )
+    db.add(log)
+    return log
+
+
+def test_aggregate_days():
+    noon = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=12)
+    rows = [
+        (1, noon, noon, False, 1.5, None, MACROS),
+        (1, noon, None, True, 1.0, None, MACROS),
+        (1, noon, noon, False, 1.0, {"dish_name": "Thali", "calories": 700, "protein_g": 20}, None),
+        (1, noon, None, False, 1.0, None, MACROS),
+        (2, noon - timedelta(days=1), noon, False, None, None, MACROS),
+    ]
+
+    days = aggregate_days(rows)
+
+    today = days[(1, TODAY)]
+    assert (today["meals_planned"], today["meals_consumed"], today["meals_skipped"]) == (4, 2, 1)
+    assert today["calories"] == pytest.approx(400 * 1.5 + 700)
+    assert today["protein_g"] == pytest.approx(30 * 1.5 + 20)
+    assert today["fiber_g"] == pytest.approx(5 * 1.5)
+    assert days[(2, TODAY - timedelta(days=1))]["calories"] == 400
+
+
+def test_get_days_of_unbuilt_user_is_read_only(test_db, user, recipe):
+    _log(test_db, user.id, TODAY - timedelta(days=2), recipe.id, consumed=True)
+    _log(test_db, user.id, TODAY - timedelta(days=2), recipe.id, skipped=True)
+    _log(test_db, user.id, TODAY, recipe.id, consumed=True, portion=2.0)
+    test_db.commit()
+    service = NutritionRollupService(test_db)
+
+    days = service.get_days(user.id, TODAY - timedelta(days=7), TODAY)
+
+    assert [day.date for day in days] == [TODAY - timedelta(days=2), TODAY]
+    assert (days[0].meals_planned, days[0].meals_skipped, days[0].calories) == (2, 1, 400)
+    assert days[1].calories == 800
+    assert service.get_users_day([user.id], TODAY)[user.id].calories == 800
+    assert not test_db.new and not test_db.dirty
+    assert test_db.query(DailyNutritionRollup).count() == 0
+
+
+def test_rebuild_marks_users_without_meals(test_db, user):
+    service = NutritionRollupService(test_db)
+    assert service._users_without_rollup([user.id]) == [user.id]
+
+    service.rebuild([user.id])
+
+    assert test_db.get(NutritionRollupUser, user.id) is not None
+    assert service._users_without_rollup([user.id]) == []
+    assert service.get_days(user.id, TODAY - timedelta(days=7), TODAY) == []
+
+
+def test_consumption_service_keeps_rollup_current(test_db, user, recipe):
+    past = _log(test_db, user.id, TODAY - timedelta(days=1), recipe.id, consumed=True)
+    lunch = _log(test_db, user.id, TODAY, recipe.id)
+    dinner = _log(test_db, user.id, TODAY, recipe.id)
+    test_db.commit()
+    service = ConsumptionService(test_db)
+
+    result = service.log_meal_consumption(user.id, {'meal_log_id': lunch.id, 'portion_multiplier': 1.5})
+    assert result["updated_totals"]["calories"] == pytest.approx(600)
+
+    service.handle_skip_meal(user.id, {'meal_log_id': dinner.id, 'reason': 'Not hungry'})
+    service.track_portions(user.id, {'meal_log_id': lunch.id, 'portion_multiplier': 0.5})
+
+    today = test_db.get(DailyNutritionRollup, (user.id, TODAY))
+    test_db.refresh(today)
+    assert (today.meals_planned, today.meals_consumed, today.meals_skipped) == (2, 1, 1)
+    assert today.calories == pytest.approx(200)
+
+    # The earlier day was backfilled when the user's first rollup was written
+    yesterday = test_db.get(DailyNutritionRollup, (user.id, past.planned_datetime.date()))
+    assert yesterday.calories == 400
+
+
+def test_consumption_history_reads_rollups(test_db, user, recipe):
+    for offset in range(3):
+        _log(test_db, user.id, TODAY - timedelta(days=offset), recipe.id, consumed=True)
+        _log(test_db, user.id, TODAY - timedelta(days=offset), recipe.id, skipped=True)
+    test_db.commit()
+
+    result = ConsumptionService(test_db).get_consumption_history(user.id, days=7, include_details=True)
+
+    assert result["success"]
+    assert list(result["history"]) == [(TODAY - timedelta(days=n)).isoformat() for n in range(3)]
+    day = result["history"][TODAY.isoformat()]
+    assert (day["planned"], day["consumed"], day["skipped"], day["calories"]) == (2, 1, 1, 400)
+    assert len(day["meals"]) == 2
+    assert result["statistics"]["total_meals_consumed"] == 3
@@ -0,0 +1,135 @@
+"""
+Batch meal plan generation tests
+
+Tests:
+1. MealPlanWriter saves many plans and their meal logs in one go, mapping
+   the meal log ids back into plan_data
+2. Batch run plans every onboarded user and reports failures per user
+3. Plans whose write fails are reported as failures, not as solved methods
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.database import (
+    DietaryType, MealLog, MealPlan, Recipe, User, UserGoal, UserPath,
+    UserPreference, UserProfile
+)
+from app.services.meal_plan_writer import MealPlanWriter
+from app.services.recipe_index import recipe_candidate_index
+from app.workers.plan_batch_worker import BatchPlanGenerator
+
+START = datetime(2026, 1, 5)
+
+
+def _recipe_row(title, meal_time, calories, protein):
+    return Recipe(
+        title=title,
+        goals=['general_health', 'muscle_gain'],
+        dietary_tags=['vegetarian'],
+        suitable_meal_times=[meal_time],
+        macros_per_serving={
+            'calories': calories,
+            'protein_g': protein,
+            'carbs_g': calories * 0.4 / 4,
+            'fat_g': calories * 0.3 / 9
+        },
+        prep_time_min=10,
+        cook_time_min=15
+    )
+
+
+@pytest.fixture
+def recipe_pool(test_db):
+    recipe_candidate_index.invalidate()
+    rows = []
+    for meal_time, base in (('breakfast', 450), ('lunch', 650), ('dinner', 650)):
+        for k in range(5):
+            rows.append(_recipe_row(f'{meal_time} {k}', meal_time, base + 25 * k, 30 + 4 * k))
+    test_db.add_all(rows)
+    test_db.commit()
+    yield rows
+    recipe_candidate_index.invalidate()
+
+
+def _onboarded_user(db, email, goal_calories):
+    user = User(email=email, hashed_password='x', is_active=True, onboarding_completed=True)
+    db.add(user)
+    db.flush()
+    db.add(UserProfile(user_id=user.id, name=email, goal_calories=goal_calories, tdee=goal_calories))
+    db.add(UserGoal(user_id=user.id, goal_type='muscle_gain', is_active=True))
+    db.add(UserPath(
+        user_id=user.id, path_type='traditional', meals_per_day=3,
+        meal_windows=[{'meal': 'breakfast', 'start': '07:30', 'end': '08:30'}]
+    ))
+    db.commit()
+    return user
+
+
+def test_writer_saves_plans_in_bulk(test_db, recipe_pool):
+    users = [_onboarded_user(test_db, f'u{i}@nutrilens.ai', 2000) for i in range(2)]
+    old = MealPlan(user_id=users[0].id, week_start_date=START, plan_data={}, is_active=True)
+    test_db.add(old)
+    test_db.commit()
+
+    records = [row.to_dict() for row in recipe_pool]
+    plan_ids = MealPlanWriter(test_db).save_plans([
+        {
+            'user_id': user.id, 'start_date': START,
+            'week_plan': {'day_0': {'meals': {'breakfast': records[0], 'lunch': records[5], 'dinner': None}}},
+            'grocery_list': {}, 'total_calories': 1100, 'avg_macros': {},
+            'meal_windows': [{'meal': 'breakfast', 'start': '07:30'}]
+        }
+        for user in users
+    ])
+
+    assert len(plan_ids) == 2
+    test_db.refresh(old)
+    assert old.is_active is False
+    plans = test_db.query(MealPlan).filter(MealPlan.id.in_(plan_ids)).order_by(MealPlan.id).all()
+    assert [plan.user_id for plan in plans] == [user.id for user in users]
+
+    logs = test_db.query(MealLog).filter_by(meal_plan_id=plan_ids[0]).all()
+    assert {log.meal_type for log in logs} == {'breakfast', 'lunch'}
+    breakfast = next(log for log in logs if log.meal_type == 'breakfast')
+    assert breakfast.planned_datetime == datetime(2026, 1, 5, 7, 30)
+
+    test_db.refresh(plans[0])
+    assert plans[0].plan_data['day_0']['meal_log_ids'] == {log.meal_type: log.id for log in logs}
+    assert plans[0].plan_data['day_0']['meals']['lunch']['id'] == records[5]['id']
+
+
+def test_batch_run_plans_each_user(test_db, recipe_pool):
+    planned = [_onboarded_user(test_db, f'p{i}@nutrilens.ai', 2000 + 100 * i) for i in range(3)]
+    # The pool has no vegan recipes
+    vegan = _onboarded_user(test_db, 'vegan@nutrilens.ai', 2000)
+    test_db.add(UserPreference(user_id=vegan.id, dietary_type=DietaryType.VEGAN))
+    test_db.commit()
+
+    report = BatchPlanGenerator(test_db, workers=1, days=2, start_date=START).run()
+
+    summary = report.as_dict()
+    assert summary['users'] == 4
+    assert summary['saved'] == summary['succeeded'] == 3
+    assert list(report.failures) == [vegan.id]
+    assert set(report.solve_ms) == {user.id for user in planned + [vegan]}
+    for user in planned:
+        plan = test_db.query(MealPlan).filter_by(user_id=user.id, is_active=True).one()
+        assert set(plan.plan_data) == {'day_0', 'day_1'}
+        assert test_db.query(MealLog).filter_by(meal_plan_id=plan.id).count() == 6
+    assert test_db.query(MealPlan).filter_by(user_id=vegan.id).count() == 0
+
+
+def test_failed_write_is_not_counted(test_db, recipe_pool, monkeypatch):
+    user = _onboarded_user(test_db, 'writefail@nutrilens.ai', 2000)
+    generator = BatchPlanGenerator(test_db, workers=1, days=2, start_date=START)
+
+    def fail(plans):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(generator.writer, 'save_plans', fail)
+    summary = generator.run().as_dict()
+
+    assert (summary['saved'], summary['succeeded'], summary['methods']) == (0, 0, {})
+    assert summary['failures'] == {str(user.id): "save failed: connection lost"}
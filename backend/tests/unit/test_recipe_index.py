@@ -0,0 +1,130 @@
+"""
+Recipe candidate index tests
+
+Tests:
+1. Goal / dietary / prep-time / calorie selection
+2. Calorie range is relaxed when it leaves too few candidates
+3. add_recipes() and refresh() extend the index incrementally
+4. Local add_recipes() does not hide lower-id rows from refresh()
+5. reload() picks up edited recipes
+"""
+
+import pytest
+
+from app.models.database import Recipe
+from app.services.recipe_index import RecipeCandidateIndex, prep_time_bucket
+
+
+def _recipe(title, goals, dietary_tags, calories, prep=10, cook=10):
+    return Recipe(
+        title=title,
+        goals=goals,
+        dietary_tags=dietary_tags,
+        suitable_meal_times=["lunch"],
+        macros_per_serving={"calories": calories},
+        prep_time_min=prep,
+        cook_time_min=cook,
+    )
+
+
+@pytest.fixture
+def recipes(test_db):
+    rows = [
+        _recipe("Chicken bowl", ["muscle_gain"], ["non_vegetarian"], 600),
+        _recipe("Paneer wrap", ["muscle_gain"], ["vegetarian"], 550),
+        _recipe("Tofu stir fry", ["muscle_gain", "fat_loss"], ["vegan"], 450),
+        _recipe("Slow lasagna", ["muscle_gain"], ["vegetarian"], 700, prep=30, cook=60),
+        _recipe("Salad", ["fat_loss"], ["vegan"], 150),
+    ]
+    test_db.add_all(rows)
+    test_db.commit()
+    return rows
+
+
+def _titles(candidates):
+    return sorted(r["title"] for r in candidates)
+
+
+def test_select_by_goal_diet_and_time(test_db, recipes):
+    index = RecipeCandidateIndex()
+
+    candidates = index.select_candidates(
+        test_db, goal="muscle_gain", dietary_restrictions=["vegetarian"], max_total_time=60
+    )
+
+    # non_vegetarian no longer matches a "vegetarian" substring scan; vegan does qualify
+    assert _titles(candidates) == ["Paneer wrap", "Tofu stir fry"]
+    assert "_has_times" not in candidates[0]
+    assert set(candidates[0]) >= {"id", "macros_per_serving", "suitable_meal_times", "ingredients"}
+
+
+def test_calorie_range_and_relaxation(test_db, recipes):
+    index = RecipeCandidateIndex()
+
+    strict = index.select_candidates(
+        test_db, goal="muscle_gain", dietary_restrictions=[], max_total_time=None,
+        calorie_range=(500, 650), min_results=1
+    )
+    relaxed = index.select_candidates(
+        test_db, goal="muscle_gain", dietary_restrictions=[], max_total_time=None,
+        calorie_range=(500, 650), min_results=3
+    )
+
+    assert _titles(strict) == ["Chicken bowl", "Paneer wrap"]
+    assert len(relaxed) == 4
+
+
+def test_incremental_updates(test_db, recipes):
+    index = RecipeCandidateIndex()
+    index.snapshot(test_db)
+
+    new_recipe = _recipe("Egg scramble", ["muscle_gain"], ["vegetarian"], 400)
+    test_db.add(new_recipe)
+    test_db.commit()
+    index.add_recipes([new_recipe])
+
+    assert index.version == 2
+    assert "Egg scramble" in _titles(index.select_candidates(
+        test_db, goal="muscle_gain", dietary_restrictions=["vegetarian"], max_total_time=None
+    ))
+
+    test_db.add(_recipe("Oats", ["fat_loss"], ["vegan"], 300))
+    test_db.commit()
+
+    assert index.refresh(test_db) == 1
+    assert index.refresh(test_db) == 0
+    assert index.snapshot(test_db).goal("fat_loss").sum() == 3
+
+
+def test_local_insert_does_not_skip_other_workers_rows(test_db, recipes):
+    index = RecipeCandidateIndex()
+    index.snapshot(test_db)
+
+    other = _recipe("Dal", ["fat_loss"], ["vegan"], 350)
+    local = _recipe("Egg scramble", ["muscle_gain"], ["vegetarian"], 400)
+    test_db.add_all([other, local])
+    test_db.commit()
+    index.add_recipes([local])
+
+    assert index.refresh(test_db) == 1
+    assert index.snapshot(test_db).goal("fat_loss").sum() == 3
+
+
+def test_reload_picks_up_edits(test_db, recipes):
+    index = RecipeCandidateIndex()
+    index.snapshot(test_db)
+
+    recipes[4].macros_per_serving = {"calories": 250}
+    recipes[4].goals = ["fat_loss", "maintenance"]
+    test_db.commit()
+    assert index.refresh(test_db) == 0
+
+    snapshot = index.reload(test_db)
+    salad = next(r for r in snapshot.select("maintenance", [], None) if r["title"] == "Salad")
+    assert salad["macros_per_serving"]["calories"] == 250
+
+
+def test_prep_time_bucket():
+    assert prep_time_bucket(10) == 0
+    assert prep_time_bucket(45) == 2
+    assert prep_time_bucket(float("inf")) == 5
@@ -0,0 +1,95 @@
+"""
+Restock engine tests
+
+Tests:
+1. Historical and planned usage are aggregated per item and bucketed by priority
+2. The whole list takes two SQL statements regardless of meal history size
+"""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.models.database import Item, MealLog, Recipe, RecipeIngredient, UserInventory
+from app.services.restock_engine import RestockEngine
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def history_user(test_db, test_user):
+    user = test_user
+    rice, dal, ghee, salt = items = [
+        Item(canonical_name=name, category=category)
+        for name, category in (('rice', 'grains'), ('dal', 'legumes'), ('ghee', 'oils'), ('salt', 'spices'))
+    ]
+    test_db.add_all(items)
+    test_db.flush()
+
+    khichdi, dal_fry = Recipe(title='Khichdi'), Recipe(title='Dal fry')
+    test_db.add_all([khichdi, dal_fry])
+    test_db.flush()
+    test_db.add_all([
+        RecipeIngredient(recipe_id=khichdi.id, item_id=rice.id, quantity_grams=100),
+        RecipeIngredient(recipe_id=khichdi.id, item_id=dal.id, quantity_grams=50),
+        RecipeIngredient(recipe_id=dal_fry.id, item_id=dal.id, quantity_grams=100),
+        RecipeIngredient(recipe_id=dal_fry.id, item_id=ghee.id, quantity_grams=10),
+    ])
+
+    # 7 days of history: khichdi daily (1.5 portions), dal fry on 3 days
+    for days_ago in range(1, 8):
+        eaten = datetime.combine((NOW - timedelta(days=days_ago)).date(), time(13))
+        test_db.add(MealLog(user_id=user.id, recipe_id=khichdi.id, meal_type='lunch',
+                            planned_datetime=eaten, consumed_datetime=eaten, portion_multiplier=1.5))
+        if days_ago <= 3:
+            test_db.add(MealLog(user_id=user.id, recipe_id=dal_fry.id, meal_type='dinner',
+                                planned_datetime=eaten, consumed_datetime=eaten))
+
+    # Planned: dal fry x2 (one skipped)
+    test_db.add(MealLog(user_id=user.id, recipe_id=dal_fry.id, meal_type='dinner',
+                        planned_datetime=NOW + timedelta(days=1), portion_multiplier=2.0))
+    test_db.add(MealLog(user_id=user.id, recipe_id=dal_fry.id, meal_type='dinner',
+                        planned_datetime=NOW + timedelta(days=2), was_skipped=True))
+
+    test_db.add_all([
+        UserInventory(user_id=user.id, item_id=rice.id, quantity_grams=600, expiry_date=NOW + timedelta(days=90)),
+        UserInventory(user_id=user.id, item_id=rice.id, quantity_grams=300, expiry_date=NOW + timedelta(days=120)),
+        UserInventory(user_id=user.id, item_id=dal.id, quantity_grams=150, expiry_date=NOW + timedelta(days=60)),
+        UserInventory(user_id=user.id, item_id=ghee.id, quantity_grams=500, expiry_date=NOW + timedelta(days=2)),
+        UserInventory(user_id=user.id, item_id=salt.id, quantity_grams=1000),
+    ])
+    test_db.commit()
+    return user, items
+
+
+def test_usage_aggregates_and_buckets(test_db, history_user):
+    user, (rice, dal, ghee, salt) = history_user
+    engine = RestockEngine(test_db)
+
+    rows = {row.id: row for row in engine.item_rows(user.id, NOW)}
+    assert set(rows) == {rice.id, dal.id, ghee.id}
+    assert (rows[rice.id].total_used, rows[rice.id].usage_count, rows[rice.id].current_stock) == (1050, 7, 900)
+    assert (rows[dal.id].total_used, rows[dal.id].recipe_count, rows[dal.id].upcoming_requirement) == (825, 2, 200)
+
+    result = engine.restock_list(user.id, NOW)
+    assert result['days_of_data'] == 7
+    buckets = result['restock_list']
+
+    # Dal: 150g in stock, 200g planned -> can't cook the plan
+    assert [item['item_id'] for item in buckets['urgent']] == [dal.id, ghee.id]
+    dal_info = buckets['urgent'][0]
+    assert dal_info['recommended_quantity'] == round(825 * 1.2 - 150, 1)
+    # Ghee: well stocked but expiring
+    assert buckets['urgent'][1]['expiry_urgency'] == 'urgent'
+    # Rice: 900g vs 1260g weekly need (71%) -> nothing due yet
+    assert rice.id not in [item['item_id'] for bucket in buckets.values() for item in bucket]
+
+
+def test_restock_list_statement_count(test_db, history_user, record_statements):
+    user, _ = history_user
+    user_id = user.id
+
+    with record_statements() as statements:
+        RestockEngine(test_db).restock_list(user_id)
+
+    assert len(statements) == 2
@@ -0,0 +1,129 @@
+"""
+Meal logging streak tests
+
+Tests:
+1. Gaps-and-islands over logged dates
+2. Incremental counter updates match a full recompute (including back-dated logs)
+3. Logging a meal through ConsumptionService updates the counter
+4. Reading the streak does not commit; un-logging recomputes it
+5. Milestones are awarded once per run, also when the exact day was missed
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.database import MealLog, User, UserStreak
+from app.services.consumption_services import ConsumptionService
+from app.services.streak_service import StreakService, streak_runs
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def user(test_db):
+    user = User(email='streak@nutrilens.ai', hashed_password='x', is_active=True)
+    test_db.add(user)
+    test_db.commit()
+    return user
+
+
+def _log(db, user_id, day, consumed=True):
+    planned = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+    db.add(MealLog(
+        user_id=user_id, meal_type='lunch', planned_datetime=planned,
+        consumed_datetime=planned if consumed else None
+    ))
+
+
+def test_streak_runs():
+    days = [TODAY - timedelta(days=n) for n in (9, 8, 7, 6, 3, 1, 0)]
+
+    assert streak_runs(days) == (TODAY, 2, 4)
+    assert streak_runs([TODAY]) == (TODAY, 1, 1)
+    assert streak_runs([]) == (None, 0, 0)
+
+
+def test_incremental_updates_match_recompute(test_db, user):
+    service = StreakService(test_db)
+    _log(test_db, user.id, TODAY - timedelta(days=5))
+    _log(test_db, user.id, TODAY - timedelta(days=4), consumed=False)
+    test_db.commit()
+    assert service.get_current_streak(user.id) == 0
+
+    for offset in (3, 2, 2, 1):
+        day = TODAY - timedelta(days=offset)
+        _log(test_db, user.id, day)
+        service.record_meal(user.id, day)
+    streak = test_db.get(UserStreak, user.id)
+    assert (streak.current_streak, streak.longest_streak, streak.last_logged_date) == (3, 3, TODAY - timedelta(days=1))
+
+    # Back-dated log joins the two runs
+    _log(test_db, user.id, TODAY - timedelta(days=4))
+    service.record_meal(user.id, TODAY - timedelta(days=4))
+    _log(test_db, user.id, TODAY)
+    service.record_meal(user.id, TODAY)
+    test_db.commit()
+
+    streak = test_db.get(UserStreak, user.id)
+    assert (streak.current_streak, streak.longest_streak) == (6, 6)
+    assert service.get_current_streak(user.id) == 6
+
+    recomputed = service.recompute(user.id)
+    assert (recomputed.current_streak, recomputed.longest_streak) == (6, 6)
+
+
+def test_log_meal_consumption_updates_counter(test_db, user):
+    _log(test_db, user.id, TODAY - timedelta(days=1))
+    test_db.commit()
+    service = StreakService(test_db)
+    assert service.get_current_streak(user.id) == 0
+
+    ConsumptionService(test_db).log_meal_consumption(
+        user.id, {'meal_type': 'dinner', 'timestamp': datetime.now()}
+    )
+    test_db.commit()
+
+    assert service.get_current_streak(user.id) == 2
+    assert service.get_current_streak(user.id, today=TODAY + timedelta(days=1)) == 0
+
+
+def test_read_does_not_commit_and_unlog_recomputes(test_db, user):
+    for offset in range(3):
+        _log(test_db, user.id, TODAY - timedelta(days=offset))
+    test_db.commit()
+    service = StreakService(test_db)
+
+    assert service.get_current_streak(user.id) == 3
+    test_db.rollback()
+    assert test_db.get(UserStreak, user.id) is None
+
+    service.get_current_streak(user.id)
+    middle = test_db.query(MealLog).filter(
+        MealLog.planned_datetime >= datetime.combine(TODAY - timedelta(days=1), datetime.min.time()),
+        MealLog.planned_datetime < datetime.combine(TODAY, datetime.min.time())
+    ).one()
+    middle.consumed_datetime = None
+    service.remove_meal(user.id, TODAY - timedelta(days=1))
+
+    streak = test_db.get(UserStreak, user.id)
+    assert (streak.current_streak, streak.longest_streak) == (1, 1)
+
+
+def test_award_milestone_once_per_run(test_db, user):
+    for offset in range(1, 9):
+        _log(test_db, user.id, TODAY - timedelta(days=offset))
+    test_db.commit()
+    service = StreakService(test_db)
+
+    # Day 7 passed without a check: still awarded on day 9
+    _log(test_db, user.id, TODAY)
+    service.record_meal(user.id, TODAY)
+    assert service.award_milestone(user.id) == 7
+    assert service.award_milestone(user.id) is None
+
+    # A new run earns the milestone again
+    later = TODAY + timedelta(days=9)
+    _log(test_db, user.id, later)
+    service.record_meal(user.id, later)
+    assert test_db.get(UserStreak, user.id).milestone_awarded == 0
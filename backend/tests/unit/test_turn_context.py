@@ -0,0 +1,67 @@
+"""
+Per-turn context tests
+
+Tests:
+1. UserContext builds services lazily and memoizes sub-results until invalidated
+2. Nodes/tools of a turn (including executor threads) share one UserContext and session
+3. A failing block rolls the shared session back
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.agents.nutrition_context import UserContext
+from app.agents.turn_context import current_turn, turn_scope, use_turn
+
+
+def test_user_context_memoizes(test_db):
+    context = UserContext(test_db, 1)
+    assert 'inventory_service' not in context.__dict__
+    assert 'planning_agent' not in context.__dict__
+
+    context.consumption_service = MagicMock()
+    context.consumption_service.get_today_summary.return_value = {
+        "success": True, "total_calories": 900, "total_macros": {"protein_g": 60}, "meals_consumed": 2
+    }
+
+    first = context._get_today_consumption()
+    assert context._get_today_consumption() is first
+    assert first["consumed"]["calories"] == 900
+    assert context.consumption_service.get_today_summary.call_count == 1
+
+    context.invalidate()
+    context._get_today_consumption()
+    assert context.consumption_service.get_today_summary.call_count == 2
+
+
+def test_turn_shares_context_across_threads(test_db):
+    with turn_scope(test_db) as turn:
+        with use_turn(7) as context:
+            assert context.db is test_db
+
+        # LangGraph runs sync tools in executor threads with a copy of the context
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, lambda: current_turn().user_context(7))
+                for _ in range(2)
+            ]
+            assert all(future.result() is context for future in futures)
+
+        assert turn.user_context(8) is not context
+
+    assert current_turn() is None
+
+
+def test_failed_block_rolls_back():
+    db = MagicMock()
+
+    with turn_scope(db):
+        with pytest.raises(ValueError):
+            with use_turn(1):
+                raise ValueError("tool failed")
+
+    db.rollback.assert_called_once()
+    db.close.assert_not_called()  # sessions passed in belong to the caller
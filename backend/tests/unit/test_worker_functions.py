@@ -111,7 +111,7 @@ class TestNotificationWorkerCore:
         TEST 3: __init__() initializes state variables to None
         
         What we're testing:
-        - last_daily_summary = None
+        - daily_summaries_sent = {}
         - last_weekly_report = None
         - last_meal_reminder_check = None
         """
@@ -124,9 +124,8 @@ class TestNotificationWorkerCore:
             worker = NotificationWorker()
             
             # Assert
-            assert hasattr(worker, 'last_daily_summary'), "Should have last_daily_summary"
-            assert worker.last_daily_summary is None, "last_daily_summary should be None"
-            print("✅ last_daily_summary = None")
+            assert worker.daily_summaries_sent == {}, "daily_summaries_sent should be empty"
+            print("✅ daily_summaries_sent = {}")
             
             assert hasattr(worker, 'last_weekly_report'), "Should have last_weekly_report"
             assert worker.last_weekly_report is None, "last_weekly_report should be None"